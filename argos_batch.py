@@ -0,0 +1,149 @@
+"""
+Batched Argos translation.
+
+Argos translates a text paragraph by paragraph, one CTranslate2 call per
+paragraph, so a batch of short texts (full-screen OCR blocks, document
+chunks) never fills the model's batch. translate_texts() takes the route of
+an Argos translation apart into its packages (two of them for a pivot
+route), splits every input into paragraphs and sentences, and sends all the
+sentences of all inputs through each package's CTranslate2 translator at
+once: longest first, in batches of at most MAX_BATCH_TOKENS tokens padding
+included. The outputs are put back together the way Argos does, paragraph
+by paragraph, with the same decoding settings, so the translations match
+Argos' own.
+
+Routes it cannot take apart (another Argos version, a mock) give None, and
+the caller translates one text at a time as before.
+"""
+
+BEAM_SIZE = 4              # Argos: max(num_hypotheses, 4)
+LENGTH_PENALTY = 0.2
+MAX_BATCH_TOKENS = 2048    # sentences x longest sentence, per CTranslate2 call
+MAX_BATCH_SENTENCES = 64
+
+
+def _is(translation, argos_translate, class_name):
+    cls = getattr(argos_translate, class_name, None)
+    return isinstance(cls, type) and isinstance(translation, cls)
+
+
+def package_route(translation, argos_translate):
+    """The PackageTranslations a translation runs through, in order; None if unknown."""
+    if argos_translate is None or translation is None:
+        return None
+    if _is(translation, argos_translate, "CachedTranslation"):
+        return package_route(getattr(translation, "underlying", None), argos_translate)
+    if _is(translation, argos_translate, "CompositeTranslation"):
+        first = package_route(getattr(translation, "t1", None), argos_translate)
+        second = package_route(getattr(translation, "t2", None), argos_translate)
+        return None if first is None or second is None else first + second
+    if _is(translation, argos_translate, "IdentityTranslation"):
+        return []
+    if _is(translation, argos_translate, "PackageTranslation"):
+        pkg = getattr(translation, "pkg", None)
+        if pkg is not None and hasattr(pkg, "tokenizer") and hasattr(pkg, "package_path"):
+            return [translation]
+    return None
+
+
+def plan_batches(lengths, max_tokens=None, max_sentences=None):
+    """Indexes of lengths grouped into batches, longest first.
+
+    A batch costs its size times its longest entry, since CTranslate2 pads
+    every sentence to it; none costs more than max_tokens unless one
+    sentence alone does.
+    """
+    max_tokens = MAX_BATCH_TOKENS if max_tokens is None else max_tokens
+    max_sentences = MAX_BATCH_SENTENCES if max_sentences is None else max_sentences
+    order = sorted(range(len(lengths)), key=lambda index: -lengths[index])
+    batches = []
+    current = []
+    for index in order:
+        longest = max(1, lengths[current[0]]) if current else max(1, lengths[index])
+        if current and (len(current) >= max_sentences or longest * (len(current) + 1) > max_tokens):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _translator(step, argos_translate):
+    # Argos loads the model on the first translation; share it with the
+    # one-text-at-a-time path instead of loading a second copy.
+    if getattr(step, "translator", None) is None:
+        import ctranslate2
+
+        settings = getattr(argos_translate, "settings", None)
+        step.translator = ctranslate2.Translator(
+            str(step.pkg.package_path / "model"),
+            device=getattr(settings, "device", "cpu"),
+        )
+    return step.translator
+
+
+def _translate_leg(step, paragraphs, argos_translate, split_sentences, batches=None):
+    pkg = step.pkg
+    tokenizer = pkg.tokenizer
+    prefix = getattr(pkg, "target_prefix", "") or ""
+    sentences = []
+    owners = []
+    for index, paragraph in enumerate(paragraphs):
+        parts = [paragraph] if getattr(pkg, "type", "") == "sbd" else split_sentences(paragraph)
+        for sentence in parts:
+            sentences.append(tokenizer.encode(sentence))
+            owners.append(index)
+
+    outputs = [None] * len(sentences)
+    if sentences:
+        translator = _translator(step, argos_translate)
+        for batch in plan_batches([len(tokens) for tokens in sentences]):
+            results = translator.translate_batch(
+                [sentences[index] for index in batch],
+                target_prefix=[[prefix]] * len(batch) if prefix else None,
+                replace_unknowns=True,
+                max_batch_size=len(batch),
+                beam_size=BEAM_SIZE,
+                num_hypotheses=1,
+                length_penalty=LENGTH_PENALTY,
+            )
+            for index, result in zip(batch, results):
+                outputs[index] = list(result.hypotheses[0])
+            if batches is not None:
+                batches.append(len(batch))
+
+    tokens_by_paragraph = [[] for _ in paragraphs]
+    for owner, tokens in zip(owners, outputs):
+        tokens_by_paragraph[owner].extend(tokens)
+    translated = []
+    for tokens in tokens_by_paragraph:
+        # Decoded as Argos decodes a paragraph: all its sentences at once.
+        value = tokenizer.decode(tokens) if tokens else ""
+        if value.startswith(" "):
+            value = value[1:]
+        if prefix and value.startswith(prefix):
+            value = value[len(prefix):].lstrip(" ")
+        translated.append(value)
+    return translated
+
+
+def translate_texts(translation, texts, argos_translate, split_sentences, batches=None):
+    """Translations of texts through one Argos route, or None if it cannot be batched.
+
+    split_sentences is the sentence splitter Argos has been given; batches,
+    when a list, gets the size of every CTranslate2 call made.
+    """
+    route = package_route(translation, argos_translate)
+    if route is None:
+        return None
+    texts = [str(text or "") for text in texts]
+    paragraphs = []
+    spans = []
+    for text in texts:
+        parts = text.split("\n")
+        spans.append((len(paragraphs), len(parts)))
+        paragraphs.extend(parts)
+    for step in route:
+        paragraphs = _translate_leg(step, paragraphs, argos_translate, split_sentences, batches)
+    return ["\n".join(paragraphs[start:start + count]) for start, count in spans]
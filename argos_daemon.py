@@ -0,0 +1,319 @@
+"""
+Resident ArgosWorker process of packaged builds.
+
+Starting ArgosWorker for every request cost each offline translation the
+import of argostranslate and the load of its CTranslate2 model. The worker
+now stays up in "--serve" mode and speaks JSON lines over its stdin/stdout:
+
+    -> {"type": "request", "id": 7, "request": {"action": "translate", ...}}
+    -> {"type": "cancel", "id": 7}
+    -> {"type": "shutdown"}
+    <- {"type": "status", "id": 7, "message": "..."}
+    <- {"type": "progress", "id": 7, "message": "...", "downloaded_bytes": 0, "total_bytes": 0}
+    <- {"type": "result", "id": 7, "payload": {...}}
+
+Requests carry ids, so several can be in flight at once and their status
+and progress events are told apart; the payloads are those of the one-shot
+worker. The process is shut down after IDLE_TIMEOUT seconds without
+requests and started again by the next one. If it dies, the requests in
+flight fail, and those of RETRY_ACTIONS are sent once more to a new process.
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+import subprocess
+import time
+from collections import deque
+
+IDLE_TIMEOUT = 300.0       # seconds without requests before the worker exits
+CANCEL_GRACE = 10.0        # a cancelled request that has not ended by then restarts the worker
+SHUTDOWN_TIMEOUT = 2.0
+STDERR_LINES = 40          # tail of the worker's stderr kept for crash reports
+# Actions a fresh worker may safely run again after a crash.
+RETRY_ACTIONS = frozenset({"translate", "translate_batch", "probe", "catalog"})
+
+_LOGGER = logging.getLogger("clickntranslate.argos")
+
+
+class ArgosWorkerError(RuntimeError):
+    """The worker process ended before it answered."""
+
+
+class ArgosWorkerTimeout(ArgosWorkerError):
+    """The worker did not answer in time; it has been restarted."""
+
+
+class ArgosWorkerCancelled(ArgosWorkerError):
+    """A cancelled request did not end within CANCEL_GRACE; the worker has been restarted."""
+
+
+def _popen_options():
+    options = {}
+    if sys.platform == "win32":
+        options["creationflags"] = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        options["startupinfo"] = startupinfo
+    return options
+
+
+class _Pending:
+    __slots__ = ("process", "messages")
+
+    def __init__(self, process):
+        self.process = process
+        self.messages = queue.Queue()
+
+
+class ArgosWorkerDaemon:
+    """One resident worker started from command, shared by all callers.
+
+    env holds variables set for the worker on top of this process' own.
+    """
+
+    def __init__(self, command, idle_timeout=None, env=None):
+        self.command = list(command)
+        self.env = dict(env or {})
+        self.idle_timeout = IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._process = None
+        self._stderr = deque(maxlen=STDERR_LINES)
+        self._pending = {}
+        self._next_id = 1
+        self._idle_timer = None
+        self._stats = {"spawns": 0, "requests": 0, "crashes": 0, "retries": 0, "idle_shutdowns": 0}
+
+    # --- process ---
+
+    def _spawn(self):
+        process = subprocess.Popen(
+            self.command + ["--serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+            env={**os.environ, **self.env} if self.env else None,
+            **_popen_options(),
+        )
+        self._process = process
+        self._stderr.clear()
+        self._stats["spawns"] += 1
+        threading.Thread(target=self._read_stdout, args=(process,), name="argos-worker-out", daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(process,), name="argos-worker-err", daemon=True).start()
+        _LOGGER.info("Started ArgosWorker (pid %s)", process.pid)
+        return process
+
+    def _read_stdout(self, process):
+        for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
+            with self._lock:
+                pending = self._pending.get(message.get("id"))
+            if pending is not None and pending.process is process:
+                pending.messages.put(message)
+        # End of output: the worker has exited or is about to.
+        try:
+            code = process.wait(SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            code = None
+        with self._lock:
+            if self._process is process:
+                self._process = None
+            orphans = [pending for pending in self._pending.values() if pending.process is process]
+            if orphans and not getattr(process, "killed_on_purpose", False):
+                self._stats["crashes"] += 1
+            detail = "\n".join(self._stderr).strip() or f"exit code {code}"
+        for pending in orphans:
+            pending.messages.put({"type": "exit", "detail": detail})
+
+    def _read_stderr(self, process):
+        for line in process.stderr:
+            self._stderr.append(line.rstrip())
+
+    def _send(self, process, message):
+        with self._write_lock:
+            process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+            process.stdin.flush()
+
+    def _kill(self, process):
+        with self._lock:
+            if self._process is process:
+                self._process = None
+        process.killed_on_purpose = True
+        try:
+            process.kill()
+        except OSError:
+            pass
+
+    # --- idle shutdown ---
+
+    def _schedule_idle_shutdown(self):
+        # Called with self._lock held.
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        if self._pending or self._process is None or self.idle_timeout <= 0:
+            return
+        self._idle_timer = threading.Timer(self.idle_timeout, self._shutdown_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _shutdown_if_idle(self):
+        with self._lock:
+            if self._pending or self._process is None:
+                return
+            process, self._process = self._process, None
+            self._idle_timer = None
+            self._stats["idle_shutdowns"] += 1
+        _LOGGER.info("Stopping idle ArgosWorker (pid %s)", process.pid)
+        self._stop(process)
+
+    def _stop(self, process):
+        try:
+            self._send(process, {"type": "shutdown"})
+            process.stdin.close()
+            process.wait(SHUTDOWN_TIMEOUT)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+    def shutdown(self):
+        with self._lock:
+            process, self._process = self._process, None
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+        if process is not None:
+            self._stop(process)
+
+    # --- requests ---
+
+    def request(self, request, event_callback=None, cancel_callback=None, timeout=1800):
+        """Run one worker request and return its payload.
+
+        event_callback gets the request's status and progress events on the
+        calling thread, as they arrive. Raises ArgosWorkerTimeout,
+        ArgosWorkerCancelled, or ArgosWorkerError when the worker died (after
+        one retry for RETRY_ACTIONS).
+        """
+        request = dict(request or {})
+        retry = str(request.get("action") or "translate").lower() in RETRY_ACTIONS
+        while True:
+            try:
+                return self._request_once(request, event_callback, cancel_callback, timeout)
+            except ArgosWorkerTimeout:
+                raise
+            except ArgosWorkerCancelled:
+                raise
+            except ArgosWorkerError:
+                if not retry or (cancel_callback and cancel_callback()):
+                    raise
+                retry = False
+                with self._lock:
+                    self._stats["retries"] += 1
+                _LOGGER.warning("ArgosWorker died during a %s request; retrying once", request.get("action"))
+
+    def _request_once(self, request, event_callback, cancel_callback, timeout):
+        with self._lock:
+            process = self._process
+            if process is None or process.poll() is not None:
+                process = self._spawn()
+            request_id = self._next_id
+            self._next_id += 1
+            pending = self._pending[request_id] = _Pending(process)
+            self._stats["requests"] += 1
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+        try:
+            try:
+                self._send(process, {"type": "request", "id": request_id, "request": request})
+            except (OSError, ValueError) as exc:
+                raise ArgosWorkerError(f"Could not send the request to ArgosWorker: {exc}") from exc
+            deadline = time.monotonic() + max(1, int(timeout))
+            cancel_sent_at = None
+            while True:
+                if cancel_callback and cancel_callback():
+                    if cancel_sent_at is None:
+                        cancel_sent_at = time.monotonic()
+                        try:
+                            self._send(process, {"type": "cancel", "id": request_id})
+                        except (OSError, ValueError):
+                            pass
+                    elif time.monotonic() - cancel_sent_at > CANCEL_GRACE:
+                        self._kill(process)
+                        raise ArgosWorkerCancelled("Argos worker request was cancelled.")
+                if time.monotonic() > deadline:
+                    self._kill(process)
+                    raise ArgosWorkerTimeout("Argos offline worker timed out.")
+                try:
+                    message = pending.messages.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                kind = message.get("type")
+                if kind == "result":
+                    return message.get("payload") or {}
+                if kind == "exit":
+                    raise ArgosWorkerError(str(message.get("detail") or "ArgosWorker exited"))
+                if event_callback is not None:
+                    event_callback(message)
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+                self._schedule_idle_shutdown()
+
+    def stats(self):
+        with self._lock:
+            process = self._process
+            return {
+                **self._stats,
+                "running": process is not None and process.poll() is None,
+                "pid": process.pid if process is not None else None,
+                "in_flight": len(self._pending),
+            }
+
+
+_daemons = {}
+_daemons_lock = threading.Lock()
+
+
+def daemon(command):
+    """The shared daemon of a worker command, created on first use."""
+    key = tuple(command)
+    with _daemons_lock:
+        found = _daemons.get(key)
+        if found is None:
+            found = _daemons[key] = ArgosWorkerDaemon(key)
+        return found
+
+
+def daemon_stats():
+    with _daemons_lock:
+        existing = list(_daemons.values())
+    return {" ".join(found.command): found.stats() for found in existing}
+
+
+def shutdown_all():
+    with _daemons_lock:
+        existing = list(_daemons.values())
+        _daemons.clear()
+    for found in existing:
+        found.shutdown()
+
+
+atexit.register(shutdown_all)
@@ -0,0 +1,203 @@
+"""
+Pool of resident Argos workers for CPU-parallel offline translation.
+
+One Argos model translates on the few threads CTranslate2 gives it, and a
+document went through it one chunk at a time - on Linux in the GUI process
+itself, where translating holds the GIL the Qt thread needs. ArgosPool keeps
+several resident workers (argos_daemon) and gives every request to the
+least busy of them, warm ones first, so document chunks and the shards of a
+full-screen batch are translated in parallel, outside the GUI process.
+
+pool_size() decides how many: one worker per MIN_THREADS_PER_WORKER cores,
+at most MAX_WORKERS, and no more than fit in MEMORY_SHARE of the available
+memory, given that a worker takes PROCESS_MEMORY plus its models, which
+take about MODEL_MEMORY_FACTOR times their size on disk. Each worker gets
+its share of the cores as CTranslate2 threads (OMP_NUM_THREADS), so the
+pool as a whole does not oversubscribe the CPU. Workers start on first use,
+stay warm between documents and exit after argos_daemon's idle timeout.
+
+Callers opt in per thread with dispatch(): only document chunks and
+batches go to the pool; an interactive translation keeps its single worker.
+"""
+
+import os
+import atexit
+import threading
+import concurrent.futures
+from contextlib import contextmanager
+
+import argos_daemon
+
+MAX_WORKERS = 8
+MIN_THREADS_PER_WORKER = 2
+PROCESS_MEMORY = 300 * 1024 * 1024   # Python, argostranslate and CTranslate2 of one worker
+MODEL_MEMORY_FACTOR = 1.5
+MEMORY_SHARE = 0.5                   # of the available memory the pool may take
+MIN_SHARD_TEXTS = 4                  # smaller batches are not split between workers
+
+
+def available_memory():
+    """Bytes of memory available to new processes, or None if unknown."""
+    try:
+        import psutil
+
+        return int(psutil.virtual_memory().available)
+    except Exception:
+        return None
+
+
+def pool_size(model_bytes, cpu_count=None, memory=None):
+    """(workers, threads per worker) for models of model_bytes on this machine."""
+    cpu_count = max(1, int(cpu_count or os.cpu_count() or 1))
+    workers = min(MAX_WORKERS, max(1, cpu_count // MIN_THREADS_PER_WORKER))
+    if memory is not None:
+        per_worker = PROCESS_MEMORY + int(model_bytes * MODEL_MEMORY_FACTOR)
+        workers = min(workers, max(1, int(memory * MEMORY_SHARE) // per_worker))
+    return workers, max(1, cpu_count // workers)
+
+
+def shards(texts, count):
+    """texts cut into at most count runs of about the same number of characters."""
+    texts = list(texts)
+    count = max(1, min(count, len(texts) // MIN_SHARD_TEXTS or 1))
+    if count == 1:
+        return [texts] if texts else []
+    total = sum(len(str(text or "")) for text in texts) or 1
+    found = []
+    current = []
+    size = 0
+    for index, text in enumerate(texts):
+        current.append(text)
+        size += len(str(text or ""))
+        left = len(texts) - index - 1
+        if size * count >= total * (len(found) + 1) and len(found) < count - 1 and left:
+            found.append(current)
+            current = []
+    if current:
+        found.append(current)
+    return found
+
+
+class ArgosPool:
+    """workers resident ArgosWorkers started from command, threads CTranslate2 threads each."""
+
+    def __init__(self, command, workers, threads, model_bytes=0, setting=0):
+        self.command = list(command)
+        self.size = max(1, int(workers))
+        self.threads = max(1, int(threads))
+        self.model_bytes = model_bytes
+        self.setting = setting
+        env = {"OMP_NUM_THREADS": str(self.threads)}
+        self._workers = [argos_daemon.ArgosWorkerDaemon(self.command, env=env) for _ in range(self.size)]
+        self._busy = [0] * self.size
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        with self._lock:
+            running = [worker.stats()["running"] for worker in self._workers]
+            # The least busy worker; among equals a warm one, then the first.
+            index = min(range(self.size), key=lambda i: (self._busy[i], not running[i], i))
+            self._busy[index] += 1
+            return index
+
+    def request(self, request, event_callback=None, cancel_callback=None, timeout=1800):
+        """Run one request on the least busy worker (see ArgosWorkerDaemon.request)."""
+        index = self._acquire()
+        try:
+            return self._workers[index].request(
+                request, event_callback=event_callback, cancel_callback=cancel_callback, timeout=timeout
+            )
+        finally:
+            with self._lock:
+                self._busy[index] -= 1
+
+    def map(self, function, items):
+        """function of every item, run size at a time; results in order."""
+        items = list(items)
+        if len(items) <= 1:
+            return [function(item) for item in items]
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(self.size, len(items)), thread_name_prefix="argos-pool"
+        ) as executor:
+            return list(executor.map(function, items))
+
+    def stats(self):
+        workers = [worker.stats() for worker in self._workers]
+        return {
+            "workers": self.size,
+            "threads": self.threads,
+            "running": sum(1 for found in workers if found["running"]),
+            "spawns": sum(found["spawns"] for found in workers),
+            "requests": sum(found["requests"] for found in workers),
+            "crashes": sum(found["crashes"] for found in workers),
+        }
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.shutdown()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool(command, model_bytes, workers=0):
+    """The shared pool for models of model_bytes; workers 0 sizes it with pool_size().
+
+    A pool stays, warm, while it fits: it is only sized again for the larger
+    models of another language pair or another workers setting.
+    """
+    global _pool
+    command = list(command)
+    with _pool_lock:
+        found = _pool if _pool is not None and _pool.command == command else None
+        if found is not None and found.setting == workers and found.model_bytes >= model_bytes:
+            return found
+        model_bytes = max(model_bytes, found.model_bytes if found is not None else 0)
+        if workers:
+            size, threads = workers, max(1, (os.cpu_count() or 1) // workers)
+        else:
+            size, threads = pool_size(model_bytes, memory=available_memory())
+        if found is not None and (found.size, found.threads) == (size, threads):
+            found.model_bytes, found.setting = model_bytes, workers
+            return found
+        replaced, _pool = _pool, ArgosPool(command, size, threads, model_bytes, workers)
+        created = _pool
+    if replaced is not None:
+        replaced.shutdown()
+    return created
+
+
+def pool_stats():
+    with _pool_lock:
+        found = _pool
+    return found.stats() if found is not None else {}
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        found, _pool = _pool, None
+    if found is not None:
+        found.shutdown()
+
+
+atexit.register(shutdown)
+
+_local = threading.local()
+
+
+def dispatching():
+    """True inside dispatch() on this thread."""
+    return getattr(_local, "active", False)
+
+
+@contextmanager
+def dispatch():
+    """Send the Argos translations of this thread to the pool for the block."""
+    previous = dispatching()
+    _local.active = True
+    try:
+        yield
+    finally:
+        _local.active = previous
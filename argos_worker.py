@@ -1,9 +1,15 @@
-"""Non-Qt companion process for packaged Argos translation on Windows."""
+"""Non-Qt companion process for packaged Argos translation on Windows.
+
+Run with a request file it answers that one request and exits; run with
+--serve it stays resident and answers JSON-line requests on stdin (see
+argos_daemon for the protocol).
+"""
 
 import contextlib
 import json
 import os
 import sys
+import threading
 import traceback
 
 # Prevent translater.py from dispatching back into this executable.
@@ -12,7 +18,55 @@ os.environ["CLICKNTRANSLATE_ARGOS_WORKER"] = "1"
 import translater
 
 
-def run_request(request, event_callback=None):
+class _PackageLock:
+    """Translations share the installed Argos packages; installs and uninstalls change them alone.
+
+    serve() runs requests side by side, and an install or uninstall resets the
+    Argos caches that translations read. A waiting change holds back new
+    translations, so a stream of them cannot starve it.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextlib.contextmanager
+    def reading(self):
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def writing(self):
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                while self._writing or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+_packages = _PackageLock()
+
+
+def run_request(request, event_callback=None, cancel_event=None):
     statuses = []
 
     def emit_event(event):
@@ -41,6 +95,8 @@ def run_request(request, event_callback=None):
     cancel_path = str(request.get("cancel_path") or "")
 
     def cancel_callback():
+        if cancel_event is not None and cancel_event.is_set():
+            return True
         return bool(cancel_path and os.path.exists(cancel_path))
 
     try:
@@ -48,10 +104,11 @@ def run_request(request, event_callback=None):
             raise RuntimeError(translater.argos_unavailable_reason())
         action = str(request.get("action") or "translate").lower()
         if action == "probe":
-            pair_installed = translater._get_translation_object(
-                request.get("source_code", ""),
-                request.get("target_code", ""),
-            ) is not None
+            with _packages.reading():
+                pair_installed = translater._get_translation_object(
+                    request.get("source_code", ""),
+                    request.get("target_code", ""),
+                ) is not None
             return {
                 "result": None,
                 "pair_installed": pair_installed,
@@ -59,46 +116,60 @@ def run_request(request, event_callback=None):
                 "error": "",
             }
         if action == "catalog":
-            return {
-                "packages": translater._argos_package_catalog_local(
-                    refresh=bool(request.get("refresh", False))
-                ),
-                "statuses": statuses,
-                "error": "",
-            }
+            with _packages.reading():
+                packages = translater._argos_package_catalog_local(refresh=bool(request.get("refresh", False)))
+            return {"packages": packages, "statuses": statuses, "error": ""}
         if action == "install_packages":
-            installed = translater._install_argos_packages_local(
-                request.get("pairs") or [],
-                status_callback=status_callback,
-                progress_callback=progress_callback,
-                cancel_callback=cancel_callback,
-            )
+            with _packages.writing():
+                installed = translater._install_argos_packages_local(
+                    request.get("pairs") or [],
+                    status_callback=status_callback,
+                    progress_callback=progress_callback,
+                    cancel_callback=cancel_callback,
+                )
             return {
                 "installed": [list(pair) for pair in installed],
                 "statuses": statuses,
                 "error": "",
             }
         if action == "uninstall_packages":
-            removed = translater._uninstall_argos_packages_local(
-                request.get("pairs") or [],
-                status_callback=status_callback,
-            )
+            with _packages.writing():
+                removed = translater._uninstall_argos_packages_local(
+                    request.get("pairs") or [],
+                    status_callback=status_callback,
+                )
             return {
                 "removed": [list(pair) for pair in removed],
                 "statuses": statuses,
                 "error": "",
             }
+        if action == "translate_batch":
+            with _packages.reading():
+                results = translater._try_argos_translate_local_batch(
+                    list(request.get("texts") or []),
+                    request.get("source_code", ""),
+                    request.get("target_code", ""),
+                )
+            return {"results": results, "statuses": statuses, "error": ""}
         if action != "translate":
             raise ValueError(f"Unknown Argos worker action: {action}")
-        result = translater._try_argos_translate_local(
-            request.get("text", ""),
-            request.get("source_code", ""),
-            request.get("target_code", ""),
-            status_callback=status_callback,
-            allow_install=bool(request.get("allow_install", False)),
-            progress_callback=progress_callback,
-            cancel_callback=cancel_callback,
-        )
+        source_code = request.get("source_code", "")
+        target_code = request.get("target_code", "")
+        install = bool(request.get("allow_install", False))
+        if install:
+            with _packages.reading():
+                install = translater._get_translation_object(source_code, target_code) is None
+        # Installing the missing pair changes the packages.
+        with _packages.writing() if install else _packages.reading():
+            result = translater._try_argos_translate_local(
+                request.get("text", ""),
+                source_code,
+                target_code,
+                status_callback=status_callback,
+                allow_install=install,
+                progress_callback=progress_callback,
+                cancel_callback=cancel_callback,
+            )
         return {"result": result, "statuses": statuses, "error": ""}
     except Exception as exc:
         return {
@@ -109,10 +180,79 @@ def run_request(request, event_callback=None):
         }
 
 
+def serve(stdin, stdout):
+    """Answer JSON-line requests from stdin until shutdown or end of input.
+
+    Every request runs on a thread of its own, so translations overlap and
+    a cancel reaches a running request; its events and result carry its id.
+    Installs and uninstalls wait for running translations and hold back new
+    ones until the packages are changed (see _PackageLock).
+    """
+    write_lock = threading.Lock()
+    cancels = {}
+    cancels_lock = threading.Lock()
+
+    def send(message):
+        line = json.dumps(message, ensure_ascii=False)
+        with write_lock:
+            stdout.write(line + "\n")
+            stdout.flush()
+
+    def handle(request_id, request, cancel_event):
+        try:
+            payload = run_request(
+                request,
+                event_callback=lambda event: send({**event, "id": request_id}),
+                cancel_event=cancel_event,
+            )
+        except BaseException as exc:
+            payload = {"result": None, "statuses": [], "error": f"{type(exc).__name__}: {exc}"}
+        finally:
+            with cancels_lock:
+                cancels.pop(request_id, None)
+        send({"type": "result", "id": request_id, "payload": payload})
+
+    for line in stdin:
+        try:
+            message = json.loads(line)
+        except ValueError:
+            print(f"ArgosWorker: ignoring a malformed line: {line[:200]!r}", file=sys.stderr)
+            continue
+        kind = message.get("type")
+        if kind == "shutdown":
+            break
+        if kind == "cancel":
+            with cancels_lock:
+                cancel_event = cancels.get(message.get("id"))
+            if cancel_event is not None:
+                cancel_event.set()
+            continue
+        if kind != "request":
+            continue
+        request_id = message.get("id")
+        cancel_event = threading.Event()
+        with cancels_lock:
+            cancels[request_id] = cancel_event
+        threading.Thread(
+            target=handle,
+            args=(request_id, dict(message.get("request") or {}), cancel_event),
+            name=f"argos-request-{request_id}",
+            daemon=True,
+        ).start()
+    return 0
+
+
 def main(argv=None):
     argv = list(sys.argv[1:] if argv is None else argv)
     if hasattr(sys.stdout, "reconfigure"):
         sys.stdout.reconfigure(encoding="utf-8")
+    if argv and argv[0] == "--serve":
+        if hasattr(sys.stdin, "reconfigure"):
+            sys.stdin.reconfigure(encoding="utf-8")
+        protocol = sys.stdout
+        # Existing diagnostic prints must not corrupt the JSON protocol.
+        with contextlib.redirect_stdout(sys.stderr):
+            return serve(sys.stdin, protocol)
     if not argv:
         print(json.dumps({"error": "Argos worker request file is required."}))
         return 2
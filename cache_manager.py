@@ -5,22 +5,50 @@ Provides cleanup, size limits, and statistics.
 """
 
 import os
+import re
 import json
 import time
 import shutil
+import sqlite3
 import datetime
 import threading
 import hashlib
+import unicodedata
+import atexit
+import contextlib
+import collections
+
+import history_store
 
 # Default limits
 MAX_COPY_HISTORY = 500          # max records in copy history
 MAX_TRANSLATION_HISTORY = 500   # max records in translation history
 MAX_TRANSLATION_CACHE = 1000    # max cached translations
-MAX_TEXT_LENGTH = 5000           # max chars per history record text
+MAX_TRANSLATION_CACHE_BYTES = 4 * 1024 * 1024  # max UTF-8 bytes of cached translations
+MAX_TEXT_LENGTH = history_store.MAX_TEXT_LENGTH  # max chars per history record text
 CACHE_DIR_NAME = "cache"        # subfolder for cache files
-TRANSLATION_CACHE_FILE = "translation_cache.json"
+TRANSLATION_CACHE_FILE = "translation_cache.json"  # pre-SQLite cache, migrated on open
+TRANSLATION_CACHE_DB = "translation_cache.sqlite3"
+TRANSLATION_MEMORY_DB = "translation_memory.sqlite3"  # sentence-level translation memory
+MAX_TRANSLATION_MEMORY_SEGMENTS = 20000
+MAX_TRANSLATION_MEMORY_BYTES = 8 * 1024 * 1024
+CACHE_FLUSH_DEBOUNCE = 0.5      # seconds of quiet before queued rows are written
+CACHE_FLUSH_MAX_DELAY = 2.0     # a steady burst is still written this often
+CACHE_SYNC_INTERVAL = 0.25      # how often a store looks for other processes' writes
+# A row reaches disk up to CACHE_FLUSH_MAX_DELAY after its access time was
+# taken, so a sync also rereads rows that much older than the newest it saw.
+CACHE_SYNC_LOOKBACK = CACHE_FLUSH_MAX_DELAY + 1.0
+STORAGE_STATS_FILE = "storage_stats.json"  # per-store record counts for get_cache_stats
+TREE_STATS_MAX_AGE = 300.0      # seconds a directory tree's size is reused without a walk
 
 _cache_lock = threading.Lock()
+_stats_lock = threading.Lock()
+
+_HISTORY_FILES = history_store.HISTORY_FILES
+_CACHE_STORE_FILES = {
+    "translation_cache": TRANSLATION_CACHE_DB,
+    "translation_memory": TRANSLATION_MEMORY_DB,
+}
 
 
 def _tree_size(path):
@@ -49,63 +77,170 @@ def get_cache_dir(data_dir):
     return cache_dir
 
 
-def get_cache_stats(data_dir):
-    """Return cache statistics: file sizes, record counts, total size."""
+def _stat_paths(paths):
+    """Return the total size of paths and a signature that changes with them.
+
+    One stat per file, no reads. The -shm index is counted in the size but
+    left out of the signature: SQLite rewrites it without changing any row.
+    """
+    total = 0
+    signature = []
+    for path in paths:
+        try:
+            info = os.stat(path)
+        except OSError:
+            if not path.endswith("-shm"):
+                signature.append(None)
+            continue
+        total += info.st_size
+        if not path.endswith("-shm"):
+            signature.append([info.st_size, info.st_mtime_ns])
+    return total, signature
+
+
+def _store_paths(data_dir, name):
+    """Files that hold one store's records."""
+    if name in _HISTORY_FILES:
+        return [
+            os.path.join(data_dir, _HISTORY_FILES[name]),
+            os.path.join(data_dir, history_store.LEGACY_HISTORY_FILES[name]),
+        ]
+    cache_dir = os.path.join(data_dir, CACHE_DIR_NAME)
+    db_path = os.path.join(cache_dir, _CACHE_STORE_FILES[name])
+    paths = [db_path, db_path + "-wal", db_path + "-shm"]
+    if name == "translation_cache":
+        paths.append(os.path.join(cache_dir, TRANSLATION_CACHE_FILE))
+    return paths
+
+
+def _tree_paths(data_dir):
+    portable_root = os.path.dirname(data_dir)
+    return {
+        "pycache": os.path.join(portable_root, "__pycache__"),
+        "logs": os.path.join(data_dir, "logs"),
+        "temp": os.path.join(portable_root, "temp"),
+    }
+
+
+def _read_storage_stats(data_dir):
+    try:
+        with open(os.path.join(data_dir, STORAGE_STATS_FILE), "r", encoding="utf-8") as f:
+            sidecar = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return sidecar if isinstance(sidecar, dict) else {}
+
+
+def _write_storage_stats(data_dir, sidecar):
+    path = os.path.join(data_dir, STORAGE_STATS_FILE)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(data_dir, exist_ok=True)
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(sidecar, f)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def _scan_store_records(data_dir, name):
+    """Slow path: count a store's records by reading it."""
+    if name in _HISTORY_FILES:
+        return history_store.count_history_records(data_dir, name)
+    return _count_cached_translations(data_dir, _CACHE_STORE_FILES[name])
+
+
+def record_store_stats(data_dir, name, records):
+    """Remember how many records a writer has just persisted for a store.
+
+    The count is saved with the signature of the store's files, so
+    get_cache_stats can trust it until someone else changes them.
+    """
+    if name not in _HISTORY_FILES and name not in _CACHE_STORE_FILES:
+        raise ValueError(f"Unknown store: {name}")
+    _size, signature = _stat_paths(_store_paths(data_dir, name))
+    with _stats_lock:
+        sidecar = _read_storage_stats(data_dir)
+        stores = sidecar.get("stores")
+        if not isinstance(stores, dict):
+            stores = sidecar["stores"] = {}
+        stores[name] = {"records": int(records), "signature": signature}
+        _write_storage_stats(data_dir, sidecar)
+
+
+def get_cache_stats(data_dir, rescan=False):
+    """Return cache statistics: file sizes, record counts, total size.
+
+    Sizes come from one stat per file. Record counts come from the store
+    itself when it is open, otherwise from the storage_stats.json sidecar the
+    writers keep up to date; a store whose files no longer match the sidecar
+    is counted once and the sidecar is corrected. Directory trees are walked
+    at most every TREE_STATS_MAX_AGE seconds. rescan=True ignores the sidecar
+    and counts and walks everything.
+    """
     stats = {
         "copy_history": {"records": 0, "size_bytes": 0},
         "translation_history": {"records": 0, "size_bytes": 0},
         "translation_cache": {"records": 0, "size_bytes": 0},
+        "translation_memory": {"records": 0, "size_bytes": 0},
         "pycache": {"size_bytes": 0},
         "logs": {"size_bytes": 0},
         "temp": {"size_bytes": 0},
         "cache_bytes": 0,
         "total_bytes": 0,
     }
+    cache_id = os.path.abspath(data_dir)
 
-    # Copy history
-    ch_path = os.path.join(data_dir, "copy_history.json")
-    if os.path.exists(ch_path):
-        stats["copy_history"]["size_bytes"] = os.path.getsize(ch_path)
-        try:
-            with open(ch_path, "r", encoding="utf-8") as f:
-                records = json.load(f)
-                stats["copy_history"]["records"] = len(records)
-        except Exception:
-            pass
-
-    # Translation history
-    th_path = os.path.join(data_dir, "translation_history.json")
-    if os.path.exists(th_path):
-        stats["translation_history"]["size_bytes"] = os.path.getsize(th_path)
-        try:
-            with open(th_path, "r", encoding="utf-8") as f:
-                records = json.load(f)
-                stats["translation_history"]["records"] = len(records)
-        except Exception:
-            pass
-
-    # Translation cache
-    cache_dir = os.path.join(data_dir, CACHE_DIR_NAME)
-    tc_path = os.path.join(cache_dir, TRANSLATION_CACHE_FILE)
-    if os.path.exists(tc_path):
-        stats["translation_cache"]["size_bytes"] = os.path.getsize(tc_path)
-        try:
-            with open(tc_path, "r", encoding="utf-8") as f:
-                records = json.load(f)
-                stats["translation_cache"]["records"] = len(records)
-        except Exception:
-            pass
-
-    # __pycache__
-    pycache_dir = os.path.join(os.path.dirname(data_dir), "__pycache__")
-    stats["pycache"]["size_bytes"] = _tree_size(pycache_dir)
-    stats["logs"]["size_bytes"] = _tree_size(os.path.join(data_dir, "logs"))
-    stats["temp"]["size_bytes"] = _tree_size(
-        os.path.join(os.path.dirname(data_dir), "temp")
-    )
+    with _stats_lock:
+        sidecar = {} if rescan else _read_storage_stats(data_dir)
+        stores = sidecar.get("stores") if isinstance(sidecar.get("stores"), dict) else {}
+        trees = sidecar.get("trees") if isinstance(sidecar.get("trees"), dict) else {}
+        changed = rescan
+
+        for name in (*_HISTORY_FILES, *_CACHE_STORE_FILES):
+            size, signature = _stat_paths(_store_paths(data_dir, name))
+            stats[name]["size_bytes"] = size
+            store = _translation_caches.get((cache_id, _CACHE_STORE_FILES.get(name)))
+            cached = stores.get(name)
+            if store is not None:
+                stats[name]["records"] = len(store)
+            elif not rescan and isinstance(cached, dict) and cached.get("signature") == signature:
+                stats[name]["records"] = cached.get("records", 0)
+            else:
+                stats[name]["records"] = _scan_store_records(data_dir, name)
+                stores[name] = {"records": stats[name]["records"], "signature": signature}
+                changed = True
+
+        now = time.time()
+        for name, path in _tree_paths(data_dir).items():
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime = None
+            cached = trees.get(name)
+            if (
+                not rescan
+                and isinstance(cached, dict)
+                and cached.get("mtime") == mtime
+                and 0 <= now - cached.get("scanned", 0) < TREE_STATS_MAX_AGE
+            ):
+                stats[name]["size_bytes"] = cached.get("size_bytes", 0)
+            else:
+                stats[name]["size_bytes"] = _tree_size(path)
+                trees[name] = {"size_bytes": stats[name]["size_bytes"], "mtime": mtime, "scanned": now}
+                changed = True
+
+        if changed:
+            sidecar["stores"] = stores
+            sidecar["trees"] = trees
+            _write_storage_stats(data_dir, sidecar)
 
     stats["cache_bytes"] = (
         stats["translation_cache"]["size_bytes"]
+        + stats["translation_memory"]["size_bytes"]
         + stats["pycache"]["size_bytes"]
         + stats["logs"]["size_bytes"]
         + stats["temp"]["size_bytes"]
@@ -117,6 +252,45 @@ def get_cache_stats(data_dir):
     return stats
 
 
+def _count_cached_translations(data_dir, filename=TRANSLATION_CACHE_DB):
+    """Count cached translations without creating or migrating the store."""
+    store = _translation_caches.get((os.path.abspath(data_dir), filename))
+    if store is not None:
+        return len(store)
+    cache_dir = os.path.join(data_dir, CACHE_DIR_NAME)
+    db_path = os.path.join(cache_dir, filename)
+    if os.path.exists(db_path):
+        try:
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=2)
+            try:
+                return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            finally:
+                conn.close()
+        except Exception:
+            return 0
+    json_path = os.path.join(cache_dir, TRANSLATION_CACHE_FILE)
+    if filename == TRANSLATION_CACHE_DB and os.path.exists(json_path):
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                return len(json.load(f))
+        except Exception:
+            pass
+    return 0
+
+
+def _clear_translation_cache_rows(db_path):
+    if not os.path.exists(db_path):
+        return
+    try:
+        conn = sqlite3.connect(db_path, timeout=2, isolation_level=None)
+        try:
+            conn.execute("DELETE FROM entries")
+        finally:
+            conn.close()
+    except Exception:
+        pass
+
+
 def format_size(size_bytes):
     """Format bytes to human-readable string."""
     if size_bytes < 1024:
@@ -127,77 +301,24 @@ def format_size(size_bytes):
         return f"{size_bytes / (1024 * 1024):.1f} MB"
 
 
-def _trim_list(records, max_count):
-    """Keep only the last max_count records."""
-    if len(records) > max_count:
-        return records[-max_count:]
-    return records
-
-
-def _deduplicate_consecutive(records, key="text"):
-    """Remove consecutive duplicate entries by key."""
-    if not records:
-        return records
-    result = [records[0]]
-    for r in records[1:]:
-        if r.get(key) != result[-1].get(key):
-            result.append(r)
-    return result
-
-
-def _truncate_texts(records, max_length=MAX_TEXT_LENGTH, key="text"):
-    """Truncate long text entries."""
-    for r in records:
-        if key in r and len(r[key]) > max_length:
-            r[key] = r[key][:max_length] + "..."
-    return records
-
-
 def cleanup_history(data_dir, max_copy=MAX_COPY_HISTORY,
                     max_translation=MAX_TRANSLATION_HISTORY):
     """
-    Clean up history files:
-    - Trim to max records
+    Compact the history logs now:
     - Remove consecutive duplicates
     - Truncate overly long texts
+    - Trim to max records
     Returns dict with counts of removed records.
     """
     removed = {"copy_history": 0, "translation_history": 0}
-
-    with _cache_lock:
-        # Copy history
-        ch_path = os.path.join(data_dir, "copy_history.json")
-        if os.path.exists(ch_path):
-            try:
-                with open(ch_path, "r", encoding="utf-8") as f:
-                    records = json.load(f)
-                original_count = len(records)
-                records = _deduplicate_consecutive(records, "text")
-                records = _truncate_texts(records, MAX_TEXT_LENGTH, "text")
-                records = _trim_list(records, max_copy)
-                removed["copy_history"] = original_count - len(records)
-                with open(ch_path, "w", encoding="utf-8") as f:
-                    json.dump(records, f, ensure_ascii=False, indent=2)
-            except Exception:
-                pass
-
-        # Translation history
-        th_path = os.path.join(data_dir, "translation_history.json")
-        if os.path.exists(th_path):
-            try:
-                with open(th_path, "r", encoding="utf-8") as f:
-                    records = json.load(f)
-                original_count = len(records)
-                records = _deduplicate_consecutive(records, "original")
-                records = _truncate_texts(records, MAX_TEXT_LENGTH, "original")
-                records = _truncate_texts(records, MAX_TEXT_LENGTH, "translated")
-                records = _trim_list(records, max_translation)
-                removed["translation_history"] = original_count - len(records)
-                with open(th_path, "w", encoding="utf-8") as f:
-                    json.dump(records, f, ensure_ascii=False, indent=2)
-            except Exception:
-                pass
-
+    for name, max_records in (
+        (history_store.COPY_HISTORY, max_copy),
+        (history_store.TRANSLATION_HISTORY, max_translation),
+    ):
+        try:
+            removed[name] = history_store.compact_history(data_dir, name, max_records)
+        except Exception:
+            pass
     return removed
 
 
@@ -232,9 +353,16 @@ def clear_all_cache(data_dir, portable_root=None):
     )
 
     with _cache_lock:
-        # Invalidate first so an already queued asynchronous write cannot
-        # recreate a cache that the user has just cleared.
-        _translation_caches.pop(cache_id, None)
+        # Other processes may keep the database open (Windows then refuses to
+        # delete it); emptying it first makes them drop their copies too.
+        # Close the stores first so a stale handle cannot write into a cache
+        # that the user has just cleared. Windows also cannot delete an open
+        # database file.
+        for filename in (TRANSLATION_CACHE_DB, TRANSLATION_MEMORY_DB):
+            _clear_translation_cache_rows(os.path.join(cache_id, CACHE_DIR_NAME, filename))
+            store = _translation_caches.pop((cache_id, filename), None)
+            if store is not None:
+                store.close(discard=True)
 
         for target in targets:
             before = _tree_size(target)
@@ -254,28 +382,482 @@ def clear_all_cache(data_dir, portable_root=None):
 
 # --- Translation Cache (avoid re-translating same text) ---
 
-_translation_caches = {}  # lazy loaded per data_dir
+_translation_caches = {}  # (data_dir, database file name) -> store, lazy loaded
 
+# Engines that may prefix a legacy "engine:source:target:text" cache key.
+_LEGACY_KEY_ENGINES = {"google", "lingva", "mymemory", "libretranslate", "argos", "hymt"}
+_DIGEST_KEY_RE = re.compile(r"^(?:[^:]+:)?[^:]*:[^:]*:[0-9a-f]{64}$")
 
-def _get_cache_path(data_dir):
-    cache_dir = get_cache_dir(data_dir)
-    return os.path.join(cache_dir, TRANSLATION_CACHE_FILE)
 
+class TranslationCacheStore:
+    """Per-row SQLite store behind the translation cache of one data directory.
 
-def _load_translation_cache(data_dir):
-    cache_id = os.path.abspath(data_dir)
-    if cache_id in _translation_caches:
-        return _translation_caches[cache_id]
-    path = _get_cache_path(data_dir)
-    if os.path.exists(path):
+    Lookups are served from an in-memory LRU bounded by record count and by
+    bytes. Changes are queued and written row by row by the shared writer
+    thread; WAL mode keeps readers unblocked while a write commits.
+
+    The GUI, the ``main.py ocr|copy|translate`` launches and the Argos worker
+    all open the same database. A memory miss falls through to disk, so a
+    row committed by another process is a hit at once. A commit from another
+    connection (``PRAGMA data_version``) makes the store read the rows used
+    since its last sync into its LRU; a replaced database file makes it
+    reload.
+    """
+
+    def __init__(self, data_dir, filename=TRANSLATION_CACHE_DB, max_count=None, max_bytes=None):
+        self.data_dir = os.path.abspath(data_dir)
+        self.path = os.path.join(get_cache_dir(data_dir), filename)
+        # Name of this store in get_cache_stats, kept current after each flush.
+        self._stats_name = {db: name for name, db in _CACHE_STORE_FILES.items()}.get(filename)
+        self._max_count = max_count
+        self._max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._closed = False
+        self._last_stamp = 0.0
+        # Least recently used first: touch is move_to_end, eviction is
+        # popitem(last=False), both O(1).
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._touched = {}  # key -> access time not yet written to disk
+        self._pending = {}  # key -> (translated, created) not yet written to disk
+        self._pending_deletes = set()
+        self._synced_accessed = 0.0  # newest access time read from disk
+        self._open()
+
+    def _open(self):
+        self._conn = sqlite3.connect(
+            self.path,
+            timeout=10,
+            isolation_level=None,
+            check_same_thread=False,
+        )
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                _translation_caches[cache_id] = json.load(f)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, "
+                "translated TEXT NOT NULL, "
+                "created REAL NOT NULL, "
+                "accessed REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)"
+            )
+            if os.path.basename(self.path) == TRANSLATION_CACHE_DB:
+                self._migrate_json_cache()
+            self._load_entries(*self._limits())
         except Exception:
-            _translation_caches[cache_id] = {}
-    else:
-        _translation_caches[cache_id] = {}
-    return _translation_caches[cache_id]
+            self._conn.close()
+            raise
+        self._identity = _file_identity(self.path)
+        self._data_version = self._read_data_version()
+        self._last_sync = time.monotonic()
+
+    def _migrate_json_cache(self):
+        """Import the pre-SQLite translation_cache.json once, then remove it."""
+        json_path = os.path.join(os.path.dirname(self.path), TRANSLATION_CACHE_FILE)
+        if not os.path.exists(json_path):
+            return
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except Exception:
+            legacy = {}
+        rows = []
+        now = time.time()
+        for key, entry in (legacy.items() if isinstance(legacy, dict) else ()):
+            if not isinstance(entry, dict) or not entry.get("translated"):
+                continue
+            key = _migrated_translation_cache_key(str(key))
+            if key:
+                rows.append((
+                    key,
+                    str(entry["translated"]),
+                    float(entry.get("created") or now),
+                    float(entry.get("accessed") or entry.get("created") or now),
+                ))
+        with self._transaction():
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO entries(key, translated, created, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        try:
+            os.remove(json_path)
+        except OSError:
+            # INSERT OR IGNORE makes a repeated migration harmless.
+            pass
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _limits(self):
+        """Record and byte budgets; the module defaults apply unless overridden."""
+        return (
+            MAX_TRANSLATION_CACHE if self._max_count is None else self._max_count,
+            MAX_TRANSLATION_CACHE_BYTES if self._max_bytes is None else self._max_bytes,
+        )
+
+    def _stamp(self):
+        # Strictly increasing, so coarse Windows clocks cannot tie LRU order.
+        self._last_stamp = max(time.time(), self._last_stamp + 1e-6)
+        return self._last_stamp
+
+    def _load_entries(self, max_count, max_bytes):
+        """Fill the in-memory LRU from disk, least recently used first.
+
+        Queued local changes are kept on top of what the disk holds.
+        """
+        rows = self._conn.execute(
+            "SELECT key, translated, accessed FROM entries ORDER BY accessed"
+        ).fetchall()
+        self._entries.clear()
+        self._bytes = 0
+        for key, translated, accessed in rows:
+            self._synced_accessed = max(self._synced_accessed, accessed)
+            if key in self._pending_deletes:
+                continue
+            self._remember(key, translated)
+        for key in sorted(self._touched, key=self._touched.get):
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        for key, (translated, _created) in self._pending.items():
+            self._remember(key, translated)
+        self._evict(max_count, max_bytes)
+        self._flush_locked()
+
+    def _load_changes(self, max_count, max_bytes):
+        """Add the rows other processes saved or used since the last sync.
+
+        Only rows accessed after the newest one seen (less the lookback) are
+        read, not the whole table. Rows another process evicted stay in
+        this LRU until it evicts them too; a memory miss still falls through
+        to disk.
+        """
+        rows = self._conn.execute(
+            "SELECT key, translated, accessed FROM entries WHERE accessed > ? ORDER BY accessed",
+            (self._synced_accessed - CACHE_SYNC_LOOKBACK,),
+        ).fetchall()
+        for key, translated, accessed in rows:
+            self._synced_accessed = max(self._synced_accessed, accessed)
+            if key in self._pending_deletes or key in self._pending:
+                continue
+            if self._touched.get(key, 0.0) > accessed and key in self._entries:
+                continue  # used here since; its place in the LRU is newer
+            self._remember(key, translated)
+        self._evict(max_count, max_bytes)
+        if self._pending_deletes:
+            _cache_writer.schedule()
+
+    def _remember(self, key, translated):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= _entry_size(key, previous)
+        self._entries[key] = translated
+        self._bytes += _entry_size(key, translated)
+
+    def _read_data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync_locked(self, force=False):
+        """Pick up what other processes committed since the last look."""
+        now = time.monotonic()
+        if not force and now - self._last_sync < CACHE_SYNC_INTERVAL:
+            return
+        self._last_sync = now
+        if _file_identity(self.path) != self._identity:
+            # Another process cleared the cache and removed the database.
+            # Whatever is queued here predates that clear.
+            self._conn.close()
+            self._entries.clear()
+            self._bytes = 0
+            self._pending.clear()
+            self._pending_deletes.clear()
+            self._touched.clear()
+            self._synced_accessed = 0.0
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._open()
+            return
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._data_version = version
+            self._load_changes(*self._limits())
+
+    def _evict(self, max_count, max_bytes):
+        """Drop least recently used entries until both budgets hold."""
+        while self._entries and (len(self._entries) > max_count or self._bytes > max_bytes):
+            key, translated = self._entries.popitem(last=False)
+            self._bytes -= _entry_size(key, translated)
+            self._touched.pop(key, None)
+            self._pending.pop(key, None)
+            self._pending_deletes.add(key)
+
+    def get(self, key):
+        """Return the translation stored under key and mark it as used.
+
+        Recency is updated in memory only; the access time reaches disk
+        with the writer thread's next flush.
+        """
+        with self._lock:
+            if self._closed:
+                return None
+            self._sync_locked()
+            translated = self._entries.get(key)
+            if translated is None:
+                row = self._conn.execute(
+                    "SELECT translated FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or key in self._pending_deletes:
+                    return None
+                translated = row[0]
+                self._remember(key, translated)
+                self._evict(*self._limits())
+            self._entries.move_to_end(key)
+            self._touched[key] = self._stamp()
+            return translated
+
+    def put(self, key, translated, max_count=None, max_bytes=None):
+        """Insert or replace one translation, evicting the least recently used."""
+        default_count, default_bytes = self._limits()
+        max_count = default_count if max_count is None else max_count
+        max_bytes = default_bytes if max_bytes is None else max_bytes
+        size = _entry_size(key, translated)
+        with self._lock:
+            if self._closed or size > max_bytes:
+                return
+            self._sync_locked()
+            self._remember(key, translated)
+            self._touched.pop(key, None)
+            self._pending_deletes.discard(key)
+            self._pending[key] = (translated, self._stamp())
+            self._evict(max_count, max_bytes)
+        _cache_writer.schedule()
+
+    def flush(self):
+        """Write queued inserts, evictions and access times in one transaction.
+
+        Returns the number of rows written.
+        """
+        with self._lock:
+            if self._closed:
+                return 0
+            self._sync_locked(force=True)
+            rows = self._flush_locked()
+            records = len(self._entries)
+        if rows and self._stats_name:
+            try:
+                record_store_stats(self.data_dir, self._stats_name, records)
+            except Exception:
+                pass
+        return rows
+
+    def _flush_locked(self):
+        if not (self._pending or self._pending_deletes or self._touched):
+            return 0
+        rows = len(self._pending) + len(self._pending_deletes) + len(self._touched)
+        with self._transaction():
+            if self._pending_deletes:
+                self._conn.executemany(
+                    "DELETE FROM entries WHERE key = ?",
+                    [(key,) for key in self._pending_deletes],
+                )
+            if self._pending:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries(key, translated, created, accessed) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (key, translated, created, self._touched.pop(key, created))
+                        for key, (translated, created) in self._pending.items()
+                    ],
+                )
+            if self._touched:
+                self._conn.executemany(
+                    "UPDATE entries SET accessed = ? WHERE key = ?",
+                    [(stamp, key) for key, stamp in self._touched.items()],
+                )
+        self._pending.clear()
+        self._pending_deletes.clear()
+        self._touched.clear()
+        return rows
+
+    @property
+    def size_bytes(self):
+        """UTF-8 size of all cached keys and translations."""
+        with self._lock:
+            return self._bytes
+
+    def keys(self):
+        with self._lock:
+            return [] if self._closed else list(self._entries)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        with self._lock:
+            return 0 if self._closed else len(self._entries)
+
+    def close(self, discard=False):
+        """Close the database; queued rows are written unless discard is set."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if not discard:
+                try:
+                    self._flush_locked()
+                except Exception:
+                    pass
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            records = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            self._pending.clear()
+            self._pending_deletes.clear()
+            self._touched.clear()
+        # Closing the last connection checkpoints the WAL into the database
+        # file, which changes its signature.
+        if not discard and self._stats_name:
+            try:
+                record_store_stats(self.data_dir, self._stats_name, records)
+            except Exception:
+                pass
+
+
+class _TranslationCacheWriter:
+    """The one background thread that persists every store's queued rows.
+
+    A save only queues its row. The writer waits until saves have been quiet
+    for CACHE_FLUSH_DEBOUNCE seconds, or until CACHE_FLUSH_MAX_DELAY seconds
+    have passed since the first unwritten save, then writes everything queued
+    in one transaction per store.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._thread = None
+        self._first_dirty = None
+        self._last_dirty = None
+        self._stats = {
+            "saves": 0,
+            "flushes": 0,
+            "rows_written": 0,
+            "last_flush_seconds": 0.0,
+            "max_flush_seconds": 0.0,
+            "total_flush_seconds": 0.0,
+        }
+
+    def schedule(self):
+        with self._condition:
+            now = time.monotonic()
+            if self._first_dirty is None:
+                self._first_dirty = now
+            self._last_dirty = now
+            self._stats["saves"] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="translation-cache-writer", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._first_dirty is None:
+                    self._condition.wait()
+                deadline = min(
+                    self._last_dirty + CACHE_FLUSH_DEBOUNCE,
+                    self._first_dirty + CACHE_FLUSH_MAX_DELAY,
+                )
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                self._first_dirty = None
+                self._last_dirty = None
+            self.flush()
+
+    def flush(self):
+        """Write every store's queued rows now. Returns the rows written."""
+        written = 0
+        for store in list(_translation_caches.values()):
+            started = time.perf_counter()
+            try:
+                rows = store.flush()
+            except Exception:
+                continue
+            if not rows:
+                continue
+            elapsed = time.perf_counter() - started
+            written += rows
+            with self._condition:
+                self._stats["flushes"] += 1
+                self._stats["rows_written"] += rows
+                self._stats["last_flush_seconds"] = elapsed
+                self._stats["max_flush_seconds"] = max(self._stats["max_flush_seconds"], elapsed)
+                self._stats["total_flush_seconds"] += elapsed
+        return written
+
+    def stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+            stats["pending"] = self._first_dirty is not None
+        flushes = stats["flushes"]
+        stats["avg_flush_seconds"] = stats["total_flush_seconds"] / flushes if flushes else 0.0
+        stats["saves_per_flush"] = stats["saves"] / flushes if flushes else 0.0
+        return stats
+
+
+_cache_writer = _TranslationCacheWriter()
+
+
+def _file_identity(path):
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return (info.st_dev, info.st_ino)
+
+
+def _entry_size(key, translated):
+    return len(key.encode("utf-8")) + len(translated.encode("utf-8"))
+
+
+def _load_translation_cache(data_dir):
+    cache_id = (os.path.abspath(data_dir), TRANSLATION_CACHE_DB)
+    with _cache_lock:
+        store = _translation_caches.get(cache_id)
+        if store is None:
+            store = TranslationCacheStore(data_dir)
+            _translation_caches[cache_id] = store
+        return store
+
+
+def _load_translation_memory(data_dir):
+    cache_id = (os.path.abspath(data_dir), TRANSLATION_MEMORY_DB)
+    with _cache_lock:
+        store = _translation_caches.get(cache_id)
+        if store is None:
+            store = TranslationCacheStore(
+                data_dir,
+                TRANSLATION_MEMORY_DB,
+                max_count=MAX_TRANSLATION_MEMORY_SEGMENTS,
+                max_bytes=MAX_TRANSLATION_MEMORY_BYTES,
+            )
+            _translation_caches[cache_id] = store
+        return store
 
 
 def _translation_cache_key(text, source_code, target_code, engine=None):
@@ -285,70 +867,151 @@ def _translation_cache_key(text, source_code, target_code, engine=None):
     return f"{source_code}:{target_code}:{text_digest}"
 
 
-def _legacy_translation_cache_key(text, source_code, target_code, engine=None):
-    if engine:
-        return f"{engine}:{source_code}:{target_code}:{text}"
-    return f"{source_code}:{target_code}:{text}"
+def _migrated_translation_cache_key(key):
+    """Map a JSON-era cache key to its hashed form; raw-text keys are rehashed."""
+    if _DIGEST_KEY_RE.match(key):
+        return key
+    parts = key.split(":", 3)
+    if len(parts) == 4 and parts[0] in _LEGACY_KEY_ENGINES:
+        engine, source_code, target_code, text = parts
+        return _translation_cache_key(text, source_code, target_code, engine)
+    parts = key.split(":", 2)
+    if len(parts) == 3:
+        source_code, target_code, text = parts
+        return _translation_cache_key(text, source_code, target_code)
+    return ""
+
+
+# OCR of the same region differs in line breaks, doubled spaces and
+# invisible characters. Hy-MT is prompted with the text verbatim and mirrors
+# its line structure, so only runs of spaces are folded for it. Case is
+# never folded: every engine carries the source capitalisation into its
+# output.
+_KEEP_LINE_BREAK_ENGINES = {"hymt"}
+_INVISIBLE_CHARS_RE = re.compile("[\u00ad\u200b\u200c\u200d\u2060\ufeff]")
+_HYPHENATED_BREAK_RE = re.compile(r"(\w)-[ \t]*\n[ \t]*(\w)")
+_PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t]*\n\s*")
+_INLINE_SPACE_RE = re.compile(r"[^\S\n]+")
+
+_lookup_counters = {"exact_hits": 0, "normalized_hits": 0, "misses": 0}
+_lookup_counters_lock = threading.Lock()
+
+
+def normalize_cache_text(text, engine=None):
+    """Canonical form of text for cache lookups that tolerate OCR noise."""
+    text = unicodedata.normalize("NFC", str(text or ""))
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _INVISIBLE_CHARS_RE.sub("", text)
+    # "transla-\ntion" is one word split by the line end, "Jean-\nPaul" is not.
+    text = _HYPHENATED_BREAK_RE.sub(
+        lambda m: m.group(1) + m.group(2) if m.group(2).islower() else m.group(0).replace("\n", ""),
+        text,
+    )
+    if engine in _KEEP_LINE_BREAK_ENGINES:
+        lines = [_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.split("\n")]
+        text = re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+    else:
+        paragraphs = _PARAGRAPH_BREAK_RE.split(text)
+        text = "\n\n".join(" ".join(paragraph.split()) for paragraph in paragraphs)
+    return text.strip()
+
+
+def _count_lookup(outcome):
+    with _lookup_counters_lock:
+        _lookup_counters[outcome] += 1
+
+
+def translation_cache_counters():
+    """Hits on text that needed no normalizing, hits on OCR-noisy text, and misses so far."""
+    with _lookup_counters_lock:
+        counters = dict(_lookup_counters)
+    lookups = sum(counters.values())
+    counters["hit_rate"] = (counters["exact_hits"] + counters["normalized_hits"]) / lookups if lookups else 0.0
+    return counters
+
+
+def translation_request_key(text, source_code, target_code, engine=None):
+    """Key shared by requests the cache would answer with one translation."""
+    return _translation_cache_key(normalize_cache_text(text, engine), source_code, target_code, engine)
 
 
 def get_cached_translation(data_dir, text, source_code, target_code, engine=None):
-    """Look up a cached translation. Returns translated text or None."""
+    """Look up a cached translation. Returns translated text or None.
+
+    Translations are stored under the OCR-noise-normalized text; the exact
+    text is tried after it for entries saved before that.
+    """
     cache = _load_translation_cache(data_dir)
-    keys = [_translation_cache_key(text, source_code, target_code, engine)]
+    canonical = normalize_cache_text(text, engine)
+    translated = cache.get(_translation_cache_key(canonical, source_code, target_code, engine)) if canonical else None
+    if translated:
+        _count_lookup("exact_hits" if canonical == text else "normalized_hits")
+        return translated
+    keys = []
+    if canonical != text:
+        keys.append(_translation_cache_key(text, source_code, target_code, engine))
     if engine and engine != "hymt":
         keys.append(_translation_cache_key(text, source_code, target_code))
-    keys.append(_legacy_translation_cache_key(text, source_code, target_code, engine))
-    if engine and engine != "hymt":
-        keys.append(_legacy_translation_cache_key(text, source_code, target_code))
-    entry = None
     for key in keys:
-        entry = cache.get(key)
-        if entry:
-            break
-    if entry:
-        # Update access time
-        entry["accessed"] = time.time()
-        return entry["translated"]
+        translated = cache.get(key)
+        if translated:
+            _count_lookup("exact_hits")
+            return translated
+    _count_lookup("misses")
     return None
 
 
 def save_cached_translation(data_dir, text, source_code, target_code, translated, engine=None):
-    """Save a translation to cache. Trims cache if over limit."""
+    """Queue a translation for the cache. Trims cache if over limit.
+
+    It is stored once, under the normalized text, so the next capture of the
+    same region hits even if its whitespace differs.
+    """
     if not translated or len(text) > MAX_TEXT_LENGTH:
         return
+    canonical = normalize_cache_text(text, engine)
+    if not canonical:
+        return
     cache = _load_translation_cache(data_dir)
-    key = _translation_cache_key(text, source_code, target_code, engine)
-    cache[key] = {
-        "translated": translated,
-        "created": time.time(),
-        "accessed": time.time(),
-    }
-    # Trim by LRU if over limit
-    if len(cache) > MAX_TRANSLATION_CACHE:
-        sorted_keys = sorted(cache.keys(), key=lambda k: cache[k].get("accessed", 0))
-        to_remove = len(cache) - MAX_TRANSLATION_CACHE
-        for k in sorted_keys[:to_remove]:
-            del cache[k]
-    # Save async
-    threading.Thread(
-        target=_save_translation_cache, args=(data_dir, cache), daemon=True
-    ).start()
-
-
-def _save_translation_cache(data_dir, cache):
-    with _cache_lock:
-        cache_id = os.path.abspath(data_dir)
-        if _translation_caches.get(cache_id) is not cache:
-            return
-        try:
-            path = _get_cache_path(data_dir)
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(cache, f, ensure_ascii=False)
-        except Exception:
-            pass
+    cache.put(_translation_cache_key(canonical, source_code, target_code, engine), translated)
+
+
+def get_cached_segments(data_dir, segments, source_code, target_code, engine=None):
+    """Look up sentences in the translation memory; None marks a miss."""
+    memory = _load_translation_memory(data_dir)
+    return [
+        memory.get(_translation_cache_key(segment, source_code, target_code, engine))
+        for segment in segments
+    ]
+
+
+def save_cached_segments(data_dir, pairs, source_code, target_code, engine=None):
+    """Queue (sentence, translation) pairs for the translation memory."""
+    memory = _load_translation_memory(data_dir)
+    for segment, translated in pairs:
+        if translated and len(segment) <= MAX_TEXT_LENGTH:
+            memory.put(_translation_cache_key(segment, source_code, target_code, engine), translated)
+
+
+def flush_translation_cache():
+    """Write all queued translation-cache changes to disk now."""
+    return _cache_writer.flush()
+
+
+def translation_cache_writer_stats():
+    """Flush counts and latency of the translation-cache writer thread.
+
+    ``saves_per_flush`` is how many saves each disk write absorbed.
+    """
+    return _cache_writer.stats()
 
 
 def invalidate_translation_cache():
     """Force reload of translation cache on next access."""
     with _cache_lock:
+        for store in _translation_caches.values():
+            store.close()
         _translation_caches.clear()
+
+
+atexit.register(flush_translation_cache)
@@ -0,0 +1,160 @@
+"""
+Cancellation of interactive translations.
+
+An overlay or dialog that starts a translation hands translate_text() a
+CancelToken and cancels it when the user closes the window or starts
+another translation. The token is the thread's current token for the whole
+call (scope()), and worker threads of the call run in the same scope, so
+every step checks it without passing it around:
+
+- queued requests and chunks stop before they are sent (raise_if_cancelled),
+- a request waiting for its rate-limit slot stops waiting,
+- a request in flight is aborted: the pooled HTTP connections of
+  provider_sessions register with the current token while they carry a
+  request, and cancel() shuts their sockets down, so the blocked read
+  returns at once instead of at the timeout.
+
+A part of the call that may be abandoned on its own, such as the losing
+request of a hedged race, runs under a child() token.
+"""
+
+import socket
+import threading
+import weakref
+from contextlib import contextmanager
+
+
+class TranslationCancelledError(RuntimeError):
+    """The translation was cancelled by the user; there is nothing to report."""
+
+
+class CancelToken:
+    """Set once by cancel(); also works where a threading.Event is expected."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._connections = set()
+        self._children = weakref.WeakSet()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def is_set(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+    def cancel(self):
+        """Cancel: abort the requests in flight and stop everything not started yet."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            connections = list(self._connections)
+            self._connections.clear()
+            children = list(self._children)
+            self._children.clear()
+        for connection in connections:
+            _abort(connection)
+        for child in children:
+            child.cancel()
+
+    def child(self):
+        """A token cancelled with this one that can also be cancelled on its own."""
+        token = CancelToken()
+        with self._lock:
+            if not self._event.is_set():
+                self._children.add(token)
+                return token
+        token.cancel()
+        return token
+
+    set = cancel  # for callers that treat the token as a threading.Event
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise TranslationCancelledError("Translation cancelled")
+
+    def attach(self, connection):
+        """Abort connection when the token is cancelled, until detach()."""
+        with self._lock:
+            if not self._event.is_set():
+                self._connections.add(connection)
+                connection._cancel_token = self
+                return
+        _abort(connection)
+
+    def detach(self, connection):
+        with self._lock:
+            self._connections.discard(connection)
+        connection._cancel_token = None
+
+
+def _abort(connection):
+    # Only shut the socket down: the thread using the connection gets an
+    # error from its blocked read and closes it itself.
+    sock = getattr(connection, "sock", None)
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+_local = threading.local()
+
+
+def current():
+    """The token of the translation running on this thread, or None."""
+    return getattr(_local, "token", None)
+
+
+@contextmanager
+def scope(token):
+    """Make token the current token of this thread for the block."""
+    previous = current()
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+def bound(call):
+    """call wrapped to run in this thread's current scope, for another thread."""
+    token = current()
+    if token is None:
+        return call
+
+    def _run(*args, **kwargs):
+        with scope(token):
+            return call(*args, **kwargs)
+
+    return _run
+
+
+def raise_if_cancelled():
+    token = current()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def is_cancelled():
+    token = current()
+    return token is not None and token.cancelled
+
+
+def attach_connection(connection):
+    token = current()
+    if token is not None:
+        token.attach(connection)
+
+
+def detach_connection(connection):
+    token = getattr(connection, "_cancel_token", None)
+    if token is not None:
+        token.detach(connection)
@@ -1,13 +1,14 @@
+import concurrent.futures
 import threading
 from dataclasses import dataclass
 
+import argos_pool
+import cancellation
+import provider_capabilities
 import translater
 from languages import detect_language_code
 
 
-DEFAULT_CHUNK_SIZE = 1800
-
-
 @dataclass(frozen=True)
 class TranslationChunk:
     index: int
@@ -22,38 +23,67 @@ class TranslationChunkResult:
     error: str = ""
 
 
-def split_text_chunks(text, max_chars=DEFAULT_CHUNK_SIZE):
+def split_text_chunks(text, max_chars=None, capabilities=None):
+    """Cut text into chunks of whole paragraphs, each fitting one request.
+
+    capabilities are the engine's request limits (see provider_capabilities);
+    max_chars lowers their character limit.
+    """
     text = str(text or "").replace("\r\n", "\n").replace("\r", "\n").strip()
     if not text:
         return []
+    capabilities = provider_capabilities.limited(
+        capabilities or provider_capabilities.DEFAULT_CAPABILITIES, max_chars
+    )
+    chunks = provider_capabilities.chunk_text(_paragraph_units(text), capabilities, joiner="\n\n")
+    return [TranslationChunk(index=i, text=chunk.strip()) for i, chunk in enumerate(chunks)]
 
-    chunks = []
-    current = []
-    current_len = 0
-
-    for paragraph in _paragraph_units(text):
-        paragraph_len = len(paragraph)
-        if paragraph_len > max_chars:
-            if current:
-                chunks.append("\n\n".join(current).strip())
-                current = []
-                current_len = 0
-            chunks.extend(_split_long_unit(paragraph, max_chars))
-            continue
-
-        extra = 2 if current else 0
-        if current and current_len + paragraph_len + extra > max_chars:
-            chunks.append("\n\n".join(current).strip())
-            current = [paragraph]
-            current_len = paragraph_len
-        else:
-            current.append(paragraph)
-            current_len += paragraph_len + extra
 
-    if current:
-        chunks.append("\n\n".join(current).strip())
+def plan_document_requests(text, engine=None, max_chars=None):
+    """How many requests translating text with engine takes: one per chunk."""
+    return len(split_text_chunks(text, max_chars, provider_capabilities.capabilities(engine)))
+
+
+class _ProviderGate:
+    """At most `workers` chunks of one engine in flight, across all documents."""
+
+    def __init__(self, workers):
+        self.workers = max(1, workers)
+        self._slots = threading.BoundedSemaphore(self.workers)
+
+    def enter(self, cancel_event=None):
+        """Wait for a free slot; False if cancelled meanwhile."""
+        while not self._slots.acquire(timeout=0.1):
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+        return True
+
+    def leave(self):
+        self._slots.release()
+
+
+_gates = {}
+_gates_lock = threading.Lock()
+
 
-    return [TranslationChunk(index=i, text=chunk) for i, chunk in enumerate(chunks)]
+def _provider_gate(engine, workers=None):
+    engine = str(engine or "").lower()
+    if workers is None:
+        workers = provider_capabilities.capabilities(engine).concurrency
+    with _gates_lock:
+        gate = _gates.get((engine, workers))
+        if gate is None:
+            gate = _ProviderGate(workers)
+            _gates[(engine, workers)] = gate
+        return gate
+
+
+def _engine_workers(engine, source_code, target_code):
+    """Chunks of a document translated at once: Argos runs one per worker of its pool."""
+    workers = provider_capabilities.capabilities(engine).concurrency
+    if str(engine or "").lower() == "argos":
+        workers = max(workers, translater.argos_pool_workers(source_code, target_code))
+    return workers
 
 
 def translate_document_text(
@@ -63,58 +93,109 @@ def translate_document_text(
     provider_engine=None,
     progress_callback=None,
     cancel_event=None,
-    max_chars=DEFAULT_CHUNK_SIZE,
+    max_chars=None,
 ):
-    chunks = split_text_chunks(text, max_chars=max_chars)
+    """Translate a document chunk by chunk, several chunks at a time.
+
+    Returns the joined translation and one TranslationChunkResult per chunk,
+    in document order. A chunk that fails keeps a placeholder and its error.
+    cancel_event is a CancelToken (see make_cancel_event). Once it is
+    cancelled no new chunk starts, the requests of the chunks in flight are
+    aborted, and only the chunks before the first unfinished one are returned.
+    """
+    engine = provider_engine or translater.get_cached_translator_config().get("translator_engine", "Google")
+    # Chunks are packed to what the engine takes in one request.
+    chunks = split_text_chunks(text, max_chars, provider_capabilities.capabilities(engine))
     if not chunks:
         return "", []
 
     if source_code == "auto":
         source_code = detect_language_code(text[:5000])
 
-    results = []
-    translated_parts = []
+    gate = _provider_gate(engine, _engine_workers(engine, source_code, target_code))
     total = len(chunks)
-    for position, chunk in enumerate(chunks, start=1):
+    progress_lock = threading.Lock()
+    completed = [0]
+
+    def _progress(message, finished=False):
+        # Workers report from their own threads; one at a time keeps the
+        # done counts in order for the callback.
+        with progress_lock:
+            if finished:
+                completed[0] += 1
+            _emit_progress(progress_callback, completed[0], total, message)
+
+    def _translate_chunk(chunk):
         if cancel_event is not None and cancel_event.is_set():
-            break
-
-        _emit_progress(progress_callback, position - 1, total, f"Translating chunk {position}/{total}")
-
-        def _status(message, _position=position):
-            # Lets offline engines report language package downloads through the
-            # document progress bar.
-            _emit_progress(progress_callback, _position - 1, total, str(message))
-
+            return None
+        if not gate.enter(cancel_event):
+            return None
+        position = chunk.index + 1
         try:
-            if provider_engine:
-                translated = translater.translate_text(
-                    chunk.text, source_code, target_code, status_callback=_status, engine=provider_engine
-                )
-            else:
-                translated = translater.translate_text(
-                    chunk.text, source_code, target_code, status_callback=_status
-                )
-            error = ""
-        except Exception as exc:
-            error = str(exc)
-            translated = f"[Translation failed for chunk {position}: {error}]"
-
-        result = TranslationChunkResult(
+            _progress(f"Translating chunk {position}/{total}")
+
+            def _status(message):
+                # Lets offline engines report language package downloads through the
+                # document progress bar.
+                _progress(str(message))
+
+            try:
+                with argos_pool.dispatch():
+                    if provider_engine:
+                        translated = translater.translate_text(
+                            chunk.text,
+                            source_code,
+                            target_code,
+                            status_callback=_status,
+                            engine=provider_engine,
+                            cancel_token=cancel_event,
+                        )
+                    else:
+                        translated = translater.translate_text(
+                            chunk.text, source_code, target_code, status_callback=_status, cancel_token=cancel_event
+                        )
+                error = ""
+            except cancellation.TranslationCancelledError:
+                return None
+            except Exception as exc:
+                error = str(exc)
+                translated = f"[Translation failed for chunk {position}: {error}]"
+        finally:
+            gate.leave()
+
+        _progress(f"Translated chunk {position}/{total}", finished=True)
+        return TranslationChunkResult(
             index=chunk.index,
             source_text=chunk.text,
             translated_text=translated,
             error=error,
         )
-        results.append(result)
-        translated_parts.append(translated)
-        _emit_progress(progress_callback, position, total, f"Translated chunk {position}/{total}")
 
-    return "\n\n".join(translated_parts).strip(), results
+    workers = min(gate.workers, total)
+    if workers <= 1:
+        outcomes = []
+        for chunk in chunks:
+            outcome = _translate_chunk(chunk)
+            if outcome is None:
+                break
+            outcomes.append(outcome)
+    else:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="document-translate"
+        ) as pool:
+            outcomes = list(pool.map(_translate_chunk, chunks))
+
+    results = []
+    for outcome in outcomes:
+        if outcome is None:
+            break
+        results.append(outcome)
+    return "\n\n".join(result.translated_text for result in results).strip(), results
 
 
 def make_cancel_event():
-    return threading.Event()
+    """The token translate_document_text takes as cancel_event."""
+    return cancellation.CancelToken()
 
 
 def _paragraph_units(text):
@@ -131,27 +212,6 @@ def _paragraph_units(text):
     return parts or [text]
 
 
-def _split_long_unit(text, max_chars):
-    result = []
-    remaining = text.strip()
-    while len(remaining) > max_chars:
-        cut = _best_cut(remaining, max_chars)
-        result.append(remaining[:cut].strip())
-        remaining = remaining[cut:].strip()
-    if remaining:
-        result.append(remaining)
-    return result
-
-
-def _best_cut(text, max_chars):
-    window = text[:max_chars]
-    for marker in (". ", "! ", "? ", "; ", "\n", " "):
-        cut = window.rfind(marker)
-        if cut >= max_chars // 2:
-            return cut + len(marker)
-    return max_chars
-
-
 def _emit_progress(callback, done, total, message):
     if callback:
         callback(done, total, message)
@@ -0,0 +1,276 @@
+"""
+Searchable index over the copy and translation histories.
+
+The JSONL logs in history_store stay the source of truth. This SQLite
+database (data/history_index.sqlite3) mirrors them, so the Settings history
+view can filter and page through a history without reading the whole log.
+Each query first indexes the lines appended since the previous one; a log
+that was compacted or rewritten is indexed again from the start. Text search
+uses an FTS5 trigram index (substring match in any script) when the SQLite
+build has one and the query is at least three characters long, and LIKE
+otherwise.
+"""
+
+import os
+import json
+import sqlite3
+import datetime
+import threading
+import contextlib
+from dataclasses import dataclass
+
+import history_store
+
+HISTORY_INDEX_DB = "history_index.sqlite3"
+HISTORY_PAGE_SIZE = 50          # records per page of the history view
+_TRIGRAM = 3                    # shortest query the trigram index can answer
+
+_indexes = {}  # data_dir -> HistoryIndex
+_indexes_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class HistoryPage:
+    """One page of a history query, newest record first."""
+
+    records: tuple  # (position in read_history(), record) pairs
+    total: int      # records matching the filters on all pages
+    offset: int
+
+    @property
+    def has_more(self):
+        return self.offset + len(self.records) < self.total
+
+
+def _stamp(value):
+    """Sortable 'YYYY-MM-DD HH:MM:SS' from either timestamp format in the logs."""
+    return str(value or "").replace("T", " ")[:19]
+
+
+def _target_language(value):
+    """Target code of a record's language: 'ru' or the right side of 'en -> ru'."""
+    return str(value or "").split("->")[-1].strip().lower()
+
+
+def _day(value):
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def _like_pattern(text):
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class HistoryIndex:
+    """The index database of one data directory."""
+
+    def __init__(self, data_dir):
+        self.data_dir = os.path.abspath(data_dir)
+        self.path = os.path.join(self.data_dir, HISTORY_INDEX_DB)
+        self._lock = threading.RLock()
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.path,
+            timeout=10,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY,
+                history TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                stamp TEXT NOT NULL,
+                language TEXT NOT NULL,
+                original TEXT NOT NULL,
+                translated TEXT NOT NULL,
+                record TEXT NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS records_seq ON records(history, seq);
+            CREATE INDEX IF NOT EXISTS records_stamp ON records(history, stamp);
+            CREATE TABLE IF NOT EXISTS sources (
+                history TEXT PRIMARY KEY,
+                identity TEXT,
+                offset INTEGER NOT NULL
+            );
+            """
+        )
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5("
+                "original, translated, content='records', content_rowid='id', tokenize='trigram')"
+            )
+            self.full_text = True
+        except sqlite3.OperationalError:
+            # SQLite without FTS5 or the trigram tokenizer (older than 3.34).
+            self.full_text = False
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def refresh(self, name):
+        """Index the lines appended to a history since the last refresh."""
+        history = history_store.get_history_log(self.data_dir, name)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT identity, offset FROM sources WHERE history = ?", (name,)
+            ).fetchone()
+            identity = json.loads(row[0]) if row and row[0] else None
+            offset = row[1] if row else 0
+            identity, records, end, restarted = history.read_since(offset, identity)
+            if not records and not restarted and end == offset:
+                return 0
+            with self._transaction():
+                if restarted:
+                    self._delete_rows(name)
+                    seq = 0
+                else:
+                    seq = self._conn.execute(
+                        "SELECT COALESCE(MAX(seq) + 1, 0) FROM records WHERE history = ?", (name,)
+                    ).fetchone()[0]
+                for record in records:
+                    original = record.get("original", record.get("text", ""))
+                    cursor = self._conn.execute(
+                        "INSERT INTO records(history, seq, stamp, language, original, translated, record) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            name,
+                            seq,
+                            _stamp(record.get("timestamp")),
+                            _target_language(record.get("language")),
+                            str(original or ""),
+                            str(record.get("translated", "") or ""),
+                            json.dumps(record, ensure_ascii=False),
+                        ),
+                    )
+                    if self.full_text:
+                        self._conn.execute(
+                            "INSERT INTO records_fts(rowid, original, translated) VALUES (?, ?, ?)",
+                            (cursor.lastrowid, str(original or ""), str(record.get("translated", "") or "")),
+                        )
+                    seq += 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sources(history, identity, offset) VALUES (?, ?, ?)",
+                    (name, json.dumps(identity) if identity else None, end),
+                )
+            return len(records)
+
+    def _delete_rows(self, name):
+        if self.full_text:
+            self._conn.execute(
+                "INSERT INTO records_fts(records_fts, rowid, original, translated) "
+                "SELECT 'delete', id, original, translated FROM records WHERE history = ?",
+                (name,),
+            )
+        self._conn.execute("DELETE FROM records WHERE history = ?", (name,))
+
+    def _visible_from(self, name):
+        """First seq that read_history() still returns; older lines await compaction."""
+        count = self._conn.execute(
+            "SELECT COALESCE(MAX(seq) + 1, 0) FROM records WHERE history = ?", (name,)
+        ).fetchone()[0]
+        return max(0, count - history_store.get_history_log(self.data_dir, name).max_records)
+
+    def query(self, name, text="", language=None, date_from=None, date_to=None,
+              offset=0, limit=HISTORY_PAGE_SIZE):
+        """Return one page of a history, newest first, matching every filter.
+
+        text matches the original or translated text, case-insensitively.
+        language is a target language code. date_from and date_to are
+        inclusive days, as dates or 'YYYY-MM-DD' strings.
+        """
+        history_store.flush_history()
+        with self._lock:
+            self.refresh(name)
+            first = self._visible_from(name)
+            where = ["history = ?", "seq >= ?"]
+            params = [name, first]
+            text = str(text or "").strip()
+            if text and self.full_text and len(text) >= _TRIGRAM:
+                where.append("id IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?)")
+                params.append('"' + text.replace('"', '""') + '"')
+            elif text:
+                where.append("(original LIKE ? ESCAPE '\\' OR translated LIKE ? ESCAPE '\\')")
+                params.extend([_like_pattern(text)] * 2)
+            if language:
+                where.append("language = ?")
+                params.append(_target_language(language))
+            if date_from:
+                where.append("stamp >= ?")
+                params.append(_day(date_from).isoformat())
+            if date_to:
+                where.append("stamp < ?")
+                params.append((_day(date_to) + datetime.timedelta(days=1)).isoformat())
+            clause = " AND ".join(where)
+            total = self._conn.execute(f"SELECT COUNT(*) FROM records WHERE {clause}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT seq, record FROM records WHERE {clause} ORDER BY seq DESC LIMIT ? OFFSET ?",
+                params + [max(0, int(limit)), max(0, int(offset))],
+            ).fetchall()
+        return HistoryPage(
+            records=tuple((seq - first, json.loads(record)) for seq, record in rows),
+            total=total,
+            offset=max(0, int(offset)),
+        )
+
+    def languages(self, name):
+        """Target languages present in a history, sorted."""
+        with self._lock:
+            self.refresh(name)
+            rows = self._conn.execute(
+                "SELECT DISTINCT language FROM records WHERE history = ? AND seq >= ? "
+                "AND language != '' ORDER BY language",
+                (name, self._visible_from(name)),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+def get_history_index(data_dir):
+    index_id = os.path.abspath(data_dir)
+    with _indexes_lock:
+        index = _indexes.get(index_id)
+        if index is None:
+            index = HistoryIndex(data_dir)
+            _indexes[index_id] = index
+        return index
+
+
+def query_history(data_dir, name, text="", language=None, date_from=None, date_to=None,
+                  offset=0, limit=HISTORY_PAGE_SIZE):
+    """Return one HistoryPage of a history; see HistoryIndex.query."""
+    return get_history_index(data_dir).query(
+        name, text, language, date_from, date_to, offset, limit
+    )
+
+
+def history_languages(data_dir, name):
+    """Target languages present in a history, for the language filter."""
+    return get_history_index(data_dir).languages(name)
+
+
+def close_history_indexes():
+    with _indexes_lock:
+        for index in _indexes.values():
+            index.close()
+        _indexes.clear()
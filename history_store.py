@@ -0,0 +1,514 @@
+"""
+Append-only copy and translation histories for Click'n'Translate.
+
+Each history is a JSON Lines file with one record per line, oldest first.
+Saving a record appends one line instead of rewriting the whole file. Once
+the log holds COMPACT_FACTOR times its record limit, a background thread
+compacts it: consecutive duplicate copies are dropped, long texts truncated
+and only the newest records kept. A history saved by an older version (one JSON
+array in copy_history.json or translation_history.json) is migrated the
+first time it is opened.
+
+The app saves through submit_history: one writer thread takes records from
+a bounded queue in call order and appends each burst with one write.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import threading
+import contextlib
+import collections
+
+COPY_HISTORY = "copy_history"
+TRANSLATION_HISTORY = "translation_history"
+MAX_HISTORY_RECORDS = 500       # records kept per history
+MAX_TEXT_LENGTH = 5000          # max chars per history record text
+COMPACT_FACTOR = 2              # compact once the log holds this many times the limit
+HISTORY_QUEUE_LIMIT = 1000      # records waiting for the writer before new ones are dropped
+HISTORY_FLUSH_DELAY = 0.1       # seconds the writer waits for a burst to finish
+
+HISTORY_FILES = {
+    COPY_HISTORY: "copy_history.jsonl",
+    TRANSLATION_HISTORY: "translation_history.jsonl",
+}
+LEGACY_HISTORY_FILES = {
+    COPY_HISTORY: "copy_history.json",
+    TRANSLATION_HISTORY: "translation_history.json",
+}
+# Repeated copies of the same text collapse into one record; translations
+# never do: the same text translated into another language or by another
+# engine is a new entry.
+_DEDUPE_KEYS = {COPY_HISTORY: "text"}
+_TEXT_KEYS = {COPY_HISTORY: ("text",), TRANSLATION_HISTORY: ("original", "translated")}
+
+_NO_RECORD = object()  # dedupe key of an empty history, or of one without dedupe
+_logs = {}  # (data_dir, history name) -> HistoryLog
+_logs_lock = threading.Lock()
+_log = logging.getLogger("clickntranslate.history")
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Exclusive lock shared with other processes writing the same history.
+
+    The lock lives in a companion file, so compaction can replace the log
+    itself while the lock is held.
+    """
+    with open(path + ".lock", "a+b") as handle:
+        if sys.platform == "win32":
+            import msvcrt
+            handle.seek(0)
+            locked = False
+            try:
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                locked = True
+            except OSError:
+                pass
+            try:
+                yield
+            finally:
+                if locked:
+                    handle.seek(0)
+                    try:
+                        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+                    except OSError:
+                        pass
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def _truncate_text(record, keys):
+    for key in keys:
+        value = record.get(key)
+        if isinstance(value, str) and len(value) > MAX_TEXT_LENGTH:
+            record[key] = value[:MAX_TEXT_LENGTH] + "..."
+    return record
+
+
+def apply_history_policy(records, name, max_records=MAX_HISTORY_RECORDS):
+    """Drop consecutive duplicate copies, truncate long texts and keep the newest records."""
+    key = _DEDUPE_KEYS.get(name)
+    result = []
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        if key and result and record.get(key) == result[-1].get(key):
+            continue
+        result.append(_truncate_text(dict(record), _TEXT_KEYS[name]))
+    if max_records is not None and len(result) > max_records:
+        result = result[-max_records:]
+    return result
+
+
+def _last_dedupe_key(name, records):
+    key = _DEDUPE_KEYS.get(name)
+    return records[-1].get(key) if key and records else _NO_RECORD
+
+
+def _parse_lines(lines):
+    records = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # A line cut short by a crash mid-append.
+            continue
+        if isinstance(record, dict):
+            records.append(record)
+    return records
+
+
+class HistoryLog:
+    """One history file of one data directory."""
+
+    def __init__(self, data_dir, name, max_records=None):
+        if name not in HISTORY_FILES:
+            raise ValueError(f"Unknown history: {name}")
+        self.data_dir = os.path.abspath(data_dir)
+        self.name = name
+        self.path = os.path.join(self.data_dir, HISTORY_FILES[name])
+        self.legacy_path = os.path.join(self.data_dir, LEGACY_HISTORY_FILES[name])
+        self.max_records = MAX_HISTORY_RECORDS if max_records is None else max_records
+        self._lock = threading.Lock()
+        self._lines = None      # lines in the file, counted on first use
+        self._last_key = _NO_RECORD  # dedupe key of the last line this process knows of
+        self._size = 0          # file size after this process's last write
+        self._compacting = False
+
+    # --- reading and writing whole files (callers hold both locks) ---
+
+    def _read_lines(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return _parse_lines(f)
+        except FileNotFoundError:
+            return []
+
+    def _write_lines(self, records):
+        os.makedirs(self.data_dir, exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8", newline="\n") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(temporary, self.path)
+        finally:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+        self._lines = len(records)
+        self._last_key = _last_dedupe_key(self.name, records)
+        self._size = self._file_size()
+
+    def _migrate_legacy(self):
+        if os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError):
+            records = []
+        records = apply_history_policy(records if isinstance(records, list) else [], self.name, None)
+        self._write_lines(records)
+        try:
+            os.remove(self.legacy_path)
+        except OSError:
+            pass
+
+    def _file_size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def _prepare(self):
+        self._migrate_legacy()
+        # Another process appended or compacted since our last write: the
+        # line count and the last record are no longer ours to trust.
+        if self._lines is None or self._file_size() != self._size:
+            records = self._read_lines()
+            self._lines = len(records)
+            self._last_key = _last_dedupe_key(self.name, records)
+            self._size = self._file_size()
+
+    # --- public API ---
+
+    def append(self, records):
+        """Append records with one write. Returns the number appended."""
+        key = _DEDUPE_KEYS.get(self.name)
+        with self._lock:
+            os.makedirs(self.data_dir, exist_ok=True)
+            with _file_lock(self.path):
+                self._prepare()
+                lines = []
+                for record in records:
+                    record = _truncate_text(dict(record), _TEXT_KEYS[self.name])
+                    if key and record.get(key) == self._last_key:
+                        continue
+                    lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+                    self._last_key = record.get(key) if key else _NO_RECORD
+                if not lines:
+                    return 0
+                with open(self.path, "a+b") as f:
+                    payload = "".join(lines).encode("utf-8")
+                    f.seek(0, os.SEEK_END)
+                    if f.tell():
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            payload = b"\n" + payload
+                    f.write(payload)
+                    self._size = f.tell()
+                self._lines += len(lines)
+                compact = self._lines >= self.max_records * COMPACT_FACTOR and not self._compacting
+                if compact:
+                    self._compacting = True
+        if compact:
+            threading.Thread(
+                target=self._compact_in_background, name=f"{self.name}-compaction", daemon=True
+            ).start()
+        self._record_stats(min(self._lines, self.max_records))
+        return len(lines)
+
+    def read(self):
+        """Return the history oldest first, as the limits leave it."""
+        with self._lock:
+            if not os.path.exists(self.path) and not os.path.exists(self.legacy_path):
+                return []
+            with _file_lock(self.path):
+                self._migrate_legacy()
+                records = self._read_lines()
+        return records[-self.max_records:]
+
+    def read_since(self, offset, identity=None):
+        """Return records appended after byte offset of the file identity.
+
+        Returns (identity, records, end offset, restarted). A log that was
+        compacted or replaced since is read from the start and restarted is
+        True. A trailing line still being written is left for the next call.
+        """
+        with self._lock:
+            if not os.path.exists(self.path) and not os.path.exists(self.legacy_path):
+                return None, [], 0, identity is not None
+            with _file_lock(self.path):
+                self._migrate_legacy()
+                try:
+                    with open(self.path, "rb") as f:
+                        info = os.fstat(f.fileno())
+                        current = [info.st_dev, info.st_ino]
+                        restarted = current != identity or info.st_size < offset
+                        if restarted:
+                            offset = 0
+                        f.seek(offset)
+                        data = f.read()
+                except FileNotFoundError:
+                    return None, [], 0, identity is not None
+        end = data.rfind(b"\n") + 1
+        records = _parse_lines(data[:end].decode("utf-8", errors="replace").split("\n"))
+        return current, records, offset + end, restarted
+
+    def replace(self, records):
+        """Replace the whole history, e.g. after deleting or clearing records."""
+        # No dedupe here: deleting a record must not merge its neighbours.
+        records = [dict(record) for record in records if isinstance(record, dict)][-self.max_records:]
+        with self._lock:
+            os.makedirs(self.data_dir, exist_ok=True)
+            with _file_lock(self.path):
+                self._write_lines(records)
+                try:
+                    os.remove(self.legacy_path)
+                except OSError:
+                    pass
+        self._record_stats(len(records))
+
+    def compact(self, max_records=None):
+        """Rewrite the log as the limits leave it. Returns the lines removed."""
+        limit = self.max_records if max_records is None else max_records
+        with self._lock:
+            if not os.path.exists(self.path) and not os.path.exists(self.legacy_path):
+                return 0
+            with _file_lock(self.path):
+                self._migrate_legacy()
+                records = self._read_lines()
+                kept = apply_history_policy(records, self.name, limit)
+                if kept != records:
+                    self._write_lines(kept)
+                else:
+                    self._lines = len(records)
+        self._record_stats(len(kept))
+        return len(records) - len(kept)
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except Exception:
+            _log.exception("Could not compact %s", self.path)
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _record_stats(self, records):
+        try:
+            import cache_manager
+            cache_manager.record_store_stats(self.data_dir, self.name, records)
+        except Exception:
+            pass
+
+
+def get_history_log(data_dir, name):
+    log_id = (os.path.abspath(data_dir), name)
+    with _logs_lock:
+        history = _logs.get(log_id)
+        if history is None:
+            history = HistoryLog(data_dir, name)
+            _logs[log_id] = history
+        return history
+
+
+def append_history(data_dir, name, record):
+    """Append one record to a history."""
+    return get_history_log(data_dir, name).append([record])
+
+
+def read_history(data_dir, name):
+    """Return a history's records, oldest first, including queued ones."""
+    flush_history()
+    return get_history_log(data_dir, name).read()
+
+
+def write_history(data_dir, name, records):
+    """Replace a history's records once the queued ones are written."""
+    flush_history()
+    get_history_log(data_dir, name).replace(records)
+
+
+def compact_history(data_dir, name, max_records=None):
+    """Compact a history now. Returns the number of lines removed."""
+    flush_history()
+    return get_history_log(data_dir, name).compact(max_records)
+
+
+class _HistoryWriter:
+    """The one background thread that writes every history record.
+
+    Saves only queue their record, in call order. The writer waits up to
+    HISTORY_FLUSH_DELAY seconds for a burst to finish, then appends each
+    log's queued records with one write. The queue is bounded: if the disk
+    stalls, records past HISTORY_QUEUE_LIMIT are dropped and counted rather
+    than piling up in memory.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._queue = collections.deque()  # (data_dir, name, record, queued at)
+        self._thread = None
+        self._writing = False
+        self._flush_requested = False
+        self._stats = {
+            "queued": 0,
+            "dropped": 0,
+            "written": 0,
+            "flushes": 0,
+            "max_depth": 0,
+            "last_flush_seconds": 0.0,
+            "max_flush_seconds": 0.0,
+            "total_flush_seconds": 0.0,
+            "last_latency_seconds": 0.0,
+            "max_latency_seconds": 0.0,
+        }
+
+    def submit(self, data_dir, name, record):
+        if name not in HISTORY_FILES:
+            raise ValueError(f"Unknown history: {name}")
+        with self._condition:
+            if len(self._queue) >= HISTORY_QUEUE_LIMIT:
+                self._stats["dropped"] += 1
+                _log.warning("History queue is full; dropped a %s record", name)
+                return False
+            self._queue.append((os.path.abspath(data_dir), name, record, time.monotonic()))
+            self._stats["queued"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], len(self._queue))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                while not self._flush_requested and len(self._queue) < HISTORY_QUEUE_LIMIT:
+                    # Quiet for HISTORY_FLUSH_DELAY, or a steady stream has
+                    # been waiting ten times that long.
+                    deadline = min(
+                        self._queue[-1][3] + HISTORY_FLUSH_DELAY,
+                        self._queue[0][3] + HISTORY_FLUSH_DELAY * 10,
+                    )
+                    delay = deadline - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                batch = list(self._queue)
+                self._queue.clear()
+                self._flush_requested = False
+                self._writing = True
+            try:
+                self._write(batch)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        groups = collections.OrderedDict()
+        for data_dir, name, record, _queued in batch:
+            groups.setdefault((data_dir, name), []).append(record)
+        written = 0
+        for (data_dir, name), records in groups.items():
+            try:
+                get_history_log(data_dir, name).append(records)
+                written += len(records)
+            except Exception:
+                _log.exception("Could not save %d %s records", len(records), name)
+        elapsed = time.perf_counter() - started
+        latency = time.monotonic() - batch[0][3]
+        with self._condition:
+            self._stats["flushes"] += 1
+            self._stats["written"] += written
+            self._stats["last_flush_seconds"] = elapsed
+            self._stats["max_flush_seconds"] = max(self._stats["max_flush_seconds"], elapsed)
+            self._stats["total_flush_seconds"] += elapsed
+            self._stats["last_latency_seconds"] = latency
+            self._stats["max_latency_seconds"] = max(self._stats["max_latency_seconds"], latency)
+
+    def flush(self, timeout=5.0):
+        """Write everything queued now. Returns False if the timeout ran out."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._queue or self._writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+            stats["depth"] = len(self._queue)
+        flushes = stats["flushes"]
+        stats["avg_flush_seconds"] = stats["total_flush_seconds"] / flushes if flushes else 0.0
+        stats["records_per_flush"] = stats["written"] / flushes if flushes else 0.0
+        return stats
+
+
+_history_writer = _HistoryWriter()
+
+
+def submit_history(data_dir, name, record):
+    """Queue one record for the history writer. Returns False if it was dropped."""
+    return _history_writer.submit(data_dir, name, record)
+
+
+def flush_history(timeout=5.0):
+    """Write every queued history record now, e.g. before the app exits."""
+    return _history_writer.flush(timeout)
+
+
+def history_writer_stats():
+    """Queue depth, drops, flush time and enqueue-to-disk latency of the writer."""
+    return _history_writer.stats()
+
+
+def count_history_records(data_dir, name):
+    """Count a history's records without migrating or compacting it."""
+    history = get_history_log(data_dir, name)
+    records = history._read_lines()
+    if not records and os.path.exists(history.legacy_path):
+        try:
+            with open(history.legacy_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            legacy = []
+        records = legacy if isinstance(legacy, list) else []
+    return min(len(records), history.max_records)
+
+
+atexit.register(flush_history)
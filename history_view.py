@@ -0,0 +1,429 @@
+"""
+Virtualized list for the Settings history views.
+
+A history can hold thousands of records, and one widget tree per record made
+opening the view cost time and memory in proportion to the whole history.
+Here HistoryListModel pulls records from history_index a page at a time as the
+list is scrolled (canFetchMore / fetchMore), and HistoryRecordDelegate paints
+each record as a card, so only the rows on screen are ever drawn and no
+record owns a widget. The per-field Copy and Delete buttons are painted by
+the delegate too; HistoryListView hit-tests them and reports clicks through
+its copy_requested and delete_requested signals.
+"""
+
+import logging
+from collections import OrderedDict
+from datetime import datetime
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+from PyQt5.QtCore import Qt
+
+import history_index
+
+logger = logging.getLogger(__name__)
+
+RecordRole = Qt.UserRole + 1     # the record dict
+PositionRole = Qt.UserRole + 2   # its position in history_store.read_history()
+
+# Card geometry, in pixels; it matches the widget cards this view replaced.
+CARD_GAP = 8
+CARD_MARGIN_H = 11
+CARD_MARGIN_V = 9
+CARD_SPACING = 5
+SCROLL_GAP = 4
+BLOCK_PADDING_H = 10
+BLOCK_PADDING_V = 8
+BUTTON_HEIGHT = 28
+BUTTON_PADDING = 10
+BUTTON_SPACING = 6
+META_HEIGHT = 20
+LAYOUT_CACHE_SIZE = 64   # card layouts kept for the rows painted lately
+MAX_FETCH_SIZE = 500     # most records one scroll-triggered fetch adds
+
+_TEXT_FLAGS = Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap
+
+
+def format_history_timestamp(value):
+    try:
+        return datetime.fromisoformat(str(value or "")).strftime("%d.%m.%Y  ·  %H:%M")
+    except Exception:
+        return str(value or "")
+
+
+def _font(base, pixel_size, weight=QtGui.QFont.Normal, family=None):
+    font = QtGui.QFont(base)
+    if family:
+        font.setFamily(family)
+    font.setPixelSize(pixel_size)
+    font.setWeight(weight)
+    return font
+
+
+class HistoryListModel(QtCore.QAbstractListModel):
+    """Records of one history, newest first, fetched a page at a time."""
+
+    def __init__(self, data_dir, name, page_size=history_index.HISTORY_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.data_dir = data_dir
+        self.name = name
+        self.page_size = page_size
+        self._filters = {}
+        self._rows = []   # (position, record) pairs
+        self._total = 0
+
+    @property
+    def total(self):
+        """Records matching the filters, including those not fetched yet."""
+        return self._total
+
+    def reload(self, **filters):
+        """Start over from the first page with new filters.
+
+        Query errors propagate, leaving the model empty.
+        """
+        self.beginResetModel()
+        self._filters = dict(filters)
+        self._rows = []
+        self._total = 0
+        try:
+            page = history_index.query_history(
+                self.data_dir, self.name, offset=0, limit=self.page_size, **self._filters
+            )
+            self._rows = list(page.records)
+            self._total = page.total
+        finally:
+            self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self._total = 0
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+        position, record = self._rows[index.row()]
+        if role == RecordRole:
+            return record
+        if role == PositionRole:
+            return position
+        if role == Qt.DisplayRole:
+            if "original" in record or "translated" in record:
+                return f"{record.get('original', '')}\n{record.get('translated', '')}"
+            return str(record.get("text", "") or "")
+        return None
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and len(self._rows) < self._total
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        # QListView lays out every row again after each insert, so fetching a
+        # page at a time makes scrolling to the end quadratic. Pages grow with
+        # the list instead, up to MAX_FETCH_SIZE rows.
+        limit = min(MAX_FETCH_SIZE, max(self.page_size, len(self._rows) // 2))
+        try:
+            page = history_index.query_history(
+                self.data_dir, self.name, offset=len(self._rows), limit=limit, **self._filters
+            )
+        except Exception as exc:
+            logger.warning("Could not load more %s records: %s", self.name, exc)
+            self._total = len(self._rows)
+            return
+        records = list(page.records)
+        if not records:
+            # The history shrank under us; stop asking for more.
+            self._total = len(self._rows)
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(records) - 1)
+        self._rows.extend(records)
+        self._total = max(page.total, len(self._rows))
+        self.endInsertRows()
+
+
+class HistoryRecordDelegate(QtWidgets.QStyledItemDelegate):
+    """Paints a history record as a card with Copy and Delete per text field."""
+
+    def __init__(self, view, copy_mode, labels, colors):
+        super().__init__(view)
+        self._view = view
+        self.copy_mode = bool(copy_mode)
+        self.labels = dict(labels)  # "original", "translated", "copy", "delete"
+        self.colors = dict(colors)
+        self.hovered = None         # (row, action, field) under the mouse
+        # sizeHint runs for every row on each relayout, so it only looks up a
+        # height; the full card geometry is kept for the rows painted lately.
+        self._heights = {}                      # (row, width) -> row height
+        self._layouts = OrderedDict()           # (row, width) -> card layout
+        base = view.font()
+        self._text_font = _font(base, 15, family="Segoe UI")
+        self._translated_font = _font(base, 15, QtGui.QFont.Bold, family="Segoe UI")
+        self._meta_font = _font(base, 11, QtGui.QFont.DemiBold)
+        self._badge_font = _font(base, 11, QtGui.QFont.ExtraBold)
+        self._caption_font = _font(base, 10, QtGui.QFont.ExtraBold)
+        self._button_font = _font(base, 12, QtGui.QFont.Bold)
+
+    def set_colors(self, colors):
+        self.colors = dict(colors)
+        self._view.viewport().update()
+
+    def clear_layouts(self):
+        self._heights.clear()
+        self._layouts.clear()
+
+    def _fields(self, record):
+        """(field, caption, text, translated) for each text block of a record."""
+        if not self.copy_mode and ("original" in record or "translated" in record):
+            return [
+                ("original", self.labels.get("original", ""), str(record.get("original", "") or ""), False),
+                ("translated", self.labels.get("translated", ""), str(record.get("translated", "") or ""), True),
+            ]
+        return [("text", "", str(record.get("text", "") or ""), False)]
+
+    def _layout(self, index, width):
+        key = (index.row(), width)
+        layout = self._layouts.get(key)
+        if layout is not None:
+            self._layouts.move_to_end(key)
+            return layout
+        layout = self._build_layout(index.data(RecordRole) or {}, width)
+        self._layouts[key] = layout
+        self._heights[key] = layout["height"]
+        while len(self._layouts) > LAYOUT_CACHE_SIZE:
+            self._layouts.popitem(last=False)
+        return layout
+
+    def _build_layout(self, record, width):
+        card_width = max(120, width - SCROLL_GAP)
+        inner_width = card_width - 2 * CARD_MARGIN_H
+        text_width = max(40, inner_width - 2 * BLOCK_PADDING_H)
+        caption_height = QtGui.QFontMetrics(self._caption_font).height()
+        button_metrics = QtGui.QFontMetrics(self._button_font)
+        button_widths = {
+            action: button_metrics.horizontalAdvance(self.labels.get(action, "")) + 2 * BUTTON_PADDING
+            for action in ("copy", "delete")
+        }
+
+        y = CARD_MARGIN_V
+        meta_rect = QtCore.QRect(CARD_MARGIN_H, y, inner_width, META_HEIGHT)
+        y += META_HEIGHT + CARD_SPACING
+        fields = []
+        for field, caption, text, translated in self._fields(record):
+            caption_rect = None
+            if caption:
+                caption_rect = QtCore.QRect(CARD_MARGIN_H + 2, y, inner_width - 2, caption_height)
+                y += caption_height + CARD_SPACING
+            metrics = QtGui.QFontMetrics(self._translated_font if translated else self._text_font)
+            text_height = max(
+                metrics.height(),
+                metrics.boundingRect(QtCore.QRect(0, 0, text_width, 1 << 24), _TEXT_FLAGS, text).height(),
+            )
+            block_rect = QtCore.QRect(CARD_MARGIN_H, y, inner_width, text_height + 2 * BLOCK_PADDING_V)
+            text_rect = block_rect.adjusted(BLOCK_PADDING_H, BLOCK_PADDING_V, -BLOCK_PADDING_H, -BLOCK_PADDING_V)
+            y += block_rect.height() + CARD_SPACING
+            right = CARD_MARGIN_H + inner_width
+            delete_rect = QtCore.QRect(right - button_widths["delete"], y, button_widths["delete"], BUTTON_HEIGHT)
+            copy_rect = QtCore.QRect(
+                delete_rect.left() - BUTTON_SPACING - button_widths["copy"], y, button_widths["copy"], BUTTON_HEIGHT
+            )
+            y += BUTTON_HEIGHT + 2 + CARD_SPACING
+            fields.append(
+                {
+                    "field": field,
+                    "caption": caption,
+                    "caption_rect": caption_rect,
+                    "text": text,
+                    "translated": translated,
+                    "block_rect": block_rect,
+                    "text_rect": text_rect,
+                    "copy": copy_rect,
+                    "delete": delete_rect,
+                }
+            )
+        card_height = y - CARD_SPACING + CARD_MARGIN_V
+        layout = {
+            "card": QtCore.QRect(0, 0, card_width, card_height),
+            "meta": meta_rect,
+            "fields": fields,
+            "height": card_height + CARD_GAP,
+        }
+        return layout
+
+    def _width(self, option):
+        width = option.rect.width()
+        return width if width > 0 else self._view.viewport().width()
+
+    def sizeHint(self, option, index):
+        width = self._width(option)
+        height = self._heights.get((index.row(), width))
+        if height is None:
+            height = self._layout(index, width)["height"]
+        return QtCore.QSize(width, height)
+
+    def actions(self, index, rect):
+        """(action, field, text, rect) of each button of a row painted in rect."""
+        layout = self._layout(index, rect.width())
+        offset = rect.topLeft()
+        return [
+            (action, field["field"], field["text"], field[action].translated(offset))
+            for field in layout["fields"]
+            for action in ("copy", "delete")
+        ]
+
+    def paint(self, painter, option, index):
+        record = index.data(RecordRole) or {}
+        layout = self._layout(index, option.rect.width())
+        colors = self.colors
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.translate(option.rect.topLeft())
+        painter.setClipRect(QtCore.QRect(0, 0, option.rect.width(), layout["height"]))
+
+        painter.setPen(QtGui.QPen(QtGui.QColor(colors["border"]), 1))
+        painter.setBrush(QtGui.QColor(colors["card"]))
+        painter.drawRoundedRect(QtCore.QRectF(layout["card"]).adjusted(0.5, 0.5, -0.5, -0.5), 10, 10)
+
+        meta = layout["meta"]
+        language = str(record.get("language", "") or "").upper()
+        if language and not self.copy_mode:
+            painter.setFont(self._badge_font)
+            badge_width = painter.fontMetrics().horizontalAdvance(language) + 16
+            badge = QtCore.QRectF(meta.left(), meta.top(), badge_width, meta.height())
+            painter.setPen(QtGui.QPen(QtGui.QColor(colors["soft_border"]), 1))
+            painter.setBrush(QtGui.QColor(colors["field"]))
+            painter.drawRoundedRect(badge.adjusted(0.5, 0.5, -0.5, -0.5), 7, 7)
+            painter.setPen(QtGui.QColor(colors["accent"]))
+            painter.drawText(badge, Qt.AlignCenter, language)
+        painter.setFont(self._meta_font)
+        painter.setPen(QtGui.QColor(colors["muted"]))
+        painter.drawText(meta, Qt.AlignRight | Qt.AlignVCenter, format_history_timestamp(record.get("timestamp", "")))
+
+        hovered = self.hovered
+        for field in layout["fields"]:
+            if field["caption_rect"] is not None:
+                painter.setFont(self._caption_font)
+                painter.setPen(QtGui.QColor(colors["muted"]))
+                painter.drawText(field["caption_rect"], Qt.AlignLeft | Qt.AlignVCenter, field["caption"])
+            translated = field["translated"]
+            painter.setPen(QtGui.QPen(QtGui.QColor(colors["accent" if translated else "border"]), 1))
+            painter.setBrush(QtGui.QColor(colors["field_alt" if translated else "field"]))
+            painter.drawRoundedRect(QtCore.QRectF(field["block_rect"]).adjusted(0.5, 0.5, -0.5, -0.5), 8, 8)
+            painter.setFont(self._translated_font if translated else self._text_font)
+            painter.setPen(QtGui.QColor(colors["text"]))
+            painter.drawText(field["text_rect"], _TEXT_FLAGS, field["text"])
+
+            painter.setFont(self._button_font)
+            for action, colour in (("copy", colors["accent"]), ("delete", colors["danger"])):
+                button = QtCore.QRectF(field[action]).adjusted(0.5, 0.5, -0.5, -0.5)
+                active = hovered == (index.row(), action, field["field"])
+                painter.setPen(QtGui.QPen(QtGui.QColor(colors["border"]), 1))
+                painter.setBrush(QtGui.QColor(colour) if active else Qt.NoBrush)
+                painter.drawRoundedRect(button, 7, 7)
+                painter.setPen(QtGui.QColor("#ffffff" if active else colour))
+                painter.drawText(button, Qt.AlignCenter, self.labels.get(action, ""))
+        painter.restore()
+
+
+class HistoryListView(QtWidgets.QListView):
+    """History records as painted cards; see HistoryRecordDelegate."""
+
+    copy_requested = QtCore.pyqtSignal(str)
+    delete_requested = QtCore.pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("historyScroll")
+        self.setFrameShape(QtWidgets.QFrame.NoFrame)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(24)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.setResizeMode(QtWidgets.QListView.Adjust)
+        self.setLayoutMode(QtWidgets.QListView.Batched)
+        self.setMouseTracking(True)
+        self.setMinimumHeight(190)
+        self.viewport().setAutoFillBackground(False)
+
+        self.empty_label = QtWidgets.QLabel(self.viewport())
+        self.empty_label.setObjectName("historyEmptyState")
+        self.empty_label.setAlignment(Qt.AlignCenter)
+        self.empty_label.setWordWrap(True)
+        self.empty_label.hide()
+
+    def setModel(self, model):
+        super().setModel(model)
+        # Fetched pages are appended and keep the cached card layouts; a reset
+        # or a removal renumbers the rows, so the cache goes with it.
+        model.modelReset.connect(self._rows_renumbered)
+        model.rowsRemoved.connect(self._rows_renumbered)
+        model.rowsInserted.connect(self._update_empty_state)
+        self._rows_renumbered()
+
+    def _rows_renumbered(self, *_args):
+        delegate = self.itemDelegate()
+        if isinstance(delegate, HistoryRecordDelegate):
+            delegate.clear_layouts()
+            delegate.hovered = None
+        self._update_empty_state()
+
+    def set_empty_text(self, text):
+        self.empty_label.setText(str(text or ""))
+        self._update_empty_state()
+
+    def _update_empty_state(self, *_args):
+        model = self.model()
+        empty = model is None or model.rowCount() == 0
+        self.empty_label.setVisible(empty and bool(self.empty_label.text()))
+        self.empty_label.setGeometry(self.viewport().rect())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.empty_label.setGeometry(self.viewport().rect())
+
+    def action_at(self, pos):
+        """(row, action, field, text) of the card button at a viewport point."""
+        index = self.indexAt(pos)
+        delegate = self.itemDelegate()
+        if not index.isValid() or not isinstance(delegate, HistoryRecordDelegate):
+            return None
+        for action, field, text, rect in delegate.actions(index, self.visualRect(index)):
+            if rect.contains(pos):
+                return index.row(), action, field, text
+        return None
+
+    def _set_hovered(self, hit):
+        delegate = self.itemDelegate()
+        hovered = hit[:3] if hit else None
+        if isinstance(delegate, HistoryRecordDelegate) and delegate.hovered != hovered:
+            delegate.hovered = hovered
+            self.viewport().setCursor(Qt.PointingHandCursor if hit else Qt.ArrowCursor)
+            self.viewport().update()
+
+    def mouseMoveEvent(self, event):
+        self._set_hovered(self.action_at(event.pos()))
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self._set_hovered(None)
+        super().leaveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        hit = self.action_at(event.pos()) if event.button() == Qt.LeftButton else None
+        super().mouseReleaseEvent(event)
+        if hit is None:
+            return
+        row, action, _field, text = hit
+        if action == "copy":
+            self.copy_requested.emit(text)
+        else:
+            position = self.model().index(row, 0).data(PositionRole)
+            if position is not None:
+                self.delete_requested.emit(int(position))
@@ -17,7 +17,10 @@ import asyncio
 import threading
 import time
 import logging
+import cancellation
 import translater
+import history_store
+import translation_telemetry
 
 # CTranslate2 can crash when its native runtime is first loaded after Qt on
 # Windows. Load it while startup is still single-threaded; online translation
@@ -164,6 +167,14 @@ DEFAULT_CONFIG = {
     "ocr_engine": platform_support.default_ocr_engine(),
     "translator_engine": "Google",
     "allow_online_provider_fallback": False,
+    # Race a slow online request against the next healthy instance (see
+    # translater.hedging_stats). Off by default: it costs extra requests.
+    "hedged_requests": False,
+    # Reuse sentence translations across requests (see translater.translate_text).
+    "translation_memory": True,
+    # Argos worker processes for documents and full-screen batches (see
+    # argos_pool): 0 sizes the pool from the cores and memory, 1 turns it off.
+    "argos_workers": 0,
     "copy_history": False,
     "copy_translated_text": False,  # Все галочки отключены по умолчанию
     "keep_visible_on_ocr": False,
@@ -904,12 +915,8 @@ def ensure_data_dir_and_files():
         os.makedirs(data_dir)
     config_path = os.path.join(data_dir, "config.json")
     ensure_json_file(config_path, DEFAULT_CONFIG)
-    # copy_history.json
-    copy_history_path = os.path.join(data_dir, "copy_history.json")
-    ensure_json_file(copy_history_path, [])
-    # translation_history.json
-    translation_history_path = os.path.join(data_dir, "translation_history.json")
-    ensure_json_file(translation_history_path, [])
+    # Истории (copy_history.jsonl, translation_history.jsonl) создаёт
+    # history_store при первой записи.
     # settings.json
     settings_path = os.path.join(data_dir, "settings.json")
     ensure_json_file(settings_path, {})
@@ -922,16 +929,12 @@ def get_data_file(filename):
     # Автоматически создаём нужные json-файлы с дефолтным содержимым
     if filename == "config.json":
         ensure_json_file(file_path, DEFAULT_CONFIG)
-    elif filename == "copy_history.json":
-        ensure_json_file(file_path, [])
-    elif filename == "translation_history.json":
-        ensure_json_file(file_path, [])
     elif filename == "settings.json":
         ensure_json_file(file_path, {})
     return file_path
 
 def _save_copy_history_sync(text):
-    """Синхронная запись в историю копирований (выполняется в отдельном потоке)."""
+    """Поставить текст в очередь общего писателя истории копирований."""
     try:
         config = get_cached_config()
         if not config.get("copy_history", False):
@@ -940,78 +943,21 @@ def _save_copy_history_sync(text):
         return
 
     record = {"timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "text": text}
-    history_file = get_data_file("copy_history.json")
-    
-    history = []
     try:
-        if sys.platform == "win32":
-            import msvcrt
-            with open(history_file, "r+", encoding="utf-8") as f:
-                try:
-                    f.seek(0, 2)
-                    file_size = f.tell()
-                    f.seek(0)
-                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, max(file_size, 1))
-                except Exception:
-                    pass
-                try:
-                    content = f.read()
-                    if content.strip():
-                        history = json.loads(content)
-                except (json.JSONDecodeError, ValueError):
-                    history = []
-                # Deduplicate consecutive + limit
-                if history and history[-1].get("text") == record["text"]:
-                    pass  # skip duplicate
-                else:
-                    history.append(record)
-                if len(history) > 500:
-                    history = history[-500:]
-                f.seek(0)
-                f.truncate()
-                json.dump(history, f, ensure_ascii=False, indent=4)
-                try:
-                    f.seek(0, 2)
-                    file_size = f.tell()
-                    f.seek(0)
-                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, max(file_size, 1))
-                except Exception:
-                    pass
-        else:
-            import fcntl
-            with open(history_file, "r+", encoding="utf-8") as f:
-                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-                try:
-                    content = f.read()
-                    if content.strip():
-                        history = json.loads(content)
-                except (json.JSONDecodeError, ValueError):
-                    history = []
-                history.append(record)
-                f.seek(0)
-                f.truncate()
-                json.dump(history, f, ensure_ascii=False, indent=4)
-                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-    except Exception as e:
-        # Fallback без блокировки
-        try:
-            with open(history_file, "r", encoding="utf-8") as f:
-                history = json.load(f)
-        except Exception:
-            history = []
-        if not (history and history[-1].get("text") == record["text"]):
-            history.append(record)
-        if len(history) > 500:
-            history = history[-500:]
-        try:
-            with open(history_file, "w", encoding="utf-8") as f:
-                json.dump(history, f, ensure_ascii=False, indent=4)
-        except Exception:
-            pass
+        data_dir = os.path.dirname(get_data_file("config.json"))
+        # Один фоновый писатель сохраняет записи по порядку и пачками;
+        # лимит в 500 записей и удаление повторов выполняет компактация.
+        history_store.submit_history(data_dir, history_store.COPY_HISTORY, record)
+    except Exception:
+        logging.getLogger("clickntranslate.history").exception("Could not save copy history")
 
 def save_copy_history(text):
-    """Асинхронно сохранить текст в историю копирований (не блокирует UI)."""
-    threading.Thread(target=_save_copy_history_sync, args=(text,), daemon=True).start()
+    """Сохранить текст в историю копирований.
+
+    В вызывающем потоке читается только кэшированный конфиг и путь к папке
+    данных; запись на диск делает фоновый писатель history_store.
+    """
+    _save_copy_history_sync(text)
 
 
 def save_translation_history(original_text, translated_text, language):
@@ -3539,6 +3485,9 @@ class TranslationResultDialog(QDialog):
             and self.source_code != self.target_code
         )
         self._retranslating = False
+        self._retranslate_cancel = None
+        # Closing the window cancels a re-translation still in flight.
+        self.finished.connect(self._cancel_retranslate)
         self.source_combo = None
         self.target_combo = None
         self.swap_button = None
@@ -3799,13 +3748,16 @@ class TranslationResultDialog(QDialog):
         self.status_label.setText(ui_text(self.lang, "translating"))
         source_code, target_code = self.source_code, self.target_code
         source_text = self.source_text
+        token = self._retranslate_cancel = cancellation.CancelToken()
 
         def worker():
             try:
                 from translater import translate_text
 
-                result = translate_text(source_text, source_code, target_code)
+                result = translate_text(source_text, source_code, target_code, cancel_token=token)
                 error = "" if result else ui_text(self.lang, "translation_error")
+            except translater.TranslationCancelledError:
+                return
             except Exception as exc:
                 result, error = "", f"{ui_text(self.lang, 'translation_error')}: {exc}"
             try:
@@ -3816,9 +3768,15 @@ class TranslationResultDialog(QDialog):
 
         threading.Thread(target=worker, daemon=True).start()
 
+    def _cancel_retranslate(self, *_args):
+        token, self._retranslate_cancel = self._retranslate_cancel, None
+        if token is not None:
+            token.cancel()
+
     @QtCore.pyqtSlot(str, str)
     def _on_retranslated(self, translated_text, error):
         self._retranslating = False
+        self._retranslate_cancel = None
         self._set_pair_row_enabled(True)
         if error or not translated_text:
             self.status_label.setText(error or ui_text(self.lang, "translation_error"))
@@ -5926,6 +5884,9 @@ class DarkThemeApp(QMainWindow):
         # Late enough that it never competes with start-up for the network or
         # the user's attention, and after the first-run guide has had its turn.
         QTimer.singleShot(9000, self._maybe_check_updates_on_launch)
+        # Once the window is up, connect to the online translator so the first
+        # hotkey translation does not wait for DNS, TCP and TLS.
+        QTimer.singleShot(1500, self._prewarm_translation_connections)
 
         # Подписка на события хоткеев из потоков
         try:
@@ -6851,6 +6812,12 @@ class DarkThemeApp(QMainWindow):
             return
         self.minimize_to_taskbar()
 
+    def _prewarm_translation_connections(self):
+        try:
+            translater.prewarm_connections(self.config.get("translator_engine", "Google"))
+        except Exception:
+            logging.exception("Could not pre-connect to the translation provider")
+
     def _maybe_check_updates_on_launch(self):
         """Ask the releases feed once per start, and stay quiet unless there is
         something to say.
@@ -7518,6 +7485,11 @@ class DarkThemeApp(QMainWindow):
         # Capture this before translation starts. The worker verifies it again
         # immediately before pasting, after also re-copying the same selection.
         selection_window = _windows_foreground_window() if replace_selection else 0
+        # A newer selection supersedes one that is still being translated.
+        previous = getattr(self, "_selection_translation_cancel", None)
+        if previous is not None:
+            previous.cancel()
+        token = self._selection_translation_cancel = cancellation.CancelToken()
 
         def _do_copy_and_translate():
             lang = self.config.get("interface_language", "ru")
@@ -7570,7 +7542,7 @@ class DarkThemeApp(QMainWindow):
                 self._show_status_signal.emit(status_msg)
                 print(f"[SEL] translating {source_code}->{target_code}, {len(text)} chars...")
                 from translater import translate_text
-                translated = translate_text(text, source_code, target_code)
+                translated = translate_text(text, source_code, target_code, cancel_token=token)
                 self._hide_status_signal.emit()
                 print(f"[SEL] result: {len(translated) if translated else 0} chars")
                 if not translated:
@@ -7635,6 +7607,9 @@ class DarkThemeApp(QMainWindow):
                 self._show_selection_signal.emit(
                     translated, auto_copy, lang, theme, text, source_code, target_code
                 )
+            except translater.TranslationCancelledError:
+                # The newer selection owns the status tip and the clipboard now.
+                print("[SEL] superseded by a newer selection")
             except Exception as e:
                 restore_captured_clipboard()
                 err_msg = ui_text(lang, "translation_error")
@@ -9270,6 +9245,19 @@ class DarkThemeApp(QMainWindow):
                 self.toggle_window_hotkey_thread.join(timeout=0.5)
         except Exception as e:
             print(f"Error stopping window toggle hotkey thread: {e}")
+        try:
+            import cache_manager
+            cache_manager.flush_translation_cache()
+        except Exception as e:
+            print(f"Error flushing translation cache: {e}")
+        try:
+            history_store.flush_history()
+        except Exception as e:
+            print(f"Error flushing history: {e}")
+        try:
+            translation_telemetry.flush()
+        except Exception as e:
+            print(f"Error saving translation telemetry: {e}")
         self.save_config()
         self.tray_icon.hide()  # Убираем иконку из трея
         event.accept()
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 import shutil
 import time
 import re
+import threading
 
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtWidgets import QApplication, QWidget, QMessageBox
@@ -30,6 +31,8 @@ from languages import (
     tesseract_language_code,
     windows_ocr_tag,
 )
+import cancellation
+import history_store
 import platform_support
 import portable_paths
 
@@ -53,7 +56,7 @@ OCR_UI_TEXT = {
         "auto_unreliable_info": "Weak results were filtered out so noise is not sent to the translator.\n\nTry:\n• Select the text area more tightly, without extra borders or background\n• Choose the specific source language\n• Try another OCR engine or install the Windows OCR language pack",
         "not_recognized": "😔 Text not recognized", "not_recognized_info": "Try:\n• Select an area with larger text\n• Make sure the text has good contrast\n• Choose a different OCR engine in settings",
         "translate": "Translate", "ocr_init_failed": "OCR initialization failed", "screen_no_text": "No text recognized on screen",
-        "translation_failed": "Translation failed", "translating_screen": "Translating screen...", "fullscreen_hint": "ESC — close  |  RMB — drag",
+        "translation_failed": "Translation failed", "translating": "Translating...", "translating_screen": "Translating screen...", "fullscreen_hint": "ESC — close  |  RMB — drag",
         "no_installed_languages": "No OCR languages installed",
         "no_installed_translation_pairs": "No installed translation pairs",
         "install_languages_first": "Install a language first in Settings → Language packages.",
@@ -75,7 +78,7 @@ OCR_UI_TEXT = {
         "auto_unreliable_info": "Слабые результаты отфильтрованы, чтобы не отправлять мусор в переводчик.\n\nПопробуйте:\n• Выделить область точнее, без лишних рамок и фона\n• Выбрать конкретный язык текста\n• Попробовать другой OCR-движок или установить языковой пакет Windows OCR",
         "not_recognized": "😔 Текст не распознан", "not_recognized_info": "Попробуйте:\n• Выделить область с более крупным текстом\n• Убедиться, что текст контрастный\n• Выбрать другой OCR-движок в настройках",
         "translate": "Перевести", "ocr_init_failed": "Не удалось запустить OCR", "screen_no_text": "Текст на экране не распознан",
-        "translation_failed": "Ошибка перевода", "translating_screen": "Перевод экрана...", "fullscreen_hint": "ESC — закрыть  |  ПКМ — перетащить",
+        "translation_failed": "Ошибка перевода", "translating": "Перевод...", "translating_screen": "Перевод экрана...", "fullscreen_hint": "ESC — закрыть  |  ПКМ — перетащить",
         "no_installed_languages": "Нет установленных языков OCR",
         "no_installed_translation_pairs": "Нет установленных направлений перевода",
         "install_languages_first": "Сначала установите язык: Настройки → Языковые пакеты.",
@@ -94,7 +97,7 @@ OCR_UI_TEXT = {
         "auto_unreliable": "El texto no se reconoció de forma fiable", "auto_unreliable_info": "Los resultados débiles se filtraron para no enviar ruido al traductor.\n\nPrueba:\n• Selecciona el área con más precisión\n• Elige el idioma de origen\n• Usa otro motor OCR o instala el paquete de Windows OCR",
         "not_recognized": "😔 No se reconoció el texto", "not_recognized_info": "Prueba:\n• Selecciona texto más grande\n• Comprueba que tenga buen contraste\n• Elige otro motor OCR",
         "translate": "Traducir", "ocr_init_failed": "No se pudo iniciar OCR", "screen_no_text": "No se reconoció texto en la pantalla",
-        "translation_failed": "Error de traducción", "translating_screen": "Traduciendo la pantalla...", "fullscreen_hint": "ESC — cerrar  |  Botón derecho — arrastrar",
+        "translation_failed": "Error de traducción", "translating": "Traduciendo...", "translating_screen": "Traduciendo la pantalla...", "fullscreen_hint": "ESC — cerrar  |  Botón derecho — arrastrar",
         "no_installed_languages": "No hay idiomas OCR instalados",
         "no_installed_translation_pairs": "No hay direcciones de traducción instaladas",
         "install_languages_first": "Instala primero un idioma en Ajustes → Paquetes de idioma.",
@@ -113,7 +116,7 @@ OCR_UI_TEXT = {
         "auto_unreliable": "Text wurde nicht zuverlässig erkannt", "auto_unreliable_info": "Schwache Ergebnisse wurden gefiltert, damit kein Rauschen übersetzt wird.\n\nVersuche:\n• Den Textbereich genauer auswählen\n• Die konkrete Ausgangssprache wählen\n• Eine andere OCR-Engine verwenden oder das Windows-OCR-Paket installieren",
         "not_recognized": "😔 Text nicht erkannt", "not_recognized_info": "Versuche:\n• Einen Bereich mit größerem Text auswählen\n• Auf guten Kontrast achten\n• Eine andere OCR-Engine wählen",
         "translate": "Übersetzen", "ocr_init_failed": "OCR konnte nicht gestartet werden", "screen_no_text": "Auf dem Bildschirm wurde kein Text erkannt",
-        "translation_failed": "Übersetzung fehlgeschlagen", "translating_screen": "Bildschirm wird übersetzt...", "fullscreen_hint": "ESC — schließen  |  Rechtsklick — ziehen",
+        "translation_failed": "Übersetzung fehlgeschlagen", "translating": "Wird übersetzt...", "translating_screen": "Bildschirm wird übersetzt...", "fullscreen_hint": "ESC — schließen  |  Rechtsklick — ziehen",
         "no_installed_languages": "Keine OCR-Sprachen installiert",
         "no_installed_translation_pairs": "Keine Übersetzungsrichtungen installiert",
         "install_languages_first": "Installiere zuerst eine Sprache unter Einstellungen → Sprachpakete.",
@@ -132,7 +135,7 @@ OCR_UI_TEXT = {
         "auto_unreliable": "Le texte n’a pas été reconnu de façon fiable", "auto_unreliable_info": "Les résultats faibles ont été filtrés pour ne pas envoyer de bruit au traducteur.\n\nEssayez :\n• Sélectionner la zone plus précisément\n• Choisir la langue source exacte\n• Utiliser un autre moteur OCR ou installer le module Windows OCR",
         "not_recognized": "😔 Texte non reconnu", "not_recognized_info": "Essayez :\n• Sélectionner une zone avec un texte plus grand\n• Vérifier le contraste\n• Choisir un autre moteur OCR",
         "translate": "Traduire", "ocr_init_failed": "Impossible de démarrer l’OCR", "screen_no_text": "Aucun texte reconnu à l’écran",
-        "translation_failed": "Échec de la traduction", "translating_screen": "Traduction de l’écran...", "fullscreen_hint": "ESC — fermer  |  Clic droit — déplacer",
+        "translation_failed": "Échec de la traduction", "translating": "Traduction...", "translating_screen": "Traduction de l’écran...", "fullscreen_hint": "ESC — fermer  |  Clic droit — déplacer",
         "no_installed_languages": "Aucune langue OCR installée",
         "no_installed_translation_pairs": "Aucune direction de traduction installée",
         "install_languages_first": "Installez d’abord une langue dans Réglages → Modules de langue.",
@@ -151,7 +154,7 @@ OCR_UI_TEXT = {
         "auto_unreliable": "未能可靠识别文本", "auto_unreliable_info": "已过滤置信度较低的结果，以免向翻译器发送噪声。\n\n请尝试：\n• 更精确地选择文本区域\n• 选择具体的源语言\n• 使用其他 OCR 引擎或安装 Windows OCR 语言包",
         "not_recognized": "😔 未识别到文本", "not_recognized_info": "请尝试：\n• 选择字号更大的文本区域\n• 确保文本对比度良好\n• 在设置中选择其他 OCR 引擎",
         "translate": "翻译", "ocr_init_failed": "OCR 初始化失败", "screen_no_text": "未识别到屏幕文字",
-        "translation_failed": "翻译失败", "translating_screen": "正在翻译屏幕...", "fullscreen_hint": "ESC — 关闭  |  右键 — 拖动",
+        "translation_failed": "翻译失败", "translating": "正在翻译...", "translating_screen": "正在翻译屏幕...", "fullscreen_hint": "ESC — 关闭  |  右键 — 拖动",
         "no_installed_languages": "未安装 OCR 语言",
         "no_installed_translation_pairs": "未安装翻译方向",
         "install_languages_first": "请先在设置 → 语言包中安装语言。",
@@ -1704,6 +1707,16 @@ def installed_ocr_language_codes(engine=None, config=None):
     return result
 
 
+def _prewarm_translation_connections(config=None):
+    """Connect to the online translator while the user selects or OCR runs."""
+    try:
+        import translater
+        config = config if config is not None else get_cached_ocr_config()
+        translater.prewarm_connections(config.get("translator_engine", "Google"))
+    except Exception as exc:
+        logging.warning(f"Could not pre-connect to the translation provider: {exc}")
+
+
 def _installed_argos_translation_pairs():
     try:
         import translater
@@ -1839,101 +1852,32 @@ def load_ocr_config():
     return get_cached_ocr_config().get("ocr_language", "ru")
 
 def _save_translation_history_sync(original_text, translated_text, language):
-    """Синхронная запись в историю переводов (выполняется в отдельном потоке)."""
+    """Поставить перевод в очередь общего писателя истории переводов."""
     try:
         config = get_cached_ocr_config()
     except Exception:
         return
     if not config.get("history", False):
         return
-    history_file = get_data_file("translation_history.json")
-    if not os.path.exists(history_file):
-        with open(history_file, "w", encoding="utf-8") as f:
-            json.dump([], f, ensure_ascii=False, indent=4)
-    
-    history = []
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "language": language,
+        "original": original_text,
+        "translated": translated_text
+    }
     try:
-        if sys.platform == "win32":
-            import msvcrt
-            with open(history_file, "r+", encoding="utf-8") as f:
-                try:
-                    f.seek(0, 2)
-                    file_size = f.tell()
-                    f.seek(0)
-                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, max(file_size, 1))
-                except Exception:
-                    pass
-                try:
-                    content = f.read()
-                    if content.strip():
-                        history = json.loads(content)
-                except (json.JSONDecodeError, ValueError):
-                    history = []
-                history.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "language": language,
-                    "original": original_text,
-                    "translated": translated_text
-                })
-                if len(history) > 500:
-                    history = history[-500:]
-                f.seek(0)
-                f.truncate()
-                json.dump(history, f, ensure_ascii=False, indent=4)
-                try:
-                    f.seek(0, 2)
-                    file_size = f.tell()
-                    f.seek(0)
-                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, max(file_size, 1))
-                except Exception:
-                    pass
-        else:
-            import fcntl
-            with open(history_file, "r+", encoding="utf-8") as f:
-                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-                try:
-                    content = f.read()
-                    if content.strip():
-                        history = json.loads(content)
-                except (json.JSONDecodeError, ValueError):
-                    history = []
-                history.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "language": language,
-                    "original": original_text,
-                    "translated": translated_text
-                })
-                if len(history) > 500:
-                    history = history[-500:]
-                f.seek(0)
-                f.truncate()
-                json.dump(history, f, ensure_ascii=False, indent=4)
-                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        data_dir = os.path.dirname(get_data_file("config.json"))
+        history_store.submit_history(data_dir, history_store.TRANSLATION_HISTORY, record)
     except Exception:
-        # Fallback без блокировки
-        try:
-            with open(history_file, "r", encoding="utf-8") as f:
-                history = json.load(f)
-        except Exception:
-            history = []
-        history.append({
-            "timestamp": datetime.now().isoformat(),
-            "language": language,
-            "original": original_text,
-            "translated": translated_text
-        })
-        if len(history) > 500:
-            history = history[-500:]
-        try:
-            with open(history_file, "w", encoding="utf-8") as f:
-                json.dump(history, f, ensure_ascii=False, indent=4)
-        except Exception:
-            pass
+        logging.getLogger("clickntranslate.history").exception("Could not save translation history")
 
 def save_translation_history(original_text, translated_text, language):
-    """Асинхронно сохранить перевод в историю (не блокирует UI)."""
-    import threading
-    threading.Thread(target=_save_translation_history_sync, args=(original_text, translated_text, language), daemon=True).start()
+    """Сохранить перевод в историю.
+
+    В вызывающем потоке читается только кэшированный конфиг и путь к папке
+    данных; запись на диск делает фоновый писатель history_store.
+    """
+    _save_translation_history_sync(original_text, translated_text, language)
 
 async def run_ocr_with_engine(bitmap, engine):
     debug_log("run_ocr_with_engine called")
@@ -3302,6 +3246,9 @@ class EasyOCRWorker(QtCore.QThread):
 
 
 class ScreenCaptureOverlay(QWidget):
+    # token, source text, source code, target code, translation, error
+    _area_translation_ready = QtCore.pyqtSignal(object, str, str, str, str, str)
+
     def __init__(self, mode="ocr", defer_show=False):
         super().__init__()
         # Устанавливаем иконку приложения
@@ -3320,6 +3267,8 @@ class ScreenCaptureOverlay(QWidget):
         self._handling_ocr_result = False
         self._ocr_worker_session_id = None
         self._ocr_status_text = ""
+        self._area_translation = None  # CancelToken of the running translation
+        self._area_translation_ready.connect(self._on_area_translation_ready)
         self._last_ocr_raw_capture = None
         self._last_ocr_pil_variants = []
         self._last_ocr_capture_meta = {}
@@ -3722,6 +3671,7 @@ class ScreenCaptureOverlay(QWidget):
             self._handling_ocr_result = False
             self._ocr_worker_session_id = None
             self._ocr_status_text = ""
+            self._cancel_area_translation()
             self._last_ocr_raw_capture = None
             self._last_ocr_pil_variants = []
             self._last_ocr_capture_meta = {}
@@ -3729,6 +3679,8 @@ class ScreenCaptureOverlay(QWidget):
             config = get_cached_ocr_config()
             self._freeze_screen_on_ocr = config.get("freeze_screen_on_ocr", False)
             self._refresh_language_controls_from_config(config)
+            if self.mode == "translate":
+                _prewarm_translation_connections(config)
             self.setWindowOpacity(1.0)
 
             # Активный монитор — тот, где находится курсор в момент запуска OCR.
@@ -3884,6 +3836,7 @@ class ScreenCaptureOverlay(QWidget):
                     _ACTIVE_OVERLAYS[active_mode] = None
         except Exception:
             pass
+        self._cancel_area_translation()
         if not self._handling_ocr_result:
             self._ignore_ocr_results = True
             self._ocr_worker_session_id = None
@@ -4852,9 +4805,129 @@ class ScreenCaptureOverlay(QWidget):
                 pass
         finally:
             self._handling_ocr_result = False
-            self._ocr_in_progress = False
+            # A translation still running keeps the overlay busy until it reports.
+            translating = getattr(self, "_area_translation", None) is not None
+            self._ocr_in_progress = translating
             self._ocr_worker_session_id = None
-            self._ocr_status_text = ""
+            self._ocr_status_text = (
+                ocr_ui_text(get_cached_ocr_config().get("interface_language", "en"), "translating")
+                if translating else ""
+            )
+
+    def _start_area_translation(self, text):
+        """Translate the recognized text off the GUI thread.
+
+        The overlay stays up with a status line meanwhile; closing it (ESC)
+        cancels the translation, aborting its requests in flight.
+        """
+        session_id = getattr(self, "_session_id", "unknown")
+        source_code, target_code = self._current_translate_pair()
+        logging.info(
+            f"[OCR:{session_id}] Translating from {source_code.upper()} to {target_code.upper()}; "
+            f"source_len={len(text)}"
+        )
+        self._cancel_area_translation()
+        token = cancellation.CancelToken()
+        self._area_translation = token
+
+        def worker():
+            translated_text, error = "", ""
+            try:
+                from translater import translate_text
+                translated_text = translate_text(text, source_code, target_code, cancel_token=token) or ""
+            except cancellation.TranslationCancelledError:
+                logging.info(f"[OCR:{session_id}] Translation cancelled")
+                return
+            except Exception as e:
+                logging.exception(f"[OCR:{session_id}] Translation error: {e}")
+                error = str(e) or e.__class__.__name__
+            if token.cancelled:
+                return
+            try:
+                self._area_translation_ready.emit(token, text, source_code, target_code, translated_text, error)
+            except RuntimeError:
+                # The overlay was deleted while the request was in flight.
+                pass
+
+        threading.Thread(target=worker, name="ocr-area-translate", daemon=True).start()
+        self.update()
+
+    def _cancel_area_translation(self):
+        token = getattr(self, "_area_translation", None)
+        self._area_translation = None
+        if token is not None:
+            token.cancel()
+
+    @QtCore.pyqtSlot(object, str, str, str, str, str)
+    def _on_area_translation_ready(self, token, text, source_code, target_code, translated_text, error):
+        if token is not self._area_translation or token.cancelled:
+            return
+        self._area_translation = None
+        self._ocr_in_progress = False
+        self._ocr_status_text = ""
+        session_id = getattr(self, "_session_id", "unknown")
+        if translated_text:
+            logging.info(
+                f"[OCR:{session_id}] Translation completed successfully; "
+                f"len={len(translated_text)}, preview={_text_preview(translated_text)}"
+            )
+        elif not error:
+            logging.warning(f"[OCR:{session_id}] Translation returned empty result")
+        self._show_area_translation(text, source_code, target_code, translated_text, error)
+
+    def _show_area_translation(self, text, source_code, target_code, translated_text, error=""):
+        if error:
+            self.hide()
+            QMessageBox.warning(None, "Ошибка перевода", error)
+            translated_text = ""
+        if translated_text:
+            # Определяем тему и язык из кэша
+            config = get_cached_ocr_config()
+            theme = config.get("theme", "Темная")
+            lang = config.get("interface_language", "ru")
+            auto_copy = config.get("copy_translated_text", False)
+            # Ленивый импорт для избежания циклического импорта
+            from main import (
+                result_window_hidden_for,
+                show_translation_dialog,
+                save_copy_history,
+            )
+
+            if result_window_hidden_for(config, "area"):
+                platform_support.copy_text(translated_text)
+                save_copy_history(translated_text)
+                save_translation_history(text, translated_text, target_code)
+                self.close()
+                return
+
+            # Скрываем оверлей ПЕРЕД показом диалога, чтобы:
+            # 1) Пользователь видел исходный контент за диалогом
+            # 2) Не было z-order проблем (диалог поверх translucent overlay)
+            self.hide()
+
+            # Используем главное окно приложения как parent вместо overlay
+            dialog_parent = None
+            app = QApplication.instance()
+            if app:
+                for widget in app.topLevelWidgets():
+                    if hasattr(widget, 'show_window_from_tray') and widget.windowTitle() == "Click'n'Translate":
+                        dialog_parent = widget
+                        break
+
+            show_translation_dialog(
+                dialog_parent,
+                translated_text,
+                auto_copy=auto_copy,
+                lang=lang,
+                theme=theme,
+                source_text=text,
+                source_lang=source_code,
+                target_lang=target_code,
+                result_mode="area",
+            )
+            # Сохраняем переводы в историю (исходный текст и перевод)
+            save_translation_history(text, translated_text, target_code)
+        self.close()
 
     def _handle_ocr_result_inner(self, text):
         session_id = getattr(self, "_session_id", "unknown")
@@ -4899,74 +4972,7 @@ class ScreenCaptureOverlay(QWidget):
 
         if text:
             if self.mode == "translate":
-                from translater import translate_text
-                source_code, target_code = self._current_translate_pair()
-                logging.info(
-                    f"[OCR:{session_id}] Translating from {source_code.upper()} to {target_code.upper()}; "
-                    f"source_len={len(text)}"
-                )
-                try:
-                    translated_text = translate_text(text, source_code, target_code)
-                    if translated_text:
-                        logging.info(
-                            f"[OCR:{session_id}] Translation completed successfully; "
-                            f"len={len(translated_text)}, preview={_text_preview(translated_text)}"
-                        )
-                    else:
-                        logging.warning(f"[OCR:{session_id}] Translation returned empty result")
-                except Exception as e:
-                    logging.exception(f"[OCR:{session_id}] Translation error: {e}")
-                    self.hide()
-                    QMessageBox.warning(None, "Ошибка перевода", str(e))
-                    translated_text = ""
-                if translated_text:
-                    # Определяем тему и язык из кэша
-                    config = get_cached_ocr_config()
-                    theme = config.get("theme", "Темная")
-                    lang = config.get("interface_language", "ru")
-                    auto_copy = config.get("copy_translated_text", False)
-                    # Ленивый импорт для избежания циклического импорта
-                    from main import (
-                        result_window_hidden_for,
-                        show_translation_dialog,
-                        save_copy_history,
-                    )
-
-                    if result_window_hidden_for(config, "area"):
-                        platform_support.copy_text(translated_text)
-                        save_copy_history(translated_text)
-                        save_translation_history(text, translated_text, target_code)
-                        self.close()
-                        return
-
-                    # Скрываем оверлей ПЕРЕД показом диалога, чтобы:
-                    # 1) Пользователь видел исходный контент за диалогом
-                    # 2) Не было z-order проблем (диалог поверх translucent overlay)
-                    self.hide()
-
-                    # Используем главное окно приложения как parent вместо overlay
-                    dialog_parent = None
-                    app = QApplication.instance()
-                    if app:
-                        for widget in app.topLevelWidgets():
-                            if hasattr(widget, 'show_window_from_tray') and widget.windowTitle() == "Click'n'Translate":
-                                dialog_parent = widget
-                                break
-
-                    show_translation_dialog(
-                        dialog_parent,
-                        translated_text,
-                        auto_copy=auto_copy,
-                        lang=lang,
-                        theme=theme,
-                        source_text=text,
-                        source_lang=source_code,
-                        target_lang=target_code,
-                        result_mode="area",
-                    )
-                    # Сохраняем переводы в историю (исходный текст и перевод)
-                    save_translation_history(text, translated_text, target_code)
-                self.close()
+                self._start_area_translation(text)
             else:
                 try:
                     # Ленивый импорт для избежания циклического импорта
@@ -5237,68 +5243,6 @@ def _group_screen_ocr_lines(lines_data):
     return blocks
 
 
-def _split_marked_screen_translation(translated, count):
-    marker_re = re.compile(r"\[\[\[\s*CXT(\d{4})\s*\]\]\]", re.IGNORECASE)
-    matches = list(marker_re.finditer(str(translated or "")))
-    if len(matches) != count:
-        return None
-    result = [""] * count
-    seen = set()
-    for index, match in enumerate(matches):
-        block_index = int(match.group(1))
-        if block_index < 0 or block_index >= count or block_index in seen:
-            return None
-        seen.add(block_index)
-        start = match.end()
-        end = matches[index + 1].start() if index + 1 < len(matches) else len(translated)
-        result[block_index] = str(translated[start:end]).strip()
-    if seen != set(range(count)) or any(not value for value in result):
-        return None
-    return result
-
-
-def _translate_screen_texts(texts, translate_func, source_code, target_code):
-    """Translate blocks in one request while preserving mapping; safely fall back per block."""
-    values = [str(text or "").strip() for text in texts]
-    if not values:
-        return []
-
-    def translate_chunk(chunk):
-        if len(chunk) == 1:
-            return [str(translate_func(chunk[0], source_code, target_code) or "").strip()]
-        marked = "\n".join(
-            f"[[[CXT{index:04d}]]]\n{text}"
-            for index, text in enumerate(chunk)
-        )
-        translated = translate_func(marked, source_code, target_code)
-        mapped = _split_marked_screen_translation(translated, len(chunk))
-        if mapped is not None:
-            return mapped
-        logging.warning("Fullscreen translation did not preserve block markers; retrying blocks separately")
-        return [
-            str(translate_func(text, source_code, target_code) or "").strip()
-            for text in chunk
-        ]
-
-    # Provider limits differ. Small ordered batches avoid rejecting a text-rich
-    # screen while still using far fewer network calls than one request per OCR
-    # rectangle.
-    translated_values = []
-    chunk = []
-    chunk_length = 0
-    for value in values:
-        marker_cost = 18
-        if chunk and (len(chunk) >= 24 or chunk_length + len(value) + marker_cost > 3500):
-            translated_values.extend(translate_chunk(chunk))
-            chunk = []
-            chunk_length = 0
-        chunk.append(value)
-        chunk_length += len(value) + marker_cost
-    if chunk:
-        translated_values.extend(translate_chunk(chunk))
-    return translated_values
-
-
 class FullScreenOCRWorker(QtCore.QThread):
     """OCR worker that returns text lines with bounding box positions."""
 
@@ -5382,6 +5326,7 @@ class FullScreenTranslateOverlay(QWidget):
         self.ocr_worker = None
         self._ocr_workers = set()
         self._pending_translation_pair = None
+        self._translation_cancel = None  # CancelToken of the running translation
         self._translation_run_id = 0
         self._is_dragging = False
         self._drag_offset = QtCore.QPoint()
@@ -5591,6 +5536,7 @@ class FullScreenTranslateOverlay(QWidget):
             return
         self.ocr_language = self.src_lang
         self._translation_run_id += 1
+        self._cancel_translation()
         self.loading = True
         self.translated_blocks.clear()
         self.error_message = None
@@ -5621,6 +5567,7 @@ class FullScreenTranslateOverlay(QWidget):
         self._pending_translation_pair = None
         run_id = self._translation_run_id
         logging.info(f"FullScreenOverlay: starting OCR ({source_code}->{target_code})")
+        _prewarm_translation_connections()
         try:
             self._start_ocr(run_id, source_code, target_code)
         except Exception:
@@ -5688,27 +5635,37 @@ class FullScreenTranslateOverlay(QWidget):
 
         try:
             self._lines_data = _group_screen_ocr_lines(lines_data)
-            import threading
+            self._cancel_translation()
+            self._translation_cancel = cancellation.CancelToken()
             threading.Thread(
                 target=self._translate_all,
-                args=(run_id, list(self._lines_data), source_code, target_code),
+                args=(run_id, list(self._lines_data), source_code, target_code, self._translation_cancel),
                 daemon=True,
             ).start()
         except Exception:
             logging.exception("FullScreenOverlay: could not start screen translation")
             self._fail_translation(run_id, "translation_failed")
 
-    def _translate_all(self, run_id, lines_data, source_code, target_code):
+    def _cancel_translation(self):
+        token, self._translation_cancel = self._translation_cancel, None
+        if token is not None:
+            token.cancel()
+
+    def _translate_all(self, run_id, lines_data, source_code, target_code, cancel_token=None):
         blocks = []
         error_message = ""
         try:
-            from translater import translate_text
+            from translater import translate_batch
 
             src, tgt = source_code, target_code
             logging.info(f"FullScreenOverlay: translating {len(lines_data)} blocks ({src}->{tgt})")
 
-            all_texts = [item[4] for item in lines_data]
-            translated_texts = _translate_screen_texts(all_texts, translate_text, src, tgt)
+            # Blocks share a few provider requests; each one keeps its own result.
+            items = translate_batch([item[4] for item in lines_data], src, tgt, cancel_token=cancel_token)
+            failed = [item.error for item in items if item.error]
+            if failed and len(failed) == len(items):
+                raise RuntimeError(failed[0])
+            translated_texts = [item.translated for item in items]
 
             if translated_texts and any(translated_texts):
                 for i, (x, y, w, h, orig) in enumerate(lines_data):
@@ -5731,6 +5688,10 @@ class FullScreenTranslateOverlay(QWidget):
                 config = get_cached_ocr_config()
                 lang = config.get("interface_language", "en")
                 error_message = ocr_ui_text(lang, "translation_failed")
+        except cancellation.TranslationCancelledError:
+            # Closed or restarted: a newer run, if any, reports instead.
+            logging.info(f"FullScreenOverlay: translation of run {run_id} cancelled")
+            return
         except Exception as e:
             error_message = str(e)
 
@@ -6077,6 +6038,7 @@ class FullScreenTranslateOverlay(QWidget):
     def closeEvent(self, event):
         global _fullscreen_overlay_ref
         self._translation_run_id += 1
+        self._cancel_translation()
         self._rerun_timer.stop()
         self._pending_translation_pair = None
         for worker in list(self._ocr_workers):
@@ -0,0 +1,190 @@
+"""
+What each translation engine accepts in one request.
+
+One table instead of limits scattered over the callers: the longest text a
+service takes, the size of the encoded text in a request (percent-encoded
+for GET parameters and paths, JSON for POST bodies, UTF-8 for services that
+count bytes and for local engines), whether several texts fit in one
+request, and how many requests may be in flight at once. Document chunks,
+Google's long-text chunks and translate_batch groups are all packed up to
+these limits with pack() and chunk_text().
+"""
+
+import json
+from dataclasses import dataclass, replace
+from urllib.parse import quote
+
+GET = "GET"
+POST = "POST"
+LOCAL = "local"
+
+URL = "url"      # percent-encoded, as in a query string or URL path
+JSON = "json"    # a JSON string in a body, non-ASCII escaped as requests' json= sends it
+UTF8 = "utf-8"   # raw UTF-8 bytes
+
+
+@dataclass(frozen=True)
+class ProviderCapabilities:
+    max_chars: int               # characters of text per request
+    max_payload_bytes: int       # encoded text per request, see payload_size()
+    method: str = GET
+    encoding: str = URL
+    batch: bool = False          # several texts per request (translate_batch)
+    max_batch_items: int = 1
+    concurrency: int = 1         # requests, or document chunks, in flight at once
+
+    def payload_size(self, text):
+        """Bytes text takes in a request to this engine."""
+        text = str(text or "")
+        if self.encoding == URL:
+            return len(quote(text, safe=""))
+        if self.encoding == JSON:
+            return len(json.dumps(text)) - 2
+        return len(text.encode("utf-8"))
+
+    def fits(self, text):
+        return len(text) <= self.max_chars and self.payload_size(text) <= self.max_payload_bytes
+
+
+CAPABILITIES = {
+    # q goes in the URL, and translate_a has no documented URL limit. Keep
+    # the 1500 characters chunks always had; 9000 bytes is what such a chunk
+    # of Cyrillic (6 bytes a letter) sent, and caps CJK (9) there too.
+    # translate_a/t takes one q per text.
+    "google": ProviderCapabilities(
+        max_chars=1500, max_payload_bytes=9000, method=GET, encoding=URL,
+        batch=True, max_batch_items=128, concurrency=4,
+    ),
+    # The text is a URL path segment; Vercel rejects URLs over 14 KB.
+    "lingva": ProviderCapabilities(
+        max_chars=5000, max_payload_bytes=8000, method=GET, encoding=URL, concurrency=2,
+    ),
+    # MyMemory rejects q over 500 bytes of UTF-8.
+    "mymemory": ProviderCapabilities(
+        max_chars=500, max_payload_bytes=500, method=GET, encoding=UTF8, concurrency=1,
+    ),
+    # Public instances cap the characters of all q values of one request.
+    "libretranslate": ProviderCapabilities(
+        max_chars=2000, max_payload_bytes=16000, method=POST, encoding=JSON,
+        batch=True, max_batch_items=50, concurrency=1,
+    ),
+    # One model at a time. Argos splits sentences itself, so chunks only
+    # bound how often document progress moves.
+    "argos": ProviderCapabilities(
+        max_chars=4000, max_payload_bytes=16000, method=LOCAL, encoding=UTF8,
+        batch=True, max_batch_items=64, concurrency=1,
+    ),
+    # hymt_translate allows at most 2048 output tokens, about 1.6 per character.
+    "hymt": ProviderCapabilities(
+        max_chars=1200, max_payload_bytes=4800, method=LOCAL, encoding=UTF8, concurrency=1,
+    ),
+}
+DEFAULT_CAPABILITIES = ProviderCapabilities(max_chars=1800, max_payload_bytes=7200, method=LOCAL, encoding=UTF8)
+
+# Extra bytes of each text in a batch request: "&q=" in a query string, or
+# the quotes around it and the ", " after it in a JSON array.
+BATCH_ITEM_OVERHEAD = "&q="
+JSON_ITEM_OVERHEAD = '"", '
+
+
+def capabilities(engine):
+    """The request limits of a translation engine."""
+    return CAPABILITIES.get(str(engine or "").lower(), DEFAULT_CAPABILITIES)
+
+
+def limited(caps, max_chars=None):
+    """caps with max_chars lowered to max_chars, if that is given."""
+    if not max_chars or max_chars >= caps.max_chars:
+        return caps
+    return replace(caps, max_chars=int(max_chars))
+
+
+def pack(texts, caps, joiner="\n", item_overhead="", max_items=None):
+    """Indexes of texts in consecutive groups that each fit one request.
+
+    A group's texts travel joined by joiner, or as separate items of one
+    request when joiner is None. item_overhead is sent with every text: a
+    marker in the joined text, encoded like it, or the request syntax around
+    a separate item (BATCH_ITEM_OVERHEAD, JSON_ITEM_OVERHEAD), sent as it
+    is. A text too large on its own gets a group of its own; chunk_text()
+    cuts such texts first.
+    """
+    if max_items is None:
+        max_items = caps.max_batch_items if joiner is None else len(texts) or 1
+    join_chars = len(joiner or "")
+    join_size = caps.payload_size(joiner) if joiner else 0
+    overhead_chars = len(item_overhead)
+    if joiner is None:
+        overhead_size = len(item_overhead.encode("utf-8"))
+    else:
+        overhead_size = caps.payload_size(item_overhead) if item_overhead else 0
+    groups = []
+    group = []
+    chars = size = 0
+    for index, text in enumerate(texts):
+        text_chars = len(text) + overhead_chars
+        text_size = caps.payload_size(text) + overhead_size
+        if group and (
+            len(group) >= max_items
+            or chars + join_chars + text_chars > caps.max_chars
+            or size + join_size + text_size > caps.max_payload_bytes
+        ):
+            groups.append(group)
+            group = []
+            chars = size = 0
+        if group:
+            chars += join_chars
+            size += join_size
+        group.append(index)
+        chars += text_chars
+        size += text_size
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _best_cut(text, max_chars):
+    window = text[:max_chars]
+    for marker in (". ", "! ", "? ", "; ", "\n", " "):
+        cut = window.rfind(marker)
+        if cut >= max_chars // 2:
+            return cut + len(marker)
+    return max_chars
+
+
+def split_long_text(text, max_chars):
+    """Cut text into pieces of at most max_chars, at sentence or word ends where possible."""
+    result = []
+    remaining = text.strip()
+    while len(remaining) > max_chars:
+        cut = _best_cut(remaining, max_chars)
+        result.append(remaining[:cut].strip())
+        remaining = remaining[cut:].strip()
+    if remaining:
+        result.append(remaining)
+    return result
+
+
+def cut_to_fit(text, caps):
+    """Pieces of text that each fit one request of caps."""
+    if caps.fits(text):
+        return [text]
+    # Budget in characters from the text's own bytes per character, so
+    # Cyrillic and CJK get shorter pieces than Latin text.
+    size = caps.payload_size(text) or 1
+    budget = min(caps.max_chars, max(1, len(text) * caps.max_payload_bytes // size))
+    pieces = []
+    for piece in split_long_text(text, budget):
+        if caps.fits(piece) or len(piece) <= 1:
+            pieces.append(piece)
+        else:
+            pieces.extend(cut_to_fit(piece, replace(caps, max_chars=max(1, len(piece) * 3 // 4))))
+    return pieces
+
+
+def chunk_text(units, caps, joiner="\n"):
+    """Join units (lines, paragraphs) into as few request-sized chunks as possible."""
+    pieces = []
+    for unit in units:
+        pieces.extend(cut_to_fit(unit, caps) if unit else [unit])
+    return [joiner.join(pieces[index] for index in group) for group in pack(pieces, caps, joiner)]
@@ -0,0 +1,221 @@
+"""
+Health of the online translation providers and their mirror instances.
+
+Every request to a provider ("google") or to one instance of it
+("lingva https://lingva.ml") is recorded here with its latency and outcome.
+After FAILURE_THRESHOLD failures in a row the target's circuit opens: it is
+skipped, so a dead mirror stops costing every request its full timeout.
+Once the cooldown has passed one probe request is let through (half-open);
+success closes the circuit, another failure opens it again with a longer
+cooldown. Instances and fallback providers are tried healthiest first.
+
+health_stats() returns the state of every target for diagnostics, and
+circuit changes are logged to the clickntranslate.providers logger.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+
+FAILURE_THRESHOLD = 3     # failures in a row that open a circuit
+COOLDOWN = 30.0           # seconds before an open circuit lets a probe through
+MAX_COOLDOWN = 600.0      # cooldown doubles on each failed probe, up to this
+WINDOW = 20               # recent requests kept per target for error rate and latency
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_LOGGER = logging.getLogger("clickntranslate.providers")
+
+
+def target_key(provider, instance=None):
+    """Registry key of a provider, or of one of its instances."""
+    return f"{provider} {instance}" if instance else str(provider)
+
+
+class _Target:
+    __slots__ = (
+        "state", "failures", "opened_at", "cooldown", "probing",
+        "outcomes", "latencies", "requests", "errors", "last_error",
+    )
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0          # in a row
+        self.opened_at = 0.0
+        self.cooldown = COOLDOWN
+        self.probing = False
+        self.outcomes = deque(maxlen=WINDOW)   # True for success
+        self.latencies = deque(maxlen=WINDOW)  # seconds, successes only
+        self.requests = 0
+        self.errors = 0
+        self.last_error = ""
+
+    def error_rate(self):
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def average_latency(self):
+        return sum(self.latencies) / len(self.latencies) if self.latencies else None
+
+
+class ProviderHealth:
+    """Circuit breakers and recent statistics for a set of targets."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._targets = {}
+
+    def _target(self, key):
+        target = self._targets.get(key)
+        if target is None:
+            target = _Target()
+            self._targets[key] = target
+        return target
+
+    def allow(self, key):
+        """Whether a request to key may go out now.
+
+        An open circuit whose cooldown has passed turns half-open and lets
+        exactly one probe through until that probe is recorded.
+        """
+        with self._lock:
+            target = self._target(key)
+            if target.state == CLOSED:
+                return True
+            if target.state == OPEN and self._clock() - target.opened_at >= target.cooldown:
+                target.state = HALF_OPEN
+                target.probing = False
+                _LOGGER.info("Circuit half-open for %s: probing", key)
+            if target.state == HALF_OPEN and not target.probing:
+                target.probing = True
+                return True
+            return False
+
+    def record_success(self, key, latency):
+        with self._lock:
+            target = self._target(key)
+            target.requests += 1
+            target.outcomes.append(True)
+            target.latencies.append(max(0.0, float(latency)))
+            target.failures = 0
+            if target.state != CLOSED:
+                _LOGGER.info("Circuit closed for %s", key)
+            target.state = CLOSED
+            target.cooldown = COOLDOWN
+            target.probing = False
+
+    def record_failure(self, key, error=""):
+        with self._lock:
+            target = self._target(key)
+            target.requests += 1
+            target.errors += 1
+            target.outcomes.append(False)
+            target.failures += 1
+            target.last_error = str(error or "")[:300]
+            if target.state == HALF_OPEN:
+                target.cooldown = min(MAX_COOLDOWN, target.cooldown * 2)
+            elif target.state == OPEN or target.failures < FAILURE_THRESHOLD:
+                return
+            target.state = OPEN
+            target.opened_at = self._clock()
+            target.probing = False
+            _LOGGER.warning(
+                "Circuit open for %s after %d failures (retry in %.0f s): %s",
+                key, target.failures, target.cooldown, target.last_error,
+            )
+
+    def order(self, keys):
+        """keys healthiest first; ties keep the given order.
+
+        Open circuits go last, then targets by recent error rate, then by
+        average latency in whole seconds, so that instances of similar speed
+        keep their configured order. Targets without history rank as healthy.
+        """
+        with self._lock:
+            ranked = []
+            for position, key in enumerate(keys):
+                target = self._targets.get(key)
+                if target is None:
+                    ranked.append(((False, 0.0, 0), position, key))
+                    continue
+                latency = int(target.average_latency() or 0)
+                ranked.append(((target.state != CLOSED, target.error_rate(), latency), position, key))
+        return [key for _rank, _position, key in sorted(ranked)]
+
+    def latency_percentile(self, key, fraction, min_samples=5):
+        """Recent latency that `fraction` of key's successful requests stayed under.
+
+        None until key has min_samples successes in its window.
+        """
+        with self._lock:
+            target = self._targets.get(key)
+            if target is None or len(target.latencies) < min_samples:
+                return None
+            latencies = sorted(target.latencies)
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    def stats(self):
+        now = self._clock()
+        with self._lock:
+            result = {}
+            for key, target in self._targets.items():
+                latency = target.average_latency()
+                result[key] = {
+                    "state": target.state,
+                    "requests": target.requests,
+                    "errors": target.errors,
+                    "consecutive_failures": target.failures,
+                    "error_rate": target.error_rate(),
+                    "avg_latency_ms": latency * 1e3 if latency is not None else None,
+                    "retry_in": (
+                        max(0.0, target.opened_at + target.cooldown - now) if target.state == OPEN else 0.0
+                    ),
+                    "last_error": target.last_error,
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._targets.clear()
+
+
+_health = ProviderHealth()
+
+
+def allow_request(provider, instance=None):
+    return _health.allow(target_key(provider, instance))
+
+
+def record_success(provider, latency, instance=None):
+    _health.record_success(target_key(provider, instance), latency)
+
+
+def record_failure(provider, error="", instance=None):
+    _health.record_failure(target_key(provider, instance), error)
+
+
+def order_instances(provider, instances):
+    """A provider's instances, healthiest first."""
+    keys = {target_key(provider, instance): instance for instance in instances}
+    return [keys[key] for key in _health.order(list(keys))]
+
+
+def order_providers(providers):
+    """Providers healthiest first."""
+    return _health.order([str(provider) for provider in providers])
+
+
+def latency_percentile(provider, fraction, instance=None):
+    return _health.latency_percentile(target_key(provider, instance), fraction)
+
+
+def health_stats():
+    """State, error rate and latency of every provider and instance seen so far."""
+    return _health.stats()
+
+
+def reset_health():
+    _health.reset()
@@ -0,0 +1,266 @@
+"""
+Pooled HTTP sessions of the online translation providers.
+
+Each provider gets a requests.Session of its own. Its pool keeps as many
+connections per host as the provider may have requests in flight (see
+provider_capabilities), its sockets use TCP keep-alive so idle connections
+survive between translations, and warm() opens connections ahead of the
+first request, so the first hotkey translation after launch or after an
+idle spell does not pay DNS, TCP and TLS setup.
+
+A connection carrying a request is attached to the calling thread's
+CancelToken (see cancellation), so cancelling an interactive translation
+aborts its requests in flight.
+
+pool_stats() reports, per provider, how many requests went out and how
+many of them reused an open connection.
+
+Aborting requests and counting reuse hook into urllib3's connection pools
+(requirements pin the urllib3 versions they were written against). With a
+urllib3 that lacks those hooks the sessions still work: requests are only
+checked for cancellation before they are sent, and reuse is not counted.
+"""
+
+import time
+import socket
+import logging
+import threading
+
+import requests
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import cancellation
+import provider_capabilities
+
+# Connections of one host kept open in a provider's pool at least; a hedged
+# request may overlap the one it races.
+MIN_POOL_SIZE = 2
+# Hosts (mirror instances) one provider session keeps pools for.
+MAX_HOSTS = 8
+# A host used or warmed this recently still has an open connection.
+WARM_INTERVAL = 45.0
+WARM_TIMEOUT = 5.0
+
+# TCP keep-alive: first probe after this many idle seconds, then every
+# KEEPALIVE_INTERVAL, so NATs and proxies do not drop pooled connections.
+KEEPALIVE_IDLE = 30
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_PROBES = 3
+
+_LOGGER = logging.getLogger("clickntranslate.providers")
+
+
+def _keepalive_socket_options():
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    for name, value in (
+        ("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+        ("TCP_KEEPCNT", KEEPALIVE_PROBES),
+    ):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class _CancellableConnectionMixin:
+    def connect(self):
+        super().connect()
+        # cancel() found no socket to shut down while this one was connecting.
+        token = getattr(self, "_cancel_token", None)
+        if token is not None and token.cancelled:
+            self.close()
+            token.raise_if_cancelled()
+
+
+class CancellableHTTPConnection(_CancellableConnectionMixin, HTTPConnection):
+    pass
+
+
+class CancellableHTTPSConnection(_CancellableConnectionMixin, HTTPSConnection):
+    pass
+
+
+# The private pool methods the mixin below extends, stable from urllib3 1.26 to 2.x.
+_POOL_HOOKS = all(hasattr(HTTPConnectionPool, name) for name in ("_make_request", "_put_conn"))
+
+
+class _CancellablePoolMixin:
+    def _make_request(self, conn, *args, **kwargs):
+        cancellation.raise_if_cancelled()
+        cancellation.attach_connection(conn)
+        return super()._make_request(conn, *args, **kwargs)
+
+    def _put_conn(self, conn):
+        # Back in the pool the connection may serve another thread's request.
+        if conn is not None:
+            cancellation.detach_connection(conn)
+        super()._put_conn(conn)
+
+
+class CancellableHTTPConnectionPool(_CancellablePoolMixin, HTTPConnectionPool):
+    ConnectionCls = CancellableHTTPConnection
+
+
+class CancellableHTTPSConnectionPool(_CancellablePoolMixin, HTTPSConnectionPool):
+    ConnectionCls = CancellableHTTPSConnection
+
+
+_POOL_CLASSES = {"http": CancellableHTTPConnectionPool, "https": CancellableHTTPSConnectionPool}
+
+
+class PooledAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter with keep-alive, cancellable connections that can report their reuse."""
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault("socket_options", _keepalive_socket_options())
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        _use_cancellable_pools(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        _use_cancellable_pools(manager)
+        return manager
+
+    def counters(self):
+        """(requests, connections opened) over the host pools still held; zeros if urllib3 hides them."""
+        pools = self.poolmanager.pools
+        container = getattr(pools, "_container", None)
+        lock = getattr(pools, "lock", None)
+        if container is None or lock is None:
+            return 0, 0
+        with lock:
+            held = list(container.values())
+        sent = sum(getattr(pool, "num_requests", 0) for pool in held)
+        opened = sum(getattr(pool, "num_connections", 0) for pool in held)
+        return sent, opened
+
+
+def _use_cancellable_pools(manager):
+    if _POOL_HOOKS and hasattr(manager, "pool_classes_by_scheme"):
+        manager.pool_classes_by_scheme = dict(_POOL_CLASSES)
+
+
+def pool_size(provider):
+    return max(MIN_POOL_SIZE, provider_capabilities.capabilities(provider).concurrency)
+
+
+class ProviderSession:
+    """A provider's session, its adapter and when each of its hosts was last used."""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.session = requests.Session()
+        self.adapter = PooledAdapter(pool_connections=MAX_HOSTS, pool_maxsize=pool_size(provider))
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+        self.session.hooks["response"].append(self._touch)
+        self._lock = threading.Lock()
+        self._used = {}
+        self.warmups = 0
+        self.warm_failures = 0
+
+    def _touch(self, response, *args, **kwargs):
+        host = requests.utils.urlparse(response.url)
+        with self._lock:
+            self._used[f"{host.scheme}://{host.netloc}"] = time.monotonic()
+        return response
+
+    def needs_warming(self, base_url):
+        base_url = base_url.rstrip("/")
+        with self._lock:
+            used = self._used.get(base_url)
+        return used is None or time.monotonic() - used > WARM_INTERVAL
+
+    def warm(self, base_url):
+        """Open a connection to base_url; False when the host cannot be reached."""
+        try:
+            # Any answer will do, 404 included: the connection stays in the pool.
+            self.session.head(base_url, timeout=WARM_TIMEOUT, allow_redirects=False).close()
+        except requests.RequestException as exc:
+            with self._lock:
+                self.warm_failures += 1
+            _LOGGER.info("Could not pre-connect to %s: %s", base_url, exc)
+            return False
+        with self._lock:
+            self.warmups += 1
+        return True
+
+    def stats(self):
+        sent, opened = self.adapter.counters()
+        with self._lock:
+            return {
+                "pool_size": pool_size(self.provider),
+                "requests": sent,
+                "connections": opened,
+                "reused": max(0, sent - opened),
+                "reuse_ratio": max(0, sent - opened) / sent if sent else 0.0,
+                "warmups": self.warmups,
+                "warm_failures": self.warm_failures,
+            }
+
+    def close(self):
+        self.session.close()
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_warming = set()
+
+
+def provider_session(provider):
+    provider = str(provider or "default")
+    with _sessions_lock:
+        found = _sessions.get(provider)
+        if found is None:
+            found = ProviderSession(provider)
+            _sessions[provider] = found
+        return found
+
+
+def session(provider):
+    """The pooled requests.Session of provider."""
+    return provider_session(provider).session
+
+
+def warm(provider, base_urls):
+    """Open connections to those of base_urls that have none yet. Blocks; returns how many opened."""
+    found = provider_session(provider)
+    return sum(found.warm(base_url) for base_url in base_urls if found.needs_warming(base_url))
+
+
+def warm_in_background(provider, base_urls):
+    """warm() on a daemon thread, unless provider is being warmed already."""
+    provider = str(provider)
+    with _sessions_lock:
+        if provider in _warming:
+            return None
+        _warming.add(provider)
+
+    def _run():
+        try:
+            warm(provider, base_urls)
+        finally:
+            with _sessions_lock:
+                _warming.discard(provider)
+
+    thread = threading.Thread(target=_run, name=f"prewarm-{provider}", daemon=True)
+    thread.start()
+    return thread
+
+
+def pool_stats():
+    """Pool size, requests, new connections and reuse ratio of every provider session."""
+    with _sessions_lock:
+        existing = list(_sessions.items())
+    return {provider: found.stats() for provider, found in existing}
+
+
+def reset_sessions():
+    with _sessions_lock:
+        existing = list(_sessions.values())
+        _sessions.clear()
+    for found in existing:
+        found.close()
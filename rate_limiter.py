@@ -0,0 +1,264 @@
+"""
+Client-side rate limits for the online translation providers.
+
+Every request to a provider first takes a token from that provider's
+bucket, so document translation, full-screen translation and the main
+window share one budget per provider instead of each bursting on its own.
+Providers with several public instances (Lingva and LibreTranslate
+mirrors) get one bucket per instance, with the provider's limit, so one
+mirror that throttles does not hold up failover to the others. A bucket
+refills at `rate` tokens a second and holds at most `burst`.
+
+A 429 answer (see throttled()) pauses the provider until its Retry-After
+time, or for an exponential backoff when the server sends none, and halves
+the bucket's rate; every success afterwards wins back a tenth of the
+configured rate. The limits can be changed in config.json:
+
+    "provider_rate_limits": {"google": {"rate": 5, "burst": 10}}
+"""
+
+import time
+import logging
+import datetime
+import threading
+import email.utils
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate: float     # requests per second
+    burst: int = 1  # requests that may go out at once after a quiet period
+
+
+DEFAULT_RATE_LIMITS = {
+    "google": RateLimit(rate=5.0, burst=10),
+    "lingva": RateLimit(rate=2.0, burst=4),
+    "mymemory": RateLimit(rate=1.0, burst=2),
+    "libretranslate": RateLimit(rate=1.0, burst=2),
+}
+FALLBACK_RATE_LIMIT = RateLimit(rate=2.0, burst=2)
+
+BACKOFF = 1.0             # first pause after a 429 without Retry-After, doubles each time
+MAX_BACKOFF = 60.0
+MIN_RATE_FRACTION = 0.1   # throttling never slows a bucket below this share of its rate
+RECOVERY_FRACTION = 0.1   # share of the configured rate each success wins back
+
+_LOGGER = logging.getLogger("clickntranslate.providers")
+
+
+class RateLimitTimeout(RuntimeError):
+    """A request would have to wait longer than the caller allows for its turn."""
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = str(value or "").strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class TokenBucket:
+    """Token bucket of one provider, with adaptive backoff after throttling.
+
+    A caller reserves its token at once and then sleeps until the token
+    would have been refilled, so waiting callers are served in order.
+    """
+
+    def __init__(self, limit, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.limit = limit
+        self._rate = float(limit.rate)
+        self._tokens = float(limit.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._backoff = BACKOFF
+        self.requests = 0
+        self.throttled_count = 0
+        self.waited = 0.0
+
+    def _refill(self, now):
+        # Nothing refills while the provider is paused.
+        start = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(float(self.limit.burst), self._tokens + (now - start) * self._rate)
+        self._updated = max(self._updated, now)
+
+    def set_limit(self, limit):
+        with self._lock:
+            self._refill(self._clock())
+            self.limit = limit
+            self._rate = float(limit.rate)
+            self._tokens = min(self._tokens, float(limit.burst))
+
+    def reserve(self, max_wait=None):
+        """Take a token; return how long the caller must wait before sending.
+
+        Raises RateLimitTimeout, without taking the token, when that wait
+        would exceed max_wait.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            deficit = max(0.0, 1.0 - self._tokens)
+            wait = max(0.0, self._paused_until - now) + deficit / max(self._rate, 1e-9)
+            if max_wait is not None and wait > max_wait:
+                raise RateLimitTimeout(f"next request allowed in {wait:.0f} s")
+            self._tokens -= 1.0
+            self.requests += 1
+            self.waited += wait
+            return wait
+
+    def release(self):
+        """Give back a reserved token that was never used."""
+        with self._lock:
+            self._tokens = min(float(self.limit.burst), self._tokens + 1.0)
+
+    def throttled(self, retry_after=None):
+        """The provider answered 429: pause it and slow the bucket down. Returns the pause."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if retry_after is None:
+                pause = self._backoff
+                self._backoff = min(MAX_BACKOFF, self._backoff * 2)
+            else:
+                pause = max(0.0, float(retry_after))
+            self._paused_until = max(self._paused_until, now + pause)
+            self._tokens = min(self._tokens, 0.0)
+            self._rate = max(self.limit.rate * MIN_RATE_FRACTION, self._rate / 2)
+            self.throttled_count += 1
+            return pause
+
+    def succeeded(self):
+        with self._lock:
+            self._backoff = BACKOFF
+            self._rate = min(float(self.limit.rate), self._rate + self.limit.rate * RECOVERY_FRACTION)
+
+    def stats(self):
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            return {
+                "rate": self._rate,
+                "configured_rate": float(self.limit.rate),
+                "burst": self.limit.burst,
+                "tokens": self._tokens,
+                "paused_for": max(0.0, self._paused_until - now),
+                "requests": self.requests,
+                "throttled": self.throttled_count,
+                "waited_ms": self.waited * 1e3,
+            }
+
+
+_buckets = {}  # provider, or "provider instance" -> TokenBucket
+_bucket_providers = {}  # the same keys -> provider, whose limit applies
+_buckets_lock = threading.Lock()
+_overrides = {}
+
+
+def _coerce_limit(value, default):
+    if isinstance(value, RateLimit):
+        return value
+    try:
+        rate = float(value.get("rate", default.rate))
+        burst = int(value.get("burst", default.burst))
+    except (AttributeError, TypeError, ValueError):
+        return default
+    if rate <= 0:
+        return default
+    return RateLimit(rate=rate, burst=max(1, burst))
+
+
+def _limit_for(provider):
+    default = DEFAULT_RATE_LIMITS.get(provider, FALLBACK_RATE_LIMIT)
+    if provider in _overrides:
+        return _coerce_limit(_overrides[provider], default)
+    return default
+
+
+def _key(provider, instance=None):
+    # The same keys as provider_health.target_key.
+    return f"{provider} {instance}" if instance else str(provider)
+
+
+def bucket(provider, instance=None):
+    provider = str(provider)
+    key = _key(provider, instance)
+    with _buckets_lock:
+        found = _buckets.get(key)
+        if found is None:
+            found = TokenBucket(_limit_for(provider))
+            _buckets[key] = found
+            _bucket_providers[key] = provider
+        return found
+
+
+def configure(limits):
+    """Apply the "provider_rate_limits" setting: {provider: {"rate": r, "burst": b}}."""
+    global _overrides
+    limits = dict(limits) if isinstance(limits, dict) else {}
+    with _buckets_lock:
+        if limits == _overrides:
+            return
+        _overrides = limits
+        existing = [(_bucket_providers[key], found) for key, found in _buckets.items()]
+    for provider, found in existing:
+        found.set_limit(_limit_for(provider))
+
+
+def acquire(provider, max_wait=None, cancel_event=None, instance=None):
+    """Wait for the next request slot of provider, or of its instance. False if cancel_event was set meanwhile.
+
+    Raises RateLimitTimeout when the slot is further away than max_wait.
+    """
+    found = bucket(provider, instance)
+    wait = found.reserve(max_wait)
+    if wait <= 0:
+        return True
+    if cancel_event is not None:
+        if cancel_event.wait(wait):
+            found.release()
+            return False
+    else:
+        time.sleep(wait)
+    return True
+
+
+def throttled(provider, retry_after=None, instance=None):
+    """Record a 429 from provider (one instance of it); returns how long its requests are paused."""
+    pause = bucket(provider, instance).throttled(retry_after)
+    _LOGGER.warning("%s is rate limiting requests; pausing for %.1f s", _key(provider, instance), pause)
+    return pause
+
+
+def succeeded(provider, instance=None):
+    bucket(provider, instance).succeeded()
+
+
+def rate_limit_stats():
+    """Rate, tokens, pause and throttling counts of every provider and instance used so far."""
+    with _buckets_lock:
+        existing = list(_buckets.items())
+    return {provider: found.stats() for provider, found in existing}
+
+
+def reset_rate_limits():
+    with _buckets_lock:
+        _buckets.clear()
+        _bucket_providers.clear()
@@ -40,6 +40,9 @@ from styled_dialogs import (
 
 QMessageBox = StyledMessageBox
 from app_version import APP_VERSION
+import history_index
+import history_store
+from history_view import HistoryListModel, HistoryListView, HistoryRecordDelegate
 import platform_support
 import portable_paths
 from languages import (
@@ -1407,6 +1410,13 @@ SETTINGS_TEXT = {
         "copy_history_title": "Copy history",
         "history_empty": "History is empty.",
         "history_error": "Error reading history.",
+        "history_search_placeholder": "Search history",
+        "history_all_languages": "All languages",
+        "history_period_all": "Any time",
+        "history_period_today": "Today",
+        "history_period_week": "Last 7 days",
+        "history_period_month": "Last 30 days",
+        "history_no_matches": "No records match the filters.",
         "error_title": "Error",
         "clear_translation_history_error": "Could not clear translation history.",
         "clear_copy_history_error": "Could not clear copy history.",
@@ -1466,7 +1476,18 @@ SETTINGS_TEXT = {
         "reset_question": "Are you sure you want to reset all settings?",
         "clear_histories_title": "Clear histories?",
         "clear_histories_question": "Clear translation history and copy history?",
-        "settings_reset_done": "Settings were reset"
+        "settings_reset_done": "Settings were reset",
+        "diagnostics_button": "Diagnostics",
+        "diagnostics_title": "Translation diagnostics",
+        "diagnostics_engine": "Engine / pair",
+        "diagnostics_requests": "Requests",
+        "diagnostics_errors": "Errors",
+        "diagnostics_cache_hits": "Cache",
+        "diagnostics_data": "Sent {sent}, received {received}",
+        "diagnostics_empty": "No translations recorded yet.",
+        "diagnostics_hint": "Latency of uncached translations, over all sessions.",
+        "diagnostics_refresh": "Refresh",
+        "diagnostics_reset": "Reset statistics"
     },
     "ru": {
         "autostart": "Запускать вместе с ОС",
@@ -1490,6 +1511,13 @@ SETTINGS_TEXT = {
         "copy_history_title": "История копирований",
         "history_empty": "История пуста.",
         "history_error": "Ошибка чтения истории.",
+        "history_search_placeholder": "Поиск по истории",
+        "history_all_languages": "Все языки",
+        "history_period_all": "За всё время",
+        "history_period_today": "Сегодня",
+        "history_period_week": "Последние 7 дней",
+        "history_period_month": "Последние 30 дней",
+        "history_no_matches": "Нет записей, подходящих под фильтры.",
         "error_title": "Ошибка",
         "clear_translation_history_error": "Не удалось очистить историю переводов.",
         "clear_copy_history_error": "Не удалось очистить историю копирований.",
@@ -1549,7 +1577,18 @@ SETTINGS_TEXT = {
         "reset_question": "Вы уверены, что хотите сбросить все настройки?",
         "clear_histories_title": "Очистить истории?",
         "clear_histories_question": "Очистить историю переводов и историю копирований?",
-        "settings_reset_done": "Настройки сброшены"
+        "settings_reset_done": "Настройки сброшены",
+        "diagnostics_button": "Диагностика",
+        "diagnostics_title": "Диагностика перевода",
+        "diagnostics_engine": "Движок / пара",
+        "diagnostics_requests": "Запросы",
+        "diagnostics_errors": "Ошибки",
+        "diagnostics_cache_hits": "Кэш",
+        "diagnostics_data": "Отправлено {sent}, получено {received}",
+        "diagnostics_empty": "Переводов пока не было.",
+        "diagnostics_hint": "Задержка переводов без кэша, за все сеансы.",
+        "diagnostics_refresh": "Обновить",
+        "diagnostics_reset": "Сбросить статистику"
     },
     "es": {
         "autostart": "Iniciar con el sistema",
@@ -1572,6 +1611,13 @@ SETTINGS_TEXT = {
         "copy_history_title": "Historial de copias",
         "history_empty": "El historial esta vacio.",
         "history_error": "Error al leer el historial.",
+        "history_search_placeholder": "Buscar en el historial",
+        "history_all_languages": "Todos los idiomas",
+        "history_period_all": "Cualquier fecha",
+        "history_period_today": "Hoy",
+        "history_period_week": "Últimos 7 días",
+        "history_period_month": "Últimos 30 días",
+        "history_no_matches": "Ningún registro coincide con los filtros.",
         "error_title": "Error",
         "clear_translation_history_error": "No se pudo borrar el historial de traducciones.",
         "clear_copy_history_error": "No se pudo borrar el historial de copias.",
@@ -1631,7 +1677,18 @@ SETTINGS_TEXT = {
         "reset_question": "Seguro que quieres restablecer todos los ajustes?",
         "clear_histories_title": "Borrar historiales?",
         "clear_histories_question": "Borrar el historial de traducciones y de copias?",
-        "settings_reset_done": "Ajustes restablecidos"
+        "settings_reset_done": "Ajustes restablecidos",
+        "diagnostics_button": "Diagnóstico",
+        "diagnostics_title": "Diagnóstico de traducción",
+        "diagnostics_engine": "Motor / par",
+        "diagnostics_requests": "Solicitudes",
+        "diagnostics_errors": "Errores",
+        "diagnostics_cache_hits": "Caché",
+        "diagnostics_data": "Enviado {sent}, recibido {received}",
+        "diagnostics_empty": "Aún no hay traducciones registradas.",
+        "diagnostics_hint": "Latencia de las traducciones sin caché, en todas las sesiones.",
+        "diagnostics_refresh": "Actualizar",
+        "diagnostics_reset": "Restablecer estadísticas"
     },
     "de": {
         "autostart": "Mit dem System starten",
@@ -1654,6 +1711,13 @@ SETTINGS_TEXT = {
         "copy_history_title": "Kopierverlauf",
         "history_empty": "Der Verlauf ist leer.",
         "history_error": "Fehler beim Lesen des Verlaufs.",
+        "history_search_placeholder": "Verlauf durchsuchen",
+        "history_all_languages": "Alle Sprachen",
+        "history_period_all": "Gesamter Zeitraum",
+        "history_period_today": "Heute",
+        "history_period_week": "Letzte 7 Tage",
+        "history_period_month": "Letzte 30 Tage",
+        "history_no_matches": "Keine Einträge passen zu den Filtern.",
         "error_title": "Fehler",
         "clear_translation_history_error": "Der Übersetzungsverlauf konnte nicht gelöscht werden.",
         "clear_copy_history_error": "Der Kopierverlauf konnte nicht gelöscht werden.",
@@ -1713,7 +1777,18 @@ SETTINGS_TEXT = {
         "reset_question": "Mochtest du wirklich alle Einstellungen zurucksetzen?",
         "clear_histories_title": "Verlaufe leeren?",
         "clear_histories_question": "Ubersetzungs- und Kopierverlauf leeren?",
-        "settings_reset_done": "Einstellungen wurden zuruckgesetzt"
+        "settings_reset_done": "Einstellungen wurden zuruckgesetzt",
+        "diagnostics_button": "Diagnose",
+        "diagnostics_title": "Übersetzungsdiagnose",
+        "diagnostics_engine": "Dienst / Paar",
+        "diagnostics_requests": "Anfragen",
+        "diagnostics_errors": "Fehler",
+        "diagnostics_cache_hits": "Cache",
+        "diagnostics_data": "Gesendet {sent}, empfangen {received}",
+        "diagnostics_empty": "Noch keine Übersetzungen erfasst.",
+        "diagnostics_hint": "Latenz der Übersetzungen ohne Cache, über alle Sitzungen.",
+        "diagnostics_refresh": "Aktualisieren",
+        "diagnostics_reset": "Statistik zurücksetzen"
     },
     "fr": {
         "autostart": "Demarrer avec le systeme",
@@ -1736,6 +1811,13 @@ SETTINGS_TEXT = {
         "copy_history_title": "Historique des copies",
         "history_empty": "L'historique est vide.",
         "history_error": "Erreur de lecture de l'historique.",
+        "history_search_placeholder": "Rechercher dans l'historique",
+        "history_all_languages": "Toutes les langues",
+        "history_period_all": "Toute période",
+        "history_period_today": "Aujourd'hui",
+        "history_period_week": "7 derniers jours",
+        "history_period_month": "30 derniers jours",
+        "history_no_matches": "Aucun enregistrement ne correspond aux filtres.",
         "error_title": "Erreur",
         "clear_translation_history_error": "Impossible d’effacer l’historique des traductions.",
         "clear_copy_history_error": "Impossible d’effacer l’historique des copies.",
@@ -1795,7 +1877,18 @@ SETTINGS_TEXT = {
         "reset_question": "Voulez-vous vraiment reinitialiser tous les reglages ?",
         "clear_histories_title": "Effacer les historiques ?",
         "clear_histories_question": "Effacer l'historique des traductions et des copies ?",
-        "settings_reset_done": "Reglages reinitialises"
+        "settings_reset_done": "Reglages reinitialises",
+        "diagnostics_button": "Diagnostic",
+        "diagnostics_title": "Diagnostic de traduction",
+        "diagnostics_engine": "Moteur / paire",
+        "diagnostics_requests": "Requêtes",
+        "diagnostics_errors": "Erreurs",
+        "diagnostics_cache_hits": "Cache",
+        "diagnostics_data": "Envoyé {sent}, reçu {received}",
+        "diagnostics_empty": "Aucune traduction enregistrée pour l'instant.",
+        "diagnostics_hint": "Latence des traductions hors cache, sur toutes les sessions.",
+        "diagnostics_refresh": "Actualiser",
+        "diagnostics_reset": "Réinitialiser les statistiques"
     },
     "zh": {
         "autostart": "随系统启动",
@@ -1818,6 +1911,13 @@ SETTINGS_TEXT = {
         "copy_history_title": "复制历史",
         "history_empty": "历史为空。",
         "history_error": "读取历史时出错。",
+        "history_search_placeholder": "搜索历史",
+        "history_all_languages": "所有语言",
+        "history_period_all": "全部时间",
+        "history_period_today": "今天",
+        "history_period_week": "最近 7 天",
+        "history_period_month": "最近 30 天",
+        "history_no_matches": "没有符合筛选条件的记录。",
         "error_title": "错误",
         "clear_translation_history_error": "无法清除翻译历史。",
         "clear_copy_history_error": "无法清除复制历史。",
@@ -1877,7 +1977,18 @@ SETTINGS_TEXT = {
         "reset_question": "确定要重置所有设置吗？",
         "clear_histories_title": "清除历史？",
         "clear_histories_question": "清除翻译历史和复制历史吗？",
-        "settings_reset_done": "设置已重置"
+        "settings_reset_done": "设置已重置",
+        "diagnostics_button": "诊断",
+        "diagnostics_title": "翻译诊断",
+        "diagnostics_engine": "引擎 / 语言对",
+        "diagnostics_requests": "请求",
+        "diagnostics_errors": "错误",
+        "diagnostics_cache_hits": "缓存",
+        "diagnostics_data": "发送 {sent}，接收 {received}",
+        "diagnostics_empty": "尚无翻译记录。",
+        "diagnostics_hint": "未命中缓存的翻译延迟，涵盖所有会话。",
+        "diagnostics_refresh": "刷新",
+        "diagnostics_reset": "重置统计"
     }
 }
 
@@ -2219,11 +2330,6 @@ def get_data_file(filename):
         os.makedirs(data_dir)
     return os.path.join(data_dir, filename)
 
-def ensure_json_file(filepath, default_content):
-    if not os.path.exists(filepath):
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(default_content, f, ensure_ascii=False, indent=4)
-
 
 EASYOCR_MODEL_GROUP_BY_LANGUAGE = {
     "en": "english_g2",
@@ -6614,11 +6720,34 @@ class SettingsWindow(QWidget):
         self.main_layout.addLayout(btn_row)
         self.main_layout.addSpacing(10)
         
-        # --- Версия программы ---
+        # --- Версия программы и ссылка на диагностику ---
+        version_row = QHBoxLayout()
+        version_row.setContentsMargins(0, 0, 0, 0)
+        version_row.setSpacing(12)
         version_label = QLabel(f"V{APP_VERSION}")
         version_label.setAlignment(Qt.AlignCenter)
         version_label.setStyleSheet("color: #7A5FA1; font-size: 16px; font-weight: bold; margin-bottom: 2px; margin-top: 2px;")
-        self.main_layout.addWidget(version_label)
+        self.diagnostics_btn = QPushButton(settings_text(lang, "diagnostics_button"))
+        self.diagnostics_btn.setCursor(Qt.PointingHandCursor)
+        self.diagnostics_btn.setFlat(True)
+        self.diagnostics_btn.setStyleSheet("""
+            QPushButton {
+                color: #7A5FA1;
+                background: transparent;
+                border: none;
+                padding: 0px;
+                font-family: 'Segoe UI';
+                font-size: 13px;
+                text-decoration: underline;
+            }
+            QPushButton:hover { color: #8B70B2; }
+        """)
+        self.diagnostics_btn.clicked.connect(self.show_diagnostics_view)
+        version_row.addStretch(1)
+        version_row.addWidget(version_label)
+        version_row.addWidget(self.diagnostics_btn)
+        version_row.addStretch(1)
+        self.main_layout.addLayout(version_row)
         self.main_layout.addStretch()
 
     def set_language_package_task_status(self, text="", percent=None, kind="running"):
@@ -6832,84 +6961,67 @@ class SettingsWindow(QWidget):
             QKeySequenceEdit#secondaryHotkeyInput QLineEdit:focus {{
                 border: 1px solid {colors['accent']};
             }}
-            QScrollArea#historyScroll {{
+            QListView#historyScroll {{
                 background: transparent;
                 border: none;
+                outline: none;
             }}
-            QWidget#historyScrollContent {{
-                background: transparent;
-            }}
-            QFrame#historyRecordCard {{
-                background-color: {colors['card']};
-                border: 1px solid {colors['border']};
-                border-radius: 10px;
-            }}
-            QLabel#historyMeta {{
-                color: {colors['muted']};
-                font-size: 11px;
-                font-weight: 600;
-            }}
-            QLabel#historyLanguageBadge {{
-                color: {colors['accent']};
-                background-color: {colors['field']};
-                border: 1px solid {colors['soft_border']};
-                border-radius: 7px;
-                padding: 2px 7px;
-                font-size: 11px;
-                font-weight: 800;
-            }}
-            QLabel#historySectionCaption {{
+            QLabel#historyEmptyState {{
                 color: {colors['muted']};
-                font-size: 10px;
-                font-weight: 800;
-                padding-left: 2px;
+                font-size: 14px;
+                padding: 44px 12px;
             }}
-            QFrame#historyTextBlock {{
+            QLineEdit#historySearch,
+            QComboBox#historyFilter {{
                 background-color: {colors['field']};
+                color: {colors['text']};
                 border: 1px solid {colors['border']};
                 border-radius: 8px;
+                padding: 4px 10px;
+                font-size: 13px;
+                selection-background-color: {colors['accent']};
+                selection-color: #ffffff;
+            }}
+            QComboBox#historyFilter {{
+                padding-right: 24px;
             }}
-            QFrame#historyTextBlock[translated="true"] {{
-                background-color: {colors['field_alt']};
+            QLineEdit#historySearch:focus,
+            QComboBox#historyFilter:focus,
+            QComboBox#historyFilter:on {{
                 border: 1px solid {colors['accent']};
             }}
-            QLabel#historyRecordOriginal,
-            QLabel#historyRecordTranslated,
-            QLabel#historyRecordText {{
-                background: transparent;
-                color: {colors['text']};
+            QComboBox#historyFilter::drop-down {{
                 border: none;
-                padding: 1px;
-                font-family: 'Segoe UI';
-                font-size: 15px;
+                width: 22px;
             }}
-            QLabel#historyRecordTranslated {{
-                font-weight: 700;
-            }}
-            QLabel#historyEmptyState {{
-                color: {colors['muted']};
-                font-size: 14px;
-                padding: 44px 12px;
+            QComboBox#historyFilter QAbstractItemView {{
+                background-color: {colors['field']};
+                color: {colors['text']};
+                selection-background-color: {colors['accent']};
+                selection-color: #ffffff;
+                border: 1px solid {colors['border']};
+                outline: none;
             }}
-            QPushButton#historyCopyButton,
-            QPushButton#historyDeleteButton {{
-                background: transparent;
+            QTableWidget#diagnosticsTable {{
+                background-color: {colors['card']};
+                alternate-background-color: {colors['field']};
+                color: {colors['text']};
                 border: 1px solid {colors['border']};
-                border-radius: 7px;
-                padding: 4px 10px;
+                border-radius: 10px;
+                gridline-color: transparent;
+                font-size: 13px;
+                selection-background-color: {colors['field_alt']};
+                selection-color: {colors['text']};
+            }}
+            QTableWidget#diagnosticsTable QHeaderView::section {{
+                background-color: {colors['card']};
+                color: {colors['muted']};
+                border: none;
+                border-bottom: 1px solid {colors['border']};
+                padding: 4px 6px;
                 font-size: 12px;
                 font-weight: 700;
             }}
-            QPushButton#historyCopyButton {{ color: {colors['accent']}; }}
-            QPushButton#historyCopyButton:hover {{
-                color: #ffffff;
-                background-color: {colors['accent']};
-            }}
-            QPushButton#historyDeleteButton {{ color: {colors['danger']}; }}
-            QPushButton#historyDeleteButton:hover {{
-                color: #ffffff;
-                background-color: {colors['danger']};
-            }}
             QPushButton#secondaryBackButton {{
                 background-color: {colors['accent']};
                 color: #ffffff;
@@ -6999,6 +7111,16 @@ class SettingsWindow(QWidget):
             shell.setStyleSheet(self._secondary_view_stylesheet())
         except RuntimeError:
             self.secondary_view_shell = None
+            return
+        # The history cards are painted by their delegate, not styled.
+        for attribute in ("history_scroll_area", "copy_history_scroll_area"):
+            view = getattr(self, attribute, None)
+            if view is None:
+                continue
+            try:
+                view.itemDelegate().set_colors(self._secondary_palette())
+            except RuntimeError:
+                setattr(self, attribute, None)
 
     def show_hotkeys_screen(self):
         self.setup_new_layout()
@@ -7234,7 +7356,8 @@ class SettingsWindow(QWidget):
             self.history_count_label,
         )
 
-        self.history_scroll_area, self.history_cards_layout = self._create_history_scroll()
+        shell_layout.addLayout(self._create_history_filters(copy_mode=False))
+        self.history_scroll_area = self._create_history_list(copy_mode=False)
         shell_layout.addWidget(self.history_scroll_area, 1)
         self.load_history_embedded()
 
@@ -7256,227 +7379,140 @@ class SettingsWindow(QWidget):
         shell_layout.addLayout(footer)
         self._refresh_secondary_view_theme()
 
-    def _create_history_scroll(self):
-        scroll = QScrollArea()
-        scroll.setObjectName("historyScroll")
-        scroll.setWidgetResizable(True)
-        scroll.setFrameShape(QFrame.NoFrame)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        scroll.setMinimumHeight(190)
-
-        content = QWidget()
-        content.setObjectName("historyScrollContent")
-        cards_layout = QVBoxLayout(content)
-        cards_layout.setContentsMargins(0, 0, 4, 0)
-        cards_layout.setSpacing(8)
-        scroll.setWidget(content)
-        return scroll, cards_layout
-
-    def _clear_history_cards(self, cards_layout):
-        while cards_layout.count():
-            item = cards_layout.takeAt(0)
-            widget = item.widget()
-            if widget is not None:
-                widget.deleteLater()
-            elif item.layout() is not None:
-                self.clear_nested_layout(item.layout())
-
-    @staticmethod
-    def _format_history_timestamp(value):
-        try:
-            from datetime import datetime
-            return datetime.fromisoformat(str(value or "")).strftime("%d.%m.%Y  ·  %H:%M")
-        except Exception:
-            return str(value or "")
-
-    @staticmethod
-    def _history_label(text, object_name):
-        label = QLabel(str(text or ""))
-        label.setObjectName(object_name)
-        label.setTextFormat(Qt.PlainText)
-        label.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        label.setWordWrap(True)
-        label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-        label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Minimum)
-        return label
-
-    def _add_history_field(
-        self,
-        card_layout,
-        caption,
-        text,
-        object_name,
-        record_index,
-        copy_mode,
-        field_name,
-        translated=False,
-    ):
+    def _create_history_list(self, copy_mode=False):
+        """Virtualized list of one history; records are fetched as it scrolls."""
         lang = self.parent.current_interface_language
-        if caption:
-            caption_label = QLabel(caption)
-            caption_label.setObjectName("historySectionCaption")
-            card_layout.addWidget(caption_label)
-
-        text_block = QFrame()
-        text_block.setObjectName("historyTextBlock")
-        text_block.setProperty("translated", bool(translated))
-        text_layout = QVBoxLayout(text_block)
-        text_layout.setContentsMargins(10, 8, 10, 8)
-        text_layout.setSpacing(0)
-        text_layout.addWidget(self._history_label(text, object_name))
-        card_layout.addWidget(text_block)
-
-        action_row = QHBoxLayout()
-        action_row.setContentsMargins(0, 0, 0, 2)
-        action_row.setSpacing(6)
-        action_row.addStretch(1)
-        copy_button = QPushButton(history_record_text(lang, "copy"))
-        copy_button.setObjectName("historyCopyButton")
-        copy_button.setProperty("historyField", field_name)
-        copy_button.setCursor(Qt.PointingHandCursor)
-        copy_button.setMinimumHeight(28)
-        copy_button.clicked.connect(
-            lambda _checked=False, value=str(text or ""): QApplication.clipboard().setText(value)
-        )
-        delete_button = QPushButton(history_record_text(lang, "delete"))
-        delete_button.setObjectName("historyDeleteButton")
-        delete_button.setProperty("recordIndex", record_index)
-        delete_button.setProperty("historyField", field_name)
-        delete_button.setCursor(Qt.PointingHandCursor)
-        delete_button.setMinimumHeight(28)
-        delete_button.clicked.connect(
-            lambda _checked=False, index=record_index, mode=copy_mode: self._delete_history_record(mode, index)
+        view = HistoryListView()
+        delegate = HistoryRecordDelegate(
+            view,
+            copy_mode,
+            {key: history_record_text(lang, key) for key in ("original", "translated", "copy", "delete")},
+            self._secondary_palette(),
         )
-        action_row.addWidget(copy_button)
-        action_row.addWidget(delete_button)
-        card_layout.addLayout(action_row)
-
-    def _add_history_record_card(self, cards_layout, record, record_index, copy_mode=False):
-        if not isinstance(record, dict):
-            record = {"text": str(record or "")}
+        view.setItemDelegate(delegate)
+        view.setModel(HistoryListModel(self._history_data_dir(), self._history_name(copy_mode), parent=view))
+        view.copy_requested.connect(QApplication.clipboard().setText)
+        view.delete_requested.connect(lambda index, mode=copy_mode: self._delete_history_record(mode, index))
+        return view
+
+    def _create_history_filters(self, copy_mode=False):
+        """Search field, language and period filters above a history list."""
         lang = self.parent.current_interface_language
+        row = QHBoxLayout()
+        row.setContentsMargins(0, 0, 0, 0)
+        row.setSpacing(6)
+
+        search = QLineEdit()
+        search.setObjectName("historySearch")
+        search.setPlaceholderText(settings_text(lang, "history_search_placeholder"))
+        search.setClearButtonEnabled(True)
+        search.setFixedHeight(32)
+        row.addWidget(search, 1)
+
+        language = None
+        if not copy_mode:
+            language = DropDownCombo()
+            language.setObjectName("historyFilter")
+            language.setFixedHeight(32)
+            language.addItem(settings_text(lang, "history_all_languages"), "")
+            try:
+                codes = history_index.history_languages(
+                    self._history_data_dir(), history_store.TRANSLATION_HISTORY
+                )
+            except Exception:
+                codes = []
+            for code in codes:
+                language.addItem(code.upper(), code)
+            row.addWidget(language, 0)
+
+        period = DropDownCombo()
+        period.setObjectName("historyFilter")
+        period.setFixedHeight(32)
+        for key, days in (
+            ("history_period_all", None),
+            ("history_period_today", 0),
+            ("history_period_week", 6),
+            ("history_period_month", 29),
+        ):
+            period.addItem(settings_text(lang, key), days)
+        row.addWidget(period, 0)
+
+        # Typing waits for a pause before querying; the combos query at once.
+        timer = QtCore.QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(250)
+        timer.timeout.connect(lambda: self._load_history_page(copy_mode))
+        search.textChanged.connect(lambda _text: timer.start())
+        if language is not None:
+            language.currentIndexChanged.connect(lambda _index: self._load_history_page(copy_mode))
+        period.currentIndexChanged.connect(lambda _index: self._load_history_page(copy_mode))
+
+        popup_background = self._secondary_palette()["field"]
+        for combo in (language, period):
+            if combo is not None:
+                combo.set_popup_background(popup_background)
 
-        card = QFrame()
-        card.setObjectName("historyRecordCard")
-        card.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Maximum)
-        card_layout = QVBoxLayout(card)
-        card_layout.setContentsMargins(11, 9, 11, 9)
-        card_layout.setSpacing(5)
-
-        meta_row = QHBoxLayout()
-        meta_row.setContentsMargins(0, 0, 0, 0)
-        meta_row.setSpacing(7)
-        language = str(record.get("language", "") or "").upper()
-        if language and not copy_mode:
-            language_badge = QLabel(language)
-            language_badge.setObjectName("historyLanguageBadge")
-            meta_row.addWidget(language_badge, 0, Qt.AlignLeft | Qt.AlignVCenter)
-        meta_row.addStretch(1)
-        date_label = QLabel(self._format_history_timestamp(record.get("timestamp", "")))
-        date_label.setObjectName("historyMeta")
-        date_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        meta_row.addWidget(date_label, 0, Qt.AlignRight | Qt.AlignVCenter)
-        card_layout.addLayout(meta_row)
-
+        filters = {"search": search, "language": language, "period": period, "timer": timer}
         if copy_mode:
-            self._add_history_field(
-                card_layout,
-                "",
-                record.get("text", ""),
-                "historyRecordText",
-                record_index,
-                True,
-                "text",
-            )
-        elif "original" in record or "translated" in record:
-            self._add_history_field(
-                card_layout,
-                history_record_text(lang, "original"),
-                record.get("original", ""),
-                "historyRecordOriginal",
-                record_index,
-                False,
-                "original",
-            )
-            self._add_history_field(
-                card_layout,
-                history_record_text(lang, "translated"),
-                record.get("translated", ""),
-                "historyRecordTranslated",
-                record_index,
-                False,
-                "translated",
-                translated=True,
-            )
+            self.copy_history_filters = filters
         else:
-            self._add_history_field(
-                card_layout,
-                "",
-                record.get("text", ""),
-                "historyRecordText",
-                record_index,
-                False,
-                "text",
-            )
-        cards_layout.addWidget(card)
-        return card
+            self.history_filters = filters
+        return row
 
-    def _populate_history_cards(self, records, copy_mode=False):
-        records = records if isinstance(records, list) else []
-        cards_layout = self.copy_history_cards_layout if copy_mode else self.history_cards_layout
+    def _history_query_filters(self, copy_mode=False):
+        filters = getattr(self, "copy_history_filters" if copy_mode else "history_filters", None) or {}
+        try:
+            text = filters["search"].text().strip() if filters.get("search") is not None else ""
+            language = filters["language"].currentData() if filters.get("language") is not None else ""
+            days = filters["period"].currentData() if filters.get("period") is not None else None
+        except RuntimeError:
+            # The view was closed while a search was pending.
+            text, language, days = "", "", None
+        date_from = None
+        if days is not None:
+            from datetime import date, timedelta
+            date_from = date.today() - timedelta(days=int(days))
+        return {"text": text, "language": language or None, "date_from": date_from}
+
+    def _load_history_page(self, copy_mode=False):
+        """Show a history from its newest record with the current filters."""
+        lang = self.parent.current_interface_language
+        view = self.copy_history_scroll_area if copy_mode else self.history_scroll_area
         count_label = self.copy_history_count_label if copy_mode else self.history_count_label
-        self._clear_history_cards(cards_layout)
-        count_label.setText(str(len(records)))
-        cards = []
-        if not records:
-            empty_label = QLabel(settings_text(self.parent.current_interface_language, "history_empty"))
-            empty_label.setObjectName("historyEmptyState")
-            empty_label.setAlignment(Qt.AlignCenter)
-            empty_label.setWordWrap(True)
-            cards_layout.addWidget(empty_label)
-        else:
-            for record_index, record in reversed(list(enumerate(records))):
-                cards.append(
-                    self._add_history_record_card(
-                        cards_layout,
-                        record,
-                        record_index,
-                        copy_mode,
-                    )
-                )
-        cards_layout.addStretch(1)
-        if copy_mode:
-            self.copy_history_record_cards = cards
-        else:
-            self.history_record_cards = cards
-
-    @staticmethod
-    def _write_history_records(history_file, records):
-        target = Path(history_file)
-        temporary = target.with_name(target.name + ".tmp")
+        if view is None:
+            return
+        filters = self._history_query_filters(copy_mode)
         try:
-            temporary.write_text(
-                json.dumps(records, ensure_ascii=False, indent=4),
-                encoding="utf-8",
+            model = view.model()
+            model.reload(**filters)
+            count_label.setText(str(model.total))
+            view.set_empty_text(
+                settings_text(lang, "history_no_matches" if any(filters.values()) else "history_empty")
             )
-            os.replace(str(temporary), str(target))
-        finally:
-            try:
-                temporary.unlink(missing_ok=True)
-            except OSError:
-                pass
+        except RuntimeError:
+            # The view was closed while a search was pending.
+            return
+        except Exception:
+            model.clear()
+            count_label.setText("!")
+            view.set_empty_text(settings_text(lang, "history_error"))
+
+    @staticmethod
+    def _history_name(copy_mode):
+        return history_store.COPY_HISTORY if copy_mode else history_store.TRANSLATION_HISTORY
+
+    @staticmethod
+    def _history_data_dir():
+        return os.path.dirname(get_data_file("config.json"))
 
     def _delete_history_record(self, copy_mode, record_index):
-        history_file = get_data_file("copy_history.json" if copy_mode else "translation_history.json")
-        ensure_json_file(history_file, [])
+        data_dir = self._history_data_dir()
+        name = self._history_name(copy_mode)
         try:
-            with open(history_file, "r", encoding="utf-8") as stream:
-                records = json.load(stream)
-            records = records if isinstance(records, list) else []
+            records = history_store.read_history(data_dir, name)
             if 0 <= int(record_index) < len(records):
                 records.pop(int(record_index))
-                self._write_history_records(history_file, records)
+                history_store.write_history(data_dir, name, records)
             if copy_mode:
                 self.load_copy_history_embedded()
             else:
@@ -7493,28 +7529,11 @@ class SettingsWindow(QWidget):
             )
 
     def load_history_embedded(self):
-        history_file = get_data_file("translation_history.json")
-        ensure_json_file(history_file, [])
-        lang = self.parent.current_interface_language
-        try:
-            with open(history_file, "r", encoding="utf-8") as f:
-                history = json.load(f)
-            history = history if isinstance(history, list) else []
-            self._populate_history_cards(history)
-        except Exception:
-            self.history_count_label.setText("!")
-            self._clear_history_cards(self.history_cards_layout)
-            error_label = QLabel(settings_text(lang, "history_error"))
-            error_label.setObjectName("historyEmptyState")
-            error_label.setAlignment(Qt.AlignCenter)
-            self.history_cards_layout.addWidget(error_label)
-            self.history_cards_layout.addStretch(1)
+        self._load_history_page(copy_mode=False)
 
     def clear_history(self):
-        history_file = get_data_file("translation_history.json")
-        ensure_json_file(history_file, [])
         try:
-            self._write_history_records(history_file, [])
+            history_store.write_history(self._history_data_dir(), history_store.TRANSLATION_HISTORY, [])
             self.load_history_embedded()
         except Exception:
             lang = self.parent.current_interface_language
@@ -7542,7 +7561,8 @@ class SettingsWindow(QWidget):
             self.copy_history_count_label,
         )
 
-        self.copy_history_scroll_area, self.copy_history_cards_layout = self._create_history_scroll()
+        shell_layout.addLayout(self._create_history_filters(copy_mode=True))
+        self.copy_history_scroll_area = self._create_history_list(copy_mode=True)
         shell_layout.addWidget(self.copy_history_scroll_area, 1)
         self.load_copy_history_embedded()
 
@@ -7565,28 +7585,11 @@ class SettingsWindow(QWidget):
         self._refresh_secondary_view_theme()
 
     def load_copy_history_embedded(self):
-        history_file = get_data_file("copy_history.json")
-        ensure_json_file(history_file, [])
-        lang = self.parent.current_interface_language
-        try:
-            with open(history_file, "r", encoding="utf-8") as f:
-                history = json.load(f)
-            history = history if isinstance(history, list) else []
-            self._populate_history_cards(history, copy_mode=True)
-        except Exception:
-            self.copy_history_count_label.setText("!")
-            self._clear_history_cards(self.copy_history_cards_layout)
-            error_label = QLabel(settings_text(lang, "history_error"))
-            error_label.setObjectName("historyEmptyState")
-            error_label.setAlignment(Qt.AlignCenter)
-            self.copy_history_cards_layout.addWidget(error_label)
-            self.copy_history_cards_layout.addStretch(1)
+        self._load_history_page(copy_mode=True)
 
     def clear_copy_history(self):
-        history_file = get_data_file("copy_history.json")
-        ensure_json_file(history_file, [])
         try:
-            self._write_history_records(history_file, [])
+            history_store.write_history(self._history_data_dir(), history_store.COPY_HISTORY, [])
             self.load_copy_history_embedded()
         except Exception:
             lang = self.parent.current_interface_language
@@ -7600,6 +7603,148 @@ class SettingsWindow(QWidget):
         self.init_ui()
         self.apply_theme()
 
+    def show_diagnostics_view(self):
+        self.clear_main_layout()
+        self.hotkeys_mode = False
+        self._secondary_view_kind = "diagnostics"
+        self.main_layout.setContentsMargins(10, 7, 10, 7)
+        self.main_layout.setSpacing(0)
+        lang = self.parent.current_interface_language
+
+        self.diagnostics_count_label = QLabel("0")
+        shell_layout = self._create_secondary_shell(
+            settings_text(lang, "diagnostics_title"),
+            self.diagnostics_count_label,
+        )
+
+        table = QTableWidget(0, 7)
+        table.setObjectName("diagnosticsTable")
+        table.setHorizontalHeaderLabels([
+            settings_text(lang, "diagnostics_engine"),
+            settings_text(lang, "diagnostics_requests"),
+            settings_text(lang, "diagnostics_errors"),
+            settings_text(lang, "diagnostics_cache_hits"),
+            "p50",
+            "p95",
+            "p99",
+        ])
+        table.verticalHeader().setVisible(False)
+        table.setShowGrid(False)
+        table.setAlternatingRowColors(True)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionMode(QAbstractItemView.NoSelection)
+        table.setFocusPolicy(Qt.NoFocus)
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        self.diagnostics_table = table
+        shell_layout.addWidget(table, 1)
+
+        hint = QLabel(settings_text(lang, "diagnostics_hint"))
+        hint.setObjectName("secondaryHint")
+        hint.setWordWrap(True)
+        self.diagnostics_hint_label = hint
+        shell_layout.addWidget(hint)
+        self.load_diagnostics()
+
+        reset_button = QPushButton(settings_text(lang, "diagnostics_reset"))
+        self._configure_secondary_button(reset_button, "secondaryClearButton")
+        reset_button.clicked.connect(self.reset_diagnostics)
+        refresh_button = QPushButton(settings_text(lang, "diagnostics_refresh"))
+        self._configure_secondary_button(refresh_button, "secondaryBackButton")
+        refresh_button.clicked.connect(self.load_diagnostics)
+        back_button = QPushButton(settings_text(lang, "back"))
+        self._configure_secondary_button(back_button, "secondaryBackButton")
+        back_button.clicked.connect(self.back_from_diagnostics)
+        self.diagnostics_reset_button = reset_button
+        self.diagnostics_refresh_button = refresh_button
+        self.diagnostics_back_button = back_button
+
+        footer = QHBoxLayout()
+        footer.setContentsMargins(0, 0, 0, 0)
+        footer.setSpacing(8)
+        footer.addWidget(reset_button, 0)
+        footer.addStretch(1)
+        footer.addWidget(refresh_button, 0)
+        footer.addWidget(back_button, 0)
+        shell_layout.addLayout(footer)
+        self._refresh_secondary_view_theme()
+
+    @staticmethod
+    def _format_latency(value):
+        if value is None:
+            return "—"
+        if value < 1000:
+            return f"{value:.0f} ms"
+        return f"{value / 1000:.1f} s"
+
+    @classmethod
+    def _diagnostics_row_values(cls, label, summary):
+        return (
+            label,
+            str(summary["requests"]),
+            f"{summary['error_rate']:.0%}",
+            f"{summary['cache_hit_rate']:.0%}",
+            cls._format_latency(summary["p50_ms"]),
+            cls._format_latency(summary["p95_ms"]),
+            cls._format_latency(summary["p99_ms"]),
+        )
+
+    def load_diagnostics(self):
+        """Fill the diagnostics table: one row per engine, then one per language pair of it."""
+        import translater
+
+        table = getattr(self, "diagnostics_table", None)
+        if table is None:
+            return
+        lang = self.parent.current_interface_language
+        stats = translater.translation_telemetry_stats()
+        rows = []
+        for engine, summary in stats.items():
+            rows.append((True, self._diagnostics_row_values(engine.upper(), summary), summary))
+            for pair, pair_summary in summary["pairs"].items():
+                label = "    " + pair.replace("-", " → ")
+                rows.append((False, self._diagnostics_row_values(label, pair_summary), pair_summary))
+
+        table.clearSpans()
+        if not rows:
+            table.setRowCount(1)
+            empty = QTableWidgetItem(settings_text(lang, "diagnostics_empty"))
+            empty.setTextAlignment(Qt.AlignCenter)
+            table.setItem(0, 0, empty)
+            table.setSpan(0, 0, 1, table.columnCount())
+        else:
+            table.setRowCount(len(rows))
+            from cache_manager import format_size
+
+            for row, (is_engine, values, summary) in enumerate(rows):
+                for column, value in enumerate(values):
+                    item = QTableWidgetItem(value)
+                    if column:
+                        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                    else:
+                        item.setToolTip(settings_text(lang, "diagnostics_data").format(
+                            sent=format_size(summary["bytes_in"]),
+                            received=format_size(summary["bytes_out"]),
+                        ))
+                    if is_engine:
+                        font = item.font()
+                        font.setBold(True)
+                        item.setFont(font)
+                    table.setItem(row, column, item)
+        self.diagnostics_count_label.setText(str(sum(summary["requests"] for summary in stats.values())))
+
+    def reset_diagnostics(self):
+        import translater
+
+        translater.reset_translation_telemetry()
+        self.load_diagnostics()
+
+    def back_from_diagnostics(self):
+        self.diagnostics_table = None
+        self.init_ui()
+        self.apply_theme()
+
     def save_and_back(self):
         autostart_enabled = self.parent.set_autostart(self.autostart_checkbox.isChecked())
         self.autostart_checkbox.setChecked(autostart_enabled)
@@ -11618,6 +11763,9 @@ finally {
             "copy_history": False,
             "translator_engine": "Google",
             "allow_online_provider_fallback": False,
+            "hedged_requests": False,
+            "translation_memory": True,
+            "argos_workers": 0,
             "keep_visible_on_ocr": False,
             "last_ocr_language": "ru",
             "ocr_translate_source_language": "en",
@@ -11674,11 +11822,9 @@ finally {
         msg_clear.setWindowIcon(QIcon(resource_path("icons/icon.ico")))
         msg_clear.exec_()
         if msg_clear.clickedButton() == yes_btn:
-            for fname in ("translation_history.json", "copy_history.json"):
+            for name in (history_store.TRANSLATION_HISTORY, history_store.COPY_HISTORY):
                 try:
-                    path = get_data_file(fname)
-                    with open(path, 'w', encoding='utf-8') as f:
-                        json.dump([], f)
+                    history_store.write_history(self._history_data_dir(), name, [])
                 except Exception:
                     pass
 
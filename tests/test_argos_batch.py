@@ -0,0 +1,162 @@
+import sys
+import types
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import argos_batch  # noqa: E402
+import translater  # noqa: E402
+
+
+class PackageTranslation:
+    def __init__(self, pkg, translator=None):
+        self.pkg = pkg
+        self.translator = translator
+
+
+class CompositeTranslation:
+    def __init__(self, t1, t2):
+        self.t1 = t1
+        self.t2 = t2
+
+
+class CachedTranslation:
+    def __init__(self, underlying):
+        self.underlying = underlying
+
+
+class IdentityTranslation:
+    pass
+
+
+FAKE_ARGOS = types.SimpleNamespace(
+    PackageTranslation=PackageTranslation,
+    CompositeTranslation=CompositeTranslation,
+    CachedTranslation=CachedTranslation,
+    IdentityTranslation=IdentityTranslation,
+)
+
+
+class _Tokenizer:
+    # Words become "▁word" pieces, joined back with spaces, like SentencePiece.
+    def encode(self, text):
+        return ["▁" + word for word in text.split()]
+
+    def decode(self, tokens):
+        return "".join(token.replace("▁", " ") for token in tokens).lstrip(" ")
+
+
+class _Translator:
+    """Upper-cases (or tags) every word and records the size of each call."""
+
+    def __init__(self, tag=None):
+        self.tag = tag
+        self.calls = []
+
+    def translate_batch(self, source, target_prefix=None, **options):
+        self.calls.append((len(source), options))
+        results = []
+        for tokens in source:
+            if self.tag:
+                hypothesis = [token + self.tag for token in tokens]
+            else:
+                hypothesis = [token.upper() for token in tokens]
+            if target_prefix:
+                hypothesis = target_prefix[0] + hypothesis
+            results.append(types.SimpleNamespace(hypotheses=[hypothesis]))
+        return results
+
+
+def _step(tag=None, target_prefix=""):
+    pkg = types.SimpleNamespace(tokenizer=_Tokenizer(), package_path=Path("model"), type="translate",
+                                target_prefix=target_prefix)
+    return PackageTranslation(pkg, _Translator(tag))
+
+
+def _argos_translate(step, text):
+    """PackageTranslation.translate as Argos runs it: one model call per paragraph."""
+    pkg = step.pkg
+    translated = []
+    for paragraph in text.split("\n"):
+        sentences = [pkg.tokenizer.encode(sentence) for sentence in translater.split_sentences(paragraph)]
+        prefix = pkg.target_prefix
+        results = step.translator.translate_batch(
+            sentences, target_prefix=[[prefix]] * len(sentences) if prefix else None, replace_unknowns=True
+        ) if sentences else []
+        value = pkg.tokenizer.decode([token for result in results for token in result.hypotheses[0]])
+        if prefix and value.startswith(prefix):
+            value = value[len(prefix):].lstrip(" ")
+        translated.append(value)
+    return "\n".join(translated)
+
+
+def test_plan_batches_respects_the_token_budget_longest_first():
+    lengths = [3, 50, 10, 10, 40, 1]
+    batches = argos_batch.plan_batches(lengths, max_tokens=100, max_sentences=3)
+
+    assert [index for batch in batches for index in batch] == [1, 4, 2, 3, 0, 5]
+    for batch in batches:
+        assert len(batch) <= 3
+        assert len(batch) * max(lengths[index] for index in batch) <= 100 or len(batch) == 1
+
+
+def test_sentences_of_all_texts_share_translator_calls_and_map_back():
+    step = _step()
+    texts = ["One two. Three four.", "", "Five.\nSix seven eight.", "Nine"]
+
+    translated = argos_batch.translate_texts(step, texts, FAKE_ARGOS, translater.split_sentences)
+
+    assert translated == ["ONE TWO. THREE FOUR.", "", "FIVE.\nSIX SEVEN EIGHT.", "NINE"]
+    sizes = [size for size, _options in step.translator.calls]
+    assert sizes == [5]  # five sentences, one call
+    options = step.translator.calls[0][1]
+    assert (options["beam_size"], options["num_hypotheses"], options["replace_unknowns"]) == (4, 1, True)
+
+
+def test_pivot_route_runs_every_leg_batched_and_strips_target_prefix():
+    first, second = _step("@en"), _step("@ru", target_prefix="__ru__")
+    route = CachedTranslation(CompositeTranslation(first, CachedTranslation(second)))
+
+    with mock.patch.object(argos_batch, "MAX_BATCH_TOKENS", 2):
+        translated = argos_batch.translate_texts(route, ["Ein Hund.", "Katze"], FAKE_ARGOS, translater.split_sentences)
+
+    assert translated == ["Ein@en@ru Hund.@en@ru", "Katze@en@ru"]
+    assert [size for size, _options in first.translator.calls] == [1, 1]
+    assert [size for size, _options in second.translator.calls] == [1, 1]
+
+
+def test_unknown_routes_are_not_batched():
+    assert argos_batch.translate_texts(mock.Mock(), ["Hi"], FAKE_ARGOS, translater.split_sentences) is None
+    assert argos_batch.translate_texts(_step(), ["Hi"], None, translater.split_sentences) is None
+    assert argos_batch.translate_texts(IdentityTranslation(), ["Hi"], FAKE_ARGOS, translater.split_sentences) == ["Hi"]
+
+
+def test_batched_translation_matches_translate_on_the_same_package():
+    texts = ["One two. Three four!", "", "Five.\n\nSix seven eight?", "Nine", "  Ten.  Eleven  "]
+    for step in (_step(), _step("@ru", target_prefix="__ru__")):
+        translated = argos_batch.translate_texts(step, texts, FAKE_ARGOS, translater.split_sentences)
+
+        assert translated == [_argos_translate(step, text) for text in texts]
+
+
+def test_local_batch_uses_one_batched_call_and_falls_back_per_text():
+    step = _step()
+    step.translate = mock.Mock(return_value="D")
+    with mock.patch.object(translater, "_ensure_argos_available", return_value=True), \
+            mock.patch.object(translater, "arg_tr", FAKE_ARGOS), \
+            mock.patch.object(translater, "_get_translation_object", return_value=step):
+        assert translater._try_argos_translate_local_batch(["a b", "c"], "en", "ru") == ["A B", "C"]
+        # A single text keeps Argos' own translate().
+        assert translater._try_argos_translate_local("d", "en", "ru") == "D"
+    assert [size for size, _options in step.translator.calls] == [2]
+    step.translate.assert_called_once_with("d")
+
+    broken = _step()
+    broken.translator.translate_batch = mock.Mock(side_effect=RuntimeError("out of memory"))
+    broken.translate = lambda text: text + "!"
+    with mock.patch.object(translater, "_ensure_argos_available", return_value=True), \
+            mock.patch.object(translater, "arg_tr", FAKE_ARGOS), \
+            mock.patch.object(translater, "_get_translation_object", return_value=broken):
+        assert translater._try_argos_translate_local_batch(["a", "b"], "en", "ru") == ["a!", "b!"]
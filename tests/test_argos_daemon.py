@@ -0,0 +1,224 @@
+import os
+import stat
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import argos_daemon  # noqa: E402
+import translater  # noqa: E402
+
+# The real argos_worker serve loop, with run_request answering from the request itself.
+_STUB_WORKER = f"""#!{sys.executable}
+import os
+import sys
+import time
+
+sys.path.insert(0, {str(ROOT)!r})
+import argos_worker
+
+
+def run_request(request, event_callback=None, cancel_event=None):
+    action = request.get("action")
+    marker = request.get("crash_once")
+    if marker and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(3)
+    if request.get("crash"):
+        print("model file is corrupt", file=sys.stderr, flush=True)
+        os._exit(3)
+    if request.get("noise"):
+        # JSON that is not a message, written past the stdout redirection.
+        sys.__stdout__.write('42\\n["not", "a", "message"]\\nnull\\n"text"\\n')
+        sys.__stdout__.flush()
+    if action == "translate":
+        event_callback({{"type": "status", "message": "Translating " + request["text"]}})
+        time.sleep(float(request.get("delay", 0)))
+        print("diagnostic output must not reach the protocol")
+        return {{"result": request["text"].upper(), "pid": os.getpid(), "statuses": [], "error": ""}}
+    if action == "install_packages":
+        event_callback({{"type": "progress", "message": "Downloading", "downloaded_bytes": 5, "total_bytes": 10}})
+        cancel_event.wait(10)
+        error = "ArgosInstallCancelledError: canceled" if cancel_event.is_set() else ""
+        return {{"installed": [], "statuses": [], "error": error}}
+    return {{"statuses": [], "error": "ValueError: Unknown Argos worker action: " + str(action)}}
+
+
+argos_worker.run_request = run_request
+raise SystemExit(argos_worker.main())
+"""
+
+
+@pytest.fixture
+def worker_script(tmp_path):
+    path = tmp_path / "stub_argos_worker.py"
+    path.write_text(_STUB_WORKER, encoding="utf-8")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return path
+
+
+@pytest.fixture
+def daemon(worker_script):
+    found = argos_daemon.ArgosWorkerDaemon([sys.executable, str(worker_script)])
+    yield found
+    found.shutdown()
+
+
+def test_one_resident_process_answers_every_request(daemon):
+    events = []
+    first = daemon.request({"action": "translate", "text": "hello"}, event_callback=events.append)
+    second = daemon.request({"action": "translate", "text": "world"})
+
+    assert (first["result"], second["result"]) == ("HELLO", "WORLD")
+    assert first["pid"] == second["pid"]
+    assert events == [{"type": "status", "id": 1, "message": "Translating hello"}]
+    stats = daemon.stats()
+    assert (stats["spawns"], stats["requests"], stats["running"]) == (1, 2, True)
+
+
+def test_protocol_lines_that_are_not_messages_are_skipped(daemon):
+    payload = daemon.request({"action": "translate", "text": "hello", "noise": True})
+    assert payload["result"] == "HELLO"
+
+    assert daemon.request({"action": "translate", "text": "again"})["pid"] == payload["pid"]
+    assert daemon.stats()["crashes"] == 0
+
+
+def test_requests_in_flight_are_multiplexed(daemon):
+    daemon.request({"action": "translate", "text": "warm"})
+    results = {}
+
+    def slow():
+        results["slow"] = daemon.request({"action": "translate", "text": "slow", "delay": 1.0})
+        results["slow_done"] = time.monotonic()
+
+    thread = threading.Thread(target=slow)
+    thread.start()
+    time.sleep(0.1)
+    fast = daemon.request({"action": "translate", "text": "fast"})
+    fast_done = time.monotonic()
+    thread.join(5)
+
+    assert fast["result"] == "FAST"
+    assert results["slow"]["result"] == "SLOW"
+    assert fast_done < results["slow_done"]
+
+
+def test_cancel_message_reaches_the_running_request(daemon):
+    cancelled = threading.Event()
+    progress = []
+
+    def on_event(event):
+        progress.append(event)
+        cancelled.set()
+
+    started = time.monotonic()
+    payload = daemon.request(
+        {"action": "install_packages", "pairs": [["en", "ru"]]},
+        event_callback=on_event,
+        cancel_callback=cancelled.is_set,
+    )
+
+    assert "ArgosInstallCancelledError" in payload["error"]
+    assert progress[0]["downloaded_bytes"] == 5
+    assert time.monotonic() - started < 5
+    assert daemon.stats()["spawns"] == 1  # the worker survives a cancel
+
+
+def test_package_changes_in_the_worker_do_not_overlap_translations():
+    with mock.patch.dict(os.environ):
+        import argos_worker
+
+    log = []
+
+    def change(pairs, **_kwargs):
+        log.append("change started")
+        time.sleep(0.3)
+        log.append("change done")
+        return [tuple(pair) for pair in pairs]
+
+    def translate(text, *_args, **_kwargs):
+        log.append("translate " + text)
+        time.sleep(0.3)
+        log.append("translated " + text)
+        return text.upper()
+
+    request = {"action": "translate", "source_code": "en", "target_code": "ru"}
+    with mock.patch.object(translater, "_ensure_argos_available", return_value=True), \
+            mock.patch.object(translater, "_get_translation_object", return_value=object()), \
+            mock.patch.object(translater, "_install_argos_packages_local", side_effect=change), \
+            mock.patch.object(translater, "_uninstall_argos_packages_local", side_effect=change), \
+            mock.patch.object(translater, "_try_argos_translate_local", side_effect=translate):
+        threads = [
+            threading.Thread(target=argos_worker.run_request, args=({**request, "text": "first"},)),
+            threading.Thread(target=argos_worker.run_request, args=({"action": "uninstall_packages", "pairs": [["en", "de"]]},)),
+            threading.Thread(target=argos_worker.run_request, args=({**request, "text": "second"},)),
+        ]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.1)
+        for thread in threads:
+            thread.join(5)
+
+    # The uninstall waits for the first translation and the second waits for it.
+    assert log == [
+        "translate first", "translated first", "change started", "change done", "translate second", "translated second"
+    ]
+
+
+def test_crashed_worker_is_respawned_and_the_translation_retried(daemon, tmp_path):
+    first = daemon.request({"action": "translate", "text": "before"})
+    payload = daemon.request({"action": "translate", "text": "again", "crash_once": str(tmp_path / "crashed")})
+
+    assert payload["result"] == "AGAIN"
+    assert payload["pid"] != first["pid"]
+    stats = daemon.stats()
+    assert (stats["spawns"], stats["crashes"], stats["retries"]) == (2, 1, 1)
+
+
+def test_crash_during_an_install_is_reported_not_retried(daemon):
+    with pytest.raises(argos_daemon.ArgosWorkerError, match="model file is corrupt"):
+        daemon.request({"action": "install_packages", "crash": True})
+    assert daemon.stats()["retries"] == 0
+
+
+def test_idle_worker_exits_and_the_next_request_starts_it_again(worker_script):
+    found = argos_daemon.ArgosWorkerDaemon([sys.executable, str(worker_script)], idle_timeout=0.2)
+    try:
+        first = found.request({"action": "translate", "text": "one"})
+        deadline = time.monotonic() + 5
+        while found.stats()["running"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert found.stats()["idle_shutdowns"] == 1
+
+        second = found.request({"action": "translate", "text": "two"})
+        assert second["pid"] != first["pid"]
+        assert found.stats()["spawns"] == 2
+    finally:
+        found.shutdown()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="runs the stub worker through its #! line")
+def test_translater_requests_go_through_the_resident_worker(worker_script):
+    statuses = []
+    try:
+        with mock.patch.object(translater, "_argos_worker_path", return_value=str(worker_script)):
+            first = translater._run_argos_worker_request(
+                {"action": "translate", "text": "hi"}, status_callback=statuses.append
+            )
+            second = translater._run_argos_worker_request({"action": "translate", "text": "there"})
+            with pytest.raises(RuntimeError, match="Argos offline worker failed"):
+                translater._run_argos_worker_request({"action": "install_packages", "crash": True})
+    finally:
+        argos_daemon.shutdown_all()
+
+    assert (first["result"], second["result"]) == ("HI", "THERE")
+    assert first["pid"] == second["pid"]
+    assert statuses == ["Translating hi"]
@@ -0,0 +1,209 @@
+import json
+import os
+import stat
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import argos_pool  # noqa: E402
+import translater  # noqa: E402
+
+# The real argos_worker serve loop; translations take a while and report who ran them.
+_STUB_WORKER = f"""#!{sys.executable}
+import os
+import sys
+import time
+
+sys.path.insert(0, {str(ROOT)!r})
+import argos_worker
+
+
+def run_request(request, event_callback=None, cancel_event=None):
+    time.sleep(0.3)
+    if request.get("action") == "translate_batch":
+        results = [text.upper() + "@" + str(os.getpid()) for text in request["texts"]]
+        return {{"results": results, "statuses": [], "error": ""}}
+    if request["text"] == "stale":
+        # A worker whose cached languages predate the pair's install.
+        return {{"result": None, "statuses": [], "error": ""}}
+    return {{
+        "result": request["text"].upper(),
+        "pid": os.getpid(),
+        "threads": os.environ.get("OMP_NUM_THREADS"),
+        "statuses": [],
+        "error": "",
+    }}
+
+
+argos_worker.run_request = run_request
+raise SystemExit(argos_worker.main())
+"""
+
+
+@pytest.fixture
+def command(tmp_path):
+    path = tmp_path / "stub_argos_worker.py"
+    path.write_text(_STUB_WORKER, encoding="utf-8")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return [sys.executable, str(path)]
+
+
+@pytest.fixture
+def pool(command):
+    found = argos_pool.ArgosPool(command, workers=3, threads=2)
+    yield found
+    found.shutdown()
+
+
+def test_pool_size_follows_cores_and_model_memory():
+    gigabyte = 1024 ** 3
+    assert argos_pool.pool_size(100 * 1024 ** 2, cpu_count=16, memory=64 * gigabyte) == (8, 2)
+    assert argos_pool.pool_size(100 * 1024 ** 2, cpu_count=4, memory=64 * gigabyte) == (2, 2)
+    # One worker of a 1 GB pivot route (1.8 GB loaded) fits in half of 4 GB.
+    assert argos_pool.pool_size(gigabyte, cpu_count=16, memory=4 * gigabyte) == (1, 16)
+    assert argos_pool.pool_size(300 * 1024 ** 2, cpu_count=16, memory=4 * gigabyte) == (2, 8)
+    assert argos_pool.pool_size(0, cpu_count=1, memory=None) == (1, 1)
+
+
+def test_shards_keep_order_and_balance_characters():
+    texts = ["a" * 10] * 10 + ["b" * 40, "c" * 40]
+    found = argos_pool.shards(texts, 3)
+
+    assert [text for shard in found for text in shard] == texts
+    assert len(found) == 3
+    assert max(sum(map(len, shard)) for shard in found) <= 80  # a third of 180, plus one text
+    assert argos_pool.shards(["x", "y"], 4) == [["x", "y"]]  # too few to split
+    assert argos_pool.shards([], 4) == []
+
+
+def test_requests_run_in_parallel_on_warm_workers(pool):
+    first = pool.request({"action": "translate", "text": "warm"})
+    assert first["threads"] == "2"
+
+    started = time.monotonic()
+    results = pool.map(lambda text: pool.request({"action": "translate", "text": text}), ["a", "b", "c"])
+    elapsed = time.monotonic() - started
+
+    assert [result["result"] for result in results] == ["A", "B", "C"]
+    assert len({result["pid"] for result in results}) == 3
+    assert elapsed < 0.85  # three 0.3 s requests side by side, not one after another
+
+    again = pool.request({"action": "translate", "text": "again"})
+    assert again["pid"] in {result["pid"] for result in results}
+    stats = pool.stats()
+    assert (stats["workers"], stats["spawns"], stats["running"]) == (3, 3, 3)
+
+
+def test_idle_request_goes_to_the_warm_worker(pool):
+    pids = {pool.request({"action": "translate", "text": text})["pid"] for text in ("one", "two", "three")}
+    assert len(pids) == 1
+    assert pool.stats()["spawns"] == 1
+
+
+def test_shared_pool_is_kept_until_a_larger_model_needs_resizing(command):
+    try:
+        with mock.patch.object(argos_pool, "available_memory", return_value=None), \
+                mock.patch.object(argos_pool.os, "cpu_count", return_value=8):
+            first = argos_pool.pool(command, 100)
+            assert argos_pool.pool(command, 50) is first
+            assert first.size == 4
+
+            with mock.patch.object(argos_pool, "available_memory", return_value=2 * 1024 ** 3):
+                resized = argos_pool.pool(command, 1024 ** 3)
+            assert resized is not first
+            assert resized.size == 1
+    finally:
+        argos_pool.shutdown()
+
+
+def _write_package(root, name, source, target, size):
+    package = root / name
+    (package / "model").mkdir(parents=True)
+    (package / "metadata.json").write_text(json.dumps({"from_code": source, "to_code": target}), encoding="utf-8")
+    (package / "model" / "model.bin").write_bytes(b"0" * size)
+
+
+def test_model_bytes_of_direct_and_pivot_routes(tmp_path):
+    _write_package(tmp_path, "de_en", "de", "en", 1000)
+    _write_package(tmp_path, "en_ru", "en", "ru", 3000)
+
+    def model_bytes(source, target):
+        return translater.argos_model_bytes(source, target, package_dirs=[str(tmp_path)])
+
+    assert model_bytes("en", "ru") > 3000
+    assert model_bytes("de", "ru") == model_bytes("de", "en") + model_bytes("en", "ru")
+    assert model_bytes("ru", "de") == 0
+
+
+def test_model_bytes_are_read_once_until_packages_change(tmp_path):
+    _write_package(tmp_path, "en_ru", "en", "ru", 3000)
+    with mock.patch.object(translater, "_argos_package_data_dirs", return_value=[str(tmp_path)]), \
+            mock.patch.object(argos_pool, "shutdown"):
+        translater._argos_packages_changed()
+        assert translater.argos_model_bytes("en", "de") == 0
+        with mock.patch.object(translater.os, "walk") as walk:
+            assert translater.argos_model_bytes("en", "ru") > 3000
+        walk.assert_not_called()
+
+        _write_package(tmp_path, "en_de", "en", "de", 2000)
+        assert translater.argos_model_bytes("en", "de") == 0
+        translater._argos_packages_changed()
+        assert translater.argos_model_bytes("en", "de") > 2000
+        translater._argos_packages_changed()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="runs the stub worker through its #! line")
+def test_batches_are_sharded_over_the_pool_and_document_chunks_dispatched(pool):
+    texts = [f"text {index}" for index in range(12)]
+    with mock.patch.object(translater, "_argos_pool", return_value=pool):
+        results = translater._argos_translate_batch(texts, "en", "ru")
+        with argos_pool.dispatch():
+            chunk = translater._try_argos_translate("chunk", "en", "ru", allow_install=False)
+
+    assert [result.split("@")[0] for result in results] == [text.upper() for text in texts]
+    assert len({result.split("@")[1] for result in results}) == 3
+    assert chunk == "CHUNK"
+
+
+def test_a_worker_without_the_pair_falls_back_to_the_single_worker(pool):
+    with mock.patch.object(translater, "_argos_pool", return_value=pool), \
+            mock.patch.object(translater, "_argos_worker_path", return_value=""), \
+            mock.patch.object(translater, "_try_argos_translate_local", return_value="local") as local:
+        with argos_pool.dispatch():
+            assert translater._try_argos_translate("stale", "en", "ru", allow_install=False) == "local"
+    local.assert_called_once()
+
+
+@pytest.mark.parametrize("action", ["install_packages", "uninstall_packages"])
+def test_package_changes_stop_the_pool(action):
+    payload = {"installed": [["en", "ru"]], "removed": [["en", "ru"]], "error": ""}
+    change = translater.install_argos_packages if action == "install_packages" else translater.uninstall_argos_packages
+    with mock.patch.object(translater, "_argos_worker_path", return_value="ArgosWorker.exe"), \
+            mock.patch.object(translater, "_run_argos_worker_request", return_value=payload) as run, \
+            mock.patch.object(argos_pool, "shutdown") as shutdown:
+        assert change([("en", "ru")]) == [("en", "ru")]
+    assert run.call_args[0][0]["action"] == action
+    shutdown.assert_called_once()
+
+
+def test_interactive_translation_does_not_use_the_pool():
+    with mock.patch.object(translater, "_argos_pool") as pool_for, \
+            mock.patch.object(translater, "_argos_worker_path", return_value=""), \
+            mock.patch.object(translater, "_try_argos_translate_local", return_value="local") as local:
+        assert translater._try_argos_translate("hi", "en", "ru") == "local"
+    pool_for.assert_not_called()
+    local.assert_called_once()
+
+
+def test_argos_workers_setting_turns_the_pool_off():
+    with mock.patch.object(translater, "get_cached_translator_config", return_value={"argos_workers": 1}), \
+            mock.patch.object(argos_pool, "pool") as shared:
+        assert translater._argos_pool("en", "ru") is None
+        assert translater.argos_pool_workers("en", "ru") == 1
+    shared.assert_not_called()
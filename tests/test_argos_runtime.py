@@ -206,6 +206,22 @@ class ArgosRuntimeTest(unittest.TestCase):
         self.assertEqual(payload["result"], "Hello")
         self.assertFalse(payload["error"])
 
+    def test_worker_translates_a_batch_with_one_loaded_model(self):
+        with mock.patch.dict(os.environ, {"CLICKNTRANSLATE_ARGOS_WORKER": "1"}, clear=False):
+            argos_worker = importlib.import_module("argos_worker")
+        translation = mock.Mock()
+        translation.translate.side_effect = lambda text: text.upper()
+        request = {"action": "translate_batch", "texts": ["one", "two"], "source_code": "en", "target_code": "ru"}
+        with mock.patch.object(argos_worker.translater, "_ensure_argos_available", return_value=True):
+            with mock.patch.object(
+                argos_worker.translater, "_get_translation_object", return_value=translation
+            ) as get_translation:
+                payload = argos_worker.run_request(request)
+
+        self.assertEqual(payload["results"], ["ONE", "TWO"])
+        self.assertEqual(get_translation.call_count, 1)
+        self.assertFalse(payload["error"])
+
     def test_worker_probe_reports_installed_pair(self):
         with mock.patch.dict(os.environ, {"CLICKNTRANSLATE_ARGOS_WORKER": "1"}, clear=False):
             argos_worker = importlib.import_module("argos_worker")
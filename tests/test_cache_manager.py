@@ -1,8 +1,11 @@
 import json
 import os
+import subprocess
 import sys
 import tempfile
+import time
 from pathlib import Path
+from unittest import mock
 
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -63,13 +66,92 @@ def test_stale_async_cache_write_cannot_recreate_cleared_cache():
     with tempfile.TemporaryDirectory(prefix="cnt_cache_race_") as root:
         data_dir = os.path.join(root, "data")
         cache = cache_manager._load_translation_cache(data_dir)
-        cache["entry"] = {"translated": "old"}
+        cache.put("entry", "old")
 
         cache_manager.clear_all_cache(data_dir)
-        cache_manager._save_translation_cache(data_dir, cache)
+        cache.put("entry", "old")
 
-        assert not Path(data_dir, "cache", "translation_cache.json").exists()
+        assert not Path(data_dir, "cache", "translation_cache.sqlite3").exists()
         assert cache_manager.get_cached_translation(data_dir, "x", "en", "ru") is None
+        cache_manager.invalidate_translation_cache()
+
+
+def test_json_cache_and_legacy_raw_text_keys_are_migrated_once():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_migrate_") as root:
+        data_dir = os.path.join(root, "data")
+        cache_dir = Path(data_dir, "cache")
+        cache_dir.mkdir(parents=True)
+        hashed = cache_manager._translation_cache_key("hello", "en", "ru", "google")
+        (cache_dir / "translation_cache.json").write_text(json.dumps({
+            hashed: {"translated": "привет", "created": 1, "accessed": 2},
+            "google:en:ru:a: colon": {"translated": "двоеточие", "created": 1, "accessed": 2},
+            "en:de:world": {"translated": "Welt", "created": 1, "accessed": 2},
+        }), encoding="utf-8")
+        cache_manager.invalidate_translation_cache()
+
+        try:
+            assert cache_manager.get_cached_translation(data_dir, "hello", "en", "ru", "google") == "привет"
+            assert cache_manager.get_cached_translation(data_dir, "a: colon", "en", "ru", "google") == "двоеточие"
+            assert cache_manager.get_cached_translation(data_dir, "world", "en", "de", "lingva") == "Welt"
+            assert not (cache_dir / "translation_cache.json").exists()
+            store = cache_manager._load_translation_cache(data_dir)
+            assert len(store) == 3
+            assert not any("colon" in key for key in store)
+        finally:
+            cache_manager.invalidate_translation_cache()
+
+
+def test_translation_cache_evicts_least_recently_used_rows():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_lru_") as root:
+        data_dir = os.path.join(root, "data")
+        try:
+            store = cache_manager._load_translation_cache(data_dir)
+            store.put("a", "1", max_count=2)
+            store.put("b", "2", max_count=2)
+            store.get("a")
+            store.put("c", "3", max_count=2)
+
+            assert sorted(store) == ["a", "c"]
+            assert len(store) == 2
+        finally:
+            cache_manager.invalidate_translation_cache()
+
+
+def test_translation_cache_byte_budget_evicts_large_entries():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_bytes_") as root:
+        data_dir = os.path.join(root, "data")
+        try:
+            store = cache_manager._load_translation_cache(data_dir)
+            store.put("small", "x", max_bytes=100)
+            store.put("large", "y" * 80, max_bytes=100)
+            store.put("other", "z" * 30, max_bytes=100)
+
+            assert list(store) == ["other"]
+            assert store.size_bytes <= 100
+            store.put("huge", "w" * 200, max_bytes=100)
+            assert "huge" not in list(store)
+        finally:
+            cache_manager.invalidate_translation_cache()
+
+
+def test_cache_hit_updates_recency_without_writing_to_disk():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_touch_") as root:
+        data_dir = os.path.join(root, "data")
+        try:
+            cache_manager.save_cached_translation(data_dir, "hello", "en", "ru", "привет", engine="google")
+            cache_manager.flush_translation_cache()
+            store = cache_manager._load_translation_cache(data_dir)
+            changes = store._conn.total_changes
+
+            for _ in range(5):
+                assert cache_manager.get_cached_translation(data_dir, "hello", "en", "ru", "google") == "привет"
+
+            assert store._conn.total_changes == changes
+            cache_manager.invalidate_translation_cache()
+            reopened = cache_manager._load_translation_cache(data_dir)
+            assert len(reopened) == 1
+        finally:
+            cache_manager.invalidate_translation_cache()
 
 
 def test_cache_stats_separate_disposable_cache_from_user_history():
@@ -84,3 +166,217 @@ def test_cache_stats_separate_disposable_cache_from_user_history():
 
         assert stats["cache_bytes"] == stats["translation_cache"]["size_bytes"]
         assert stats["total_bytes"] > stats["cache_bytes"]
+
+
+def test_cache_stats_reuse_counts_recorded_by_the_writers():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_stats_sidecar_") as root:
+        data_dir = Path(root, "data")
+        data_dir.mkdir()
+        history_path = data_dir / "copy_history.json"
+        history_path.write_text(json.dumps([{"text": str(i)} for i in range(3)]), encoding="utf-8")
+        cache_manager.record_store_stats(str(data_dir), "copy_history", 3)
+        cache_manager.get_cache_stats(str(data_dir))
+
+        with mock.patch.object(cache_manager, "_scan_store_records") as scan, \
+                mock.patch.object(cache_manager, "_tree_size") as walk:
+            stats = cache_manager.get_cache_stats(str(data_dir))
+        assert stats["copy_history"]["records"] == 3
+        assert stats["copy_history"]["size_bytes"] == history_path.stat().st_size
+        scan.assert_not_called()
+        walk.assert_not_called()
+
+        # A write that did not update the sidecar is counted once, then cached.
+        history_path.write_text(json.dumps([{"text": "only"}]), encoding="utf-8")
+        assert cache_manager.get_cache_stats(str(data_dir))["copy_history"]["records"] == 1
+        with mock.patch.object(cache_manager, "_scan_store_records") as scan:
+            assert cache_manager.get_cache_stats(str(data_dir))["copy_history"]["records"] == 1
+        scan.assert_not_called()
+
+        with mock.patch.object(cache_manager, "_scan_store_records", return_value=7) as scan:
+            stats = cache_manager.get_cache_stats(str(data_dir), rescan=True)
+        assert stats["copy_history"]["records"] == 7
+        assert scan.call_count == 4
+
+
+def test_cache_flush_records_translation_counts_for_other_processes():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_stats_flush_") as root:
+        data_dir = os.path.join(root, "data")
+        try:
+            for index in range(4):
+                cache_manager.save_cached_translation(data_dir, f"text {index}", "en", "ru", f"текст {index}")
+            cache_manager.flush_translation_cache()
+            cache_manager.invalidate_translation_cache()
+
+            with mock.patch.object(cache_manager, "_scan_store_records", return_value=0) as scan:
+                stats = cache_manager.get_cache_stats(data_dir)
+            assert stats["translation_cache"]["records"] == 4
+            assert mock.call(data_dir, "translation_cache") not in scan.call_args_list
+        finally:
+            cache_manager.invalidate_translation_cache()
+
+
+def test_burst_of_saves_is_written_by_one_flush():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_writer_") as root:
+        data_dir = os.path.join(root, "data")
+        try:
+            before = cache_manager.translation_cache_writer_stats()
+            for index in range(50):
+                cache_manager.save_cached_translation(data_dir, f"text {index}", "en", "ru", f"текст {index}")
+            written = cache_manager.flush_translation_cache()
+            after = cache_manager.translation_cache_writer_stats()
+
+            assert written == 50
+            assert after["flushes"] - before["flushes"] == 1
+            assert after["saves"] - before["saves"] == 50
+            assert after["rows_written"] - before["rows_written"] == 50
+            cache_manager.invalidate_translation_cache()
+            assert cache_manager.get_cached_translation(data_dir, "text 49", "en", "ru") == "текст 49"
+        finally:
+            cache_manager.invalidate_translation_cache()
+
+
+def test_writer_thread_flushes_after_the_debounce_interval():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_debounce_") as root:
+        data_dir = os.path.join(root, "data")
+        try:
+            with mock.patch.object(cache_manager, "CACHE_FLUSH_DEBOUNCE", 0.01):
+                cache_manager.save_cached_translation(data_dir, "hello", "en", "ru", "привет")
+                store = cache_manager._load_translation_cache(data_dir)
+                deadline = time.monotonic() + 5
+                while store._pending and time.monotonic() < deadline:
+                    time.sleep(0.01)
+
+            assert not store._pending
+            rows = store._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            assert rows == 1
+        finally:
+            cache_manager.invalidate_translation_cache()
+
+
+CROSS_PROCESS_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+import cache_manager
+action, data_dir = sys.argv[1], sys.argv[2]
+if action == "save":
+    cache_manager.save_cached_translation(data_dir, "shared", "en", "ru", "общий", engine="google")
+elif action == "read":
+    print(cache_manager.get_cached_translation(data_dir, "local", "en", "ru", engine="google"))
+elif action == "clear":
+    cache_manager.clear_all_cache(data_dir)
+"""
+
+
+def _run_cache_process(action, data_dir):
+    script = CROSS_PROCESS_SCRIPT.format(root=str(Path(__file__).resolve().parents[1]))
+    completed = subprocess.run(
+        [sys.executable, "-c", script, action, data_dir],
+        capture_output=True, text=True, encoding="utf-8", timeout=60,
+    )
+    assert completed.returncode == 0, completed.stderr
+    return completed.stdout.strip()
+
+
+def test_translations_are_shared_between_processes():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_shared_") as root:
+        data_dir = os.path.join(root, "data")
+        try:
+            cache_manager.save_cached_translation(data_dir, "local", "en", "ru", "местный", engine="google")
+            cache_manager.flush_translation_cache()
+            assert _run_cache_process("read", data_dir) == "местный"
+
+            # This process already has the store open; the other process's
+            # row must still be an immediate hit.
+            _run_cache_process("save", data_dir)
+            assert cache_manager.get_cached_translation(data_dir, "shared", "en", "ru", "google") == "общий"
+        finally:
+            cache_manager.invalidate_translation_cache()
+
+
+def test_commits_from_another_connection_are_read_incrementally():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_sync_") as root:
+        data_dir = os.path.join(root, "data")
+        other = None
+        try:
+            store = cache_manager._load_translation_cache(data_dir)
+            for key in ("a", "b", "c"):
+                store.put(key, key.upper())
+            store.flush()
+
+            # A second connection stands in for another process.
+            other = cache_manager.TranslationCacheStore(data_dir)
+            other.put("d", "D")
+            other.flush()
+            store._last_sync = 0
+            with mock.patch.object(store, "_load_entries", side_effect=AssertionError("full reload")):
+                assert store.get("b") == "B"
+            assert list(store) == ["a", "c", "d", "b"]
+        finally:
+            if other is not None:
+                other.close()
+            cache_manager.invalidate_translation_cache()
+
+
+def test_clear_in_another_process_empties_this_process_cache():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_shared_clear_") as root:
+        data_dir = os.path.join(root, "data")
+        try:
+            cache_manager.save_cached_translation(data_dir, "local", "en", "ru", "местный", engine="google")
+            cache_manager.flush_translation_cache()
+
+            _run_cache_process("clear", data_dir)
+            store = cache_manager._load_translation_cache(data_dir)
+            store._last_sync = 0
+
+            assert cache_manager.get_cached_translation(data_dir, "local", "en", "ru", "google") is None
+        finally:
+            cache_manager.invalidate_translation_cache()
+
+
+def test_ocr_noise_variants_hit_the_normalized_key():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_normalized_") as root:
+        data_dir = os.path.join(root, "data")
+        try:
+            cache_manager.save_cached_translation(
+                data_dir, "Open the transla-\ntion\nsettings  now", "en", "ru", "Откройте настройки", engine="google"
+            )
+            before = cache_manager.translation_cache_counters()
+
+            assert cache_manager.get_cached_translation(
+                data_dir, "Open the transla-\ntion\nsettings  now", "en", "ru", "google"
+            ) == "Откройте настройки"
+            assert cache_manager.get_cached_translation(
+                data_dir, "Open the­ translation settings now ", "en", "ru", "google"
+            ) == "Откройте настройки"
+            assert cache_manager.get_cached_translation(
+                data_dir, "OPEN THE TRANSLATION SETTINGS NOW", "en", "ru", "google"
+            ) is None
+
+            after = cache_manager.translation_cache_counters()
+            assert after["exact_hits"] - before["exact_hits"] == 0
+            assert after["normalized_hits"] - before["normalized_hits"] == 2
+            assert after["misses"] - before["misses"] == 1
+            # One entry, under the normalized text only.
+            assert len(cache_manager._load_translation_cache(data_dir)) == 1
+        finally:
+            cache_manager.invalidate_translation_cache()
+
+
+def test_entries_saved_under_the_exact_text_are_still_found():
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_exact_") as root:
+        data_dir = os.path.join(root, "data")
+        try:
+            text = "Open the\nsettings  now"
+            store = cache_manager._load_translation_cache(data_dir)
+            store.put(cache_manager._translation_cache_key(text, "en", "ru", "google"), "Откройте настройки")
+
+            assert cache_manager.get_cached_translation(data_dir, text, "en", "ru", "google") == "Откройте настройки"
+        finally:
+            cache_manager.invalidate_translation_cache()
+
+
+def test_normalized_key_keeps_line_breaks_for_hymt():
+    assert cache_manager.normalize_cache_text("one\ntwo  three", "google") == "one two three"
+    assert cache_manager.normalize_cache_text("one\ntwo  three", "hymt") == "one\ntwo three"
+    assert cache_manager.normalize_cache_text("first\n\n\nsecond", "google") == "first\n\nsecond"
+    assert cache_manager.normalize_cache_text("Jean-\nPaul", "google") == "Jean-Paul"
@@ -0,0 +1,173 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cache_manager  # noqa: E402
+import cancellation  # noqa: E402
+import provider_health  # noqa: E402
+import provider_sessions  # noqa: E402
+import rate_limiter  # noqa: E402
+import translater  # noqa: E402
+
+
+class _StubGoogleHandler(BaseHTTPRequestHandler):
+    """Answers like translate_a/single, after server.release is set when server.hold is."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.received.append(self.path)
+        self.server.arrived.set()
+        if self.server.hold:
+            self.server.release.wait(10)
+        query = parse_qs(urlparse(self.path).query)
+        body = json.dumps([[[query.get("q", [""])[0].upper(), None]]]).encode("utf-8")
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass  # the client hung up
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def stub(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubGoogleHandler)
+    server.daemon_threads = True
+    server.received = []
+    server.arrived = threading.Event()
+    server.release = threading.Event()
+    server.hold = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache_manager.invalidate_translation_cache()
+    provider_sessions.reset_sessions()
+    provider_health.reset_health()
+    rate_limiter.reset_rate_limits()
+    config = {"translator_engine": "google", "translation_memory": False}
+    with mock.patch.object(translater, "GOOGLE_HOSTS", [f"http://127.0.0.1:{server.server_address[1]}"]), \
+            mock.patch.object(translater, "get_cached_translator_config", return_value=config), \
+            mock.patch.object(translater, "get_data_file", side_effect=lambda name: str(tmp_path / name)), \
+            mock.patch.object(translater, "_try_argos_translate", return_value=None):
+        yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+    cache_manager.invalidate_translation_cache()
+    provider_sessions.reset_sessions()
+    provider_health.reset_health()
+    rate_limiter.reset_rate_limits()
+
+
+def _translate_in_background(text, token):
+    outcome = {}
+
+    def _run():
+        try:
+            outcome["result"] = translater.translate_text(text, "en", "ru", cancel_token=token)
+        except BaseException as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=_run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def test_request_answers_through_the_stub(stub):
+    stub.hold = False
+    assert translater.translate_text("hello", "en", "ru", cancel_token=cancellation.CancelToken()) == "HELLO"
+
+
+def test_cancel_aborts_a_request_in_flight(stub):
+    token = cancellation.CancelToken()
+    thread, outcome = _translate_in_background("hello", token)
+    assert stub.arrived.wait(5)
+
+    started = time.monotonic()
+    token.cancel()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert time.monotonic() - started < 2  # the request timeout is 10 s
+    assert isinstance(outcome.get("error"), translater.TranslationCancelledError)
+    # A cancelled request says nothing about the provider's health.
+    assert provider_health.health_stats().get("google", {}).get("errors", 0) == 0
+
+
+def test_cancel_drops_queued_chunks_before_they_are_sent(stub):
+    caps = translater.provider_capabilities.capabilities("google")
+    text = "\n".join(f"{index:02d}" + "x" * (caps.max_chars - 10) for index in range(8))
+    token = cancellation.CancelToken()
+    thread, outcome = _translate_in_background(text, token)
+    assert stub.arrived.wait(5)
+    time.sleep(0.2)
+
+    token.cancel()
+    thread.join(5)
+
+    assert isinstance(outcome.get("error"), translater.TranslationCancelledError)
+    assert len(stub.received) <= translater.ONLINE_MAX_PARALLEL
+    stub.release.set()
+    time.sleep(0.2)
+    assert len(stub.received) <= translater.ONLINE_MAX_PARALLEL
+
+
+def test_cancelled_token_sends_nothing(stub):
+    token = cancellation.CancelToken()
+    token.cancel()
+
+    with pytest.raises(translater.TranslationCancelledError):
+        translater.translate_text("hello", "en", "ru", cancel_token=token)
+    with pytest.raises(translater.TranslationCancelledError):
+        translater.translate_batch(["one", "two"], "en", "ru", cancel_token=token)
+    assert stub.received == []
+
+
+def test_connection_back_in_the_pool_is_not_aborted_later(stub):
+    stub.hold = False
+    token = cancellation.CancelToken()
+    assert translater.translate_text("first", "en", "ru", cancel_token=token) == "FIRST"
+    token.cancel()
+
+    assert translater.translate_text("second", "en", "ru") == "SECOND"
+    stats = provider_sessions.pool_stats()["google"]
+    assert stats["connections"] == 1
+    assert stats["reused"] == 1
+
+
+def test_scope_is_inherited_by_bound_calls():
+    token = cancellation.CancelToken()
+    seen = []
+    with cancellation.scope(token):
+        call = cancellation.bound(lambda: seen.append(cancellation.current()))
+    worker = threading.Thread(target=call)
+    worker.start()
+    worker.join()
+
+    assert seen == [token]
+    assert cancellation.current() is None
+
+
+def test_child_token_is_cancelled_with_its_parent_but_not_the_other_way():
+    parent = cancellation.CancelToken()
+    first, second = parent.child(), parent.child()
+    first.cancel()
+    assert not parent.is_set() and not second.is_set()
+
+    parent.cancel()
+    assert second.is_set()
+    assert parent.child().is_set()
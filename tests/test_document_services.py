@@ -1,6 +1,8 @@
 import json
 import os
 import tempfile
+import threading
+import time
 import unittest
 import zipfile
 from types import SimpleNamespace
@@ -10,6 +12,8 @@ import document_parser
 import document_storage
 import document_translation
 import main
+import provider_capabilities
+import translater
 
 
 class TestDocumentParser(unittest.TestCase):
@@ -67,9 +71,9 @@ class TestDocumentTranslation(unittest.TestCase):
     def test_translate_document_text_returns_partial_failures(self):
         calls = []
 
-        def fake_translate(text, source, target, status_callback=None):
+        def fake_translate(text, source, target, status_callback=None, cancel_token=None):
             calls.append(text)
-            if len(calls) == 2:
+            if text.startswith("second"):
                 raise RuntimeError("provider down")
             return text.upper()
 
@@ -89,7 +93,7 @@ class TestDocumentTranslation(unittest.TestCase):
     def test_translate_document_text_can_override_provider(self):
         seen_engines = []
 
-        def fake_translate(text, source, target, status_callback=None, engine=None):
+        def fake_translate(text, source, target, status_callback=None, engine=None, cancel_token=None):
             seen_engines.append(engine)
             return text
 
@@ -106,7 +110,7 @@ class TestDocumentTranslation(unittest.TestCase):
     def test_translate_document_text_reports_engine_status_through_progress(self):
         messages = []
 
-        def fake_translate(text, source, target, status_callback=None, engine=None):
+        def fake_translate(text, source, target, status_callback=None, engine=None, cancel_token=None):
             if status_callback:
                 status_callback("Загрузка EN→RU…")
             return text
@@ -125,6 +129,99 @@ class TestDocumentTranslation(unittest.TestCase):
 
         self.assertIn((0, 1, "Загрузка EN→RU…"), messages)
 
+    def _limited(self, engine, workers):
+        limits = provider_capabilities.ProviderCapabilities(max_chars=1800, max_payload_bytes=7200, concurrency=workers)
+        patches = [
+            mock.patch.dict(provider_capabilities.CAPABILITIES, {engine: limits}),
+            mock.patch.dict(document_translation._gates, clear=True),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_translate_document_text_runs_chunks_in_parallel_and_keeps_order(self):
+        self._limited("fake", workers=3)
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+        progress = []
+
+        def fake_translate(text, source, target, status_callback=None, engine=None, cancel_token=None):
+            with lock:
+                in_flight.append(text)
+                peak.append(len(in_flight))
+            # Later chunks finish first.
+            time.sleep(0.03 - int(text.split()[1]) * 0.002)
+            with lock:
+                in_flight.remove(text)
+            return text.upper()
+
+        text = "\n\n".join(f"paragraph {index} of the document" for index in range(12))
+        with mock.patch("document_translation.translater.translate_text", side_effect=fake_translate):
+            translated, results = document_translation.translate_document_text(
+                text,
+                "en",
+                "ru",
+                provider_engine="fake",
+                progress_callback=lambda done, total, message: progress.append(done),
+                max_chars=30,
+            )
+
+        self.assertEqual([result.index for result in results], list(range(12)))
+        self.assertEqual(translated, text.upper())
+        self.assertEqual(max(peak), 3)
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(progress[-1], 12)
+
+    def test_translate_document_text_stops_starting_chunks_once_cancelled(self):
+        self._limited("fake", workers=2)
+        cancel_event = document_translation.make_cancel_event()
+        calls = []
+
+        def fake_translate(text, source, target, status_callback=None, engine=None, cancel_token=None):
+            calls.append(text)
+            if len(calls) == 3:
+                cancel_event.set()
+            time.sleep(0.01)
+            return text
+
+        text = "\n\n".join(f"paragraph {index}" for index in range(20))
+        with mock.patch("document_translation.translater.translate_text", side_effect=fake_translate):
+            translated, results = document_translation.translate_document_text(
+                text, "en", "ru", provider_engine="fake", cancel_event=cancel_event, max_chars=12
+            )
+
+        self.assertLessEqual(len(calls), 4)
+        self.assertEqual([result.index for result in results], list(range(len(results))))
+        self.assertEqual(translated, "\n\n".join(result.translated_text for result in results))
+
+    def test_cancelling_a_document_aborts_the_chunks_in_flight(self):
+        self._limited("fake", workers=2)
+        cancel_event = document_translation.make_cancel_event()
+        tokens = []
+
+        def fake_translate(text, source, target, status_callback=None, engine=None, cancel_token=None):
+            tokens.append(cancel_token)
+            if text.endswith(" 0"):
+                return text
+            # Stands in for a request aborted by cancel().
+            if cancel_token.wait(5):
+                raise translater.TranslationCancelledError("Translation cancelled")
+            return text
+
+        threading.Timer(0.1, cancel_event.cancel).start()
+        text = "\n\n".join(f"paragraph {index}" for index in range(6))
+        started = time.monotonic()
+        with mock.patch("document_translation.translater.translate_text", side_effect=fake_translate):
+            translated, results = document_translation.translate_document_text(
+                text, "en", "ru", provider_engine="fake", cancel_event=cancel_event, max_chars=12
+            )
+
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertTrue(all(token is cancel_event for token in tokens))
+        self.assertEqual(translated, "paragraph 0")
+        self.assertEqual([result.error for result in results], [""])
+
 
 class TestDocumentTranslationWindowMessages(unittest.TestCase):
     def test_provider_failure_message_guides_user_to_settings_or_another_provider(self):
@@ -0,0 +1,108 @@
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import history_index  # noqa: E402
+import history_store  # noqa: E402
+
+
+def _write_log(root, name, records):
+    path = Path(root, history_store.HISTORY_FILES[name])
+    path.write_text("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records), encoding="utf-8")
+
+
+def _translation(index, original, translated, language="ru", day="2026-08-02"):
+    return {
+        "timestamp": f"{day}T12:{index % 60:02d}:00",
+        "language": language,
+        "original": original,
+        "translated": translated,
+    }
+
+
+def test_pages_come_newest_first_with_positions_for_deleting():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_index_pages_") as root:
+        _write_log(
+            root,
+            history_store.TRANSLATION_HISTORY,
+            [_translation(index, f"text {index}", f"текст {index}") for index in range(120)],
+        )
+        try:
+            first = history_index.query_history(root, history_store.TRANSLATION_HISTORY, limit=50)
+            last = history_index.query_history(root, history_store.TRANSLATION_HISTORY, offset=100, limit=50)
+
+            assert first.total == 120
+            assert first.has_more
+            assert [position for position, _record in first.records[:2]] == [119, 118]
+            assert first.records[0][1]["original"] == "text 119"
+            assert len(last.records) == 20
+            assert not last.has_more
+            records = history_store.read_history(root, history_store.TRANSLATION_HISTORY)
+            for position, record in first.records + last.records:
+                assert records[position] == record
+        finally:
+            history_index.close_history_indexes()
+
+
+def test_search_and_filters_match_text_language_and_day():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_index_filters_") as root:
+        _write_log(
+            root,
+            history_store.TRANSLATION_HISTORY,
+            [
+                _translation(0, "The window is ready.", "Окно готово.", "ru", "2026-08-01"),
+                _translation(1, "Доброе утро", "Bom dia.", "ru -> pt", "2026-08-02"),
+                _translation(2, "Open the WINDOW", "Öffne das Fenster", "de", "2026-08-03"),
+            ],
+        )
+        try:
+            def originals(**filters):
+                page = history_index.query_history(root, history_store.TRANSLATION_HISTORY, **filters)
+                return [record["original"] for _position, record in page.records]
+
+            assert originals(text="window") == ["Open the WINDOW", "The window is ready."]
+            assert originals(text="окно") == ["The window is ready."]
+            assert originals(text="bo") == ["Доброе утро"]
+            assert originals(language="pt") == ["Доброе утро"]
+            assert originals(date_from="2026-08-02") == ["Open the WINDOW", "Доброе утро"]
+            assert originals(date_from="2026-08-01", date_to="2026-08-01") == ["The window is ready."]
+            assert originals(text="window", language="de") == ["Open the WINDOW"]
+            assert history_index.history_languages(root, history_store.TRANSLATION_HISTORY) == ["de", "pt", "ru"]
+        finally:
+            history_index.close_history_indexes()
+
+
+def test_index_follows_appends_and_rewrites_of_the_log():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_index_sync_") as root:
+        try:
+            history_store.append_history(root, history_store.COPY_HISTORY, {"text": "alpha"})
+            assert history_index.query_history(root, history_store.COPY_HISTORY).total == 1
+
+            history_store.submit_history(root, history_store.COPY_HISTORY, {"text": "beta"})
+            page = history_index.query_history(root, history_store.COPY_HISTORY, text="bet")
+            assert [record["text"] for _position, record in page.records] == ["beta"]
+
+            history_store.write_history(root, history_store.COPY_HISTORY, [{"text": "gamma"}])
+            page = history_index.query_history(root, history_store.COPY_HISTORY)
+            assert page.total == 1
+            assert page.records == ((0, {"text": "gamma"}),)
+        finally:
+            history_index.close_history_indexes()
+
+
+def test_only_records_within_the_history_limit_are_listed():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_index_limit_") as root:
+        limit = history_store.MAX_HISTORY_RECORDS
+        _write_log(root, history_store.COPY_HISTORY, [{"text": str(index)} for index in range(limit + 5)])
+        try:
+            page = history_index.query_history(root, history_store.COPY_HISTORY, text="0", limit=1000)
+            visible = history_store.read_history(root, history_store.COPY_HISTORY)
+            assert page.total == sum("0" in record["text"] for record in visible)
+            assert all(visible[position] == record for position, record in page.records)
+        finally:
+            history_index.close_history_indexes()
@@ -0,0 +1,152 @@
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import history_store  # noqa: E402
+
+
+def test_append_writes_one_line_without_rewriting_the_log():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_append_") as root:
+        history_store.append_history(root, history_store.COPY_HISTORY, {"text": "first"})
+        path = Path(root, "copy_history.jsonl")
+        before = path.read_bytes()
+
+        history_store.append_history(root, history_store.COPY_HISTORY, {"text": "second"})
+        history_store.append_history(root, history_store.COPY_HISTORY, {"text": "second"})
+
+        after = path.read_bytes()
+        assert after.startswith(before)
+        assert [json.loads(line) for line in after[len(before):].splitlines()] == [{"text": "second"}]
+        assert history_store.read_history(root, history_store.COPY_HISTORY) == [
+            {"text": "first"},
+            {"text": "second"},
+        ]
+
+
+def test_legacy_json_array_is_migrated_on_first_use():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_legacy_") as root:
+        legacy = [
+            {"original": "a", "translated": "а"},
+            {"original": "b", "translated": "б"},
+        ]
+        Path(root, "translation_history.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        history_store.append_history(
+            root, history_store.TRANSLATION_HISTORY, {"original": "c", "translated": "в"}
+        )
+
+        assert not Path(root, "translation_history.json").exists()
+        records = history_store.read_history(root, history_store.TRANSLATION_HISTORY)
+        assert [record["original"] for record in records] == ["a", "b", "c"]
+
+
+def test_log_is_compacted_in_the_background_at_twice_the_limit():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_compact_") as root:
+        log = history_store.HistoryLog(root, history_store.COPY_HISTORY, max_records=5)
+        for index in range(9):
+            log.append([{"text": str(index)}])
+        assert len(Path(log.path).read_text(encoding="utf-8").splitlines()) == 9
+
+        log.append([{"text": "9" * (history_store.MAX_TEXT_LENGTH + 10)}])
+        deadline = time.monotonic() + 5
+        while log._compacting:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        assert len(Path(log.path).read_text(encoding="utf-8").splitlines()) == 5
+        records = log.read()
+        assert [record["text"][:1] for record in records] == ["5", "6", "7", "8", "9"]
+        assert len(records[-1]["text"]) == history_store.MAX_TEXT_LENGTH + 3
+
+
+def test_compaction_drops_consecutive_duplicates_from_other_writers():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_dedupe_") as root:
+        path = Path(root, "copy_history.jsonl")
+        lines = [{"text": "a"}, {"text": "a"}, {"text": "b"}, {"text": "a"}]
+        path.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding="utf-8")
+
+        removed = history_store.compact_history(root, history_store.COPY_HISTORY)
+
+        assert removed == 1
+        assert [record["text"] for record in history_store.read_history(root, history_store.COPY_HISTORY)] == [
+            "a",
+            "b",
+            "a",
+        ]
+
+
+def test_the_same_text_translated_again_is_a_new_translation_record():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_retranslated_") as root:
+        records = [
+            {"original": "Hello", "translated": "Привет", "target": "ru"},
+            {"original": "Hello", "translated": "Hallo", "target": "de"},
+            {"original": "Hello", "translated": "Hallo", "target": "de"},
+        ]
+        for record in records:
+            history_store.append_history(root, history_store.TRANSLATION_HISTORY, record)
+        history_store.compact_history(root, history_store.TRANSLATION_HISTORY)
+
+        assert history_store.read_history(root, history_store.TRANSLATION_HISTORY) == records
+
+
+def test_a_line_cut_short_by_a_crash_is_skipped_and_not_glued_to_the_next():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_torn_") as root:
+        path = Path(root, "copy_history.jsonl")
+        path.write_text('{"text": "kept"}\n{"text": "tor', encoding="utf-8")
+
+        history_store.append_history(root, history_store.COPY_HISTORY, {"text": "next"})
+
+        assert history_store.read_history(root, history_store.COPY_HISTORY) == [
+            {"text": "kept"},
+            {"text": "next"},
+        ]
+
+
+def test_writer_keeps_order_and_batches_a_burst_into_few_writes():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_writer_") as root:
+        before = history_store.history_writer_stats()
+        for index in range(100):
+            history_store.submit_history(root, history_store.COPY_HISTORY, {"text": str(index)})
+            history_store.submit_history(
+                root, history_store.TRANSLATION_HISTORY, {"original": str(index), "translated": str(index)}
+            )
+        assert history_store.flush_history()
+        after = history_store.history_writer_stats()
+
+        copies = history_store.read_history(root, history_store.COPY_HISTORY)
+        assert [record["text"] for record in copies] == [str(index) for index in range(100)]
+        assert after["written"] - before["written"] == 200
+        assert after["flushes"] - before["flushes"] < 20
+        assert after["depth"] == 0
+
+
+def test_writer_queue_is_bounded():
+    with tempfile.TemporaryDirectory(prefix="cnt_history_bounded_") as root:
+        writer = history_store._HistoryWriter()
+        release = threading.Event()
+        log = history_store.get_history_log(root, history_store.COPY_HISTORY)
+        original_append = log.append
+
+        def slow_append(records):
+            release.wait(5)
+            return original_append(records)
+
+        with mock.patch.object(history_store, "HISTORY_QUEUE_LIMIT", 3), \
+                mock.patch.object(log, "append", side_effect=slow_append):
+            assert writer.submit(root, history_store.COPY_HISTORY, {"text": "0"})
+            assert writer.flush(timeout=0.2) is False  # the writer is stuck on the disk
+            accepted = [writer.submit(root, history_store.COPY_HISTORY, {"text": str(i)}) for i in range(1, 6)]
+            release.set()
+            assert writer.flush()
+
+        assert accepted == [True, True, True, False, False]
+        assert writer.stats()["dropped"] == 2
+        assert [record["text"] for record in log.read()] == ["0", "1", "2", "3"]
@@ -1,3 +1,4 @@
+import gc
 import os
 import sys
 import tempfile
@@ -1148,6 +1149,10 @@ class LanguageManagerFollowsInterfaceLanguageTest(unittest.TestCase):
             dialog.close()
         self.settings.close()
         self.parent.close()
+        # The closed windows linger in reference cycles. Collect them here:
+        # left to a collection that lands inside processEvents, they are
+        # freed in the middle of Qt's event dispatch and crash the run.
+        gc.collect()
         self.app.processEvents()
 
     def test_switching_while_it_is_open_rebuilds_it_in_the_new_language(self):
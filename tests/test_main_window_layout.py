@@ -138,6 +138,9 @@ class MainWindowGeometryTest(unittest.TestCase):
         )
         update_check.start()
         self.addCleanup(update_check.stop)
+        prewarm = mock.patch.object(main.DarkThemeApp, "_prewarm_translation_connections")
+        prewarm.start()
+        self.addCleanup(prewarm.stop)
         guide = mock.patch.object(main.DarkThemeApp, "_maybe_start_first_run_guide")
         guide.start()
         self.addCleanup(guide.stop)
@@ -405,6 +408,9 @@ class DirectionSummaryTest(unittest.TestCase):
         )
         update_check.start()
         self.addCleanup(update_check.stop)
+        prewarm = mock.patch.object(main.DarkThemeApp, "_prewarm_translation_connections")
+        prewarm.start()
+        self.addCleanup(prewarm.stop)
         guide = mock.patch.object(main.DarkThemeApp, "_maybe_start_first_run_guide")
         guide.start()
         self.addCleanup(guide.stop)
@@ -1,5 +1,6 @@
 import os
 import tempfile
+import threading
 import time
 import unittest
 from pathlib import Path
@@ -35,6 +36,10 @@ class TestScreenCaptureOverlayWindowing(unittest.TestCase):
             )
             self._language_patch.start()
             self.addCleanup(self._language_patch.stop)
+        # Showing a translate overlay pre-connects to the translator; no network here.
+        prewarm = mock.patch.object(ocr, "_prewarm_translation_connections")
+        prewarm.start()
+        self.addCleanup(prewarm.stop)
 
     def test_pytesseract_uses_the_system_environment_on_linux(self):
         original = mock.Mock(return_value={"stdin": object()})
@@ -123,6 +128,87 @@ class TestScreenCaptureOverlayWindowing(unittest.TestCase):
             ("de", "es"),
         )
 
+    def _wait_for(self, condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        return condition()
+
+    def test_area_translation_runs_off_the_gui_thread_and_is_shown(self):
+        overlay = ocr.ScreenCaptureOverlay("translate", defer_show=True)
+        try:
+            with mock.patch("translater.translate_text", return_value="Привет") as translate, \
+                    mock.patch.object(overlay, "_show_area_translation") as show:
+                overlay._start_area_translation("Hello")
+                self.assertTrue(self._wait_for(lambda: show.called))
+
+            source, target = overlay._current_translate_pair()
+            show.assert_called_once_with("Hello", source, target, "Привет", "")
+            self.assertIsNotNone(translate.call_args.kwargs["cancel_token"])
+            self.assertIsNone(overlay._area_translation)
+        finally:
+            overlay.deleteLater()
+
+    def test_closing_the_overlay_cancels_its_translation(self):
+        overlay = ocr.ScreenCaptureOverlay("translate", defer_show=True)
+        started = threading.Event()
+        finished = threading.Event()
+        tokens = []
+
+        def slow_translate(_text, _source, _target, cancel_token=None):
+            tokens.append(cancel_token)
+            started.set()
+            try:
+                cancel_token.wait(5)
+                cancel_token.raise_if_cancelled()
+                return "too late"
+            finally:
+                finished.set()
+
+        try:
+            with mock.patch("translater.translate_text", side_effect=slow_translate), \
+                    mock.patch.object(overlay, "_show_area_translation") as show, \
+                    mock.patch.object(ocr, "_safe_prepare_overlay"):
+                overlay._start_area_translation("Hello")
+                self.assertTrue(started.wait(5))
+                overlay.close()
+                self.assertTrue(finished.wait(1))
+                self._wait_for(lambda: False, timeout=0.1)
+
+            self.assertTrue(tokens[0].cancelled)
+            show.assert_not_called()
+        finally:
+            overlay.deleteLater()
+
+    def test_closing_fullscreen_overlay_cancels_the_batch(self):
+        config = {"interface_language": "en", "translator_engine": "Google"}
+        started = threading.Event()
+        tokens = []
+
+        def slow_batch(_texts, _source, _target, cancel_token=None):
+            tokens.append(cancel_token)
+            started.set()
+            cancel_token.wait(5)
+            cancel_token.raise_if_cancelled()
+            return []
+
+        with mock.patch.object(ocr, "get_cached_ocr_config", return_value=config), \
+                mock.patch.object(ocr, "installed_ocr_language_codes", return_value=["en", "ru"]), \
+                mock.patch.object(ocr.QtCore.QTimer, "singleShot"):
+            overlay = ocr.FullScreenTranslateOverlay()
+        results = []
+        overlay._translation_result_ready.connect(lambda *args: results.append(args))
+        with mock.patch("translater.translate_batch", side_effect=slow_batch):
+            overlay._on_ocr_complete([(0, 0, 10, 10, "Hello")], overlay._translation_run_id, "en", "ru")
+            self.assertTrue(started.wait(5))
+            # closeEvent deletes the overlay.
+            overlay.close()
+            self._wait_for(lambda: False, timeout=0.2)
+
+        self.assertTrue(tokens[0].cancelled)
+        self.assertEqual(results, [])
+
     def test_translate_overlay_has_separate_source_and_target_controls(self):
         overlay = ocr.ScreenCaptureOverlay("translate", defer_show=True)
         try:
@@ -1102,32 +1188,6 @@ class TestScreenCaptureOverlayWindowing(unittest.TestCase):
         self.assertEqual(blocks[0][4], "First setting")
         self.assertEqual(blocks[1][4], "Second setting")
 
-    def test_fullscreen_translation_mapping_falls_back_when_markers_change(self):
-        calls = []
-
-        def translate(text, source, target):
-            calls.append((text, source, target))
-            if text.startswith("[[["):
-                return "markers were removed"
-            return "T:" + text
-
-        result = ocr._translate_screen_texts(["one", "two"], translate, "en", "ru")
-        self.assertEqual(result, ["T:one", "T:two"])
-        self.assertEqual(len(calls), 3)
-
-    def test_fullscreen_translation_splits_text_rich_screen_into_safe_batches(self):
-        calls = []
-
-        def translate(text, _source, _target):
-            calls.append(text)
-            return text
-
-        values = [f"block {index}" for index in range(30)]
-        result = ocr._translate_screen_texts(values, translate, "en", "ru")
-
-        self.assertEqual(result, values)
-        self.assertEqual(len(calls), 2)
-
     def test_fullscreen_translation_layout_stays_inside_screen(self):
         dummy = SimpleNamespace(width=lambda: 800, height=lambda: 500)
         bg_rect, draw_rect, font, _flags = ocr.FullScreenTranslateOverlay._translation_block_layout(
@@ -1211,7 +1271,7 @@ class TestAreaTranslateResultWindow(unittest.TestCase):
     class _Overlay:
         mode = "translate"
         _session_id = "test"
-        _handle_ocr_result_inner = ocr.ScreenCaptureOverlay._handle_ocr_result_inner
+        _show_area_translation = ocr.ScreenCaptureOverlay._show_area_translation
 
         def __init__(self):
             self.closed = False
@@ -1236,12 +1296,11 @@ class TestAreaTranslateResultWindow(unittest.TestCase):
             "result_window_hidden_modes": hidden_modes,
         }
         with mock.patch.object(ocr, "get_cached_ocr_config", return_value=config), \
-                mock.patch("translater.translate_text", return_value="Привет мир"), \
                 mock.patch.object(platform_support, "copy_text") as copy, \
                 mock.patch.object(main, "show_translation_dialog") as dialog, \
                 mock.patch.object(main, "save_copy_history") as copy_history, \
                 mock.patch.object(ocr, "save_translation_history") as translation_history:
-            overlay._handle_ocr_result_inner("Hello world")
+            overlay._show_area_translation("Hello world", "en", "ru", "Привет мир")
         return overlay, copy, dialog, copy_history, translation_history
 
     def test_listing_area_copies_instead_of_opening_the_window(self):
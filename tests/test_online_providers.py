@@ -1,4 +1,6 @@
 import sys
+import threading
+import time
 import unittest
 from pathlib import Path
 from types import SimpleNamespace
@@ -7,14 +9,19 @@ from unittest import mock
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
+import cancellation  # noqa: E402
+import provider_health  # noqa: E402
+import provider_sessions  # noqa: E402
+import rate_limiter  # noqa: E402
 import translater  # noqa: E402
 
 
 class FakeResponse:
-    def __init__(self, status_code, payload=None, raises=None):
+    def __init__(self, status_code, payload=None, raises=None, headers=None):
         self.status_code = status_code
         self._payload = payload
         self._raises = raises
+        self.headers = headers or {}
 
     def json(self):
         if self._raises is not None:
@@ -22,7 +29,21 @@ class FakeResponse:
         return self._payload
 
 
-class LibreTranslateTest(unittest.TestCase):
+class _HealthResetMixin:
+    def setUp(self):
+        # Circuit state and rate limits are process-wide; each test starts
+        # with healthy providers and a budget its requests never wait for.
+        provider_health.reset_health()
+        rate_limiter.reset_rate_limits()
+        unlimited = rate_limiter.RateLimit(rate=1000.0, burst=1000)
+        patch = mock.patch.dict(rate_limiter.DEFAULT_RATE_LIMITS, dict.fromkeys(translater._ONLINE_ENGINES, unlimited))
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(rate_limiter.reset_rate_limits)
+        self.addCleanup(provider_health.reset_health)
+
+
+class LibreTranslateTest(_HealthResetMixin, unittest.TestCase):
     def test_key_gated_instance_is_skipped_for_a_working_one(self):
         calls = []
 
@@ -54,7 +75,7 @@ class LibreTranslateTest(unittest.TestCase):
             self.assertNotIn(f"'https://{dead}'", source)
 
 
-class LingvaTest(unittest.TestCase):
+class LingvaTest(_HealthResetMixin, unittest.TestCase):
     def test_failing_instance_falls_through_and_reports_status(self):
         def fake_get(url, timeout=None):
             if "vercel.app" in url or "lingva.ml" in url:
@@ -86,6 +107,290 @@ class LingvaTest(unittest.TestCase):
 
         self.assertIn("An error occurred", str(ctx.exception))
 
+    def test_a_failing_instance_moves_behind_the_healthy_ones(self):
+        calls = []
+
+        def fake_get(url, timeout=None):
+            calls.append(url)
+            if "vercel.app" in url:
+                raise ConnectionError("timed out")
+            return FakeResponse(200, {"translation": "привет"})
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(get=fake_get)):
+            for _ in range(3):
+                self.assertEqual(translater.lingva_translate("hello", "en", "ru"), "привет")
+
+        self.assertEqual(len([url for url in calls if "vercel.app" in url]), 1)
+        self.assertTrue(calls[-1].startswith("https://lingva.ml/"))
+
+    def test_dead_instances_are_skipped_once_their_circuits_open(self):
+        calls = []
+
+        def fake_get(url, timeout=None):
+            calls.append(url)
+            raise ConnectionError("timed out")
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(get=fake_get)):
+            for _ in range(provider_health.FAILURE_THRESHOLD + 2):
+                with self.assertRaises(Exception):
+                    translater.lingva_translate("hello", "en", "ru")
+
+        self.assertEqual(len(calls), 3 * provider_health.FAILURE_THRESHOLD)
+        stats = translater.provider_health_stats()
+        self.assertEqual(stats["lingva https://lingva.vercel.app"]["state"], provider_health.OPEN)
+        self.assertEqual(stats["lingva https://lingva.vercel.app"]["errors"], provider_health.FAILURE_THRESHOLD)
+
+
+    def test_calls_skipped_by_open_circuits_are_not_provider_failures(self):
+        def fake_get(url, timeout=None):
+            raise ConnectionError("timed out")
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(get=fake_get)):
+            for _ in range(provider_health.FAILURE_THRESHOLD + 3):
+                with self.assertRaises(Exception):
+                    translater.lingva_translate("hello", "en", "ru")
+
+        # Only the calls that reached a mirror count; the skipped ones sent nothing.
+        self.assertEqual(translater.provider_health_stats()["lingva"]["errors"], provider_health.FAILURE_THRESHOLD)
+
+
+class GoogleTranslateTest(_HealthResetMixin, unittest.TestCase):
+    @staticmethod
+    def _long_text(parts):
+        # One line per chunk: every line is just under the request limit.
+        limit = translater.provider_capabilities.capabilities("google").max_chars
+        return "\n".join(f"{index:02d} " + "x" * (limit - 10) for index in range(parts))
+
+    def test_chunks_are_sent_concurrently_and_reassembled_in_order(self):
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def fake_get(url, params=None, timeout=None):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            # Later chunks answer first, so the order has to be restored.
+            time.sleep(0.05 - int(params["q"][:2]) * 0.004)
+            with lock:
+                in_flight.pop()
+            return mock.Mock(json=lambda: [[[f"<{params['q'][:2]}>", None]]], raise_for_status=lambda: None)
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(get=fake_get)):
+            result = translater.google_translate(self._long_text(10), "en", "ru")
+
+        self.assertEqual(result.split("\n"), [f"<{index:02d}>" for index in range(10)])
+        self.assertGreater(max(peak), 1)
+        self.assertLessEqual(max(peak), translater.ONLINE_MAX_PARALLEL)
+
+    def test_failed_chunks_are_reported_by_part(self):
+        def fake_get(url, params=None, timeout=None):
+            if params["q"].startswith(("01", "03")):
+                raise ConnectionError(f"reset on {params['q'][:2]}")
+            return mock.Mock(json=lambda: [[[params["q"][:2], None]]], raise_for_status=lambda: None)
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(get=fake_get)):
+            with self.assertRaises(translater.ChunkTranslationError) as ctx:
+                translater.google_translate(self._long_text(5), "en", "ru")
+
+        self.assertEqual([index for index, _error in ctx.exception.failures], [1, 3])
+        self.assertEqual(ctx.exception.translated, ["00", None, "02", None, "04"])
+        self.assertIn("part 2: reset on 01", str(ctx.exception))
+
+    def test_batch_of_oversized_texts_does_not_block_the_executor(self):
+        # Four texts too long for one request: each batch group holds one and
+        # splits it again while all executor threads run the groups.
+        texts = ["\n".join([f"{index} Съешь же ещё этих мягких булок. " * 3] * 20) for index in range(4)]
+        capabilities = translater.provider_capabilities.capabilities("google")
+        self.assertFalse(any(capabilities.fits(text) for text in texts))
+        chunks = []
+
+        def fake_chunk(text, source_code, target_code):
+            chunks.append(text)
+            time.sleep(0.01)
+            return text.upper()
+
+        results = []
+        with mock.patch.object(translater, "_google_translate_chunk", side_effect=fake_chunk):
+            worker = threading.Thread(
+                target=lambda: results.append(translater.google_translate_batch(texts, "ru", "en")), daemon=True
+            )
+            worker.start()
+            worker.join(10)
+
+        self.assertFalse(worker.is_alive(), "google_translate_batch deadlocked")
+        self.assertEqual(results[0], [text.upper() for text in texts])
+        self.assertGreater(len(chunks), len(texts))
+
+    def test_each_provider_has_its_own_pool_sized_to_its_concurrency(self):
+        with mock.patch.dict(provider_sessions._sessions, clear=True):
+            google = translater._get_http_session("google")
+            lingva = translater._get_http_session("lingva")
+            self.assertIsNot(google, lingva)
+            self.assertIs(translater._get_http_session("google"), google)
+            self.assertEqual(
+                google.get_adapter("https://translate.googleapis.com")._pool_maxsize, translater.ONLINE_MAX_PARALLEL
+            )
+            self.assertEqual(lingva.get_adapter("https://lingva.ml")._pool_maxsize, provider_sessions.MIN_POOL_SIZE)
+            provider_sessions.reset_sessions()
+
+
+class HedgedRequestTest(_HealthResetMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        patches = [
+            mock.patch.dict(
+                translater._hedging_stats, {"races": 0, "fired": 0, "hedge_wins": 0, "losers_cancelled": 0}
+            ),
+            mock.patch.object(translater, "HEDGE_DELAY", 0.05),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_a_slow_instance_is_raced_and_the_loser_is_cancelled(self):
+        aborted = threading.Event()
+        calls = []
+
+        def fake_get(url, timeout=None):
+            calls.append(url)
+            if "vercel.app" in url:
+                # Stands in for the socket shutdown of a pooled connection.
+                if cancellation.current().wait(5):
+                    aborted.set()
+                    raise ConnectionError("connection aborted")
+                return FakeResponse(200, {"translation": "медленно"})
+            return FakeResponse(200, {"translation": "привет"})
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(get=fake_get)):
+            self.assertEqual(translater.lingva_translate("hello", "en", "ru", hedge=True), "привет")
+            self.assertTrue(aborted.wait(1))
+
+        time.sleep(0.05)
+        stats = translater.hedging_stats()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual((stats["races"], stats["fired"], stats["hedge_wins"]), (1, 1, 1))
+        self.assertEqual(stats["losers_cancelled"], 1)
+        health = translater.provider_health_stats()
+        self.assertEqual(health.get("lingva https://lingva.vercel.app", {}).get("errors", 0), 0)
+        self.assertEqual(health.get("lingva", {}).get("errors", 0), 0)
+
+    def test_cancelling_the_caller_cancels_every_attempt(self):
+        token = cancellation.CancelToken()
+        attempt_tokens = []
+
+        def _slow(attempt_token):
+            attempt_tokens.append(attempt_token)
+            attempt_token.wait(5)
+            raise RuntimeError("aborted")
+
+        threading.Timer(0.15, token.cancel).start()
+        with cancellation.scope(token):
+            with self.assertRaises(translater.TranslationCancelledError):
+                translater._hedged_first([("lingva", "a", _slow), ("lingva", "b", _slow)])
+
+        self.assertEqual(len(attempt_tokens), 2)
+        self.assertTrue(all(attempt_token.is_set() for attempt_token in attempt_tokens))
+
+    def test_a_fast_answer_sends_no_second_request(self):
+        calls = []
+
+        def fake_get(url, timeout=None):
+            calls.append(url)
+            return FakeResponse(200, {"translation": "привет"})
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(get=fake_get)):
+            self.assertEqual(translater.lingva_translate("hello", "en", "ru", hedge=True), "привет")
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(translater.hedging_stats()["fired"], 0)
+
+    def test_failures_fall_through_and_are_not_counted_as_hedges(self):
+        def fake_post(url, json=None, timeout=None):
+            if "disroot" in url:
+                return FakeResponse(503, {"error": "overloaded"})
+            return FakeResponse(200, {"translatedText": "привет"})
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(post=fake_post)):
+            self.assertEqual(translater.libretranslate("hello", "en", "ru", hedge=True), "привет")
+
+        self.assertEqual(translater.hedging_stats()["fired"], 0)
+
+    def test_hedge_delay_follows_the_recent_p90_latency(self):
+        self.assertEqual(translater._hedge_delay("lingva", "https://lingva.ml"), translater.HEDGE_DELAY)
+        for latency in (0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 2.0):
+            provider_health.record_success("lingva", latency, "https://lingva.ml")
+
+        self.assertEqual(translater._hedge_delay("lingva", "https://lingva.ml"), 2.0)
+        for _ in range(20):
+            provider_health.record_success("lingva", 0.01, "https://lingva.ml")
+        self.assertEqual(translater._hedge_delay("lingva", "https://lingva.ml"), translater.HEDGE_MIN_DELAY)
+
+
+class ThrottlingTest(_HealthResetMixin, unittest.TestCase):
+    def test_a_429_pauses_for_retry_after_and_the_request_is_sent_again(self):
+        calls = []
+
+        def fake_post(url, json=None, timeout=None):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                return FakeResponse(429, {"error": "Slow down"}, headers={"Retry-After": "0.2"})
+            return FakeResponse(200, {"translatedText": "привет"})
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(post=fake_post)):
+            self.assertEqual(translater.libretranslate("hello", "en", "ru"), "привет")
+
+        self.assertEqual(len(calls), 2)
+        self.assertGreaterEqual(calls[1] - calls[0], 0.19)
+        stats = translater.rate_limit_stats()["libretranslate https://translate.disroot.org"]
+        self.assertEqual(stats["throttled"], 1)
+        self.assertLess(stats["rate"], stats["configured_rate"])
+        self.assertEqual(translater.provider_health_stats()["libretranslate https://translate.disroot.org"]["errors"], 0)
+
+    def test_a_long_retry_after_fails_fast_instead_of_waiting(self):
+        calls = []
+
+        def fake_get(url, params=None, timeout=None):
+            calls.append(url)
+            return mock.Mock(status_code=429, headers={"Retry-After": "3600"})
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(get=fake_get)):
+            with self.assertRaises(translater.ProviderThrottledError) as ctx:
+                translater.google_translate("hello", "en", "ru")
+            with self.assertRaises(translater.ProviderThrottledError):
+                translater.google_translate("hello", "en", "ru")
+
+        self.assertIn("retry after 3600 s", str(ctx.exception))
+        # The second call never reached the server: the provider is paused.
+        self.assertEqual(len(calls), 1)
+
+
+    def test_a_throttling_mirror_is_paused_alone_and_others_take_over(self):
+        calls = []
+
+        def fake_get(url, timeout=None):
+            calls.append(url)
+            if "vercel.app" in url:
+                return FakeResponse(429, {"error": "Slow down"}, headers={"Retry-After": "3600"})
+            return FakeResponse(200, {"translation": "привет"})
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(get=fake_get)):
+            self.assertEqual(translater.lingva_translate("hello", "en", "ru"), "привет")
+            self.assertEqual(translater.lingva_translate("hello", "en", "ru"), "привет")
+
+        self.assertEqual(sum("vercel.app" in url for url in calls), 1)
+        stats = translater.rate_limit_stats()
+        self.assertGreater(stats["lingva https://lingva.vercel.app"]["paused_for"], 3000)
+        self.assertEqual(stats["lingva https://lingva.ml"]["paused_for"], 0)
+
+    def test_waiting_for_our_own_budget_is_not_a_provider_failure(self):
+        rate_limiter.throttled("google", 3600)
+
+        with self.assertRaises(translater.ProviderThrottledError):
+            translater.google_translate("hello", "en", "ru")
+
+        self.assertEqual(translater.provider_health_stats().get("google", {}).get("errors", 0), 0)
+
 
 class ServerErrorDetailTest(unittest.TestCase):
     def test_non_json_body_falls_back_to_status_code(self):
@@ -0,0 +1,114 @@
+import json
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import document_translation  # noqa: E402
+import provider_capabilities  # noqa: E402
+
+
+LATIN = "The quick brown fox jumps over the lazy dog. " * 8
+CYRILLIC = "Съешь же ещё этих мягких французских булок, да выпей чаю. " * 6
+CJK = "我能吞下玻璃而不伤身体。这是一个测试句子。" * 12
+
+
+def _document(paragraph, count=40):
+    return "\n\n".join(f"{index}. {paragraph}" for index in range(count))
+
+
+def test_payload_size_follows_the_request_encoding():
+    google = provider_capabilities.capabilities("google")
+    mymemory = provider_capabilities.capabilities("mymemory")
+    libre = provider_capabilities.capabilities("libretranslate")
+
+    assert google.payload_size("abc") == 3
+    assert google.payload_size("да") == 12
+    assert google.payload_size("a b") == 5
+    assert mymemory.payload_size("да") == 4
+    assert libre.payload_size('a"b') == 4
+    assert libre.payload_size("да") == 12  # \u0434\u0430, as requests sends it
+
+
+def test_every_document_chunk_fits_one_request_of_its_engine():
+    for engine in list(provider_capabilities.CAPABILITIES) + ["unknown"]:
+        caps = provider_capabilities.capabilities(engine)
+        for paragraph in (LATIN, CYRILLIC, CJK, "x" * 12000):
+            chunks = document_translation.split_text_chunks(_document(paragraph, 12), capabilities=caps)
+            assert chunks
+            assert all(caps.fits(chunk.text) for chunk in chunks), (engine, paragraph[:10])
+
+
+def test_chunks_are_packed_to_the_encoded_limit():
+    google = provider_capabilities.capabilities("google")
+    latin = document_translation.split_text_chunks(_document(LATIN), capabilities=google)
+    cjk = document_translation.split_text_chunks(_document(CJK), capabilities=google)
+    by_chars = document_translation.split_text_chunks(
+        _document(CJK), capabilities=replace(google, max_payload_bytes=10**6)
+    )
+
+    # CJK takes 9 URL bytes per character, so the URL is what fills first.
+    assert len(cjk) > len(by_chars)
+    for chunks in (latin, cjk):
+        # No chunk could have taken the next paragraph as well.
+        for chunk, following in zip(chunks, chunks[1:]):
+            assert not google.fits(chunk.text + "\n\n" + following.text.split("\n\n")[0])
+
+
+def test_google_requests_stay_within_what_1500_character_chunks_sent():
+    google = provider_capabilities.capabilities("google")
+
+    # The old chunks of 1500 Cyrillic letters: 9000 bytes in the URL.
+    assert google.fits("д" * 1500)
+    assert google.payload_size("д" * 1500) == 9000
+    assert not google.fits("x" * 1501)
+    assert not google.fits("д" * 1499 + "我")  # 1500 characters, 9003 bytes
+    assert not google.fits("我" * 1001)
+
+
+def test_pack_honours_items_overhead_and_oversized_texts():
+    caps = provider_capabilities.ProviderCapabilities(max_chars=10, max_payload_bytes=100, encoding=provider_capabilities.UTF8)
+
+    assert provider_capabilities.pack(["aaa", "bbb", "ccc"], caps, joiner="\n") == [[0, 1], [2]]
+    assert provider_capabilities.pack(["aaa", "bbb", "ccc"], caps, joiner=None, max_items=1) == [[0], [1], [2]]
+    assert provider_capabilities.pack(["aa", "bb"], caps, joiner=None, item_overhead="&q=") == [[0], [1]]
+    assert provider_capabilities.pack(["a" * 30, "b"], caps) == [[0], [1]]
+
+
+def test_json_batches_are_packed_to_the_size_of_the_array_sent():
+    caps = provider_capabilities.ProviderCapabilities(
+        max_chars=1000, max_payload_bytes=120, encoding=provider_capabilities.JSON, max_batch_items=50
+    )
+    texts = ['say "hi"', "C:\\path\\to", "привет мир", "a\tb\nc", "你好", "plain text"] * 4
+    groups = provider_capabilities.pack(texts, caps, joiner=None, item_overhead=provider_capabilities.JSON_ITEM_OVERHEAD)
+
+    assert [index for group in groups for index in group] == list(range(len(texts)))
+    for group, following in zip(groups, groups[1:] + [None]):
+        sent = [texts[index] for index in group]
+        assert len(json.dumps(sent)) <= caps.max_payload_bytes
+        if following:
+            # Packed tight: the next text would not have fitted.
+            assert len(json.dumps(sent + [texts[following[0]]])) > caps.max_payload_bytes
+
+
+def test_long_lines_are_cut_at_sentence_ends():
+    caps = provider_capabilities.capabilities("mymemory")
+    pieces = provider_capabilities.cut_to_fit(CYRILLIC, caps)
+
+    assert len(pieces) > 1
+    assert all(caps.fits(piece) for piece in pieces)
+    assert all(piece.endswith(".") for piece in pieces[:-1])
+    assert " ".join(pieces) == CYRILLIC.strip()
+
+
+def test_requests_per_document_are_reported():
+    text = _document(LATIN)
+
+    assert document_translation.plan_document_requests(text, "google") == len(
+        document_translation.split_text_chunks(text, capabilities=provider_capabilities.capabilities("google"))
+    )
+    assert document_translation.plan_document_requests(text, "google") < document_translation.plan_document_requests(
+        text, "mymemory"
+    )
@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import provider_health  # noqa: E402
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fail(health, key, times):
+    for _ in range(times):
+        health.record_failure(key, "timed out")
+
+
+def test_circuit_opens_after_repeated_failures_and_probes_after_the_cooldown():
+    clock = _Clock()
+    health = provider_health.ProviderHealth(clock=clock)
+
+    _fail(health, "lingva a", provider_health.FAILURE_THRESHOLD - 1)
+    assert health.allow("lingva a")
+    _fail(health, "lingva a", 1)
+    assert not health.allow("lingva a")
+    assert health.stats()["lingva a"]["state"] == provider_health.OPEN
+
+    clock.now += provider_health.COOLDOWN
+    assert health.allow("lingva a")          # the one probe
+    assert not health.allow("lingva a")      # nothing else while it runs
+    health.record_success("lingva a", 0.2)
+    assert health.allow("lingva a")
+    assert health.stats()["lingva a"]["state"] == provider_health.CLOSED
+
+
+def test_a_failed_probe_reopens_the_circuit_with_a_longer_cooldown():
+    clock = _Clock()
+    health = provider_health.ProviderHealth(clock=clock)
+    _fail(health, "google", provider_health.FAILURE_THRESHOLD)
+
+    clock.now += provider_health.COOLDOWN
+    assert health.allow("google")
+    _fail(health, "google", 1)
+
+    clock.now += provider_health.COOLDOWN
+    assert not health.allow("google")
+    assert health.stats()["google"]["retry_in"] == provider_health.COOLDOWN
+    clock.now += provider_health.COOLDOWN
+    assert health.allow("google")
+
+
+def test_targets_are_ordered_by_circuit_error_rate_and_latency():
+    health = provider_health.ProviderHealth(clock=_Clock())
+    health.record_success("slow", 2.0)
+    health.record_success("fast", 0.1)
+    health.record_success("flaky", 0.1)
+    health.record_failure("flaky", "HTTP 502")
+    _fail(health, "dead", provider_health.FAILURE_THRESHOLD)
+
+    order = health.order(["dead", "unknown", "flaky", "slow", "fast"])
+
+    assert order == ["unknown", "fast", "slow", "flaky", "dead"]
@@ -0,0 +1,118 @@
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import provider_health  # noqa: E402
+import provider_sessions  # noqa: E402
+import translater  # noqa: E402
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _answer(self, body=b""):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._answer()
+
+    def do_GET(self):
+        self._answer(b'{"translation": "ok"}')
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_sessions():
+    provider_sessions.reset_sessions()
+    yield
+    provider_sessions.reset_sessions()
+
+
+def test_warm_connection_is_reused_by_the_first_request(server):
+    assert provider_sessions.warm("lingva", [server]) == 1
+    session = provider_sessions.session("lingva")
+    for _ in range(3):
+        assert session.get(f"{server}/api", timeout=5).json() == {"translation": "ok"}
+
+    stats = provider_sessions.pool_stats()["lingva"]
+    assert stats["requests"] == 4
+    assert stats["connections"] == 1
+    assert stats["reused"] == 3
+    assert stats["reuse_ratio"] == 0.75
+    assert stats["warmups"] == 1
+
+
+def test_recently_used_host_is_not_warmed_again(server):
+    session = provider_sessions.session("google")
+    session.get(f"{server}/api", timeout=5)
+
+    assert provider_sessions.warm("google", [server]) == 0
+    with mock.patch.object(provider_sessions, "WARM_INTERVAL", -1):
+        assert provider_sessions.warm("google", [server]) == 1
+
+
+def test_unreachable_host_counts_a_failed_warmup():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        closed_port = probe.getsockname()[1]
+
+    assert provider_sessions.warm("mymemory", [f"http://127.0.0.1:{closed_port}"]) == 0
+    assert provider_sessions.pool_stats()["mymemory"]["warm_failures"] == 1
+
+
+def test_sockets_use_tcp_keepalive():
+    options = provider_sessions._keepalive_socket_options()
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in options
+    adapter = provider_sessions.provider_session("google").adapter
+    assert adapter.poolmanager.connection_pool_kw["socket_options"] == options
+
+
+def test_prewarm_skips_offline_engines_and_open_circuits():
+    provider_health.reset_health()
+    try:
+        assert translater.prewarm_connections("argos") is None
+        for _ in range(provider_health.FAILURE_THRESHOLD):
+            provider_health.record_failure("lingva", "down", instance=translater.LINGVA_INSTANCES[0])
+        with mock.patch.object(provider_sessions, "warm_in_background") as warm:
+            translater.prewarm_connections("Lingva")
+        warm.assert_called_once_with("lingva", translater.LINGVA_INSTANCES[1:3])
+    finally:
+        provider_health.reset_health()
+
+
+def test_sessions_work_without_the_urllib3_hooks(server):
+    with mock.patch.object(provider_sessions, "_POOL_HOOKS", False):
+        found = provider_sessions.provider_session("lingva")
+        assert provider_sessions.warm("lingva", [server]) == 1
+        assert found.session.get(f"{server}/api", timeout=5).json() == {"translation": "ok"}
+
+    pool = found.adapter.poolmanager.connection_from_url(server)
+    assert not isinstance(pool, provider_sessions._CancellablePoolMixin)
+    with mock.patch.object(found.adapter.poolmanager.pools, "_container", None):
+        stats = provider_sessions.pool_stats()["lingva"]
+    assert (stats["requests"], stats["connections"], stats["warmups"]) == (0, 0, 1)
@@ -0,0 +1,99 @@
+import datetime
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import rate_limiter  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bursts_are_allowed_then_requests_are_spaced_by_the_rate():
+    clock = FakeClock()
+    bucket = rate_limiter.TokenBucket(rate_limiter.RateLimit(rate=2.0, burst=3), clock=clock)
+
+    waits = [bucket.reserve() for _ in range(5)]
+
+    assert waits == [0.0, 0.0, 0.0, 0.5, 1.0]
+    clock.now += 10
+    assert bucket.reserve() == 0.0
+
+
+def test_throttling_pauses_slows_and_recovers():
+    clock = FakeClock()
+    bucket = rate_limiter.TokenBucket(rate_limiter.RateLimit(rate=4.0, burst=4), clock=clock)
+
+    assert bucket.throttled(retry_after=5) == 5
+    assert bucket.reserve() == 5 + 1 / 2.0
+    assert bucket.throttled() == rate_limiter.BACKOFF
+    assert bucket.throttled() == rate_limiter.BACKOFF * 2
+    assert bucket.stats()["rate"] == 0.5  # halved three times
+    for _ in range(20):
+        bucket.succeeded()
+    assert bucket.stats()["rate"] == 4.0
+    assert bucket.throttled() == rate_limiter.BACKOFF
+
+
+def test_a_wait_beyond_max_wait_does_not_take_a_token():
+    clock = FakeClock()
+    bucket = rate_limiter.TokenBucket(rate_limiter.RateLimit(rate=1.0, burst=1), clock=clock)
+    bucket.throttled(retry_after=60)
+
+    try:
+        bucket.reserve(max_wait=30)
+    except rate_limiter.RateLimitTimeout:
+        pass
+    else:
+        raise AssertionError("expected RateLimitTimeout")
+    # The 429 also halved the rate: one token takes two seconds to refill.
+    clock.now += 62
+    assert bucket.reserve(max_wait=30) == 0.0
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    now = datetime.datetime(2026, 10, 1, 12, 0, 0, tzinfo=datetime.timezone.utc)
+
+    assert rate_limiter.parse_retry_after("7") == 7.0
+    assert rate_limiter.parse_retry_after("Thu, 01 Oct 2026 12:00:30 GMT", now=now) == 30.0
+    assert rate_limiter.parse_retry_after("Thu, 01 Oct 2026 11:00:00 GMT", now=now) == 0.0
+    assert rate_limiter.parse_retry_after("soon") is None
+    assert rate_limiter.parse_retry_after(None) is None
+
+
+def test_callers_share_one_budget_and_settings_override_it():
+    rate_limiter.reset_rate_limits()
+    try:
+        rate_limiter.configure({"fake": {"rate": 20, "burst": 2}})
+        starts = []
+        lock = threading.Lock()
+
+        def worker():
+            rate_limiter.acquire("fake")
+            with lock:
+                starts.append(time.monotonic())
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        starts.sort()
+        assert starts[-1] - starts[0] >= 4 / 20 * 0.9
+        assert rate_limiter.rate_limit_stats()["fake"]["requests"] == 6
+        cancel = threading.Event()
+        cancel.set()
+        assert rate_limiter.acquire("fake", cancel_event=cancel) is False
+    finally:
+        rate_limiter.configure({})
+        rate_limiter.reset_rate_limits()
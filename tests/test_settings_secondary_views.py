@@ -12,10 +12,15 @@ os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
-from PyQt5.QtCore import QPoint  # noqa: E402
+from PyQt5.QtCore import QPoint, Qt  # noqa: E402
+from PyQt5.QtTest import QTest  # noqa: E402
 from PyQt5.QtWidgets import QApplication, QLabel, QPushButton, QWidget  # noqa: E402
 
+import history_index  # noqa: E402
+import history_store  # noqa: E402
+import history_view  # noqa: E402
 import settings_window as sw  # noqa: E402
+import translation_telemetry  # noqa: E402
 
 
 class _SettingsParent(QWidget):
@@ -103,6 +108,7 @@ class SettingsSecondaryViewsTest(unittest.TestCase):
         self.app.processEvents()
         self.tesseract_patch.stop()
         self.data_patch.stop()
+        history_index.close_history_indexes()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
 
     @staticmethod
@@ -110,6 +116,25 @@ class SettingsSecondaryViewsTest(unittest.TestCase):
         point = child.mapTo(widget, QPoint(0, 0))
         return point.x(), point.y(), child.width(), child.height()
 
+    @staticmethod
+    def _history_records(view):
+        model = view.model()
+        return [model.index(row, 0).data(history_view.RecordRole) for row in range(model.rowCount())]
+
+    def _rendered_history(self, view):
+        model = view.model()
+        return "\n".join(model.index(row, 0).data() for row in range(model.rowCount()))
+
+    def _click_history_action(self, view, row, action, field):
+        index = view.model().index(row, 0)
+        view.scrollTo(index)
+        self.app.processEvents()
+        for name, field_name, _text, rect in view.itemDelegate().actions(index, view.visualRect(index)):
+            if (name, field_name) == (action, field):
+                QTest.mouseClick(view.viewport(), Qt.LeftButton, pos=rect.center())
+                return
+        self.fail(f"No {action} button for {field} in row {row}")
+
     def test_hotkeys_are_six_aligned_rows_inside_one_card(self):
         self.settings.show_hotkeys_screen()
         self.app.processEvents()
@@ -227,22 +252,27 @@ class SettingsSecondaryViewsTest(unittest.TestCase):
         self.settings.show_history_view()
         self.app.processEvents()
 
+        view = self.settings.history_scroll_area
         self.assertEqual(self.settings.history_count_label.text(), "2")
-        self.assertEqual(self.settings.history_scroll_area.objectName(), "historyScroll")
-        self.assertGreaterEqual(self.settings.history_scroll_area.minimumHeight(), 190)
-        self.assertEqual(len(self.settings.history_record_cards), 2)
-        rendered = "\n".join(
-            label.text()
-            for card in self.settings.history_record_cards
-            for label in card.findChildren(QLabel)
-        )
+        self.assertEqual(view.objectName(), "historyScroll")
+        self.assertGreaterEqual(view.minimumHeight(), 190)
+        self.assertEqual(len(self._history_records(view)), 2)
+        rendered = self._rendered_history(view)
         self.assertIn("Bom dia.", rendered)
         self.assertIn("The window is ready.", rendered)
-        for card in self.settings.history_record_cards:
-            self.assertEqual(card.objectName(), "historyRecordCard")
-            self.assertEqual(len(card.findChildren(QPushButton, "historyCopyButton")), 2)
-            self.assertEqual(len(card.findChildren(QPushButton, "historyDeleteButton")), 2)
-            self.assertEqual(len(card.findChildren(sw.QFrame, "historyTextBlock")), 2)
+        for row in range(2):
+            index = view.model().index(row, 0)
+            actions = [
+                (action, field)
+                for action, field, _text, _rect in view.itemDelegate().actions(index, view.visualRect(index))
+            ]
+            self.assertEqual(
+                sorted(actions),
+                [("copy", "original"), ("copy", "translated"), ("delete", "original"), ("delete", "translated")],
+            )
+        # Records are painted, not built out of widgets.
+        self.assertEqual(view.findChildren(QPushButton), [])
+        self.assertFalse(view.viewport().grab().isNull())
         self.assertNotIn("━", rendered)
         self.assertEqual(self.settings.history_clear_button.objectName(), "secondaryClearButton")
         self.assertEqual(self.settings.history_back_button.objectName(), "secondaryBackButton")
@@ -262,30 +292,65 @@ class SettingsSecondaryViewsTest(unittest.TestCase):
         self.assertEqual(self.settings.copy_history_back_button.objectName(), "secondaryBackButton")
         empty = self.settings.copy_history_scroll_area.findChild(QLabel, "historyEmptyState")
         self.assertIsNotNone(empty)
+        self.assertTrue(empty.isVisible())
         self.assertIn("History is empty", empty.text())
 
     def test_history_card_copy_and_delete_actions_update_real_data(self):
         self.settings.show_history_view()
         self.app.processEvents()
 
-        with open(os.path.join(self.temp_dir, "translation_history.json"), "r", encoding="utf-8") as stream:
-            expected_latest = json.load(stream)[-1]["translated"]
-        latest_card = self.settings.history_record_cards[0]
-        translated_copy = next(
-            button
-            for button in latest_card.findChildren(QPushButton, "historyCopyButton")
-            if button.property("historyField") == "translated"
-        )
-        translated_copy.click()
+        view = self.settings.history_scroll_area
+        expected_latest = history_store.read_history(self.temp_dir, history_store.TRANSLATION_HISTORY)[-1]["translated"]
+        self._click_history_action(view, 0, "copy", "translated")
         self.assertEqual(self.app.clipboard().text(), expected_latest)
 
-        latest_card.findChild(QPushButton, "historyDeleteButton").click()
+        self._click_history_action(view, 0, "delete", "original")
         self.app.processEvents()
         self.assertEqual(self.settings.history_count_label.text(), "1")
-        with open(os.path.join(self.temp_dir, "translation_history.json"), "r", encoding="utf-8") as stream:
-            remaining = json.load(stream)
+        remaining = history_store.read_history(self.temp_dir, history_store.TRANSLATION_HISTORY)
         self.assertEqual(len(remaining), 1)
         self.assertEqual(remaining[0]["translated"], "Bom dia.")
+        self.assertEqual(self._history_records(view), remaining)
+
+    def test_history_view_pages_and_filters_through_the_index(self):
+        records = history_store.read_history(self.temp_dir, history_store.TRANSLATION_HISTORY)
+        records += [
+            {
+                "timestamp": "2026-08-03T09:00:00",
+                "language": "de",
+                "original": f"line {index}",
+                "translated": f"Zeile {index}",
+            }
+            for index in range(60)
+        ]
+        history_store.write_history(self.temp_dir, history_store.TRANSLATION_HISTORY, records)
+
+        self.settings.show_history_view()
+        self.app.processEvents()
+        view = self.settings.history_scroll_area
+        self.assertEqual(self.settings.history_count_label.text(), "62")
+        self.assertEqual(view.model().rowCount(), history_index.HISTORY_PAGE_SIZE)
+
+        # Scrolling to the end fetches the next page.
+        scroll_bar = view.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+        self.app.processEvents()
+        self.assertEqual(view.model().rowCount(), 62)
+        self.assertFalse(view.model().canFetchMore())
+        self.assertEqual(self._history_records(view)[-1]["translated"], "Bom dia.")
+
+        filters = self.settings.history_filters
+        filters["search"].setText("Bom")
+        filters["timer"].timeout.emit()
+        self.app.processEvents()
+        self.assertEqual(self.settings.history_count_label.text(), "1")
+
+        filters["search"].clear()
+        filters["language"].setCurrentIndex(filters["language"].findData("ru"))
+        filters["timer"].timeout.emit()
+        self.app.processEvents()
+        self.assertEqual(self.settings.history_count_label.text(), "1")
+        self.assertIn("Окно готово.", self._rendered_history(view))
 
     def test_theme_refresh_restyles_the_open_history_without_losing_records(self):
         self.settings.show_history_view()
@@ -295,13 +360,42 @@ class SettingsSecondaryViewsTest(unittest.TestCase):
 
         style = self.settings.secondary_view_shell.styleSheet()
         self.assertIn("#f6f3fa", style)
+        self.assertEqual(self.settings.history_scroll_area.itemDelegate().colors["surface"], "#f6f3fa")
         self.assertEqual(self.settings.history_count_label.text(), "2")
-        rendered = "\n".join(
-            label.text()
-            for card in self.settings.history_record_cards
-            for label in card.findChildren(QLabel)
-        )
-        self.assertIn("Bom dia.", rendered)
+        self.assertIn("Bom dia.", self._rendered_history(self.settings.history_scroll_area))
+
+    def test_diagnostics_view_lists_engine_and_pair_percentiles(self):
+        telemetry = translation_telemetry.Telemetry()
+        for latency in (0.1, 0.2, 0.3, 2.5):
+            telemetry.record("google", "en", "ru", latency=latency, chars=10, bytes_in=10, bytes_out=20)
+        telemetry.record("google", "de", "en", chars=10, errors=1)
+
+        with mock.patch.object(translation_telemetry, "_telemetry", telemetry):
+            self.settings.show_diagnostics_view()
+            self.app.processEvents()
+            table = self.settings.diagnostics_table
+            self.assertEqual(self.settings.diagnostics_count_label.text(), "5")
+            rows = [
+                [table.item(row, column).text() for column in range(table.columnCount())]
+                for row in range(table.rowCount())
+            ]
+            self.assertEqual([row[0].strip() for row in rows], ["GOOGLE", "de → en", "en → ru"])
+            self.assertEqual(rows[0][1:3], ["5", "20%"])
+            self.assertEqual(rows[1][4], "—")  # the failed pair has no latency
+            self.assertTrue(rows[2][4].endswith(" ms"))
+            self.assertTrue(rows[2][6].endswith(" s"))
+            self.assertEqual(table.item(2, 0).toolTip(), "Sent 40 B, received 80 B")
+
+            self.settings.diagnostics_reset_button.click()
+            self.app.processEvents()
+            self.assertEqual(telemetry.stats(), {})
+            self.assertEqual(table.rowCount(), 1)
+            self.assertIn("No translations recorded", table.item(0, 0).text())
+            self.assertEqual(self.settings.diagnostics_count_label.text(), "0")
+
+        self.settings.diagnostics_back_button.click()
+        self.app.processEvents()
+        self.assertIsNotNone(self.settings.diagnostics_btn)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cache_manager  # noqa: E402
+import provider_health  # noqa: E402
+import rate_limiter  # noqa: E402
+import translater  # noqa: E402
+
+
+class MarkedBatchTest(unittest.TestCase):
+    def test_lost_markers_fall_back_to_one_request_per_text(self):
+        calls = []
+
+        def translate(text):
+            calls.append(text)
+            if text.startswith("[[["):
+                return "markers were removed"
+            return "T:" + text
+
+        result = translater._translate_marked(["one", "two"], translate)
+
+        self.assertEqual(result, [("T:one", ""), ("T:two", "")])
+        self.assertEqual(len(calls), 3)
+
+    def test_a_text_rich_screen_is_split_into_safe_groups(self):
+        calls = []
+
+        def translate(text):
+            calls.append(text)
+            return text
+
+        values = [f"block {index}" for index in range(30)]
+        result = translater._translate_marked(values, translate)
+
+        self.assertEqual([translated for translated, _error in result], values)
+        self.assertEqual(len(calls), 2)
+
+    def test_a_failed_group_reports_the_error_for_each_text(self):
+        def translate(_text):
+            raise RuntimeError("provider down")
+
+        self.assertEqual(
+            translater._translate_marked(["one", "two"], translate),
+            [("", "provider down"), ("", "provider down")],
+        )
+
+
+class TranslateBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix="cnt_batch_")
+        cache_manager.invalidate_translation_cache()
+        provider_health.reset_health()
+        rate_limiter.reset_rate_limits()
+        self.config = {"translator_engine": "google", "translation_memory": False}
+        patches = [
+            mock.patch.object(translater, "get_data_file", side_effect=lambda name: os.path.join(self.data_dir, name)),
+            mock.patch.object(translater, "get_cached_translator_config", side_effect=lambda: self.config),
+            mock.patch.object(translater, "_try_argos_translate", return_value=None),
+            mock.patch.dict(
+                rate_limiter.DEFAULT_RATE_LIMITS,
+                dict.fromkeys(translater._ONLINE_ENGINES, rate_limiter.RateLimit(rate=1000.0, burst=1000)),
+            ),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        cache_manager.invalidate_translation_cache()
+        provider_health.reset_health()
+        rate_limiter.reset_rate_limits()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_google_sends_many_texts_in_one_request(self):
+        requests_sent = []
+
+        def fake_get(url, params=None, timeout=None):
+            requests_sent.append((url, params))
+            texts = [value for key, value in params if key == "q"]
+            return mock.Mock(status_code=200, json=lambda: [text.upper() for text in texts], raise_for_status=lambda: None)
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(get=fake_get)):
+            items = translater.translate_batch(["one", "two", "", "one", "three"], "en", "ru")
+
+        self.assertEqual([item.translated for item in items], ["ONE", "TWO", "", "ONE", "THREE"])
+        self.assertTrue(all(item.ok for item in items))
+        self.assertEqual(len(requests_sent), 1)
+        self.assertTrue(requests_sent[0][0].endswith("/translate_a/t"))
+        self.assertEqual([value for key, value in requests_sent[0][1] if key == "q"], ["one", "two", "three"])
+
+        # The translations are cached: a second batch sends nothing.
+        with mock.patch.object(translater, "_get_http_session", side_effect=AssertionError("no request expected")):
+            again = translater.translate_batch(["two", "three"], "en", "ru")
+        self.assertEqual([item.translated for item in again], ["TWO", "THREE"])
+
+    def test_libretranslate_sends_q_as_an_array(self):
+        self.config["translator_engine"] = "libretranslate"
+        payloads = []
+
+        def fake_post(url, json=None, timeout=None):
+            payloads.append(json)
+            return SimpleNamespace(status_code=200, headers={}, json=lambda: {"translatedText": [f"<{q}>" for q in json["q"]]})
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(post=fake_post)):
+            items = translater.translate_batch(["one", "two"], "en", "ru")
+
+        self.assertEqual([item.translated for item in items], ["<one>", "<two>"])
+        self.assertEqual([payload["q"] for payload in payloads], [["one", "two"]])
+
+    def test_a_mismatched_native_answer_falls_back_to_marked_groups(self):
+        def fake_get(url, params=None, timeout=None):
+            return mock.Mock(status_code=200, json=lambda: ["only one"], raise_for_status=lambda: None)
+
+        def fake_google(text, source_code, target_code):
+            return text.replace("one", "ONE").replace("two", "TWO")
+
+        with mock.patch.object(translater, "_get_http_session", return_value=SimpleNamespace(get=fake_get)):
+            with mock.patch.object(translater, "google_translate", side_effect=fake_google) as single:
+                items = translater.translate_batch(["one", "two"], "en", "ru")
+
+        self.assertEqual([item.translated for item in items], ["ONE", "TWO"])
+        self.assertEqual(single.call_count, 1)
+
+    def test_errors_are_reported_per_text(self):
+        self.config["translator_engine"] = "lingva"
+
+        def fake_lingva(text, source_code, target_code, hedge=False, cancelled=None):
+            if text.startswith("[[["):
+                return "no markers"
+            if text == "bad":
+                raise RuntimeError("Lingva translate failed: boom")
+            return text.upper()
+
+        with mock.patch.object(translater, "lingva_translate", side_effect=fake_lingva):
+            items = translater.translate_batch(["good", "bad"], "en", "ru")
+
+        self.assertEqual(items[0], translater.BatchTranslation("good", "GOOD", ""))
+        self.assertEqual(items[1].translated, "")
+        self.assertIn("boom", items[1].error)
+        self.assertFalse(items[1].ok)
+
+    def test_argos_translates_the_whole_batch_in_one_worker_run(self):
+        self.config["translator_engine"] = "argos"
+        requests_sent = []
+
+        def fake_worker(request, **_kwargs):
+            requests_sent.append(request)
+            return {"results": [text[::-1] for text in request["texts"]], "error": ""}
+
+        with mock.patch.object(translater, "_argos_worker_path", return_value="ArgosWorker.exe"):
+            with mock.patch.object(translater, "_run_argos_worker_request", side_effect=fake_worker):
+                items = translater.translate_batch(["abc", "def", "ghi"], "en", "ru")
+
+        self.assertEqual([item.translated for item in items], ["cba", "fed", "ihg"])
+        self.assertEqual([request["action"] for request in requests_sent], ["translate_batch"])
+
+
+if __name__ == "__main__":
+    unittest.main()
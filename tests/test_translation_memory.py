@@ -0,0 +1,214 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cache_manager  # noqa: E402
+import translater  # noqa: E402
+
+
+class TranslationMemoryTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix="cnt_memory_")
+        cache_manager.invalidate_translation_cache()
+        self.sent = []
+        patches = [
+            mock.patch.object(
+                translater, "get_data_file", side_effect=lambda name: os.path.join(self.data_dir, name)
+            ),
+            mock.patch.object(
+                translater, "get_cached_translator_config", return_value={"translator_engine": "google"}
+            ),
+            mock.patch.object(translater, "google_translate", side_effect=self._fake_google),
+            mock.patch.object(translater, "google_translate_batch", side_effect=self._fake_google_batch),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        cache_manager.invalidate_translation_cache()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def _fake_google(self, text, source_code, target_code):
+        self.sent.append(text)
+        return "\n".join(line.upper() for line in text.split("\n"))
+
+    def _fake_google_batch(self, texts, source_code, target_code):
+        self.sent.append(list(texts))
+        return [text.upper() for text in texts]
+
+    def test_segments_split_and_reassemble_exactly(self):
+        text = "Hello world. How are you?\nSecond line\n\n  Third. Fourth!  "
+        segments, gaps = translater._segment_text(text)
+
+        self.assertEqual(segments, ["Hello world.", "How are you?", "Second line", "Third.", "Fourth!"])
+        rebuilt = gaps[0] + "".join(segment + gap for segment, gap in zip(segments, gaps[1:]))
+        self.assertEqual(rebuilt, text)
+
+    def test_only_new_sentences_reach_the_provider(self):
+        before = translater.translation_memory_stats()
+        first = translater.translate_text("One fish. Two fish.\nRed fish.", "en", "ru")
+        second = translater.translate_text("One fish. Blue fish.\nRed fish.", "en", "ru")
+
+        self.assertEqual(first, "ONE FISH. TWO FISH.\nRED FISH.")
+        self.assertEqual(second, "ONE FISH. BLUE FISH.\nRED FISH.")
+        self.assertEqual(self.sent, [["One fish.", "Two fish.", "Red fish."], ["Blue fish."]])
+        after = translater.translation_memory_stats()
+        self.assertEqual(after["segments"] - before["segments"], 6)
+        self.assertEqual(after["segment_hits"] - before["segment_hits"], 2)
+
+    def test_sentences_the_batch_did_not_return_are_sent_again_alone(self):
+        translater.translate_text("One fish. Two fish.", "en", "ru")
+        self.sent.clear()
+
+        def losing(texts, *_args):
+            self.sent.append(list(texts))
+            return ["ТРИ.", None]
+
+        with mock.patch.object(translater, "google_translate_batch", side_effect=losing):
+            result = translater.translate_text("One fish. Three fish. Four fish.", "en", "ru")
+
+        self.assertEqual(self.sent, [["Three fish.", "Four fish."], "Four fish."])
+        self.assertEqual(result, "ONE FISH. ТРИ. FOUR FISH.")
+
+    def test_merged_blocks_are_retried_alone_and_the_aligned_ones_kept(self):
+        def merging(text, *_args):
+            self.sent.append(text)
+            # Runs the first two blocks of a marked request together.
+            return text.upper().replace("[[[CXT0001]]]\n", "")
+
+        with mock.patch.object(
+            translater, "get_cached_translator_config", return_value={"translator_engine": "mymemory"}
+        ), mock.patch.object(translater, "mymemory_translate", side_effect=merging):
+            result = translater.translate_text("A one. B two.\nC three.", "en", "ru")
+
+        self.assertEqual(
+            self.sent,
+            ["[[[CXT0000]]]\nA one.\n[[[CXT0001]]]\nB two.\n[[[CXT0002]]]\nC three.", "A one.", "B two."],
+        )
+        self.assertEqual(result, "A ONE. B TWO.\nC THREE.")
+
+    def test_a_sentence_that_fails_is_an_error_and_the_rest_is_remembered(self):
+        def failing(text, *_args):
+            self.sent.append(text)
+            if text == "Bad one.":
+                raise RuntimeError("provider down")
+            # The marked request comes back without the second block.
+            return text.upper().replace("BAD ONE.", "")
+
+        config = {"translator_engine": "mymemory"}
+        with mock.patch.object(translater, "get_cached_translator_config", return_value=config), \
+                mock.patch.object(translater, "mymemory_translate", side_effect=failing):
+            with self.assertRaisesRegex(RuntimeError, "provider down"):
+                translater.translate_text("Good one. Bad one.", "en", "ru")
+
+        self.assertNotIn("Good one. Bad one.", self.sent)
+        self.assertEqual(
+            cache_manager.get_cached_segments(self.data_dir, ["Good one.", "Bad one."], "en", "ru", engine="mymemory"),
+            ["GOOD ONE.", None],
+        )
+
+    def test_translation_memory_can_be_disabled(self):
+        with mock.patch.object(
+            translater,
+            "get_cached_translator_config",
+            return_value={"translator_engine": "google", "translation_memory": False},
+        ):
+            translater.translate_text("One fish. Two fish.", "en", "ru")
+
+        self.assertEqual(self.sent, ["One fish. Two fish."])
+
+    def _overlapping(self, texts, fake_google):
+        release = threading.Event()
+        results = {}
+        before = translater.single_flight_stats()
+
+        def blocking_google(text, source_code, target_code):
+            release.wait(5)
+            return fake_google(text)
+
+        def worker(index, text):
+            try:
+                results[index] = translater.translate_text(text, "en", "ru")
+            except Exception as exc:
+                results[index] = exc
+
+        with mock.patch.object(translater, "google_translate", side_effect=blocking_google) as provider:
+            threads = [threading.Thread(target=worker, args=item) for item in enumerate(texts)]
+            for thread in threads:
+                thread.start()
+            deadline = time.monotonic() + 5
+            while (
+                translater.single_flight_stats()["collapsed"] - before["collapsed"] < len(texts) - 1
+                and time.monotonic() < deadline
+            ):
+                time.sleep(0.005)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+        collapsed = translater.single_flight_stats()["collapsed"] - before["collapsed"]
+        return [results[index] for index in range(len(texts))], provider.call_count, collapsed
+
+    def test_overlapping_identical_requests_share_one_provider_call(self):
+        # The second capture differs only in OCR whitespace: the cache would
+        # answer both with one translation, so they share the request too.
+        results, calls, collapsed = self._overlapping(
+            ["Hello there", "Hello there", "Hello  there "], lambda text: text.upper()
+        )
+
+        self.assertEqual(results, ["HELLO THERE"] * 3)
+        self.assertEqual(calls, 1)
+        self.assertEqual(collapsed, 2)
+
+    def test_callers_that_join_a_translation_get_its_status_updates(self):
+        release = threading.Event()
+        statuses = {"first": [], "second": []}
+        before = translater.single_flight_stats()
+
+        def uncached(text, *_args, status_callback=None, **_kwargs):
+            release.wait(5)
+            status_callback("Translating…")
+            return text.upper()
+
+        def worker(name):
+            translater.translate_text("Hello there", "en", "ru", status_callback=statuses[name].append)
+
+        with mock.patch.object(translater, "_translate_uncached", side_effect=uncached) as provider:
+            first = threading.Thread(target=worker, args=("first",))
+            first.start()
+            while not translater._in_flight:
+                time.sleep(0.005)
+            second = threading.Thread(target=worker, args=("second",))
+            second.start()
+            deadline = time.monotonic() + 5
+            while translater.single_flight_stats()["collapsed"] == before["collapsed"] and time.monotonic() < deadline:
+                time.sleep(0.005)
+            release.set()
+            first.join(5)
+            second.join(5)
+
+        self.assertEqual(provider.call_count, 1)
+        self.assertEqual(statuses, {"first": ["Translating…"], "second": ["Translating…"]})
+
+    def test_a_failure_reaches_every_waiting_caller(self):
+        def failing(_text):
+            raise RuntimeError("provider down")
+
+        results, calls, _collapsed = self._overlapping(["Hello there"] * 2, failing)
+
+        self.assertEqual(calls, 1)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(translater._in_flight, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
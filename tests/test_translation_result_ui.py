@@ -491,7 +491,7 @@ class TranslationResultUiTest(unittest.TestCase):
         dialog = self._pair_dialog()
         calls = []
 
-        def fake_translate(text, source, target):
+        def fake_translate(text, source, target, cancel_token=None):
             calls.append((text, source, target))
             return "Hallo Welt"
 
@@ -581,7 +581,7 @@ class TranslationResultUiTest(unittest.TestCase):
                 mock.patch.object(
                     translater,
                     "translate_text",
-                    lambda text, src, tgt: calls.append((text, src, tgt)) or "Hola mundo",
+                    lambda text, src, tgt, cancel_token=None: calls.append((text, src, tgt)) or "Hola mundo",
                 ):
             dialog.swap_button.click()
         self.app.processEvents()
@@ -599,7 +599,7 @@ class TranslationResultUiTest(unittest.TestCase):
                 mock.patch.object(
                     translater,
                     "translate_text",
-                    lambda text, src, tgt: calls.append((src, tgt)) or "ok",
+                    lambda text, src, tgt, cancel_token=None: calls.append((src, tgt)) or "ok",
                 ):
             dialog.source_combo.setCurrentIndex(dialog.source_combo.findData("en"))
         self.app.processEvents()
@@ -614,7 +614,7 @@ class TranslationResultUiTest(unittest.TestCase):
     def test_failed_retranslate_keeps_the_previous_result_and_reports_it(self):
         dialog = self._pair_dialog()
 
-        def boom(_text, _source, _target):
+        def boom(_text, _source, _target, cancel_token=None):
             raise RuntimeError("no network")
 
         with mock.patch.object(main.threading, "Thread", _immediate_thread), \
@@ -630,6 +630,29 @@ class TranslationResultUiTest(unittest.TestCase):
         self.assertTrue(dialog.swap_button.isEnabled())
         dialog.close()
 
+    def test_closing_the_window_cancels_a_retranslation_in_flight(self):
+        dialog = self._pair_dialog()
+        dialog.show()
+        workers = []
+        tokens = []
+
+        def fake_translate(_text, _source, _target, cancel_token=None):
+            tokens.append(cancel_token)
+            cancel_token.raise_if_cancelled()
+            return "Hallo Welt"
+
+        with mock.patch.object(main.threading, "Thread", lambda target=None, **_kwargs: SimpleNamespace(
+            start=lambda: workers.append(target)
+        )):
+            dialog.target_combo.setCurrentIndex(dialog.target_combo.findData("de"))
+        dialog.close()
+        with mock.patch.object(translater, "translate_text", fake_translate):
+            workers[0]()
+        self.app.processEvents()
+
+        self.assertTrue(tokens[0].cancelled)
+        self.assertEqual(dialog.translated_text, "Hello world")
+
     def test_swap_tooltip_is_localized_in_every_language(self):
         for lang in main.TRANSLATION_RESULT_DIALOG_TEXT:
             dialog = self._pair_dialog(lang=lang)
@@ -0,0 +1,145 @@
+import json
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cancellation  # noqa: E402
+import translater  # noqa: E402
+import translation_telemetry  # noqa: E402
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def telemetry(tmp_path):
+    clock = _Clock()
+    found = translation_telemetry.Telemetry(clock=clock)
+    found.configure(str(tmp_path / translation_telemetry.TELEMETRY_FILE))
+    found.clock = clock
+    return found
+
+
+def test_percentiles_follow_the_recorded_latencies(telemetry):
+    for latency_ms in range(1, 1001):
+        telemetry.record("google", "en", "ru", latency=latency_ms / 1e3, chars=10)
+
+    stats = telemetry.stats()["google"]
+    assert stats["requests"] == 1000
+    assert stats["samples"] == 1000
+    # A bucket is BUCKET_GROWTH wide, so an estimate is off by less than that.
+    for key, expected in (("p50_ms", 500), ("p95_ms", 950), ("p99_ms", 990)):
+        assert expected / translation_telemetry.BUCKET_GROWTH < stats[key] <= expected * translation_telemetry.BUCKET_GROWTH
+    assert stats["max_ms"] == pytest.approx(1000)
+    assert stats["mean_ms"] == pytest.approx(500.5)
+
+
+def test_errors_cache_hits_and_bytes_are_counted_per_pair_and_size(telemetry):
+    telemetry.record("google", "en", "ru", latency=0.2, chars=5, bytes_in=5, bytes_out=12)
+    telemetry.record("google", "en", "ru", chars=5, bytes_in=5, bytes_out=12, cache_hits=1)
+    telemetry.record("google", "de", "en", chars=3000, bytes_in=3000, errors=1)
+    telemetry.record("Lingva", "en", "ru", latency=1.5, chars=8)
+
+    stats = telemetry.stats()
+    google = stats["google"]
+    assert google["requests"] == 3
+    assert google["errors"] == 1
+    assert google["error_rate"] == pytest.approx(1 / 3)
+    assert google["cache_hit_rate"] == pytest.approx(1 / 3)
+    assert google["samples"] == 1  # neither the cache hit nor the error is timed
+    assert (google["bytes_in"], google["bytes_out"]) == (3010, 24)
+    assert set(google["pairs"]) == {"en-ru", "de-en"}
+    assert google["pairs"]["de-en"]["error_rate"] == 1.0
+    assert set(google["sizes"]) == {"short", "long"}
+    assert stats["lingva"]["p50_ms"] > 1000
+
+
+def test_counters_are_saved_periodically_and_survive_a_restart(telemetry, tmp_path):
+    path = tmp_path / translation_telemetry.TELEMETRY_FILE
+    telemetry.record("google", "en", "ru", latency=0.1, chars=5)
+    assert not path.exists()  # not due yet
+
+    telemetry.clock.now += translation_telemetry.SAVE_INTERVAL
+    telemetry.record("google", "en", "ru", latency=0.3, chars=5)
+    assert json.loads(path.read_text(encoding="utf-8"))["version"] == translation_telemetry.FORMAT_VERSION
+
+    restarted = translation_telemetry.Telemetry()
+    restarted.record("google", "en", "ru", latency=0.2, chars=5)
+    restarted.configure(str(path))
+    stats = restarted.stats()["google"]
+    assert stats["requests"] == 3
+    assert stats["samples"] == 3
+    assert stats["max_ms"] == pytest.approx(300)
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / translation_telemetry.TELEMETRY_FILE
+    path.write_text("{not json", encoding="utf-8")
+    found = translation_telemetry.Telemetry()
+    found.configure(str(path))
+    assert found.stats() == {}
+
+    found.record("google", "en", "ru", latency=0.1)
+    assert found.flush()
+    assert json.loads(path.read_text(encoding="utf-8"))["series"][0]["engine"] == "google"
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    found = translation_telemetry.Telemetry()
+    config = {"translator_engine": "google", "translation_memory": False}
+    with mock.patch.object(translation_telemetry, "_telemetry", found), \
+            mock.patch.object(translater, "get_cached_translator_config", return_value=config), \
+            mock.patch.object(translater, "get_data_file", side_effect=lambda name: str(tmp_path / name)):
+        yield found
+
+
+def test_translate_text_records_calls_cache_hits_and_failures(recorded):
+    with mock.patch.object(translater, "_translate_uncached", return_value="Привет"):
+        assert translater.translate_text("Hello", "en", "ru") == "Привет"
+        assert translater.translate_text("Hello", "en", "ru") == "Привет"
+    with mock.patch.object(translater, "_translate_uncached", return_value=None):
+        assert not translater.translate_text("Broken", "en", "ru")
+
+    stats = translater.translation_telemetry_stats()["google"]
+    assert stats["requests"] == 3
+    assert stats["cache_hits"] == 1
+    assert stats["errors"] == 1
+    assert stats["samples"] == 1
+    assert stats["bytes_out"] == len("Привет".encode("utf-8")) * 2
+
+
+def test_cancelled_translation_is_not_an_error(recorded):
+    token = cancellation.CancelToken()
+
+    def _cancel(*_args, **_kwargs):
+        token.cancel()
+        raise translater.TranslationCancelledError("Translation cancelled")
+
+    with mock.patch.object(translater, "_translate_uncached", side_effect=_cancel):
+        with pytest.raises(translater.TranslationCancelledError):
+            translater.translate_text("Hello", "en", "ru", cancel_token=token)
+
+    stats = translater.translation_telemetry_stats()["google"]
+    assert (stats["requests"], stats["cancelled"], stats["errors"]) == (1, 1, 0)
+
+
+def test_translate_batch_is_one_timed_batch_sample(recorded):
+    with mock.patch.object(translater, "google_translate_batch", return_value=["Один", "Два"]):
+        results = translater.translate_batch(["One", "Two", ""], "en", "ru")
+
+    assert [item.translated for item in results] == ["Один", "Два", ""]
+    stats = translater.translation_telemetry_stats()["google"]
+    assert stats["requests"] == 2  # the empty text was never translated
+    assert stats["errors"] == 0
+    assert stats["sizes"]["batch"]["samples"] == 1
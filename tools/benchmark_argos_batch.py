@@ -0,0 +1,102 @@
+"""Compare Argos throughput text by text and with batched sentences.
+
+Argos used to translate one text at a time, each paragraph in its own
+CTranslate2 call. argos_batch sends the sentences of all texts through the
+model together, in batches sized by token budget. For an installed pair
+(a pivot route works too), this translates a set of short texts both ways
+and prints sentences per second and whether the outputs agree. The model is
+loaded and warmed up before either run is timed.
+
+    python tools/benchmark_argos_batch.py --source en --target ru
+    python tools/benchmark_argos_batch.py --source de --target ru --texts 200 --file page.txt
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import argos_batch  # noqa: E402
+import translater  # noqa: E402
+
+SENTENCES = (
+    "The train to the airport leaves every twenty minutes.",
+    "Please keep your ticket until the end of the journey.",
+    "Our office is closed on public holidays.",
+    "Click the button below to confirm your email address.",
+    "The weather will be sunny with a light breeze in the afternoon.",
+    "Thank you for your order, it will be shipped tomorrow.",
+    "This setting only applies to new documents.",
+    "He opened the window and looked at the empty street.",
+)
+
+
+def _sample_texts(count, sentences_per_text):
+    texts = []
+    for index in range(count):
+        sentences = [SENTENCES[(index + offset) % len(SENTENCES)] for offset in range(sentences_per_text)]
+        texts.append(" ".join(sentences))
+    return texts
+
+
+def _file_texts(path, count):
+    lines = [line.strip() for line in Path(path).read_text(encoding="utf-8").splitlines() if line.strip()]
+    return lines[:count] if count else lines
+
+
+def _timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default="en", help="source language code")
+    parser.add_argument("--target", default="ru", help="target language code")
+    parser.add_argument("--texts", type=int, default=64, help="number of texts to translate")
+    parser.add_argument("--sentences", type=int, default=2, help="sentences per sample text")
+    parser.add_argument("--file", help="translate the non-empty lines of this file instead of the samples")
+    args = parser.parse_args()
+
+    if not translater._ensure_argos_available():
+        print("Argos Translate is not available.", file=sys.stderr)
+        return 1
+    translation = translater._get_translation_object(args.source, args.target)
+    if translation is None:
+        print(f"No Argos route for {args.source} -> {args.target} is installed.", file=sys.stderr)
+        return 1
+    route = argos_batch.package_route(translation, translater.arg_tr)
+    if route is None:
+        print("This Argos version cannot be batched; the per-text path is used.", file=sys.stderr)
+        return 1
+
+    texts = _file_texts(args.file, args.texts) if args.file else _sample_texts(max(1, args.texts), max(1, args.sentences))
+    sentence_count = sum(
+        len(translater.split_sentences(paragraph)) for text in texts for paragraph in text.split("\n")
+    )
+    translation.translate(texts[0])  # loads the model(s)
+
+    before, before_seconds = _timed(lambda: [translation.translate(text) for text in texts])
+    batches = []
+    after, after_seconds = _timed(
+        lambda: argos_batch.translate_texts(translation, texts, translater.arg_tr, translater.split_sentences, batches)
+    )
+
+    legs = " -> ".join(f"{step.pkg.from_code}-{step.pkg.to_code}" for step in route) or "identity"
+    same = sum(a == b for a, b in zip(before, after))
+    print(f"route {legs}: {len(texts)} texts, {sentence_count} sentences")
+    print(f"text by text  {before_seconds:8.2f} s  {sentence_count / before_seconds:8.1f} sentences/s")
+    print(
+        f"batched       {after_seconds:8.2f} s  {sentence_count / after_seconds:8.1f} sentences/s  "
+        f"({len(batches)} calls, {after_seconds and before_seconds / after_seconds:.1f}x)"
+    )
+    print(f"identical outputs: {same}/{len(texts)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
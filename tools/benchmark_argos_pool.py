@@ -0,0 +1,102 @@
+"""Measure how offline document translation scales with Argos pool workers.
+
+Document chunks are translated by a pool of resident Argos workers
+(argos_pool), several at once. For an installed pair, this translates the
+chunks of a sample document, or of --file, with pools of each size in
+--workers. Every worker gets its share of the cores as CTranslate2 threads,
+as in the app, and is warmed up before the run is timed. It prints
+sentences per second and the speed-up over one worker, next to the size
+pool_size() picks for this machine.
+
+    python tools/benchmark_argos_pool.py --source en --target ru
+    python tools/benchmark_argos_pool.py --source en --target de --workers 1 2 4 8 --file book.txt
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import argos_pool  # noqa: E402
+import document_parser  # noqa: E402
+import document_translation  # noqa: E402
+import provider_capabilities  # noqa: E402
+import translater  # noqa: E402
+
+SAMPLE = (
+    "The committee met on Tuesday to review the budget for the coming year. "
+    "Several members asked for more time to study the proposal before the vote. "
+    "The chair agreed and moved the decision to the next meeting. "
+)
+
+
+def _chunks(text):
+    capabilities = provider_capabilities.capabilities("argos")
+    return [chunk.text for chunk in document_translation.split_text_chunks(text, capabilities=capabilities)]
+
+
+def _run(command, workers, chunks, source, target):
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    pool = argos_pool.ArgosPool(command, workers, threads)
+    request = {"action": "translate", "source_code": source, "target_code": target, "allow_install": False}
+    try:
+        # Start every worker and load its model outside the timed run.
+        pool.map(lambda _index: pool.request({**request, "text": "Warm up."}), range(workers))
+        started = time.perf_counter()
+        payloads = pool.map(lambda chunk: pool.request({**request, "text": chunk}), chunks)
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.shutdown()
+    errors = [payload["error"] for payload in payloads if payload.get("error")]
+    if errors:
+        raise RuntimeError(errors[0])
+    return elapsed, threads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default="en", help="source language code")
+    parser.add_argument("--target", default="ru", help="target language code")
+    parser.add_argument("--workers", type=int, nargs="+", help="pool sizes to measure; default: 1, 2, 4 ... cores")
+    parser.add_argument("--paragraphs", type=int, default=60, help="paragraphs of the sample document")
+    parser.add_argument("--file", help="a document to translate instead of the sample")
+    args = parser.parse_args()
+
+    command = translater._argos_pool_command()
+    if not command:
+        print("No Argos worker can be started from this build.", file=sys.stderr)
+        return 1
+    model_bytes = translater.argos_model_bytes(args.source, args.target)
+    if not model_bytes:
+        print(f"No Argos route for {args.source} -> {args.target} is installed.", file=sys.stderr)
+        return 1
+
+    if args.file:
+        text = document_parser.parse_document(args.file).text
+    else:
+        text = "\n\n".join(SAMPLE * (1 + index % 3) for index in range(max(1, args.paragraphs)))
+    chunks = _chunks(text)
+    sentences = sum(len(translater.split_sentences(line)) for chunk in chunks for line in chunk.split("\n"))
+    cores = os.cpu_count() or 1
+    sizes = args.workers or sorted({1} | {2 ** power for power in range(1, 4) if 2 ** power <= cores})
+    picked = argos_pool.pool_size(model_bytes, memory=argos_pool.available_memory())
+
+    print(
+        f"{args.source}-{args.target}: {len(chunks)} chunks, {sentences} sentences, "
+        f"models {model_bytes / 1024 ** 2:.0f} MB, {cores} cores; pool_size() picks {picked[0]} x {picked[1]} threads"
+    )
+    baseline = None
+    for workers in sizes:
+        elapsed, threads = _run(command, max(1, workers), chunks, args.source, args.target)
+        rate = sentences / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>3} workers x {threads:>2} threads  {elapsed:8.2f} s  {rate:8.1f} sentences/s  {rate / baseline:5.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+"""Report how many provider requests a document takes with each engine.
+
+Document chunks used to be a fixed 1800 characters for every engine, and
+Google re-split them at 1500 characters whatever the script. They are now
+packed to each engine's real request limits (provider_capabilities). For a
+sample document in Latin, Cyrillic and CJK script, or for --file, this
+prints the requests per document before and after. "too big" counts the old
+requests that exceed the engine's real limit and would fail. "fill" is the
+largest payload now sent, as a share of the limit.
+
+    python tools/benchmark_document_requests.py
+    python tools/benchmark_document_requests.py --file book.txt --engine google
+"""
+
+import argparse
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import document_parser  # noqa: E402
+import document_translation  # noqa: E402
+import provider_capabilities  # noqa: E402
+
+OLD_CHUNK_CHARS = 1800
+OLD_GOOGLE_CHUNK_CHARS = 1500
+
+SAMPLES = {
+    "latin": "The quick brown fox jumps over the lazy dog while the farmer watches from the porch. ",
+    "cyrillic": "Съешь же ещё этих мягких французских булок, да выпей чаю, сказал старый мельник. ",
+    "cjk": "我能吞下玻璃而不伤身体。今天的天气很好，我们去公园散步吧。",
+}
+
+
+def _sample_document(sentence, paragraphs):
+    return "\n\n".join(sentence * (2 + index % 7) for index in range(paragraphs))
+
+
+def _old_requests(text, engine):
+    unlimited = provider_capabilities.ProviderCapabilities(max_chars=OLD_CHUNK_CHARS, max_payload_bytes=10**9)
+    chunks = [chunk.text for chunk in document_translation.split_text_chunks(text, capabilities=unlimited)]
+    if engine != "google":
+        return chunks
+    google = replace(unlimited, max_chars=OLD_GOOGLE_CHUNK_CHARS)
+    requests = []
+    for chunk in chunks:
+        requests.extend(
+            [chunk] if len(chunk) <= OLD_GOOGLE_CHUNK_CHARS else provider_capabilities.chunk_text(chunk.split("\n"), google)
+        )
+    return requests
+
+
+def report(name, text, engines):
+    for engine in engines:
+        caps = provider_capabilities.capabilities(engine)
+        before = _old_requests(text, engine)
+        after = [chunk.text for chunk in document_translation.split_text_chunks(text, capabilities=caps)]
+        too_big = sum(not caps.fits(request) for request in before)
+        fill = max(
+            max(caps.payload_size(request) / caps.max_payload_bytes, len(request) / caps.max_chars) for request in after
+        )
+        print(
+            f"{name:<10} {engine:<15} {len(text):>8} chars  "
+            f"before {len(before):>4} ({too_big:>3} too big)  after {len(after):>4}  fill {fill:4.0%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", help="a document to measure instead of the samples")
+    parser.add_argument("--engine", action="append", help="engine to report (repeatable); default: all")
+    parser.add_argument("--paragraphs", type=int, default=200, help="paragraphs per sample document")
+    args = parser.parse_args()
+    engines = args.engine or list(provider_capabilities.CAPABILITIES)
+    if args.file:
+        report(Path(args.file).name, document_parser.parse_document(args.file).text, engines)
+    else:
+        for name, sentence in SAMPLES.items():
+            report(name, _sample_document(sentence, max(1, args.paragraphs)), engines)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
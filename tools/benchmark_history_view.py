@@ -0,0 +1,145 @@
+"""Benchmark opening a large history in the Settings history list.
+
+The history view used to build a widget card per record, so opening it cost
+time and memory in proportion to the whole history. This writes a throw-away
+history of --records translations, opens it in the virtualized list and
+prints the time to the first painted frame, the memory (RSS) the open view
+holds, and what scrolling through every record costs on top; the first two
+should not grow with --records.
+
+    python tools/benchmark_history_view.py
+    python tools/benchmark_history_view.py --records 50000 --copy
+    python tools/benchmark_history_view.py --max-first-paint-ms 250   # exit 1 if slower
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import psutil  # noqa: E402
+from PyQt5 import QtCore  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+import history_index  # noqa: E402
+import history_store  # noqa: E402
+from history_view import HistoryListModel, HistoryListView, HistoryRecordDelegate  # noqa: E402
+from settings_window import SettingsWindow, history_record_text  # noqa: E402
+
+
+class _PaintWatch(QtCore.QObject):
+    def __init__(self):
+        super().__init__()
+        self.painted_at = None
+
+    def eventFilter(self, _watched, event):
+        if event.type() == QtCore.QEvent.Paint and self.painted_at is None:
+            self.painted_at = time.perf_counter()
+        return False
+
+
+def _write_history(data_dir, name, records):
+    lines = []
+    for index in range(records):
+        stamp = f"2026-08-{index % 28 + 1:02d}T{index % 24:02d}:{index % 60:02d}:00"
+        if name == history_store.COPY_HISTORY:
+            record = {"timestamp": stamp, "text": f"Copied line {index} " * (1 + index % 6)}
+        else:
+            record = {
+                "timestamp": stamp,
+                "language": ("en -> ru", "ru -> de", "ja -> en")[index % 3],
+                "original": f"Source sentence number {index}. " * (1 + index % 5),
+                "translated": f"Переведённое предложение {index}. " * (1 + index % 5),
+            }
+        lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+    Path(data_dir, history_store.HISTORY_FILES[name]).write_text("".join(lines), encoding="utf-8")
+
+
+def _rss_mb(process):
+    return process.memory_info().rss / 2**20
+
+
+def run(records, copy_mode, max_first_paint_ms=None):
+    app = QApplication.instance() or QApplication([])
+    process = psutil.Process()
+    name = history_store.COPY_HISTORY if copy_mode else history_store.TRANSLATION_HISTORY
+    # The view lists only what read_history() returns; lift the limit so every
+    # record written here is in the list.
+    history_store.MAX_HISTORY_RECORDS = records
+    palette = SettingsWindow._secondary_palette(SimpleNamespace(parent=SimpleNamespace(current_theme="Темная")))
+    labels = {key: history_record_text("en", key) for key in ("original", "translated", "copy", "delete")}
+
+    with tempfile.TemporaryDirectory(prefix="cnt_history_view_bench_") as data_dir:
+        _write_history(data_dir, name, records)
+        try:
+            began = time.perf_counter()
+            history_index.query_history(data_dir, name, limit=1)
+            index_ms = (time.perf_counter() - began) * 1e3
+
+            app.processEvents()
+            rss_before = _rss_mb(process)
+            began = time.perf_counter()
+            view = HistoryListView()
+            view.setItemDelegate(HistoryRecordDelegate(view, copy_mode, labels, palette))
+            view.setModel(HistoryListModel(data_dir, name, parent=view))
+            view.model().reload()
+            watch = _PaintWatch()
+            view.viewport().installEventFilter(watch)
+            view.resize(640, 480)
+            view.show()
+            deadline = time.monotonic() + 30
+            while watch.painted_at is None and time.monotonic() < deadline:
+                app.processEvents()
+            if watch.painted_at is None:
+                print("the view was never painted")
+                return 1
+            first_paint_ms = (watch.painted_at - began) * 1e3
+            app.processEvents()
+            rss_open = _rss_mb(process)
+
+            began = time.perf_counter()
+            scroll_bar = view.verticalScrollBar()
+            while True:
+                scroll_bar.setValue(scroll_bar.maximum())
+                app.processEvents()
+                if not view.model().canFetchMore():
+                    break
+            scroll_ms = (time.perf_counter() - began) * 1e3
+            loaded = view.model().rowCount()
+            rss_all = _rss_mb(process)
+            view.close()
+        finally:
+            history_index.close_history_indexes()
+
+    print(f"records:          {records} ({name})")
+    print(f"index build:      {index_ms:9.1f} ms")
+    print(f"first paint:      {first_paint_ms:9.1f} ms")
+    print(f"open view:        {rss_open - rss_before:9.1f} MB")
+    print(f"scroll to end:    {scroll_ms:9.1f} ms, {loaded} rows fetched")
+    print(f"all rows fetched: {rss_all - rss_before:9.1f} MB")
+    if max_first_paint_ms is not None and first_paint_ms > max_first_paint_ms:
+        print(f"first paint is slower than {max_first_paint_ms} ms")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--copy", action="store_true", help="benchmark the copy history instead")
+    parser.add_argument("--max-first-paint-ms", type=float, default=None, help="fail above this time to first paint")
+    args = parser.parse_args()
+    return run(max(1, args.records), args.copy, args.max_first_paint_ms)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
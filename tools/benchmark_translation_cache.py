@@ -0,0 +1,77 @@
+"""Benchmark translation-cache inserts as the cache grows.
+
+The cache used to rewrite one JSON file per save, so every insert cost time
+proportional to the cache size. This fills a throw-away cache and prints the
+average insert and lookup cost per block of rows plus the time to write the
+block to disk; the numbers should stay flat.
+
+    python tools/benchmark_translation_cache.py
+    python tools/benchmark_translation_cache.py --rows 20000 --block 2000
+    python tools/benchmark_translation_cache.py --limit 1000   # full-cache eviction
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cache_manager  # noqa: E402
+
+
+def run(rows, block, limit=None):
+    with tempfile.TemporaryDirectory(prefix="cnt_cache_bench_") as root:
+        data_dir = os.path.join(root, "data")
+        # Without --limit both budgets are lifted so the cache keeps growing;
+        # with it every insert past the limit also evicts a row.
+        cache_manager.MAX_TRANSLATION_CACHE = limit or rows + 1
+        cache_manager.MAX_TRANSLATION_CACHE_BYTES = 1 << 40
+        cache_manager.invalidate_translation_cache()
+        print(f"{'rows':>8}  {'insert µs':>10}  {'lookup µs':>10}  {'flush ms':>9}")
+        try:
+            for start in range(0, rows, block):
+                began = time.perf_counter()
+                for index in range(start, start + block):
+                    cache_manager.save_cached_translation(
+                        data_dir, f"source text {index}", "en", "ru", f"перевод {index}", engine="google"
+                    )
+                insert_us = (time.perf_counter() - began) / block * 1e6
+                began = time.perf_counter()
+                for index in range(start, start + block):
+                    cache_manager.get_cached_translation(
+                        data_dir, f"source text {index}", "en", "ru", engine="google"
+                    )
+                lookup_us = (time.perf_counter() - began) / block * 1e6
+                began = time.perf_counter()
+                cache_manager.flush_translation_cache()
+                flush_ms = (time.perf_counter() - began) * 1e3
+                print(
+                    f"{start + block:>8}  {insert_us:>10.1f}  {lookup_us:>10.1f}  {flush_ms:>9.1f}",
+                    flush=True,
+                )
+            stats = cache_manager.translation_cache_writer_stats()
+            print(
+                f"writer: {stats['saves']} saves, {stats['flushes']} flushes, "
+                f"{stats['saves_per_flush']:.0f} saves per flush, "
+                f"max flush {stats['max_flush_seconds'] * 1e3:.1f} ms"
+            )
+        finally:
+            cache_manager.invalidate_translation_cache()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--block", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=None, help="record limit to evict at")
+    args = parser.parse_args()
+    run(max(1, args.rows), max(1, args.block), args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,17 +1,30 @@
 import requests
+import concurrent.futures
 import json
+import logging
 import os
+import queue
 import sys
 import subprocess
 import re
-import shutil
 import tempfile
+import threading
 import time
 import types
 import zipfile
+from dataclasses import dataclass
 from languages import language_english_name, translator_api_code
+import argos_batch
+import argos_daemon
+import argos_pool
+import cancellation
 import platform_support
 import portable_paths
+import provider_capabilities
+import provider_health
+import provider_sessions
+import rate_limiter
+import translation_telemetry
 
 # Optional Argos Translate (offline). main.py preloads its native runtime before
 # Qt on Windows; importing this module alone remains lightweight until preloaded.
@@ -37,6 +50,11 @@ class ArgosInstallCancelledError(RuntimeError):
     """Raised when the user cancels an Argos language-package download."""
 
 
+# Interactive callers pass a cancellation.CancelToken to translate_text and
+# translate_batch and cancel it when the user closes the window.
+TranslationCancelledError = cancellation.TranslationCancelledError
+
+
 def split_sentences(text):
     """Splits a paragraph into sentences without any native dependency."""
     text = str(text or "")
@@ -709,6 +727,73 @@ def argos_installed_translation_pairs_fast(package_dirs=None):
     return usable
 
 
+_argos_package_sizes_cache = None
+
+
+def _argos_package_sizes(roots):
+    """Disk size of every installed package by (from_code, to_code)."""
+    sizes = {}
+    for root in roots:
+        try:
+            package_names = os.listdir(root)
+        except OSError:
+            continue
+        for package_name in package_names:
+            package_dir = os.path.join(root, package_name)
+            try:
+                with open(os.path.join(package_dir, "metadata.json"), "r", encoding="utf-8") as metadata_file:
+                    metadata = json.load(metadata_file)
+                pair = (str(metadata.get("from_code") or "").lower(), str(metadata.get("to_code") or "").lower())
+            except (OSError, ValueError, TypeError, AttributeError):
+                continue
+            if pair in sizes:
+                continue
+            size = 0
+            for folder, _dirs, files in os.walk(package_dir):
+                for name in files:
+                    try:
+                        size += os.path.getsize(os.path.join(folder, name))
+                    except OSError:
+                        pass
+            sizes[pair] = size
+    return sizes
+
+
+def argos_model_bytes(source_code, target_code, package_dirs=None):
+    """Disk size of the installed packages translating source to target, 0 if none.
+
+    A pair without a direct package pivots through English, as Argos does.
+    The sizes of the installed packages are read once and kept until
+    _argos_packages_changed().
+    """
+    global _argos_package_sizes_cache
+    if package_dirs is not None:
+        sizes = _argos_package_sizes(package_dirs)
+    else:
+        sizes = _argos_package_sizes_cache
+        if sizes is None:
+            sizes = _argos_package_sizes_cache = _argos_package_sizes(_argos_package_data_dirs())
+    source_code, target_code = str(source_code or "").lower(), str(target_code or "").lower()
+    if (source_code, target_code) in sizes:
+        return sizes[(source_code, target_code)]
+    if (source_code, "en") in sizes and ("en", target_code) in sizes:
+        return sizes[(source_code, "en")] + sizes[("en", target_code)]
+    return 0
+
+
+def _argos_packages_changed():
+    """Сбрасывает всё, что зависит от установленных пакетов Argos: кэши и размеры моделей.
+
+    Воркеры пула держат свои кэши языков и переводов, поэтому после установки
+    или удаления пакетов пул останавливается; следующий документ запустит его
+    заново.
+    """
+    global _argos_package_sizes_cache
+    _invalidate_argos_cache()
+    _argos_package_sizes_cache = None
+    argos_pool.shutdown()
+
+
 def _normalize_argos_pairs(pairs):
     """Return unique, valid direct Argos package pairs in input order."""
     normalized = []
@@ -812,7 +897,7 @@ def _install_argos_packages_local(
         completed.append(pair)
         _emit_status(status_callback, f"Пакет {label} установлен")
     if completed:
-        _invalidate_argos_cache()
+        _argos_packages_changed()
     return completed
 
 
@@ -837,7 +922,7 @@ def _uninstall_argos_packages_local(pairs, status_callback=None):
         arg_pkg.uninstall(package)
         removed.append(pair)
     if removed:
-        _invalidate_argos_cache()
+        _argos_packages_changed()
     return removed
 
 
@@ -901,7 +986,7 @@ def ensure_language_pair(
             arg_pkg.install_from_path(download_path)
             print(f"Пакет {pair[0]}->{pair[1]} установлен.")
             _emit_status(status_callback, f"Пакет {label} установлен")
-        _invalidate_argos_cache()
+        _argos_packages_changed()
         return True
     except ArgosInstallCancelledError:
         _emit_status(status_callback, "Установка языкового пакета Argos отменена")
@@ -966,128 +1051,146 @@ def _run_argos_worker_request(
     progress_callback=None,
     cancel_callback=None,
     timeout=1800,
+    worker=None,
 ):
-    worker_path = _argos_worker_path()
-    if not worker_path:
-        raise RuntimeError("Argos offline worker is missing from this build.")
-
-    request_dir = tempfile.mkdtemp(prefix="clickntranslate_argos_")
-    request_path = os.path.join(request_dir, "request.json")
-    event_path = os.path.join(request_dir, "events.jsonl")
-    cancel_path = os.path.join(request_dir, "cancel")
-    stdout_path = os.path.join(request_dir, "stdout.json")
-    stderr_path = os.path.join(request_dir, "stderr.txt")
-    process = None
+    """Run one request in the resident ArgosWorker (see argos_daemon), or in worker."""
+    if worker is None:
+        worker_path = _argos_worker_path()
+        if not worker_path:
+            raise RuntimeError("Argos offline worker is missing from this build.")
+        worker = argos_daemon.daemon([worker_path])
+
     status_events_seen = 0
-    event_offset = 0
-    event_buffer = ""
-    cancel_sent_at = None
-
-    def drain_events():
-        nonlocal status_events_seen, event_offset, event_buffer
-        if not os.path.isfile(event_path):
-            return
-        try:
-            with open(event_path, "r", encoding="utf-8") as event_file:
-                event_file.seek(event_offset)
-                event_buffer += event_file.read()
-                event_offset = event_file.tell()
-        except OSError:
-            return
-        lines = event_buffer.split("\n")
-        event_buffer = lines.pop()
-        for line in lines:
-            if not line.strip():
-                continue
-            try:
-                event = json.loads(line)
-            except Exception:
-                continue
-            if event.get("type") == "status":
-                status_events_seen += 1
-                _emit_status(status_callback, event.get("message", ""))
-            elif event.get("type") == "progress":
-                _emit_argos_progress(
-                    progress_callback,
-                    event.get("message", ""),
-                    event.get("downloaded_bytes", 0),
-                    event.get("total_bytes", 0),
-                )
 
-    try:
-        request = dict(request or {})
-        request["event_path"] = event_path
-        request["cancel_path"] = cancel_path
-        with open(request_path, "w", encoding="utf-8") as request_file:
-            json.dump(request, request_file, ensure_ascii=False)
-
-        startupinfo = None
-        creationflags = 0
-        if sys.platform == "win32":
-            creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        with open(stdout_path, "w", encoding="utf-8") as stdout_file, open(
-            stderr_path, "w", encoding="utf-8", errors="replace"
-        ) as stderr_file:
-            process = subprocess.Popen(
-                [worker_path, request_path],
-                stdout=stdout_file,
-                stderr=stderr_file,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                startupinfo=startupinfo,
-                creationflags=creationflags,
+    def on_event(event):
+        nonlocal status_events_seen
+        if event.get("type") == "status":
+            status_events_seen += 1
+            _emit_status(status_callback, event.get("message", ""))
+        elif event.get("type") == "progress":
+            _emit_argos_progress(
+                progress_callback,
+                event.get("message", ""),
+                event.get("downloaded_bytes", 0),
+                event.get("total_bytes", 0),
             )
-            deadline = time.monotonic() + max(1, int(timeout))
-            while process.poll() is None:
-                drain_events()
-                if cancel_callback and cancel_callback():
-                    if cancel_sent_at is None:
-                        with open(cancel_path, "w", encoding="utf-8") as cancel_file:
-                            cancel_file.write("cancel\n")
-                        cancel_sent_at = time.monotonic()
-                    elif time.monotonic() - cancel_sent_at > 10:
-                        process.terminate()
-                if time.monotonic() > deadline:
-                    process.kill()
-                    raise RuntimeError("Argos offline worker timed out.")
-                time.sleep(0.1)
-            drain_events()
-            return_code = process.wait()
 
-        try:
-            with open(stdout_path, "r", encoding="utf-8", errors="replace") as stdout_file:
-                output = stdout_file.read().strip()
-        except OSError:
-            output = ""
-        try:
-            with open(stderr_path, "r", encoding="utf-8", errors="replace") as stderr_file:
-                stderr_output = stderr_file.read().strip()
-        except OSError:
-            stderr_output = ""
-        if return_code != 0:
-            if cancel_sent_at is not None:
-                raise ArgosInstallCancelledError("Argos language-package installation was canceled.")
-            detail = stderr_output or output or f"exit code {return_code}"
-            raise RuntimeError(f"Argos offline worker failed: {detail[:1200]}")
-        try:
-            payload = json.loads(output)
-        except Exception as exc:
-            detail = stderr_output or output or "empty output"
-            raise RuntimeError(f"Argos offline worker returned invalid output: {detail[:1200]}") from exc
-        if not status_events_seen:
-            for message in payload.get("statuses") or []:
-                _emit_status(status_callback, str(message))
-        return payload
-    finally:
-        if process is not None and process.poll() is None:
-            try:
-                process.kill()
-            except Exception:
-                pass
-        shutil.rmtree(request_dir, ignore_errors=True)
+    try:
+        payload = worker.request(
+            request,
+            event_callback=on_event,
+            cancel_callback=cancel_callback,
+            timeout=timeout,
+        )
+    except argos_daemon.ArgosWorkerCancelled as exc:
+        raise ArgosInstallCancelledError("Argos language-package installation was canceled.") from exc
+    except argos_daemon.ArgosWorkerTimeout:
+        raise
+    except argos_daemon.ArgosWorkerError as exc:
+        if cancel_callback and cancel_callback():
+            raise ArgosInstallCancelledError("Argos language-package installation was canceled.") from exc
+        raise RuntimeError(f"Argos offline worker failed: {str(exc)[:1200]}") from exc
+    if not status_events_seen:
+        for message in payload.get("statuses") or []:
+            _emit_status(status_callback, str(message))
+    return payload
+
+
+def argos_worker_stats():
+    """Spawns, requests, crashes, retries and idle shutdowns of the resident ArgosWorker."""
+    return argos_daemon.daemon_stats()
+
+
+def _argos_pool_command():
+    """Command that starts a pool worker, or None where there is none to start."""
+    worker_path = _argos_worker_path()
+    if worker_path:
+        return [worker_path]
+    if getattr(sys, "frozen", False) or os.environ.get("CLICKNTRANSLATE_ARGOS_WORKER"):
+        return None
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "argos_worker.py")
+    return [sys.executable, script] if os.path.isfile(script) else None
+
+
+def _argos_pool(source_code, target_code):
+    """The Argos worker pool for the pair (see argos_pool), or None if it would not help.
+
+    The "argos_workers" setting is the number of workers; 0 sizes the pool
+    from the cores, the memory and the pair's models, 1 turns it off.
+    """
+    try:
+        workers = max(0, int(get_cached_translator_config().get("argos_workers", 0) or 0))
+    except (TypeError, ValueError):
+        workers = 0
+    if workers == 1:
+        return None
+    command = _argos_pool_command()
+    if not command:
+        return None
+    model_bytes = argos_model_bytes(source_code, target_code)
+    if not model_bytes:
+        return None  # not installed: the single-worker path installs it
+    pool = argos_pool.pool(command, model_bytes, workers)
+    return pool if pool.size > 1 else None
+
+
+def argos_pool_workers(source_code, target_code):
+    """How many Argos translations of the pair may run at once."""
+    pool = _argos_pool(source_code, target_code)
+    return pool.size if pool is not None else 1
+
+
+def argos_pool_stats():
+    """Size, threads, spawns and requests of the Argos worker pool; {} before its first use."""
+    return argos_pool.pool_stats()
+
+
+def _argos_pool_translate(pool, text, source_code, target_code, status_callback=None, cancel_callback=None):
+    payload = _run_argos_worker_request(
+        {
+            "action": "translate",
+            "text": str(text or ""),
+            "source_code": source_code,
+            "target_code": target_code,
+            "allow_install": False,
+        },
+        status_callback=status_callback,
+        cancel_callback=lambda: bool(cancel_callback and cancel_callback()) or cancellation.is_cancelled(),
+        worker=pool,
+    )
+    if payload.get("error"):
+        raise RuntimeError(str(payload["error"]))
+    if payload.get("result") is None:
+        # The pair is installed, so a worker without it has stale caches.
+        raise RuntimeError("Argos pool worker has no translation for the pair")
+    return payload["result"]
+
+
+def _argos_pool_translate_batch(pool, texts, source_code, target_code):
+    """texts cut into one shard per worker, translated in parallel."""
+
+    def translate_shard(shard):
+        payload = _run_argos_worker_request(
+            {
+                "action": "translate_batch",
+                "texts": list(shard),
+                "source_code": source_code,
+                "target_code": target_code,
+            },
+            cancel_callback=cancellation.is_cancelled,
+            worker=pool,
+        )
+        if payload.get("error"):
+            raise RuntimeError(str(payload["error"]))
+        results = list(payload.get("results") or [])
+        if len(results) != len(shard) or all(result is None for result in results):
+            raise RuntimeError("Argos pool worker returned no translations")
+        return results
+
+    translated = []
+    for results in pool.map(cancellation.bound(translate_shard), argos_pool.shards(texts, pool.size)):
+        translated.extend(results)
+    return translated
 
 
 def argos_package_catalog(refresh=False):
@@ -1112,12 +1215,16 @@ def install_argos_packages(
     """Install selected direct Argos packages in-process or via ArgosWorker."""
     pairs = _normalize_argos_pairs(pairs)
     if _argos_worker_path():
-        payload = _run_argos_worker_request(
-            {"action": "install_packages", "pairs": pairs},
-            status_callback=status_callback,
-            progress_callback=progress_callback,
-            cancel_callback=cancel_callback,
-        )
+        try:
+            payload = _run_argos_worker_request(
+                {"action": "install_packages", "pairs": pairs},
+                status_callback=status_callback,
+                progress_callback=progress_callback,
+                cancel_callback=cancel_callback,
+            )
+        finally:
+            # Some packages may be in even if the request failed.
+            _argos_packages_changed()
         if payload.get("error"):
             error = str(payload["error"])
             if "ArgosInstallCancelledError" in error:
@@ -1136,11 +1243,14 @@ def uninstall_argos_packages(pairs, status_callback=None):
     """Uninstall selected direct Argos packages in-process or via ArgosWorker."""
     pairs = _normalize_argos_pairs(pairs)
     if _argos_worker_path():
-        payload = _run_argos_worker_request(
-            {"action": "uninstall_packages", "pairs": pairs},
-            status_callback=status_callback,
-            timeout=180,
-        )
+        try:
+            payload = _run_argos_worker_request(
+                {"action": "uninstall_packages", "pairs": pairs},
+                status_callback=status_callback,
+                timeout=180,
+            )
+        finally:
+            _argos_packages_changed()
         if payload.get("error"):
             raise RuntimeError(str(payload["error"]))
         return [tuple(pair) for pair in payload.get("removed") or []]
@@ -1207,14 +1317,16 @@ def _try_argos_translate_worker(
             raise RuntimeError(error)
         return payload.get("result")
 
+    # The worker installs a missing pair itself; the pool must not keep the old packages.
+    installing = allow_install and not argos_model_bytes(source_code, target_code)
     try:
         return request_translation(allow_install)
     except ArgosInstallCancelledError:
         raise
     except Exception as first_error:
-        # Each packaged translation runs in a fresh worker. Directly after a
-        # package install Windows may still be releasing model files, so retry
-        # once only when a fresh probe confirms the complete route is installed.
+        # Directly after a package install Windows may still be releasing
+        # model files, so retry once only when a probe confirms the complete
+        # route is installed.
         if cancel_callback and cancel_callback():
             raise ArgosInstallCancelledError(
                 "Argos language-package installation was canceled."
@@ -1230,6 +1342,70 @@ def _try_argos_translate_worker(
             if retry_error is first_error:
                 raise
             raise RuntimeError(str(retry_error) or str(first_error)) from retry_error
+    finally:
+        if installing:
+            _argos_packages_changed()
+
+
+def _argos_translate_batched(translation_obj, texts):
+    """Sentences of all texts through the Argos model in token-budget batches; None if not possible."""
+    try:
+        return argos_batch.translate_texts(translation_obj, texts, arg_tr, split_sentences)
+    except Exception as exc:
+        print(f"Batched Argos translation failed, translating text by text: {exc}")
+        return None
+
+
+def _try_argos_translate_local_batch(texts, source_code, target_code):
+    """Translate texts with one loaded Argos model; None if the pair is not installed."""
+    if not _ensure_argos_available():
+        return None
+    translation_obj = _get_translation_object(source_code, target_code)
+    if translation_obj is None:
+        return None
+    translated = _argos_translate_batched(translation_obj, texts)
+    if translated is not None:
+        return translated
+    translated = []
+    for text in texts:
+        try:
+            translated.append(translation_obj.translate(text))
+        except Exception as exc:
+            print(f"Argos failed on a batch item: {exc}")
+            translated.append(None)
+    return translated
+
+
+def _argos_translate_batch(texts, source_code, target_code):
+    """Translate texts with Argos in one worker run instead of one per text.
+
+    Never installs packages; a missing pair falls back to the single-text
+    path, which reports it.
+    """
+    pool = _argos_pool(source_code, target_code) if len(texts) > 1 else None
+    if pool is not None:
+        try:
+            return _argos_pool_translate_batch(pool, texts, source_code, target_code)
+        except TranslationCancelledError:
+            raise
+        except Exception as exc:
+            cancellation.raise_if_cancelled()
+            print(f"Argos worker pool failed, translating the batch in one worker: {exc}")
+    if not argos_runtime_available():
+        return [None] * len(texts)
+    if not _argos_worker_path():
+        return _try_argos_translate_local_batch(texts, source_code, target_code) or [None] * len(texts)
+    payload = _run_argos_worker_request(
+        {
+            "action": "translate_batch",
+            "texts": list(texts),
+            "source_code": source_code,
+            "target_code": target_code,
+        }
+    )
+    if payload.get("error"):
+        raise RuntimeError(str(payload["error"]))
+    return list(payload.get("results") or [None] * len(texts))
 
 
 def _try_argos_translate(
@@ -1241,6 +1417,18 @@ def _try_argos_translate(
     progress_callback=None,
     cancel_callback=None,
 ):
+    # Document chunks run in argos_pool.dispatch(): several at once, each in a worker of the pool.
+    pool = _argos_pool(source_code, target_code) if argos_pool.dispatching() else None
+    if pool is not None:
+        try:
+            return _argos_pool_translate(
+                pool, text, source_code, target_code, status_callback=status_callback, cancel_callback=cancel_callback
+            )
+        except ArgosInstallCancelledError:
+            raise
+        except Exception as exc:
+            cancellation.raise_if_cancelled()
+            print(f"Argos worker pool failed, translating in one worker: {exc}")
     if _argos_worker_path():
         return _try_argos_translate_worker(
             text,
@@ -1292,64 +1480,233 @@ def test_translation():
     else:
         print("Нет модели для EN->RU")
 
-def translate_text(
+_ONLINE_ENGINES = ['google', 'lingva', 'mymemory', 'libretranslate']
+
+_translation_memory_stats = {
+    "requests": 0,
+    "segments": 0,
+    "segment_hits": 0,
+    "chars_requested": 0,
+    "chars_sent": 0,
+}
+_translation_memory_lock = threading.Lock()
+
+
+def translation_memory_stats():
+    """How much provider traffic the sentence-level translation memory saved."""
+    with _translation_memory_lock:
+        stats = dict(_translation_memory_stats)
+    segments = stats["segments"]
+    requested = stats["chars_requested"]
+    stats["segment_hit_rate"] = stats["segment_hits"] / segments if segments else 0.0
+    stats["chars_saved_ratio"] = 1 - stats["chars_sent"] / requested if requested else 0.0
+    return stats
+
+
+def _segment_text(text):
+    """Split text into line-bound sentences and the separators around them.
+
+    ``gaps[0] + segments[0] + gaps[1] + ... + segments[-1] + gaps[-1]``
+    rebuilds the text exactly. Lines are never merged, so the segments can
+    travel to a provider one per line and come back aligned.
+    """
+    text = str(text or "")
+    segments = []
+    gaps = []
+    gap_start = 0
+    line_start = 0
+    for line in text.split("\n"):
+        position = line_start
+        for sentence in split_sentences(line) if line.strip() else []:
+            index = text.find(sentence, position)
+            if index < 0:
+                return [], []
+            gaps.append(text[gap_start:index])
+            segments.append(sentence)
+            position = gap_start = index + len(sentence)
+        line_start += len(line) + 1
+    gaps.append(text[gap_start:])
+    return segments, gaps
+
+
+def _translate_with_memory(text, source_code, target_code, engine, data_dir, translate):
+    """Translate only the sentences the translation memory does not know.
+
+    The missing sentences go out as one batch (see _translate_texts), so each
+    comes back on its own and nothing is sent twice. Returns None when the
+    text is a single sentence; the caller then translates it as usual.
+    Raises when a sentence could not be translated, after the others were
+    saved to the memory.
+    """
+    import cache_manager
+
+    segments, gaps = _segment_text(text)
+    if len(segments) < 2:
+        return None
+    try:
+        cached = cache_manager.get_cached_segments(data_dir, segments, source_code, target_code, engine=engine)
+    except Exception:
+        return None
+    missing = [index for index, translated in enumerate(cached) if translated is None]
+    sent = sum(len(segments[index]) for index in missing)
+    error = ""
+    if missing:
+        translated = _translate_texts([segments[index] for index in missing], source_code, target_code, engine, translate)
+        pairs = []
+        for index, (line, line_error) in zip(missing, translated):
+            if line:
+                cached[index] = line
+                pairs.append((segments[index], line))
+            else:
+                error = error or line_error or f"{engine} returned no translation for {segments[index]!r}"
+        try:
+            cache_manager.save_cached_segments(data_dir, pairs, source_code, target_code, engine=engine)
+        except Exception:
+            pass
+    _record_translation_memory(segments, len(segments) - len(missing), sent)
+    if error:
+        raise RuntimeError(error)
+    parts = [gaps[0]]
+    for translated, gap in zip(cached, gaps[1:]):
+        parts.append(translated)
+        parts.append(gap)
+    return "".join(parts).strip()
+
+
+def _record_translation_memory(segments, hits, chars_sent):
+    with _translation_memory_lock:
+        _translation_memory_stats["requests"] += 1
+        _translation_memory_stats["segments"] += len(segments)
+        _translation_memory_stats["segment_hits"] += hits
+        _translation_memory_stats["chars_requested"] += sum(len(segment) for segment in segments)
+        _translation_memory_stats["chars_sent"] += chars_sent
+
+
+# Identical translate_text calls that overlap (a hotkey pressed twice, a
+# full-screen run restarted mid-translation) wait for one provider call.
+_in_flight = {}  # request key -> _InFlight
+_in_flight_lock = threading.Lock()
+_single_flight_stats = {"calls": 0, "collapsed": 0}
+_single_flight_log = logging.getLogger("clickntranslate.translation")
+
+
+class _InFlight:
+    __slots__ = ("done", "result", "error", "status_callbacks", "progress_callbacks")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # Every caller's callbacks; the running call reports to all of them.
+        self.status_callbacks = []
+        self.progress_callbacks = []
+
+    def listen(self, status_callback, progress_callback):
+        if status_callback:
+            self.status_callbacks.append(status_callback)
+        if progress_callback:
+            self.progress_callbacks.append(progress_callback)
+
+    def status(self, message):
+        with _in_flight_lock:
+            callbacks = list(self.status_callbacks)
+        for callback in callbacks:
+            _emit_status(callback, message)
+
+    def progress(self, message, downloaded_bytes, total_bytes):
+        with _in_flight_lock:
+            callbacks = list(self.progress_callbacks)
+        for callback in callbacks:
+            _emit_argos_progress(callback, message, downloaded_bytes, total_bytes)
+
+
+def single_flight_stats():
+    """How many translate_text calls joined an identical one already in flight."""
+    with _in_flight_lock:
+        stats = dict(_single_flight_stats)
+    stats["collapse_rate"] = stats["collapsed"] / stats["calls"] if stats["calls"] else 0.0
+    return stats
+
+
+def _single_flight(key, call, status_callback=None, progress_callback=None):
+    """Run call(status_callback, progress_callback) once for every overlapping caller with the same key.
+
+    The first caller runs it; the others wait and get its result, or its
+    exception. The status and progress events of the call reach the
+    callbacks of every caller that joined it, from then on, for the kinds of
+    events the first caller listens to.
+    """
+    with _in_flight_lock:
+        _single_flight_stats["calls"] += 1
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _InFlight()
+            _in_flight[key] = flight
+        else:
+            _single_flight_stats["collapsed"] += 1
+        flight.listen(status_callback, progress_callback)
+    if not leader:
+        _single_flight_log.debug("Joining an identical translation already in progress")
+        while not flight.done.wait(0.05):
+            cancellation.raise_if_cancelled()
+        if isinstance(flight.error, TranslationCancelledError) and not cancellation.is_cancelled():
+            # The caller that ran it was cancelled, this one was not.
+            return _single_flight(key, call, status_callback, progress_callback)
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+    try:
+        # Only where the caller running it passed them: without a progress
+        # callback, for one, Argos does not download a missing package.
+        flight.result = call(
+            flight.status if status_callback else None,
+            flight.progress if progress_callback else None,
+        )
+    except BaseException as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+        flight.done.set()
+    return flight.result
+
+
+def _call_online(name, txt, src, tgt, hedge=False, cancelled=None):
+    if name == 'google':
+        return google_translate(txt, src, tgt)
+    elif name == 'mymemory':
+        return mymemory_translate(txt, src, tgt)
+    elif name == 'lingva':
+        return lingva_translate(txt, src, tgt, hedge=hedge, cancelled=cancelled)
+    elif name == 'libretranslate':
+        return libretranslate(txt, src, tgt, hedge=hedge, cancelled=cancelled)
+    raise ValueError(f"Unknown engine: {name}")
+
+
+def _translate_uncached(
     text,
     source_code,
     target_code,
+    engine,
+    allow_provider_fallback=False,
     status_callback=None,
-    engine=None,
     progress_callback=None,
     cancel_callback=None,
+    hedge=False,
 ):
-    """Перевод текста с выбранным движком и автоматическим фоллбеком."""
-    config = get_cached_translator_config()
-    engine = (engine or config.get("translator_engine", "Google")).lower()
-    allow_provider_fallback = bool(config.get("allow_online_provider_fallback", False))
-    print(f"Using translator: {engine.upper()}")
-
-    # Check translation cache first
-    try:
-        from main import get_data_file
-        import os
-        data_dir = os.path.dirname(get_data_file("config.json"))
-        from cache_manager import get_cached_translation, save_cached_translation
-        cached = get_cached_translation(data_dir, text, source_code, target_code, engine=engine)
-        if cached:
-            print(f"Using cached translation ({len(text)} chars)")
-            return cached
-    except Exception:
-        data_dir = None
-
-    online_engines = ['google', 'lingva', 'mymemory', 'libretranslate']
-
-    def _call_online(name, txt, src, tgt):
-        if name == 'google':
-            return google_translate(txt, src, tgt)
-        elif name == 'mymemory':
-            return mymemory_translate(txt, src, tgt)
-        elif name == 'lingva':
-            return lingva_translate(txt, src, tgt)
-        elif name == 'libretranslate':
-            return libretranslate(txt, src, tgt)
-        raise ValueError(f"Unknown engine: {name}")
-
-    def _cache_and_return(result):
-        """Save translation to cache and return."""
-        if result and data_dir:
-            try:
-                save_cached_translation(data_dir, text, source_code, target_code, result, engine=engine)
-            except Exception:
-                pass
-        return result
-
+    """Run one translation through the engine, without any caching."""
+    cancellation.raise_if_cancelled()
     if engine == HYMT_ENGINE_KEY:
-        return _cache_and_return(hymt_translate(text, source_code, target_code, status_callback=status_callback))
+        return hymt_translate(text, source_code, target_code, status_callback=status_callback)
 
     def _online_order(preferred):
+        # The chosen provider first, then the fallbacks healthiest first.
         ordered = []
-        if preferred in online_engines:
+        if preferred in _ONLINE_ENGINES:
             ordered.append(preferred)
-        for name in online_engines:
+        for name in provider_health.order_providers(_ONLINE_ENGINES):
             if name not in ordered:
                 ordered.append(name)
         return ordered
@@ -1357,11 +1714,23 @@ def translate_text(
     def _try_online(preferred, allow_fallback=False):
         last_error = None
         engines_to_try = _online_order(preferred) if allow_fallback else [preferred]
+        if hedge and len(engines_to_try) > 1:
+            # A slow provider is raced against the next healthy one.
+            return _hedged_first(
+                [
+                    (name, None, lambda cancelled, name=name: _call_online(
+                        name, text, source_code, target_code, hedge=True, cancelled=cancelled
+                    ))
+                    for name in engines_to_try
+                ]
+            )
         for name in engines_to_try:
             try:
-                result = _call_online(name, text, source_code, target_code)
+                result = _call_online(name, text, source_code, target_code, hedge=hedge)
                 if result:
                     return result
+            except TranslationCancelledError:
+                raise
             except Exception as exc:
                 last_error = exc
                 continue
@@ -1369,16 +1738,18 @@ def translate_text(
             raise last_error
         return None
 
-    if engine in online_engines:
+    if engine in _ONLINE_ENGINES:
         try:
-            return _cache_and_return(_try_online(engine, allow_fallback=allow_provider_fallback))
+            return _try_online(engine, allow_fallback=allow_provider_fallback)
+        except TranslationCancelledError:
+            raise
         except Exception as online_error:
             # Offline rescue only: never switch to another online provider silently.
             argos_result = _try_argos_translate(
                 text, source_code, target_code, status_callback=status_callback, allow_install=False
             )
             if argos_result:
-                return _cache_and_return(argos_result)
+                return argos_result
             raise online_error
 
     if engine == "argos":
@@ -1397,7 +1768,7 @@ def translate_text(
             cancel_callback=cancel_callback,
         )
         if argos_result:
-            return _cache_and_return(argos_result)
+            return argos_result
         raise Exception(
             f"Argos offline translation package is not installed for {source_code}->{target_code}. "
             "Install the required direction in Settings > Language packages > Argos."
@@ -1408,25 +1779,757 @@ def translate_text(
         text, source_code, target_code, status_callback=status_callback, allow_install=False
     )
     if argos_result:
-        return _cache_and_return(argos_result)
+        return argos_result
+
+    return _try_online("google", allow_fallback=allow_provider_fallback)
+
+
+def translate_text(
+    text,
+    source_code,
+    target_code,
+    status_callback=None,
+    engine=None,
+    progress_callback=None,
+    cancel_callback=None,
+    hedge=None,
+    cancel_token=None,
+):
+    """Перевод текста с выбранным движком и автоматическим фоллбеком.
+
+    hedge races a slow online request against the next healthy instance
+    (see hedging_stats); None takes the "hedged_requests" setting.
+    cancel_token (a cancellation.CancelToken) aborts the requests in flight and the
+    queued ones once cancelled; the call then raises TranslationCancelledError.
+    """
+    with cancellation.scope(cancel_token or cancellation.current()):
+        cancellation.raise_if_cancelled()
+        call = {"engine": engine, "cache_hits": 0}
+        started = time.monotonic()
+        result = None
+        outcome = "errors"
+        try:
+            result = _translate_text(
+                text, source_code, target_code, status_callback, engine, progress_callback, cancel_callback, hedge,
+                call,
+            )
+            if result:
+                outcome = None
+            return result
+        except TranslationCancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            _record_telemetry(
+                call["engine"], source_code, target_code, [text], [result],
+                time.monotonic() - started, cache_hits=call["cache_hits"], outcome=outcome,
+            )
+
+
+def _translate_text(
+    text, source_code, target_code, status_callback, engine, progress_callback, cancel_callback, hedge, call
+):
+    config = get_cached_translator_config()
+    engine = (engine or config.get("translator_engine", "Google")).lower()
+    call["engine"] = engine
+    allow_provider_fallback = bool(config.get("allow_online_provider_fallback", False))
+    if hedge is None:
+        hedge = bool(config.get("hedged_requests", False))
+    rate_limiter.configure(config.get("provider_rate_limits"))
+    print(f"Using translator: {engine.upper()}")
+
+    # Check translation cache first. The cache lives in the shared data
+    # directory, so the GUI and helper processes all see the same entries.
+    try:
+        data_dir = os.path.dirname(get_data_file("config.json"))
+        from cache_manager import get_cached_translation, save_cached_translation, translation_request_key
+        cached = get_cached_translation(data_dir, text, source_code, target_code, engine=engine)
+        if cached:
+            print(f"Using cached translation ({len(text)} chars)")
+            call["cache_hits"] = 1
+            return cached
+        request_key = translation_request_key(text, source_code, target_code, engine=engine)
+    except Exception:
+        data_dir = None
+        request_key = None
+
+    def _translate_and_cache(status_callback=status_callback, progress_callback=progress_callback):
+        def _translate(txt):
+            return _translate_uncached(
+                txt,
+                source_code,
+                target_code,
+                engine,
+                allow_provider_fallback=allow_provider_fallback,
+                status_callback=status_callback,
+                progress_callback=progress_callback,
+                cancel_callback=cancel_callback,
+                hedge=hedge,
+            )
+
+        result = None
+        if data_dir and config.get("translation_memory", True):
+            result = _translate_with_memory(text, source_code, target_code, engine, data_dir, _translate)
+        if not result:
+            result = _translate(text)
+
+        if result and data_dir:
+            try:
+                save_cached_translation(data_dir, text, source_code, target_code, result, engine=engine)
+            except Exception:
+                pass
+        return result
+
+    if request_key is None:
+        return _translate_and_cache()
+    return _single_flight(request_key, _translate_and_cache, status_callback, progress_callback)
+
+# --- batch translation ---
+
+# Texts without a native multi-input request travel together, each behind a
+# [[[CXTnnnn]]] marker. Output that lost a marker is translated per text.
+_BATCH_MARKER_RE = re.compile(r"\[\[\[\s*CXT(\d{4})\s*\]\]\]", re.IGNORECASE)
+_BATCH_MARKER = "[[[CXT0000]]]\n"
+MARKED_BATCH_ITEMS = 24  # more markers per request and providers start dropping some
+
+
+@dataclass(frozen=True)
+class BatchTranslation:
+    """One text of translate_batch: its translation, or why it failed."""
+
+    text: str
+    translated: str = ""
+    error: str = ""
+
+    @property
+    def ok(self):
+        return not self.error
+
+
+def _split_marked_translation(translated, count):
+    """The texts of a marked translation by marker number; None where a marker was lost.
+
+    A block is only trusted when the next marker, or the end of the output
+    after the last block, follows it: the text before a lost marker may
+    hold two blocks run together.
+    """
+    translated = str(translated or "")
+    matches = list(_BATCH_MARKER_RE.finditer(translated))
+    numbers = [int(match.group(1)) for match in matches]
+    result = [None] * count
+    if any(number >= count for number in numbers) or any(a >= b for a, b in zip(numbers, numbers[1:])):
+        return result
+    for index, (match, number) in enumerate(zip(matches, numbers)):
+        if index + 1 < len(matches):
+            if numbers[index + 1] != number + 1:
+                continue
+            end = matches[index + 1].start()
+        elif number == count - 1:
+            end = len(translated)
+        else:
+            continue
+        result[number] = translated[match.end():end].strip() or None
+    return result
+
+
+def _translate_marked(texts, translate, capabilities=provider_capabilities.DEFAULT_CAPABILITIES):
+    """Translate texts through translate(text) in few requests, joined by markers.
+
+    Groups are packed to the engine's request limits. Returns one
+    (translated, error) pair per text. The texts whose marker the output
+    lost are translated one at a time; the others keep their translation.
+    """
+    results = [None] * len(texts)
+
+    def _one(index):
+        try:
+            results[index] = (str(translate(texts[index]) or "").strip(), "")
+        except TranslationCancelledError:
+            raise
+        except Exception as exc:
+            results[index] = ("", str(exc))
+
+    groups = provider_capabilities.pack(
+        texts, capabilities, joiner="\n", item_overhead=_BATCH_MARKER, max_items=MARKED_BATCH_ITEMS
+    )
+    for group in groups:
+        if len(group) == 1:
+            _one(group[0])
+            continue
+        marked = "\n".join(f"[[[CXT{number:04d}]]]\n{texts[index]}" for number, index in enumerate(group))
+        try:
+            mapped = _split_marked_translation(translate(marked), len(group))
+        except TranslationCancelledError:
+            raise
+        except Exception as exc:
+            for index in group:
+                results[index] = ("", str(exc))
+            continue
+        lost = [index for index, translated in zip(group, mapped) if translated is None]
+        if lost:
+            print(f"Batch translation lost {len(lost)} of {len(group)} block markers; retrying those blocks separately")
+        for index, translated in zip(group, mapped):
+            if translated is None:
+                _one(index)
+            else:
+                results[index] = (translated, "")
+    return results
+
+
+def _native_batch(engine):
+    """The engine's own multi-input translation, or None if it has none."""
+    return {
+        "google": google_translate_batch,
+        "libretranslate": libretranslate_batch,
+        "argos": _argos_translate_batch,
+    }.get(engine)
+
+
+def translate_batch(texts, source_code, target_code, engine=None, status_callback=None, cancel_token=None):
+    """Translate several texts at once; one BatchTranslation per text, in order.
+
+    Google and LibreTranslate take many texts in one request, and Argos
+    translates the whole batch with one loaded model. Other engines, and
+    texts a native request did not return, go in marked groups through the
+    regular single-text path. Failures are reported per text, never raised;
+    only a cancelled cancel_token raises, TranslationCancelledError.
+    """
+    with cancellation.scope(cancel_token or cancellation.current()):
+        cancellation.raise_if_cancelled()
+        call = {"engine": engine, "cache_hits": 0}
+        started = time.monotonic()
+        results = None
+        outcome = "errors"
+        try:
+            results = _translate_batch(texts, source_code, target_code, engine, status_callback, call)
+            outcome = None
+            return results
+        except TranslationCancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            done = [item for item in results or () if item.text]
+            _record_telemetry(
+                call["engine"], source_code, target_code,
+                [item.text for item in done] if results is not None else [str(text or "").strip() for text in texts],
+                [item.translated for item in done],
+                time.monotonic() - started, cache_hits=call["cache_hits"], outcome=outcome,
+                size=translation_telemetry.BATCH,
+            )
+
 
-    return _cache_and_return(_try_online("google", allow_fallback=allow_provider_fallback))
+def _translate_batch(texts, source_code, target_code, engine, status_callback, call):
+    config = get_cached_translator_config()
+    engine = (engine or config.get("translator_engine", "Google")).lower()
+    call["engine"] = engine
+    allow_provider_fallback = bool(config.get("allow_online_provider_fallback", False))
+    hedge = bool(config.get("hedged_requests", False))
+    rate_limiter.configure(config.get("provider_rate_limits"))
+    texts = [str(text or "").strip() for text in texts]
+    results = {text: ("", "") for text in texts if not text}
+
+    try:
+        data_dir = os.path.dirname(get_data_file("config.json"))
+        from cache_manager import get_cached_translation, save_cached_translation
+        for text in texts:
+            if text and text not in results:
+                cached = get_cached_translation(data_dir, text, source_code, target_code, engine=engine)
+                if cached:
+                    results[text] = (cached, "")
+    except Exception:
+        data_dir = None
+    call["cache_hits"] = sum(1 for text in texts if text and text in results)
 
-# Кэшированная сессия для HTTP запросов
-_http_session = None
+    missing = [text for text in dict.fromkeys(texts) if text not in results]
+    if missing:
+        print(f"Using translator: {engine.upper()} (batch of {len(missing)})")
+    translated = _translate_texts(
+        missing,
+        source_code,
+        target_code,
+        engine,
+        lambda text: _translate_uncached(
+            text,
+            source_code,
+            target_code,
+            engine,
+            allow_provider_fallback=allow_provider_fallback,
+            status_callback=status_callback,
+            hedge=hedge,
+        ),
+    )
+    for text, pair in zip(missing, translated):
+        results[text] = pair
+        if data_dir and pair[0]:
+            try:
+                save_cached_translation(data_dir, text, source_code, target_code, pair[0], engine=engine)
+            except Exception:
+                pass
+    return [BatchTranslation(text, *results[text]) for text in texts]
+
+
+def _translate_texts(texts, source_code, target_code, engine, translate):
+    """One (translated, error) pair per text, without the cache.
+
+    The engine's native batch goes first; what it did not return travels in
+    marked groups through translate(text).
+    """
+    translated = [None] * len(texts)
+    native = _native_batch(engine)
+    if native and texts:
+        try:
+            translated = list(native(texts, source_code, target_code))
+            if len(translated) != len(texts):
+                translated = [None] * len(texts)
+        except TranslationCancelledError:
+            raise
+        except Exception as exc:
+            print(f"Batch request failed, falling back to marked groups: {exc}")
+    # Native batches keep going past failed groups; a cancelled one stops here.
+    cancellation.raise_if_cancelled()
+    pending = [index for index, value in enumerate(translated) if not value or not str(value).strip()]
+    if pending:
+        fallback = _translate_marked(
+            [texts[index] for index in pending], translate, provider_capabilities.capabilities(engine)
+        )
+        for index, pair in zip(pending, fallback):
+            translated[index] = pair
+    return [value if isinstance(value, tuple) else (str(value).strip(), "") for value in translated]
+
+
+# Long texts go to Google in chunks, sent concurrently. At most this many
+# requests are in flight at once across all callers; each provider's session
+# keeps as many connections per host as it has requests in flight (see
+# provider_sessions), so no request waits for a free socket.
+ONLINE_MAX_PARALLEL = 4
+_online_executor = None
+_online_executor_lock = threading.Lock()
+_online_task = threading.local()  # set on executor threads while they run a part
+
+
+# Requests wait for their provider's rate limit (see rate_limiter) at most
+# this long; a 429 is retried this many times once the pause has passed.
+RATE_LIMIT_MAX_WAIT = 30.0
+THROTTLE_RETRIES = 2
+
+
+class ProviderUnavailableError(RuntimeError):
+    """A provider or instance is skipped: its circuit is open after repeated failures."""
+
+
+class ProviderThrottledError(RuntimeError):
+    """The provider answered 429 Too Many Requests."""
+
+    def __init__(self, provider, retry_after=None):
+        self.retry_after = retry_after
+        hint = f" (retry after {retry_after:.0f} s)" if retry_after is not None else ""
+        super().__init__(f"{provider} is rate limiting requests{hint}")
+
+
+def _raise_if_throttled(provider, response):
+    if getattr(response, "status_code", None) == 429:
+        headers = getattr(response, "headers", None) or {}
+        raise ProviderThrottledError(provider, rate_limiter.parse_retry_after(headers.get("Retry-After")))
+
+
+def _guarded_call(provider, call, instance=None):
+    """Run one provider request through its rate limit and circuit breaker.
+
+    A 429 pauses the budget of the instance that sent it (of the provider
+    when it has one host) and the request is sent again once the pause is
+    over, unless that is further away than RATE_LIMIT_MAX_WAIT. Waiting
+    for our own budget is not a failure of the provider and never trips its
+    circuit breaker. A cancelled translation (see cancellation) stops
+    waiting and raises TranslationCancelledError.
+    """
+    cancellation.raise_if_cancelled()
+    if not provider_health.allow_request(provider, instance):
+        raise ProviderUnavailableError(
+            f"{instance or provider} is skipped after repeated failures and will be retried later"
+        )
+    for attempt in range(THROTTLE_RETRIES + 1):
+        try:
+            if not rate_limiter.acquire(
+                provider, max_wait=RATE_LIMIT_MAX_WAIT, cancel_event=cancellation.current(), instance=instance
+            ):
+                cancellation.raise_if_cancelled()
+        except rate_limiter.RateLimitTimeout as exc:
+            raise ProviderThrottledError(instance or provider, RATE_LIMIT_MAX_WAIT) from exc
+        started = time.monotonic()
+        try:
+            result = call()
+        except TranslationCancelledError:
+            raise
+        except ProviderThrottledError as exc:
+            pause = rate_limiter.throttled(provider, exc.retry_after, instance)
+            if attempt < THROTTLE_RETRIES and pause <= RATE_LIMIT_MAX_WAIT:
+                continue
+            provider_health.record_failure(provider, exc, instance)
+            raise
+        except Exception as exc:
+            if cancellation.is_cancelled():
+                # Aborted by the caller, not a failure of the provider.
+                raise TranslationCancelledError("Translation cancelled") from exc
+            provider_health.record_failure(provider, exc, instance)
+            raise
+        rate_limiter.succeeded(provider, instance)
+        provider_health.record_success(provider, time.monotonic() - started, instance)
+        return result
+
+
+def _record_telemetry(
+    engine, source_code, target_code, texts, translations, elapsed, cache_hits=0, outcome=None, size=None
+):
+    """Count a translate_text or translate_batch call in translation_telemetry; never raises.
+
+    outcome "errors" or "cancelled" applies to every text; otherwise texts
+    left without a translation count as errors.
+    """
+    if not texts:
+        return
+    try:
+        translation_telemetry.configure(get_data_file(translation_telemetry.TELEMETRY_FILE))
+        texts = [str(text or "") for text in texts]
+        translated = [str(value or "") for value in translations]
+        counts = {"errors": 0, "cancelled": 0}
+        if outcome:
+            counts[outcome] = len(texts)
+        else:
+            counts["errors"] = sum(1 for value in translated if not value.strip())
+        # Latency is only telling for calls that reached the engine and succeeded.
+        timed = cache_hits < len(texts) and not counts["errors"] and not counts["cancelled"]
+        translation_telemetry.record(
+            engine or get_cached_translator_config().get("translator_engine", "Google"),
+            source_code,
+            target_code,
+            latency=elapsed if timed else None,
+            chars=sum(len(text) for text in texts),
+            bytes_in=sum(len(text.encode("utf-8")) for text in texts),
+            bytes_out=sum(len(value.encode("utf-8")) for value in translated),
+            requests=len(texts),
+            cache_hits=cache_hits,
+            size=size,
+            **counts,
+        )
+    except Exception as exc:
+        print(f"Could not record translation telemetry: {exc}")
+
+
+def translation_telemetry_stats():
+    """Requests, error and cache-hit rates, bytes and p50/p95/p99 latency of each engine.
+
+    Counted over every session; each engine also has its "pairs" and
+    payload "sizes" broken down the same way.
+    """
+    return translation_telemetry.telemetry_stats()
+
+
+def reset_translation_telemetry():
+    translation_telemetry.reset_telemetry()
+
+
+def provider_health_stats():
+    """Circuit state, error rate and latency of each online provider and instance."""
+    return provider_health.health_stats()
+
+
+def rate_limit_stats():
+    """Current request rate, pause and 429 count of each online provider."""
+    return rate_limiter.rate_limit_stats()
+
+
+# Hedged requests (config "hedged_requests"): a request that has not answered
+# within its target's recent p90 latency is raced against the next healthy
+# instance, or the next provider when provider fallback is allowed.
+HEDGE_PERCENTILE = 0.9
+HEDGE_DELAY = 1.0          # seconds, until a target has enough latency history
+HEDGE_MIN_DELAY = 0.25
+HEDGE_MAX_DELAY = 4.0
+_hedging_stats = {
+    "races": 0,
+    "fired": 0,
+    "hedge_wins": 0,
+    "losers_cancelled": 0,
+}
+_hedging_lock = threading.Lock()
+
+
+def hedging_stats():
+    """How often hedged requests fired and won, and how many losing requests were aborted."""
+    with _hedging_lock:
+        stats = dict(_hedging_stats)
+    stats["fire_rate"] = stats["fired"] / stats["races"] if stats["races"] else 0.0
+    return stats
+
+
+def _hedge_delay(provider, instance=None):
+    latency = provider_health.latency_percentile(provider, HEDGE_PERCENTILE, instance)
+    if latency is None:
+        return HEDGE_DELAY
+    return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, latency))
+
+
+def _hedged_first(attempts):
+    """Return the first non-empty answer of attempts, hedging slow ones.
+
+    attempts are (provider, instance, call) triples, healthiest first.
+    Every attempt runs under a child CancelToken of the caller's (see
+    cancellation), which call(token) also gets. The first attempt starts at
+    once; the next one starts when the running one fails, or alongside it
+    when it has not answered within its hedge delay, so at most two are in
+    flight. Once the race is decided the losers' tokens are cancelled: their
+    requests are aborted, stop holding a connection and a rate-limit wait,
+    and, being cancelled, are not counted in provider health. Cancelling the
+    caller's token ends the race.
+    """
+    answers = queue.Queue()
+    parent = cancellation.current()
+    tokens = []
+    started = []
+    hedges = set()
+    in_flight = set()
+
+    def _run(index, call, token):
+        with cancellation.scope(token):
+            try:
+                answer, error = call(token), None
+            except Exception as exc:
+                answer, error = None, exc
+        answers.put((index, answer, error))
+
+    def _launch():
+        cancellation.raise_if_cancelled()
+        index = len(started)
+        token = parent.child() if parent is not None else cancellation.CancelToken()
+        tokens.append(token)
+        started.append(time.monotonic())
+        in_flight.add(index)
+        threading.Thread(
+            target=_run, args=(index, attempts[index][2], token), name="online-hedge", daemon=True
+        ).start()
+        return index
+
+    with _hedging_lock:
+        _hedging_stats["races"] += 1
+    _launch()
+    last_error = None
+    while in_flight:
+        timeout = None
+        if len(in_flight) == 1 and len(started) < len(attempts):
+            (running,) = in_flight
+            provider, instance, _call = attempts[running]
+            timeout = max(0.0, started[running] + _hedge_delay(provider, instance) - time.monotonic())
+        try:
+            index, answer, error = answers.get(timeout=timeout)
+        except queue.Empty:
+            hedges.add(_launch())
+            with _hedging_lock:
+                _hedging_stats["fired"] += 1
+            continue
+        in_flight.discard(index)
+        if error is None and answer and str(answer).strip():
+            for loser in in_flight:
+                tokens[loser].cancel()
+            with _hedging_lock:
+                _hedging_stats["losers_cancelled"] += len(in_flight)
+                if index in hedges:
+                    _hedging_stats["hedge_wins"] += 1
+            return answer
+        provider, instance, _call = attempts[index]
+        last_error = error or RuntimeError(f"{instance or provider} returned an empty translation")
+        if not in_flight and len(started) < len(attempts):
+            _launch()
+    cancellation.raise_if_cancelled()
+    raise last_error
+
+
+def _translate_on_instances(provider, label, instances, request, hedge=False, cancelled=None):
+    """Send request(base_url) to a provider's mirror instances until one answers.
+
+    Instances are tried healthiest first and those with an open circuit are
+    skipped. With hedge a slow instance is raced against the next one.
+    cancelled (a cancellation.CancelToken) stops the fallback to further instances.
+    """
+    started = time.monotonic()
+    ordered = provider_health.order_instances(provider, instances)
+    skipped = set()  # instances whose open circuit kept the request from being sent
+
+    def _attempt(base_url):
+        try:
+            return _guarded_call(provider, lambda: request(base_url), instance=base_url)
+        except TranslationCancelledError:
+            raise
+        except Exception as exc:
+            if isinstance(exc, ProviderUnavailableError):
+                skipped.add(base_url)
+            raise RuntimeError(f"{base_url}: {exc}") from exc
+
+    last_error = None
+    if hedge and len(ordered) > 1:
+        try:
+            result = _hedged_first(
+                [(provider, base_url, lambda _cancelled, base_url=base_url: _attempt(base_url)) for base_url in ordered]
+            )
+        except TranslationCancelledError:
+            raise
+        except Exception as exc:
+            last_error = exc
+        else:
+            provider_health.record_success(provider, time.monotonic() - started)
+            return result
+    else:
+        for base_url in ordered:
+            if cancelled is not None and cancelled.is_set():
+                raise Exception(f"{label} cancelled")
+            try:
+                result = _attempt(base_url)
+            except TranslationCancelledError:
+                raise
+            except Exception as exc:
+                last_error = exc
+                continue
+            provider_health.record_success(provider, time.monotonic() - started)
+            return result
+    if skipped != set(ordered):
+        # With every circuit open nothing was sent, and nothing failed.
+        provider_health.record_failure(provider, last_error)
+    raise Exception(f"{label} failed: {last_error}")
+
+
+class ChunkTranslationError(RuntimeError):
+    """Some chunks of a long text failed to translate.
+
+    failures holds (chunk index, exception) pairs; translated holds the
+    text of every chunk, with None for the failed ones.
+    """
+
+    def __init__(self, provider, failures, translated):
+        self.failures = list(failures)
+        self.translated = list(translated)
+        details = "; ".join(f"part {index + 1}: {error}" for index, error in self.failures)
+        super().__init__(
+            f"{provider} failed for {len(self.failures)} of {len(self.translated)} parts ({details})"
+        )
+
+
+GOOGLE_HOSTS = ['https://translate.googleapis.com']
+MYMEMORY_HOSTS = ['https://api.mymemory.translated.net']
+LINGVA_INSTANCES = [
+    # Active Vercel deployment. Keep it first: the older public domains
+    # below remain useful fallbacks but currently fail intermittently.
+    'https://lingva.vercel.app',
+    'https://lingva.ml',
+    'https://translate.plausibility.cloud',
+]
+# libretranslate.com требует API-ключ, argosopentech/terraprint отключены,
+# поэтому первым идёт публичный инстанс, который отвечает без ключа.
+LIBRETRANSLATE_INSTANCES = [
+    'https://translate.disroot.org',
+    'https://libretranslate.com',
+]
+_PROVIDER_HOSTS = {
+    'google': GOOGLE_HOSTS,
+    'mymemory': MYMEMORY_HOSTS,
+    'lingva': LINGVA_INSTANCES,
+    'libretranslate': LIBRETRANSLATE_INSTANCES,
+}
+# Instances of a provider pre-connected: the one the next request goes to,
+# and the one a hedged request would race it against.
+PREWARM_INSTANCES = 2
+
+
+def _get_http_session(provider=None):
+    """Возвращает переиспользуемую HTTP сессию провайдера (свой пул соединений)."""
+    return provider_sessions.session(provider)
+
+
+def prewarm_connections(engine=None):
+    """Open connections to the online engine in the background before it is needed.
+
+    Called after start-up and when an OCR selection begins, so the
+    translation that follows does not wait for DNS, TCP and TLS. engine
+    defaults to the configured translator; offline engines need nothing.
+    Returns the warming thread, or None.
+    """
+    if engine is None:
+        engine = get_cached_translator_config().get("translator_engine", "Google")
+    engine = str(engine or "").lower()
+    hosts = _PROVIDER_HOSTS.get(engine)
+    if not hosts:
+        return None
+    health = provider_health.health_stats()
+    hosts = [
+        host for host in provider_health.order_instances(engine, hosts)
+        if health.get(provider_health.target_key(engine, host), {}).get("state") != provider_health.OPEN
+    ][:PREWARM_INSTANCES]
+    return provider_sessions.warm_in_background(engine, hosts)
+
+
+def connection_pool_stats():
+    """Pool size, requests and connection reuse ratio of each provider's session."""
+    return provider_sessions.pool_stats()
+
+
+def _get_online_executor():
+    global _online_executor
+    with _online_executor_lock:
+        if _online_executor is None:
+            _online_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=ONLINE_MAX_PARALLEL, thread_name_prefix="online-translate"
+            )
+        return _online_executor
+
+
+def _translate_parts(provider, parts, translate_part):
+    """Translate parts concurrently and return the results in input order.
+
+    Every part is attempted; if any fail, ChunkTranslationError reports
+    which ones after the rest have finished.
+    """
+    if len(parts) == 1:
+        return [translate_part(parts[0])]
+    translated = []
+    failures = []
+    if getattr(_online_task, "active", False):
+        # A part of an outer call (a batch group holding one long text):
+        # waiting here for parts queued behind the executor's busy threads
+        # could block them all, so these go one after another.
+        for index, part in enumerate(parts):
+            cancellation.raise_if_cancelled()
+            try:
+                translated.append(translate_part(part))
+            except Exception as exc:
+                translated.append(None)
+                failures.append((index, exc))
+        if failures:
+            raise ChunkTranslationError(provider, failures, translated)
+        return translated
+
+    def _run_part(part):
+        _online_task.active = True
+        try:
+            return translate_part(part)
+        finally:
+            _online_task.active = False
+
+    executor = _get_online_executor()
+    futures = [executor.submit(cancellation.bound(_run_part), part) for part in parts]
+    for index, future in enumerate(futures):
+        try:
+            translated.append(future.result())
+        except Exception as exc:
+            translated.append(None)
+            failures.append((index, exc))
+    # Queued parts of a cancelled translation fail at once; report that, not them.
+    cancellation.raise_if_cancelled()
+    if failures:
+        raise ChunkTranslationError(provider, failures, translated)
+    return translated
 
-def _get_http_session():
-    """Возвращает переиспользуемую HTTP сессию."""
-    global _http_session
-    if _http_session is None:
-        _http_session = requests.Session()
-        # Оптимизация: keep-alive и пул соединений
-        _http_session.headers.update({'Connection': 'keep-alive'})
-    return _http_session
 
 def _google_translate_chunk(text, source_code, target_code):
     """Translate a single chunk via Google API."""
-    url = 'https://translate.googleapis.com/translate_a/single'
+    url = f'{GOOGLE_HOSTS[0]}/translate_a/single'
     source_api = translator_api_code(source_code, "google")
     target_api = translator_api_code(target_code, "google")
     params = {
@@ -1436,68 +2539,103 @@ def _google_translate_chunk(text, source_code, target_code):
         'dt': 't',
         'q': text,
     }
-    session = _get_http_session()
-    r = session.get(url, params=params, timeout=10)
-    r.raise_for_status()
-    data = r.json()
-    return ''.join(seg[0] for seg in data[0] if seg and seg[0])
+    session = _get_http_session("google")
+
+    def _request():
+        r = session.get(url, params=params, timeout=10)
+        _raise_if_throttled("Google Translate", r)
+        r.raise_for_status()
+        data = r.json()
+        return ''.join(seg[0] for seg in data[0] if seg and seg[0])
+
+    return _guarded_call("google", _request)
 
 
 def google_translate(text, source_code, target_code):
     """Google Translate через публичный endpoint с разбивкой длинного текста."""
     # Normalize line endings
     text = text.replace('\r\n', '\n').replace('\r', '\n')
-    # Cyrillic chars expand ~6x in URL encoding, latin ~1x
-    # Use conservative limit to avoid 400 errors
-    MAX_CHUNK = 1500
-    if len(text) <= MAX_CHUNK:
+    # The URL limit depends on the script: Cyrillic percent-encodes to ~6x
+    # its length, Latin to ~1x (see provider_capabilities).
+    capabilities = provider_capabilities.capabilities("google")
+    if capabilities.fits(text):
         return _google_translate_chunk(text, source_code, target_code)
-    # Split by paragraphs, then sentences
-    parts = []
-    current = ""
-    for line in text.split('\n'):
-        if len(current) + len(line) + 1 > MAX_CHUNK:
-            if current:
-                parts.append(current)
-            if len(line) > MAX_CHUNK:
-                while len(line) > MAX_CHUNK:
-                    cut = line[:MAX_CHUNK].rfind('. ')
-                    if cut < MAX_CHUNK // 2:
-                        cut = line[:MAX_CHUNK].rfind(' ')
-                    if cut < MAX_CHUNK // 4:
-                        cut = MAX_CHUNK
-                    else:
-                        cut += 1
-                    parts.append(line[:cut])
-                    line = line[cut:]
-                current = line if line else ""
-            else:
-                current = line
-        else:
-            current = current + '\n' + line if current else line
-    if current:
-        parts.append(current)
-    translated_parts = []
-    for part in parts:
-        translated_parts.append(_google_translate_chunk(part, source_code, target_code))
+    translated_parts = _translate_parts(
+        "Google Translate",
+        provider_capabilities.chunk_text(text.split('\n'), capabilities),
+        lambda part: _google_translate_chunk(part, source_code, target_code),
+    )
     return '\n'.join(translated_parts)
 
+def google_translate_batch(texts, source_code, target_code):
+    """Translate texts with Google, many per request (one q parameter each).
+
+    Returns one translation per text, None where its request failed. A text
+    longer than a request goes through google_translate on its own.
+    """
+    url = f'{GOOGLE_HOSTS[0]}/translate_a/t'
+    base = [
+        ('client', 'gtx'),
+        ('sl', translator_api_code(source_code, "google")),
+        ('tl', translator_api_code(target_code, "google")),
+    ]
+    session = _get_http_session("google")
+
+    def _translate_group(group):
+        if len(group) == 1:
+            return [google_translate(texts[group[0]], source_code, target_code)]
+
+        def _request():
+            r = session.get(url, params=base + [('q', texts[index]) for index in group], timeout=10)
+            _raise_if_throttled("Google Translate", r)
+            r.raise_for_status()
+            data = r.json()
+            if not isinstance(data, list) or len(data) != len(group):
+                raise ValueError("Google Translate returned a different number of texts")
+            # With sl=auto each item is [translation, detected language].
+            return [item[0] if isinstance(item, list) else item for item in data]
+
+        return _guarded_call("google", _request)
+
+    groups = provider_capabilities.pack(
+        texts,
+        provider_capabilities.capabilities("google"),
+        joiner=None,
+        item_overhead=provider_capabilities.BATCH_ITEM_OVERHEAD,
+    )
+    try:
+        group_results = _translate_parts("Google Translate", groups, _translate_group)
+    except ChunkTranslationError as exc:
+        group_results = exc.translated
+    translated = [None] * len(texts)
+    for group, values in zip(groups, group_results):
+        for index, value in zip(group, values or [None] * len(group)):
+            translated[index] = value
+    return translated
+
 def mymemory_translate(text, source_code, target_code):
     """MyMemory - бесплатный API (до 5000 символов/день без регистрации)."""
-    url = 'https://api.mymemory.translated.net/get'
+    url = f'{MYMEMORY_HOSTS[0]}/get'
     source_api = translator_api_code(source_code, "mymemory")
     target_api = translator_api_code(target_code, "mymemory")
     params = {
         'q': text,
         'langpair': f'{source_api}|{target_api}',
     }
-    session = _get_http_session()
-    r = session.get(url, params=params, timeout=10)
-    r.raise_for_status()
-    data = r.json()
-    if data.get('responseStatus') == 200:
-        return data['responseData']['translatedText']
-    raise Exception(f"MyMemory error: {data.get('responseDetails', 'Unknown error')}")
+    session = _get_http_session("mymemory")
+
+    def _request():
+        r = session.get(url, params=params, timeout=10)
+        _raise_if_throttled("MyMemory", r)
+        r.raise_for_status()
+        data = r.json()
+        if data.get('responseStatus') == 200:
+            return data['responseData']['translatedText']
+        if str(data.get('responseStatus')) == '429':
+            raise ProviderThrottledError("MyMemory")
+        raise Exception(f"MyMemory error: {data.get('responseDetails', 'Unknown error')}")
+
+    return _guarded_call("mymemory", _request)
 
 def _server_error_detail(response):
     """Server-provided error text, so dead or key-gated instances explain themselves."""
@@ -1511,63 +2649,72 @@ def _server_error_detail(response):
         pass
     return f"HTTP {response.status_code}"
 
-def lingva_translate(text, source_code, target_code):
+def lingva_translate(text, source_code, target_code, hedge=False, cancelled=None):
     """Lingva - прокси для Google Translate (более стабильный)."""
-    # Список публичных инстансов Lingva
-    instances = [
-        # Active Vercel deployment. Keep it first: the older public domains
-        # below remain useful fallbacks but currently fail intermittently.
-        'https://lingva.vercel.app',
-        'https://lingva.ml',
-        'https://translate.plausibility.cloud',
-    ]
-    session = _get_http_session()
-    last_error = None
+    session = _get_http_session("lingva")
     source_api = translator_api_code(source_code, "lingva")
     target_api = translator_api_code(target_code, "lingva")
-    for base_url in instances:
-        try:
-            url = f'{base_url}/api/v1/{source_api}/{target_api}/{requests.utils.quote(text)}'
-            r = session.get(url, timeout=8)
-            if r.status_code == 200:
-                data = r.json()
-                return data.get('translation', '')
-            last_error = f"{base_url}: {_server_error_detail(r)}"
-        except Exception as e:
-            last_error = f"{base_url}: {e}"
-            continue
-    raise Exception(f"Lingva translate failed: {last_error}")
 
-def libretranslate(text, source_code, target_code):
-    """LibreTranslate - открытый переводчик (публичные серверы)."""
-    # libretranslate.com требует API-ключ, argosopentech/terraprint отключены,
-    # поэтому первым идёт публичный инстанс, который отвечает без ключа.
-    instances = [
-        'https://translate.disroot.org',
-        'https://libretranslate.com',
-    ]
-    session = _get_http_session()
-    last_error = None
+    def _request(base_url):
+        url = f'{base_url}/api/v1/{source_api}/{target_api}/{requests.utils.quote(text)}'
+        r = session.get(url, timeout=8)
+        _raise_if_throttled(base_url, r)
+        if r.status_code != 200:
+            raise Exception(_server_error_detail(r))
+        data = r.json()
+        return data.get('translation', '')
+
+    return _translate_on_instances("lingva", "Lingva translate", LINGVA_INSTANCES, _request, hedge, cancelled)
+
+def _libretranslate_request(q, source_code, target_code, hedge=False, cancelled=None):
+    session = _get_http_session("libretranslate")
     source_api = translator_api_code(source_code, "libretranslate")
     target_api = translator_api_code(target_code, "libretranslate")
-    for base_url in instances:
+    payload = {
+        'q': q,
+        'source': source_api,
+        'target': target_api,
+        'format': 'text'
+    }
+
+    def _request(base_url):
+        r = session.post(f'{base_url}/translate', json=payload, timeout=10)
+        _raise_if_throttled(base_url, r)
+        if r.status_code != 200:
+            raise Exception(_server_error_detail(r))
+        data = r.json()
+        return data.get('translatedText', '')
+
+    return _translate_on_instances(
+        "libretranslate", "LibreTranslate", LIBRETRANSLATE_INSTANCES, _request, hedge, cancelled
+    )
+
+def libretranslate(text, source_code, target_code, hedge=False, cancelled=None):
+    """LibreTranslate - открытый переводчик (публичные серверы)."""
+    return _libretranslate_request(text, source_code, target_code, hedge, cancelled)
+
+def libretranslate_batch(texts, source_code, target_code):
+    """Translate texts with LibreTranslate, many per request (q as an array).
+
+    Returns one translation per text, None where its request failed.
+    """
+    translated = [None] * len(texts)
+    groups = provider_capabilities.pack(
+        texts,
+        provider_capabilities.capabilities("libretranslate"),
+        joiner=None,
+        item_overhead=provider_capabilities.JSON_ITEM_OVERHEAD,
+    )
+    for group in groups:
         try:
-            url = f'{base_url}/translate'
-            payload = {
-                'q': text,
-                'source': source_api,
-                'target': target_api,
-                'format': 'text'
-            }
-            r = session.post(url, json=payload, timeout=10)
-            if r.status_code == 200:
-                data = r.json()
-                return data.get('translatedText', '')
-            last_error = f"{base_url}: {_server_error_detail(r)}"
-        except Exception as e:
-            last_error = f"{base_url}: {e}"
+            values = _libretranslate_request([texts[index] for index in group], source_code, target_code)
+        except Exception as exc:
+            print(f"LibreTranslate batch failed: {exc}")
             continue
-    raise Exception(f"LibreTranslate failed: {last_error}")
+        if isinstance(values, list) and len(values) == len(group):
+            for index, value in zip(group, values):
+                translated[index] = value
+    return translated
 
 if __name__ == '__main__':
     if _ensure_argos_available():
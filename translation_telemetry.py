@@ -0,0 +1,318 @@
+"""
+Latency, error and cache telemetry of translate_text and translate_batch.
+
+Every call is recorded under its engine, language pair and payload size
+class: how long it took, whether it failed, was cancelled or came from the
+cache, and how many characters and UTF-8 bytes went in and came out.
+Latencies go into a histogram of logarithmic buckets, each BUCKET_GROWTH
+times wider than the one before, so a series costs a few hundred bytes
+whatever the number of calls, and series merge by adding their counts.
+stats() reports p50/p95/p99 per engine, and per pair and size class of it.
+
+Only translations that were neither cached nor failed enter the latency
+histogram: cache hits would make every engine look instant.
+
+The counters outlive the session: configure() points the module at a JSON
+file in the data directory, which is loaded once and rewritten at most
+every SAVE_INTERVAL seconds while calls are recorded, and by flush().
+"""
+
+import os
+import json
+import math
+import time
+import atexit
+import threading
+
+FORMAT_VERSION = 1
+TELEMETRY_FILE = "translation_telemetry.json"
+SAVE_INTERVAL = 60.0
+
+# Bucket 0 holds latencies up to FIRST_BUCKET_MS, bucket i those up to
+# FIRST_BUCKET_MS * BUCKET_GROWTH ** i; the last one takes everything slower.
+FIRST_BUCKET_MS = 1.0
+BUCKET_GROWTH = 1.2
+BUCKETS = 80  # the last bound is about 30 minutes
+
+# Payload size classes, by characters of source text; batches are a class of their own.
+SIZE_CLASSES = ((200, "short"), (2000, "medium"))
+LONG = "long"
+BATCH = "batch"
+
+_COUNTERS = ("requests", "errors", "cancelled", "cache_hits", "chars", "bytes_in", "bytes_out")
+
+
+def size_class(chars):
+    for limit, name in SIZE_CLASSES:
+        if chars <= limit:
+            return name
+    return LONG
+
+
+def bucket_index(latency_ms):
+    if latency_ms <= FIRST_BUCKET_MS:
+        return 0
+    index = math.ceil(math.log(latency_ms / FIRST_BUCKET_MS, BUCKET_GROWTH))
+    return min(BUCKETS - 1, index)
+
+
+def bucket_range(index):
+    """(lower, upper) latency in ms of histogram bucket index."""
+    if index <= 0:
+        return 0.0, FIRST_BUCKET_MS
+    return FIRST_BUCKET_MS * BUCKET_GROWTH ** (index - 1), FIRST_BUCKET_MS * BUCKET_GROWTH ** index
+
+
+class _Series:
+    """Counters and latency histogram of one engine, pair and size class."""
+
+    __slots__ = _COUNTERS + ("histogram", "latency_count", "latency_total_ms", "latency_max_ms")
+
+    def __init__(self):
+        for name in _COUNTERS:
+            setattr(self, name, 0)
+        self.histogram = {}
+        self.latency_count = 0
+        self.latency_total_ms = 0.0
+        self.latency_max_ms = 0.0
+
+    def add_latency(self, latency_ms):
+        index = bucket_index(latency_ms)
+        self.histogram[index] = self.histogram.get(index, 0) + 1
+        self.latency_count += 1
+        self.latency_total_ms += latency_ms
+        self.latency_max_ms = max(self.latency_max_ms, latency_ms)
+
+    def merge(self, other):
+        for name in _COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for index, count in other.histogram.items():
+            self.histogram[index] = self.histogram.get(index, 0) + count
+        self.latency_count += other.latency_count
+        self.latency_total_ms += other.latency_total_ms
+        self.latency_max_ms = max(self.latency_max_ms, other.latency_max_ms)
+
+    def percentile(self, fraction):
+        """Latency in ms below which fraction of the samples fall, or None."""
+        if not self.latency_count:
+            return None
+        rank = fraction * self.latency_count
+        seen = 0
+        for index in sorted(self.histogram):
+            count = self.histogram[index]
+            if seen + count >= rank:
+                lower, upper = bucket_range(index)
+                # Spread the samples evenly over the bucket.
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(value, self.latency_max_ms)
+            seen += count
+        return self.latency_max_ms
+
+    def summary(self):
+        requests = self.requests
+        return {
+            **{name: getattr(self, name) for name in _COUNTERS},
+            "error_rate": self.errors / requests if requests else 0.0,
+            "cache_hit_rate": self.cache_hits / requests if requests else 0.0,
+            "samples": self.latency_count,
+            "mean_ms": self.latency_total_ms / self.latency_count if self.latency_count else None,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.latency_max_ms if self.latency_count else None,
+        }
+
+    def to_dict(self):
+        return {
+            **{name: getattr(self, name) for name in _COUNTERS},
+            "histogram": {str(index): count for index, count in sorted(self.histogram.items())},
+            "latency_total_ms": round(self.latency_total_ms, 3),
+            "latency_max_ms": round(self.latency_max_ms, 3),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        series = cls()
+        for name in _COUNTERS:
+            setattr(series, name, max(0, int(data.get(name, 0))))
+        for index, count in dict(data.get("histogram") or {}).items():
+            index, count = int(index), int(count)
+            if 0 <= index < BUCKETS and count > 0:
+                series.histogram[index] = count
+        series.latency_count = sum(series.histogram.values())
+        series.latency_total_ms = max(0.0, float(data.get("latency_total_ms", 0.0)))
+        series.latency_max_ms = max(0.0, float(data.get("latency_max_ms", 0.0)))
+        return series
+
+
+def _read(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != FORMAT_VERSION:
+        return {}
+    found = {}
+    for entry in data.get("series") or []:
+        try:
+            key = (str(entry["engine"]), str(entry["pair"]), str(entry["size"]))
+            found[key] = _Series.from_dict(entry)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+    return found
+
+
+def _write(path, series):
+    data = {
+        "version": FORMAT_VERSION,
+        "series": [
+            {"engine": engine, "pair": pair, "size": size, **entry.to_dict()}
+            for (engine, pair, size), entry in sorted(series.items())
+        ],
+    }
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+class Telemetry:
+    """Series of every engine, pair and size class recorded, and where they are saved."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._series = {}
+        self._path = None
+        self._dirty = False
+        self._saved_at = clock()
+
+    def configure(self, path):
+        """Persist to path; what it holds from earlier sessions is added in once."""
+        with self._lock:
+            if path == self._path:
+                return
+            self._path = path
+            self._saved_at = self._clock()
+        loaded = _read(path) if path else {}
+        with self._lock:
+            if path != self._path:
+                return
+            for key, series in loaded.items():
+                self._series.setdefault(key, _Series()).merge(series)
+
+    def record(
+        self,
+        engine,
+        source_code,
+        target_code,
+        latency=None,
+        chars=0,
+        bytes_in=0,
+        bytes_out=0,
+        requests=1,
+        errors=0,
+        cancelled=0,
+        cache_hits=0,
+        size=None,
+    ):
+        """Record calls: latency in seconds of one uncached success, or None."""
+        key = (str(engine or "unknown").lower(), f"{source_code}-{target_code}", size or size_class(chars))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            series.requests += requests
+            series.errors += errors
+            series.cancelled += cancelled
+            series.cache_hits += cache_hits
+            series.chars += chars
+            series.bytes_in += bytes_in
+            series.bytes_out += bytes_out
+            if latency is not None:
+                series.add_latency(latency * 1e3)
+            self._dirty = True
+            due = self._path and self._clock() - self._saved_at >= SAVE_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write the counters to the configured file now, if anything changed."""
+        with self._lock:
+            if not self._dirty or not self._path:
+                return False
+            path = self._path
+            snapshot = {key: _Series() for key in self._series}
+            for key, series in self._series.items():
+                snapshot[key].merge(series)
+            self._dirty = False
+            self._saved_at = self._clock()
+        if not _write(path, snapshot):
+            with self._lock:
+                self._dirty = True
+            return False
+        return True
+
+    def stats(self):
+        """Summary per engine, with its "pairs" and "sizes" broken down the same way."""
+        with self._lock:
+            engines = {}
+            for (engine, pair, size), series in self._series.items():
+                found = engines.get(engine)
+                if found is None:
+                    found = engines[engine] = (_Series(), {}, {})
+                total, pairs, sizes = found
+                total.merge(series)
+                pairs.setdefault(pair, _Series()).merge(series)
+                sizes.setdefault(size, _Series()).merge(series)
+        return {
+            engine: {
+                **total.summary(),
+                "pairs": {pair: series.summary() for pair, series in sorted(pairs.items())},
+                "sizes": {size: series.summary() for size, series in sorted(sizes.items())},
+            }
+            for engine, (total, pairs, sizes) in sorted(engines.items())
+        }
+
+    def reset(self):
+        """Forget every series, in memory and in the configured file."""
+        with self._lock:
+            self._series.clear()
+            self._dirty = True
+        self.flush()
+
+
+_telemetry = Telemetry()
+
+
+def configure(path):
+    _telemetry.configure(path)
+
+
+def record(engine, source_code, target_code, **counts):
+    _telemetry.record(engine, source_code, target_code, **counts)
+
+
+def flush():
+    return _telemetry.flush()
+
+
+def telemetry_stats():
+    return _telemetry.stats()
+
+
+def reset_telemetry():
+    _telemetry.reset()
+
+
+atexit.register(flush)